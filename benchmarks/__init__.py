@@ -0,0 +1,6 @@
+"""
+Бенчмарки производительности Baby Sleep Tracker.
+
+Запускаются как модули из корня репозитория, например:
+    python -m benchmarks.bench_memory
+"""
@@ -0,0 +1,95 @@
+"""
+Бенчмарк холодной загрузки истории сна.
+
+Сравнивается время от файла на диске до готовой статистики за месяц:
+- снимок JSON -> объекты Child -> get_sleep_stats_range;
+- SQLite -> объекты Child -> get_sleep_stats_range;
+- двоичный файл -> mmap -> статистика по буферу (без объектов);
+- двоичный файл -> объекты SleepRecord (для сравнения).
+
+Запуск:
+    python -m benchmarks.bench_binary [размер ...]
+"""
+
+import json
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+from benchmarks.synthetic import generate_child
+from sleep_tracker.services.storage.binary import RecordFile, write_children
+from sleep_tracker.services.storage.serialization import child_from_dict, child_to_dict
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def timed(function: Callable[[], object]) -> float:
+    """
+    Возвращает время выполнения функции в миллисекундах.
+    """
+    started = time.perf_counter()
+    function()
+    return (time.perf_counter() - started) * 1000
+
+
+def main(sizes: List[int]) -> int:
+    print(
+        f"{'записей':>10} {'JSON, мс':>10} {'SQLite, мс':>11} "
+        f"{'mmap, мс':>10} {'mmap->объекты, мс':>18}"
+    )
+    for size in sizes:
+        child = generate_child(size)
+        last_day = child.sleep_records[-1].start_time.date()
+        first_day = last_day - timedelta(days=29)
+
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = Path(directory) / "child.json"
+            json_path.write_text(json.dumps(child_to_dict(child)), encoding="utf-8")
+            storage = SQLiteStorage(Path(directory) / "child.db")
+            storage.save_child("bench", child)
+            binary_path = Path(directory) / "child.bin"
+            write_children(binary_path, {1: child})
+
+            def from_json(
+                json_path: Path = json_path,
+                first_day: date = first_day,
+                last_day: date = last_day,
+            ) -> object:
+                data = json.loads(json_path.read_text(encoding="utf-8"))
+                return child_from_dict(data).get_sleep_stats_range(first_day, last_day)
+
+            def from_sqlite(
+                storage: SQLiteStorage = storage,
+                first_day: date = first_day,
+                last_day: date = last_day,
+            ) -> object:
+                return storage.load_child("bench").get_sleep_stats_range(first_day, last_day)
+
+            def from_mmap(
+                binary_path: Path = binary_path,
+                first_day: date = first_day,
+                last_day: date = last_day,
+            ) -> object:
+                with RecordFile(binary_path) as record_file:
+                    return record_file.daily_sleep_minutes(1, first_day, last_day).tolist()
+
+            def mmap_to_objects(binary_path: Path = binary_path) -> object:
+                with RecordFile(binary_path) as record_file:
+                    return record_file.to_records(1)
+
+            json_ms = timed(from_json)
+            sqlite_ms = timed(from_sqlite)
+            mmap_ms = timed(from_mmap)
+            objects_ms = timed(mmap_to_objects)
+            storage.close()
+
+        print(f"{size:>10} {json_ms:>10.1f} {sqlite_ms:>11.1f} {mmap_ms:>10.2f} {objects_ms:>18.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main([int(arg) for arg in sys.argv[1:]] or list(DEFAULT_SIZES)))
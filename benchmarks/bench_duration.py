@@ -0,0 +1,85 @@
+"""
+Бенчмарк длительности сна на экране статуса.
+
+Сравнивается прежний расчет (datetime.now() для каждой активной записи
+и float total_seconds() при каждом обращении) с текущим:
+- завершенные записи: duration и format_duration по истории
+  (длительность в секундах запоминается при первом обращении);
+- активные записи многих детей: format_duration с одним моментом now
+  на весь экран.
+
+Запуск:
+    python -m benchmarks.bench_duration [количество записей]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+from benchmarks.synthetic import generate_child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+
+DEFAULT_COUNT = 10_000
+REPEAT = 5
+
+
+def legacy_duration(record: SleepRecord) -> Tuple[int, int]:
+    """
+    Прежний SleepRecord.duration.
+    """
+    end = datetime.now() if record.end_time is None else record.end_time
+    total_minutes = int((end - record.start_time).total_seconds() / 60)
+    return total_minutes // 60, total_minutes % 60
+
+
+def legacy_format(record: SleepRecord) -> str:
+    """
+    Прежний SleepRecord.format_duration.
+    """
+    hours, minutes = legacy_duration(record)
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def best_ms(function: Callable[[], object]) -> float:
+    """
+    Возвращает лучшее из REPEAT времен выполнения в миллисекундах.
+    """
+    times = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - started) * 1000)
+    return min(times)
+
+
+def main(count: int) -> int:
+    closed = generate_child(count).sleep_records[-count:]
+    started = datetime(2024, 1, 1, 20, 0)
+    active = [SleepRecord(started + timedelta(seconds=number)) for number in range(count)]
+
+    def closed_legacy() -> List[object]:
+        return [(legacy_duration(record), legacy_format(record)) for record in closed]
+
+    def closed_current() -> List[object]:
+        return [(record.duration, record.format_duration()) for record in closed]
+
+    def active_legacy() -> List[str]:
+        return [legacy_format(record) for record in active]
+
+    def active_current() -> List[str]:
+        now = datetime.now()
+        return [record.format_duration(now) for record in active]
+
+    print(f"{'случай':<28} {'прежний, мс':>12} {'текущий, мс':>12} {'ускорение':>10}")
+    for name, legacy, current in (
+        ("завершенные записи", closed_legacy, closed_current),
+        ("активные записи (статус)", active_legacy, active_current),
+    ):
+        legacy_ms, current_ms = best_ms(legacy), best_ms(current)
+        print(f"{name:<28} {legacy_ms:>12.2f} {current_ms:>12.2f} {legacy_ms / current_ms:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT))
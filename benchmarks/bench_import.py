@@ -0,0 +1,83 @@
+"""
+Бенчмарк потокового импорта истории сна из CSV и JSON Lines.
+
+Генерирует файл с заданным количеством строк (каждая тысячная строка
+испорчена), затем измеряет:
+- разбор строк без добавления в Child (скорость самого конвейера);
+- полный импорт в Child через SleepImporter.
+
+Запуск:
+    python -m benchmarks.bench_import [строк]
+"""
+
+import csv
+import json
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from benchmarks.synthetic import iter_history
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.services.importer.pipeline import (
+    ImportResult,
+    SleepImporter,
+    iter_csv_rows,
+    iter_jsonl_rows,
+    parse_rows,
+)
+
+BAD_ROW_EVERY = 1000
+
+
+def write_files(directory: Path, rows: int) -> None:
+    """
+    Пишет один и тот же набор записей в CSV и JSON Lines.
+    """
+    with (directory / "history.csv").open("w", encoding="utf-8", newline="") as csv_file, (
+        directory / "history.jsonl"
+    ).open("w", encoding="utf-8") as jsonl_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(["start", "end", "comment"])
+        for number, record in enumerate(iter_history(rows), start=1):
+            assert record.end_time is not None
+            start, end = record.start_time.isoformat(), record.end_time.isoformat()
+            if number % BAD_ROW_EVERY == 0:
+                # Окончание раньше начала
+                start, end = end, start
+            writer.writerow([start, end, record.comment])
+            row = {"start": start, "end": end, "comment": record.comment}
+            jsonl_file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def main(rows: int = 1_000_000) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory)
+        started = time.perf_counter()
+        write_files(path, rows)
+        print(f"Строк: {rows}, генерация файлов: {time.perf_counter() - started:.1f} с")
+
+        for name, reader in (("csv", iter_csv_rows), ("jsonl", iter_jsonl_rows)):
+            file_path = path / f"history.{name}"
+            with file_path.open(encoding="utf-8", newline="") as stream:
+                started = time.perf_counter()
+                parsed = sum(1 for _ in parse_rows(reader(stream), ImportResult()))
+                parse_seconds = time.perf_counter() - started
+
+            child = Child(name="Импорт", birth_date=date(2019, 12, 1))
+            started = time.perf_counter()
+            result = SleepImporter().import_file(file_path, child)
+            import_seconds = time.perf_counter() - started
+
+            assert parsed == result.imported == len(child.sleep_records)
+            print(
+                f"{name:>5}: разбор {rows / parse_seconds:>9.0f} строк/с, "
+                f"импорт {rows / import_seconds:>9.0f} строк/с "
+                f"(записей: {result.imported}, ошибок: {result.skipped})"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,48 @@
+"""
+Бенчмарк памяти: список SleepRecord против PackedSleepRecords.
+
+Память измеряется через tracemalloc. Скрипт завершается с ошибкой,
+если упакованное хранилище экономит меньше, чем в MIN_RATIO раз.
+
+Запуск:
+    python -m benchmarks.bench_memory [количество записей]
+"""
+
+import sys
+import tracemalloc
+from typing import Callable, Tuple, TypeVar
+
+from benchmarks.synthetic import generate_history
+from sleep_tracker.core.models.columns import PackedSleepRecords
+
+MIN_RATIO = 5.0
+
+T = TypeVar("T")
+
+
+def measure(build: Callable[[], T]) -> Tuple[T, int]:
+    """
+    Измеряет объем памяти, оставшейся занятой после вызова build().
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main(count: int = 100_000) -> int:
+    records, list_bytes = measure(lambda: generate_history(count))
+    _, packed_bytes = measure(lambda: PackedSleepRecords.from_records(records))
+
+    ratio = list_bytes / packed_bytes
+    print(f"Записей: {count}")
+    print(f"List[SleepRecord]:   {list_bytes / count:8.1f} байт/запись")
+    print(f"PackedSleepRecords:  {packed_bytes / count:8.1f} байт/запись")
+    print(f"Экономия: {ratio:.1f}x (требуется не меньше {MIN_RATIO:.0f}x)")
+    return 0 if ratio >= MIN_RATIO else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,50 @@
+"""
+Бенчмарк масштабирования пакетной генерации отчетов по числу процессов.
+
+Для каждого числа процессов строятся месячные отчеты для одного и того
+же набора синтетических детей; выводится время и ускорение относительно
+одного процесса. Почти линейный рост ожидается, пока число процессов
+не превышает числа ядер.
+
+Запуск:
+    python -m benchmarks.bench_reports [детей] [записей на ребенка]
+"""
+
+import os
+import sys
+import time
+from datetime import timedelta
+from typing import List, Tuple
+
+from benchmarks.synthetic import generate_child
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.services.reports.batch import BatchReportService
+
+
+def main(children_count: int = 2000, records_per_child: int = 2000) -> int:
+    children: List[Tuple[str, Child]] = [
+        (f"child-{seed}", generate_child(records_per_child, seed))
+        for seed in range(children_count)
+    ]
+    last_day = min(child.sleep_records[-1].start_time.date() for _, child in children)
+    first_day = last_day - timedelta(days=364)
+
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, cores} - {0})
+    print(f"Детей: {children_count}, записей на ребенка: {records_per_child}, ядер: {cores}")
+    baseline = 0.0
+    for workers in worker_counts:
+        service = BatchReportService(max_workers=workers, chunk_size=32)
+        started = time.perf_counter()
+        count = sum(1 for _ in service.generate(children, first_day, last_day))
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(
+            f"процессов: {workers:>2}  отчетов: {count}  время: {elapsed:6.2f} с  "
+            f"ускорение: {baseline / elapsed:4.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
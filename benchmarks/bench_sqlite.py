@@ -0,0 +1,72 @@
+"""
+Бенчмарк: статистика за месяц из SQLite против вычислений в памяти.
+
+Для каждого размера истории сравниваются:
+- get_sleep_stats в цикле по 30 дням (объекты в памяти);
+- Child.get_sleep_stats_range (колоночный расчет в памяти);
+- SQLiteStorage.get_sleep_stats_range (агрегаты SQL);
+а также время полной загрузки ребенка из базы.
+
+Запуск:
+    python -m benchmarks.bench_sqlite [размер ...]
+"""
+
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, List
+
+from benchmarks.synthetic import generate_child
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def best_of(function: Callable[[], object], repeat: int = 5) -> float:
+    """
+    Возвращает лучшее время выполнения функции в миллисекундах.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main(sizes: List[int]) -> int:
+    print(f"{'записей':>10} {'цикл, мс':>10} {'range, мс':>10} {'SQL, мс':>10} {'загрузка, мс':>13}")
+    for size in sizes:
+        child = generate_child(size)
+        last_day = child.sleep_records[-1].start_time.date()
+        first_day = last_day - timedelta(days=29)
+        days = [first_day + timedelta(days=offset) for offset in range(30)]
+
+        with tempfile.TemporaryDirectory() as directory:
+            storage = SQLiteStorage(Path(directory) / "bench.db")
+            storage.save_child("bench", child)
+
+            loop_ms = best_of(
+                lambda child=child, days=days: [child.get_sleep_stats(day) for day in days]
+            )
+            range_ms = best_of(
+                lambda child=child, first=first_day, last=last_day: (
+                    child.get_sleep_stats_range(first, last)
+                )
+            )
+            sql_ms = best_of(
+                lambda storage=storage, first=first_day, last=last_day: (
+                    storage.get_sleep_stats_range("bench", first, last)
+                )
+            )
+            load_ms = best_of(lambda storage=storage: storage.load_child("bench"), repeat=1)
+            storage.close()
+
+        print(f"{size:>10} {loop_ms:>10.2f} {range_ms:>10.2f} {sql_ms:>10.2f} {load_ms:>13.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main([int(arg) for arg in sys.argv[1:]] or list(DEFAULT_SIZES)))
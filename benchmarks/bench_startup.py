@@ -0,0 +1,137 @@
+"""
+Бенчмарк холодного запуска команд CLI по выводу python -X importtime.
+
+Команды start, stop и status запускаются в отдельных процессах
+на временной базе. Для каждой из вывода -X importtime берется время
+импорта модулей, которые загружает сама команда (импорты верхнего
+уровня, кроме site: запуск интерпретатора от проекта не зависит
+и на разных машинах занимает разное время). Дополнительно
+проверяется, что команды не загружают тяжелые зависимости.
+
+Скрипт завершается с кодом 1, если импорт дольше бюджета
+или загружен запрещенный модуль.
+
+Запуск:
+    python -m benchmarks.bench_startup [--budget-ms 50] [--repeat 5]
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Sequence, Set, Tuple
+
+BUDGET_MS = 50.0
+REPEAT = 5
+# Модули, которые быстрые команды загружать не должны
+FORBIDDEN = ("numpy", "pandas", "telegram")
+START = datetime(2024, 1, 1, 20, 0)
+
+
+def parse_importtime(output: str) -> Tuple[float, Set[str]]:
+    """
+    Разбирает вывод -X importtime.
+
+    Args:
+        output (str): Поток ошибок процесса
+
+    Returns:
+        Tuple[float, Set[str]]: Время импортов верхнего уровня без site
+                                в миллисекундах и имена загруженных модулей
+    """
+    total_us = 0
+    modules: Set[str] = set()
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        module = name.strip()
+        modules.add(module)
+        # Вложенные импорты выводятся с отступом и входят во время родителя
+        if not name.startswith("  ") and module != "site":
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def run_command(database: Path, arguments: Sequence[str]) -> Tuple[float, Set[str]]:
+    """
+    Запускает команду CLI в новом процессе.
+
+    Returns:
+        Tuple[float, Set[str]]: Результат parse_importtime
+    """
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-m",
+            "sleep_tracker.interfaces.cli",
+            "--db",
+            str(database),
+            *arguments,
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def measure(repeat: int = REPEAT) -> Dict[str, Tuple[float, Set[str]]]:
+    """
+    Лучшее время импорта и загруженные модули для каждой команды.
+
+    Args:
+        repeat (int): Сколько раз запускать каждую команду
+
+    Returns:
+        Dict[str, Tuple[float, Set[str]]]: Команда -> (миллисекунды, модули)
+    """
+    from sleep_tracker.core.models.child import Child
+    from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+    results: Dict[str, Tuple[float, Set[str]]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        database = Path(directory) / "startup.db"
+        with SQLiteStorage(database) as storage:
+            storage.save_child("default", Child(name="Бенчмарк", birth_date=date(2023, 1, 1)))
+        for number in range(repeat):
+            start = START + timedelta(days=number)
+            for arguments in (
+                ["start", "--at", start.isoformat()],
+                ["status"],
+                ["stop", "--at", (start + timedelta(hours=10)).isoformat()],
+            ):
+                milliseconds, modules = run_command(database, arguments)
+                best = results.get(arguments[0])
+                if best is None or milliseconds < best[0]:
+                    results[arguments[0]] = (milliseconds, modules)
+    return results
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args(argv)
+
+    failed = False
+    for command, (milliseconds, modules) in measure(args.repeat).items():
+        heavy = sorted(
+            module for module in modules if module.split(".")[0] in FORBIDDEN
+        )
+        over = milliseconds > args.budget_ms
+        failed = failed or over or bool(heavy)
+        mark = "ПРЕВЫШЕН БЮДЖЕТ" if over else "ok"
+        print(f"{command:>8}: импорт {milliseconds:6.1f} мс ({mark})")
+        if heavy:
+            print(f"          загружены запрещенные модули: {', '.join(heavy)}")
+    print(f"Бюджет: {args.budget_ms:.0f} мс")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
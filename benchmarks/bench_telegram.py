@@ -0,0 +1,196 @@
+"""
+Нагрузочный тест Telegram бота на локальном поддельном сервере Bot API.
+
+Сервер отвечает на getMe, getUpdates и sendMessage так же, как настоящий
+Bot API, поэтому бот работает без изменений: python-telegram-bot опрашивает
+getUpdates, обработчики идут в SleepBotService и хранилище SQLite,
+ответы возвращаются через sendMessage.
+
+Каждый чат ведет себя как родитель: отправляет следующую команду
+(/sleep, /stats, /status, /stats, /wake, /stats) только после ответа на
+предыдущую. Выводятся пропускная способность в обновлениях в секунду,
+задержка ответа и число реальных расчетов статистики (остальные запросы
+объединены).
+
+Запуск:
+    python -m benchmarks.bench_telegram [чатов] [команд на чат]
+"""
+
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qsl
+
+from sleep_tracker.interfaces.telegram.bot import build_application
+from sleep_tracker.interfaces.telegram.service import SleepBotService
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+TOKEN = "123456:bench"
+SCRIPT = ("/sleep", "/stats", "/status", "/stats", "/wake", "/stats")
+
+
+class FakeBotApi:
+    """
+    Минимальный HTTP сервер, имитирующий Telegram Bot API.
+
+    Attributes:
+        replies (int): Количество полученных sendMessage
+        latencies (List[float]): Задержки ответов в секундах
+    """
+
+    def __init__(self, chats: int, commands_per_chat: int) -> None:
+        self.replies = 0
+        self.latencies: List[float] = []
+        self.done = asyncio.Event()
+        self.commands_per_chat = commands_per_chat
+        self._remaining = {chat_id: commands_per_chat for chat_id in range(1, chats + 1)}
+        self._sent_at: Dict[int, float] = {}
+        self._updates: List[Dict[str, Any]] = []
+        self._update_id = 0
+        self._has_updates = asyncio.Event()
+
+    def send_command(self, chat_id: int) -> None:
+        """
+        Ставит в очередь следующую команду чата.
+        """
+        remaining = self._remaining[chat_id]
+        if remaining == 0:
+            del self._remaining[chat_id]
+            if not self._remaining:
+                self.done.set()
+            return
+        self._remaining[chat_id] = remaining - 1
+        text = SCRIPT[(self.commands_per_chat - remaining) % len(SCRIPT)]
+        self._update_id += 1
+        self._updates.append(
+            {
+                "update_id": self._update_id,
+                "message": {
+                    "message_id": self._update_id,
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private"},
+                    "from": {"id": chat_id, "is_bot": False, "first_name": "Родитель"},
+                    "text": text,
+                    "entities": [{"type": "bot_command", "offset": 0, "length": len(text)}],
+                },
+            }
+        )
+        self._sent_at[chat_id] = time.perf_counter()
+        self._has_updates.set()
+
+    async def _method(self, name: str, params: Dict[str, str]) -> Any:
+        if name == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+        if name == "getUpdates":
+            offset = int(params.get("offset", 0))
+            self._updates = [update for update in self._updates if update["update_id"] >= offset]
+            if not self._updates:
+                self._has_updates.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._has_updates.wait(), float(params.get("timeout", 0)) or 0.01
+                    )
+                except asyncio.TimeoutError:
+                    return []
+            return self._updates[: int(params.get("limit", 100))]
+        if name == "sendMessage":
+            chat_id = int(params["chat_id"])
+            self.replies += 1
+            self.latencies.append(time.perf_counter() - self._sent_at[chat_id])
+            self.send_command(chat_id)
+            return {
+                "message_id": self.replies,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": params["text"],
+            }
+        return True
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Обрабатывает соединение HTTP/1.1 с поддержкой keep-alive.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1").strip()
+                    if not line:
+                        break
+                    key, _, value = line.partition(":")
+                    headers[key.lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                method = request_line.split()[1].decode().rsplit("/", 1)[-1]
+                params = dict(parse_qsl(body.decode()))
+                payload = json.dumps({"ok": True, "result": await self._method(method, params)})
+                data = payload.encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: %d\r\n\r\n%s" % (len(data), data)
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def run(chats: int, commands_per_chat: int, directory: Path) -> Tuple[float, FakeBotApi, int]:
+    api = FakeBotApi(chats, commands_per_chat)
+    server = await asyncio.start_server(api.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    storage = SQLiteStorage(directory / "bench.db")
+    service = SleepBotService(storage)
+    for chat_id in range(1, chats + 1):
+        await service.register(chat_id, f"Ребенок {chat_id}", date(2023, 1, 1))
+
+    application = build_application(TOKEN, service, base_url=f"http://127.0.0.1:{port}/bot")
+    async with application:
+        await application.start()
+        assert application.updater is not None
+        await application.updater.start_polling(poll_interval=0, timeout=1)
+        started = time.perf_counter()
+        for chat_id in range(1, chats + 1):
+            api.send_command(chat_id)
+        await api.done.wait()
+        elapsed = time.perf_counter() - started
+        await application.updater.stop()
+        await application.stop()
+
+    server.close()
+    await server.wait_closed()
+    storage.close()
+    return elapsed, api, service.stats_computations
+
+
+def main(chats: int = 200, commands_per_chat: int = 25) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        elapsed, api, computations = asyncio.run(run(chats, commands_per_chat, Path(directory)))
+
+    latencies = sorted(api.latencies)
+    stats_requests = chats * sum(
+        SCRIPT[index % len(SCRIPT)] == "/stats" for index in range(commands_per_chat)
+    )
+    print(f"Чатов: {chats}, команд на чат: {commands_per_chat}")
+    print(f"обновлений: {api.replies}  время: {elapsed:.2f} с  ({api.replies / elapsed:.0f} в секунду)")
+    print(
+        f"задержка: медиана {statistics.median(latencies) * 1000:.1f} мс, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} мс"
+    )
+    print(f"запросов /stats: {stats_requests}  расчетов статистики: {computations}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,321 @@
+"""
+Набор бенчмарков горячих путей с проверкой регрессий.
+
+Для каждого размера истории (по умолчанию 1k, 10k, 100k и 1M записей,
+история детерминированная, см. synthetic.py) измеряются:
+- модель: get_sleep_stats (холодный и прогретый кэш), get_active_sleep,
+  цикл start_sleep/end_sleep, SleepRecord.duration и format_duration;
+- сериализация: child_to_dict и child_from_dict;
+- хранилище и отчеты: сохранение и загрузка SQLite (полная и ленивая
+  с расчетом статистики за последний день), отчет за год по записям
+  и по дневным итогам SQLite,
+  выгрузка записей в CSV.
+
+Каждый случай запускается столько раз, чтобы один замер длился не меньше
+MIN_SAMPLE_SECONDS; из REPEAT замеров берется лучший. Результат - время
+одного вызова в секундах - пишется в JSON. Если указан файл с базовыми
+результатами, случай, ставший медленнее базового больше чем на
+tolerance, считается регрессией, и скрипт завершается с кодом 1.
+
+Запуск:
+    python -m benchmarks.suite [--sizes 1000 10000] [--output results.json]
+                               [--baseline benchmarks/baseline.json]
+                               [--tolerance 0.5] [--update-baseline]
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from benchmarks.synthetic import generate_child
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.columns import RecordColumns
+from sleep_tracker.services.reports.export import ReportExporter
+from sleep_tracker.services.reports.report import build_report, report_from_rollups
+from sleep_tracker.services.storage.serialization import child_from_dict, child_to_dict
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+MIN_SAMPLE_SECONDS = 0.2
+REPEAT = 3
+# Сколько записей берется для замера SleepRecord.duration
+DURATION_SAMPLE = 10_000
+
+# Случай бенчмарка: по ребенку, временному каталогу и стеку ресурсов
+# (закрываются после замера) возвращает измеряемую функцию без аргументов
+Case = Callable[[Child, Path, ExitStack], Callable[[], object]]
+
+
+def _copy(child: Child) -> Child:
+    """
+    Копия ребенка со своим списком записей (сами записи общие).
+    """
+    return Child(
+        name=child.name, birth_date=child.birth_date, sleep_records=list(child.sleep_records)
+    )
+
+
+def _last_days(child: Child, count: int) -> List[date]:
+    last_day = child.sleep_records[-1].start_time.date()
+    return [last_day - timedelta(days=offset) for offset in range(count)]
+
+
+def case_sleep_stats_cold(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    days = _last_days(child, 30)
+
+    def run() -> object:
+        child.cache_clear()
+        return [child.get_sleep_stats(day) for day in days]
+
+    return run
+
+
+def case_sleep_stats_warm(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    days = _last_days(child, 30)
+    for day in days:
+        child.get_sleep_stats(day)
+    return lambda: [child.get_sleep_stats(day) for day in days]
+
+
+def case_active_sleep(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    copy = _copy(child)
+    copy.start_sleep(copy.sleep_records[-1].end_time or datetime.now())
+    return copy.get_active_sleep
+
+
+def case_start_end_cycle(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    copy = _copy(child)
+    history_end = copy.sleep_records[-1].end_time or datetime.now()
+    moments: Iterator[datetime] = (
+        history_end + timedelta(hours=hours) for hours in itertools.count(1)
+    )
+
+    def run() -> object:
+        start = next(moments)
+        copy.start_sleep(start)
+        return copy.end_sleep(start + timedelta(minutes=30))
+
+    return run
+
+
+def case_duration(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    records = child.sleep_records[-DURATION_SAMPLE:]
+    return lambda: [(record.duration, record.format_duration()) for record in records]
+
+
+def case_serialize(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    return lambda: child_to_dict(child)
+
+
+def case_load(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    data = child_to_dict(child)
+    return lambda: child_from_dict(data)
+
+
+def case_sqlite_save(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    storage = resources.enter_context(SQLiteStorage(directory / "save.db", pool_size=1))
+    return lambda: storage.save_child("bench", child)
+
+
+def case_sqlite_load(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    storage = resources.enter_context(SQLiteStorage(directory / "load.db", pool_size=1))
+    storage.save_child("bench", child)
+    return lambda: storage.load_child("bench")
+
+
+def case_sqlite_load_recent(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    storage = resources.enter_context(SQLiteStorage(directory / "load.db", pool_size=1))
+    storage.save_child("bench", child)
+    return lambda: storage.load_recent("bench").get_sleep_stats(
+        child.sleep_records[-1].start_time.date()
+    )
+
+
+def case_year_report(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    last_day = child.sleep_records[-1].start_time.date()
+    first_day = last_day - timedelta(days=364)
+    range_start = datetime.combine(first_day, datetime.min.time())
+    range_end = datetime.combine(last_day, datetime.min.time()) + timedelta(days=1)
+
+    def run() -> object:
+        records = child.get_records_between(range_start, range_end)
+        return build_report("bench", RecordColumns.from_records(records), first_day, last_day)
+
+    return run
+
+
+def case_rollup_report(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    storage = resources.enter_context(SQLiteStorage(directory / "rollups.db", pool_size=1))
+    storage.save_child("bench", child)
+    last_day = child.sleep_records[-1].start_time.date()
+    first_day = last_day - timedelta(days=364)
+    return lambda: report_from_rollups(
+        "bench", storage.get_rollups("bench", first_day, last_day), first_day, last_day
+    )
+
+
+def case_export_records(
+    child: Child, directory: Path, resources: ExitStack
+) -> Callable[[], object]:
+    exporter = ReportExporter()
+    path = directory / "export.csv"
+    return lambda: exporter.export([("bench", child)], path, kind="records")
+
+
+CASES: Dict[str, Case] = {
+    "get_sleep_stats_cold_30d": case_sleep_stats_cold,
+    "get_sleep_stats_warm_30d": case_sleep_stats_warm,
+    "get_active_sleep": case_active_sleep,
+    "start_end_cycle": case_start_end_cycle,
+    "duration_format": case_duration,
+    "serialize": case_serialize,
+    "load": case_load,
+    "sqlite_save": case_sqlite_save,
+    "sqlite_load": case_sqlite_load,
+    "sqlite_load_recent": case_sqlite_load_recent,
+    "report_year": case_year_report,
+    "report_year_rollups": case_rollup_report,
+    "export_records_csv": case_export_records,
+}
+
+
+def measure(function: Callable[[], object]) -> float:
+    """
+    Возвращает лучшее время одного вызова функции в секундах.
+
+    Как timeit.Timer.autorange: количество вызовов в замере удваивается,
+    пока замер не займет MIN_SAMPLE_SECONDS.
+    """
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_SAMPLE_SECONDS:
+            break
+        number *= 2
+
+    timings = [elapsed]
+    for _ in range(REPEAT - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) / number
+
+
+def run_suite(sizes: List[int], only: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Запускает все случаи для всех размеров.
+
+    Returns:
+        Dict[str, float]: Время вызова по ключу "случай[размер]"
+    """
+    results: Dict[str, float] = {}
+    for size in sizes:
+        child = generate_child(size)
+        for name, case in CASES.items():
+            if only and name not in only:
+                continue
+            with tempfile.TemporaryDirectory() as directory, ExitStack() as resources:
+                seconds = measure(case(child, Path(directory), resources))
+            key = f"{name}[{size}]"
+            results[key] = seconds
+            print(f"{key:<40} {seconds * 1e6:>14.2f} мкс", flush=True)
+    return results
+
+
+def compare(
+    results: Dict[str, float], baseline: Dict[str, float], tolerance: float
+) -> List[Tuple[str, float, float]]:
+    """
+    Находит случаи, ставшие медленнее базовых больше чем на tolerance.
+
+    Returns:
+        List[Tuple[str, float, float]]: (ключ, базовое время, текущее время)
+    """
+    return [
+        (key, baseline[key], seconds)
+        for key, seconds in results.items()
+        if key in baseline and seconds > baseline[key] * (1 + tolerance)
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки Baby Sleep Tracker")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), help="Только эти случаи")
+    parser.add_argument("--output", type=Path, help="Куда записать результаты JSON")
+    parser.add_argument("--baseline", type=Path, help="Файл с базовыми результатами")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Допустимое замедление")
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Записать результаты как базовые"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.sizes, args.cases)
+    document = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(document, indent=2), encoding="utf-8")
+
+    if args.baseline is None:
+        return 0
+    if args.update_baseline or not args.baseline.exists():
+        args.baseline.write_text(json.dumps(document, indent=2), encoding="utf-8")
+        print(f"Базовые результаты записаны в {args.baseline}")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for key, before, after in regressions:
+        print(
+            f"РЕГРЕССИЯ {key}: {before * 1e6:.2f} -> {after * 1e6:.2f} мкс "
+            f"({after / before:.2f}x)"
+        )
+    if regressions:
+        return 1
+    print(f"Регрессий нет (допуск {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
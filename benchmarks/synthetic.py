@@ -0,0 +1,89 @@
+"""
+Детерминированный генератор синтетической истории сна для бенчмарков.
+
+Один и тот же seed всегда дает одну и ту же историю, поэтому результаты
+разных запусков можно сравнивать между собой.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+from typing import Iterator, List
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+
+HISTORY_START = datetime(2020, 1, 1, 20, 0)
+COMMENTS = ("", "", "", "Уснул быстро", "Просыпался", "Ночной сон", "Дневной сон")
+
+
+def iter_history(
+    count: int, seed: int = 0, start: datetime = HISTORY_START
+) -> Iterator[SleepRecord]:
+    """
+    Генерирует хронологическую историю сна без пересечений, по одной записи.
+
+    Чередует ночной сон (9-12 часов) и 2-3 дневных сна (30-150 минут),
+    время содержит секунды, часть записей имеет комментарии.
+
+    Args:
+        count (int): Количество записей
+        seed (int): Начальное значение генератора случайных чисел
+        start (datetime): Начало первого сна
+
+    Yields:
+        SleepRecord: Очередная завершенная запись о сне
+    """
+    rng = random.Random(seed)
+    produced = 0
+    current = start
+    while produced < count:
+        night = timedelta(hours=rng.uniform(9, 12))
+        yield SleepRecord(current, current + night, rng.choice(COMMENTS))
+        produced += 1
+        current += night
+        for _ in range(rng.randint(2, 3)):
+            if produced >= count:
+                break
+            current += timedelta(hours=rng.uniform(1.5, 3.5))
+            nap = timedelta(minutes=rng.uniform(30, 150))
+            yield SleepRecord(current, current + nap, rng.choice(COMMENTS))
+            produced += 1
+            current += nap
+        # Следующий ночной сон начинается вечером
+        evening = datetime.combine(current.date(), datetime.min.time()) + timedelta(
+            hours=rng.uniform(19, 21.5)
+        )
+        current = max(evening, current + timedelta(hours=1))
+
+
+def generate_history(
+    count: int, seed: int = 0, start: datetime = HISTORY_START
+) -> List[SleepRecord]:
+    """
+    Генерирует историю сна списком (см. iter_history).
+
+    Args:
+        count (int): Количество записей
+        seed (int): Начальное значение генератора случайных чисел
+        start (datetime): Начало первого сна
+
+    Returns:
+        List[SleepRecord]: Завершенные записи о сне
+    """
+    return list(iter_history(count, seed, start))
+
+
+def generate_child(count: int, seed: int = 0) -> Child:
+    """
+    Создает ребенка с синтетической историей сна.
+
+    Args:
+        count (int): Количество записей
+        seed (int): Начальное значение генератора случайных чисел
+
+    Returns:
+        Child: Ребенок с историей
+    """
+    child = Child(name=f"Ребенок {seed}", birth_date=date(2019, 12, 1))
+    child.add_records(generate_history(count, seed))
+    return child
@@ -0,0 +1,22 @@
+"""
+Пользовательские исключения приложения.
+
+Ошибки валидации моделей по-прежнему сообщаются через ValueError,
+а здесь собраны исключения сервисного уровня.
+"""
+
+
+class SleepTrackerError(Exception):
+    """Базовое исключение приложения."""
+
+
+class StorageError(SleepTrackerError):
+    """Ошибка чтения или записи хранилища."""
+
+
+class ChildNotFoundError(StorageError):
+    """Ребенок с указанным идентификатором отсутствует в хранилище."""
+
+    def __init__(self, child_id: str) -> None:
+        super().__init__(f"Ребенок '{child_id}' не найден в хранилище")
+        self.child_id = child_id
@@ -0,0 +1,252 @@
+"""
+Метрики горячих путей приложения.
+
+Реестр MetricsRegistry собирает для каждой операции:
+- счетчики вызовов и ошибок;
+- гистограмму длительности (корзины LATENCY_BUCKETS, в секундах);
+- датчик количества записей, обработанных последним вызовом.
+
+Операции размечаются декоратором instrumented. По умолчанию сбор
+выключен, и обертка сводится к одной проверке METRICS.enabled перед
+вызовом исходной функции. Включается сбор вызовом METRICS.enable()
+или переменной окружения SLEEP_TRACKER_METRICS=1.
+
+Реестр выгружается в текстовом формате Prometheus (to_prometheus)
+и в виде словаря для JSON (snapshot).
+"""
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, cast
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Верхние границы корзин гистограммы длительности в секундах
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0,
+)
+PREFIX = "sleep_tracker"
+
+
+@dataclass
+class OperationMetrics:
+    """
+    Метрики одной операции.
+
+    Attributes:
+        calls (int): Количество вызовов
+        errors (int): Количество вызовов, завершившихся исключением
+        seconds (float): Суммарная длительность вызовов
+        buckets (List[int]): Количество вызовов по корзинам LATENCY_BUCKETS
+                             (последняя - больше самой верхней границы)
+        records (Optional[int]): Количество записей в последнем вызове
+    """
+
+    calls: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    records: Optional[int] = None
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик операций внутри процесса.
+
+    Attributes:
+        enabled (bool): Собираются ли метрики
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        """
+        Args:
+            enabled (bool): Собирать ли метрики сразу
+        """
+        self.enabled = enabled
+        self._operations: Dict[str, OperationMetrics] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Включает сбор метрик."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Выключает сбор метрик (собранные значения сохраняются)."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Удаляет все собранные метрики."""
+        with self._lock:
+            self._operations.clear()
+
+    def observe(
+        self,
+        operation: str,
+        seconds: float,
+        error: bool = False,
+        records: Optional[int] = None,
+    ) -> None:
+        """
+        Учитывает один вызов операции.
+
+        Args:
+            operation (str): Имя операции, например "Child.start_sleep"
+            seconds (float): Длительность вызова
+            error (bool): Завершился ли вызов исключением
+            records (Optional[int]): Количество обработанных записей
+        """
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            metrics = self._operations.get(operation)
+            if metrics is None:
+                metrics = self._operations[operation] = OperationMetrics()
+            metrics.calls += 1
+            metrics.errors += error
+            metrics.seconds += seconds
+            metrics.buckets[bucket] += 1
+            if records is not None:
+                metrics.records = records
+
+    def get(self, operation: str) -> OperationMetrics:
+        """
+        Возвращает копию метрик операции (нулевые, если вызовов не было).
+
+        Args:
+            operation (str): Имя операции
+
+        Returns:
+            OperationMetrics: Метрики операции
+        """
+        with self._lock:
+            metrics = self._operations.get(operation, OperationMetrics())
+            return OperationMetrics(
+                calls=metrics.calls,
+                errors=metrics.errors,
+                seconds=metrics.seconds,
+                buckets=list(metrics.buckets),
+                records=metrics.records,
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Возвращает все метрики в виде словаря, пригодного для json.dumps.
+
+        Returns:
+            Dict[str, Any]: {"buckets": [...], "operations": {имя: метрики}}
+        """
+        with self._lock:
+            operations = {
+                name: {
+                    "calls": metrics.calls,
+                    "errors": metrics.errors,
+                    "seconds": metrics.seconds,
+                    "buckets": list(metrics.buckets),
+                    "records": metrics.records,
+                }
+                for name, metrics in sorted(self._operations.items())
+            }
+        return {"buckets": list(LATENCY_BUCKETS), "operations": operations}
+
+    def to_prometheus(self) -> str:
+        """
+        Выгружает метрики в текстовом формате Prometheus.
+
+        Returns:
+            str: Текст для ответа на запрос /metrics
+        """
+        operations = self.snapshot()["operations"]
+        lines = [
+            f"# HELP {PREFIX}_operation_calls_total Количество вызовов операции",
+            f"# TYPE {PREFIX}_operation_calls_total counter",
+        ]
+        lines += [
+            f'{PREFIX}_operation_calls_total{{operation="{name}"}} {metrics["calls"]}'
+            for name, metrics in operations.items()
+        ]
+        lines += [
+            f"# HELP {PREFIX}_operation_errors_total Количество вызовов, завершившихся ошибкой",
+            f"# TYPE {PREFIX}_operation_errors_total counter",
+        ]
+        lines += [
+            f'{PREFIX}_operation_errors_total{{operation="{name}"}} {metrics["errors"]}'
+            for name, metrics in operations.items()
+        ]
+
+        lines += [
+            f"# HELP {PREFIX}_operation_seconds Длительность операции",
+            f"# TYPE {PREFIX}_operation_seconds histogram",
+        ]
+        for name, metrics in operations.items():
+            cumulative = 0
+            bounds = [repr(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+            for bound, count in zip(bounds, metrics["buckets"]):
+                cumulative += count
+                lines.append(
+                    f'{PREFIX}_operation_seconds_bucket{{operation="{name}",le="{bound}"}} '
+                    f"{cumulative}"
+                )
+            labels = f'{{operation="{name}"}}'
+            lines.append(f"{PREFIX}_operation_seconds_sum{labels} {metrics['seconds']!r}")
+            lines.append(f"{PREFIX}_operation_seconds_count{labels} {metrics['calls']}")
+
+        lines += [
+            f"# HELP {PREFIX}_operation_records Количество записей в последнем вызове",
+            f"# TYPE {PREFIX}_operation_records gauge",
+        ]
+        lines += [
+            f'{PREFIX}_operation_records{{operation="{name}"}} {metrics["records"]}'
+            for name, metrics in operations.items()
+            if metrics["records"] is not None
+        ]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry(enabled=os.environ.get("SLEEP_TRACKER_METRICS") == "1")
+
+
+def instrumented(
+    operation: Optional[str] = None,
+    records: Optional[Callable[..., int]] = None,
+    registry: Optional[MetricsRegistry] = None,
+) -> Callable[[F], F]:
+    """
+    Декоратор, собирающий метрики вызовов функции.
+
+    Args:
+        operation (Optional[str]): Имя операции (по умолчанию __qualname__
+                                   функции, например "Child.start_sleep")
+        records (Optional[Callable[..., int]]): Функция (результат, *аргументы) ->
+                                                количество обработанных записей
+        registry (Optional[MetricsRegistry]): Реестр (по умолчанию METRICS)
+
+    Returns:
+        Callable[[F], F]: Декоратор
+    """
+    target = METRICS if registry is None else registry
+
+    def decorator(function: F) -> F:
+        name = operation or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not target.enabled:
+                return function(*args, **kwargs)
+
+            started = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except BaseException:
+                target.observe(name, time.perf_counter() - started, error=True)
+                raise
+            elapsed = time.perf_counter() - started
+            count = None if records is None else records(result, *args, **kwargs)
+            target.observe(name, elapsed, records=count)
+            return result
+
+        return cast(F, wrapper)
+
+    return decorator
@@ -6,39 +6,454 @@
 2. Валидацию данных
 3. Вычисляемые свойства
 4. Управление связанными объектами
+5. Индексацию записей для быстрых запросов по диапазону дат
+6. Кэширование результатов с вытеснением давно неиспользуемых (LRU)
+7. Ленивую загрузку старой истории из хранилища
+8. Границы дней в часовом поясе ребенка
 """
 
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    ClassVar,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
+from sleep_tracker.core.metrics import instrumented
+
+from .days import DayCalendar
+from .epoch import MINUTE_US, from_epoch_us
+from .history import HistoryLoader, LazySleepRecords
 from .sleep_record import SleepRecord
 
+if TYPE_CHECKING:
+    # Колоночные записи требуют NumPy и импортируются только в методах,
+    # которые с ними работают, чтобы быстрые команды CLI его не загружали
+    from .columns import PackedSleepRecords
+
+DayStats = Tuple[int, int, List[SleepRecord]]
+
+
+def _history_size(result: object, child: "Child", *args: object, **kwargs: object) -> int:
+    """Количество записей ребенка в памяти (датчик для метрик)."""
+    return child.loaded_records
+
+
+def _day_records(result: DayStats, *args: object, **kwargs: object) -> int:
+    """Количество записей за день в результате get_sleep_stats (датчик для метрик)."""
+    return len(result[2])
+
+
+class StatsCacheInfo(NamedTuple):
+    """
+    Счетчики кэша статистики по дням (по аналогии с functools.lru_cache).
+    
+    Attributes:
+        hits (int): Количество ответов из кэша
+        misses (int): Количество пересчетов
+        maxsize (int): Максимальное количество дней в кэше
+        currsize (int): Текущее количество дней в кэше
+    """
+    
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
 
 @dataclass
 class Child:
     """
     Класс для хранения информации о ребенке и управления его записями сна.
     
+    Записи о сне хранятся в хронологическом порядке (по времени начала).
+    Параллельно списку поддерживается индекс времен начала, по которому
+    бинарным поиском (модуль bisect) находятся записи нужного диапазона,
+    поэтому запрос за день не просматривает всю историю.
+    
+    Ребенок, созданный через Child.lazy, держит в памяти только недавние
+    записи и подгружает старые, когда запрос по диапазону до них доходит
+    (см. модуль history).
+    
+    Если задан часовой пояс, время записей хранится в UTC, а статистика
+    считается по местным дням ребенка (см. модуль days).
+    
     Attributes:
         name (str): Имя ребенка
         birth_date (date): Дата рождения
         sleep_records (List[SleepRecord]): Список записей о сне
+        timezone (Optional[str]): Часовой пояс IANA (None - записи
+                                  в наивном местном времени, день - 24 часа)
     """
     
     name: str
     birth_date: date
     sleep_records: List[SleepRecord] = field(default_factory=list)
+    timezone: Optional[str] = None
+    # Записи в памяти; совпадает с sleep_records, если история загружена целиком
+    _records: List[SleepRecord] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    # Все записи, закончившиеся раньше этого момента, еще не загружены
+    # (None - история загружена целиком)
+    _loaded_since: Optional[datetime] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _history_loader: Optional[HistoryLoader] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Отсортированные времена начала записей (индекс для bisect)
+    _starts: List[datetime] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    # Максимальная длительность завершенного сна: запись, закончившаяся
+    # в момент T, не могла начаться раньше T - _max_duration
+    _max_duration: timedelta = field(
+        default=timedelta(0), init=False, repr=False, compare=False
+    )
+    # Текущий активный сон, чтобы не искать его перебором списка
+    _active_sleep: Optional[SleepRecord] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Кэш get_sleep_stats: дата -> (минуты сна, минуты бодрствования, записи)
+    _stats_cache: "OrderedDict[date, DayStats]" = field(
+        default_factory=OrderedDict, init=False, repr=False, compare=False
+    )
+    _cache_hits: int = field(default=0, init=False, repr=False, compare=False)
+    _cache_misses: int = field(default=0, init=False, repr=False, compare=False)
+    # Границы дней для текущего timezone (пересоздаются при его смене)
+    _calendar: DayCalendar = field(
+        default_factory=DayCalendar, init=False, repr=False, compare=False
+    )
+    
+    # Сколько дней хранить в кэше статистики
+    STATS_CACHE_SIZE: ClassVar[int] = 400
     
     def __post_init__(self) -> None:
         """
         Валидация данных после инициализации.
         
         Raises:
-            ValueError: Если дата рождения в будущем
+            ValueError: Если дата рождения в будущем, часовой пояс неизвестен
+                        или среди записей больше одного активного сна
         """
         if self.birth_date > date.today():
             raise ValueError("Дата рождения не может быть в будущем")
+        self._calendar = DayCalendar(self.timezone)
+        self.rebuild_index()
+    
+    @classmethod
+    def from_packed(
+        cls,
+        name: str,
+        birth_date: date,
+        packed: "PackedSleepRecords",
+        timezone: Optional[str] = None,
+    ) -> "Child":
+        """
+        Создает ребенка из упакованных записей о сне.
+        
+        Args:
+            name (str): Имя ребенка
+            birth_date (date): Дата рождения
+            packed (PackedSleepRecords): Упакованные записи
+            timezone (Optional[str]): Часовой пояс IANA
+            
+        Returns:
+            Child: Ребенок с распакованными записями
+        """
+        return cls(
+            name=name,
+            birth_date=birth_date,
+            sleep_records=packed.to_records(),
+            timezone=timezone,
+        )
+    
+    @classmethod
+    def lazy(
+        cls,
+        name: str,
+        birth_date: date,
+        recent_records: List[SleepRecord],
+        loaded_since: datetime,
+        loader: HistoryLoader,
+        timezone: Optional[str] = None,
+    ) -> "Child":
+        """
+        Создает ребенка, старая история которого загружается по требованию.
+        
+        Args:
+            name (str): Имя ребенка
+            birth_date (date): Дата рождения
+            recent_records (List[SleepRecord]): Все записи, закончившиеся
+                                                не раньше loaded_since,
+                                                и активный сон
+            loaded_since (datetime): Граница загруженной истории
+            loader (HistoryLoader): Загружает записи, закончившиеся
+                                    раньше границы
+            timezone (Optional[str]): Часовой пояс IANA
+            
+        Returns:
+            Child: Ребенок с ленивой историей
+        """
+        child = cls(
+            name=name, birth_date=birth_date, sleep_records=recent_records, timezone=timezone
+        )
+        child._loaded_since = loaded_since
+        child._history_loader = loader
+        child.sleep_records = LazySleepRecords(child._full_records)  # type: ignore[assignment]
+        return child
+    
+    @property
+    def history_loaded(self) -> bool:
+        """
+        Загружена ли история ребенка целиком.
+        """
+        return self._loaded_since is None
+    
+    @property
+    def loaded_records(self) -> int:
+        """
+        Количество записей в памяти (без загрузки старой истории).
+        """
+        return len(self._records)
+    
+    @property
+    def loaded_since(self) -> Optional[datetime]:
+        """
+        Граница загруженной истории: все записи, закончившиеся раньше нее,
+        еще не загружены (None - история загружена целиком).
+        """
+        return self._loaded_since
+    
+    @property
+    def last_record(self) -> Optional[SleepRecord]:
+        """
+        Последняя по времени начала запись (None - записей нет).
+        
+        Последняя запись всегда в памяти, поэтому старая история
+        загружается, только если в памяти нет ни одной записи.
+        """
+        if not self._records:
+            self._page_in(None)
+        return self._records[-1] if self._records else None
+    
+    def load_history(self) -> None:
+        """
+        Загружает всю старую историю; после этого sleep_records - обычный список.
+        """
+        self._page_in(None)
+    
+    def _full_records(self) -> List[SleepRecord]:
+        self._page_in(None)
+        return self._records
+    
+    def _page_in(self, since: Optional[datetime]) -> None:
+        """
+        Загружает записи, закончившиеся не раньше since (None - все записи).
+        
+        Args:
+            since (Optional[datetime]): С какого момента нужны записи
+        """
+        loaded_since = self._loaded_since
+        if loaded_since is None or (since is not None and since >= loaded_since):
+            return
+        assert self._history_loader is not None
+        older = self._history_loader(since, loaded_since)
+        # Старые записи обычно начинаются раньше загруженных, но активный
+        # или длинный сон может начаться раньше них, поэтому сортируем
+        records = older + self._records
+        records.sort(key=lambda record: record.start_time)
+        self._records = records
+        self._starts = [record.start_time for record in records]
+        for record in older:
+            self._update_max_duration(record)
+        
+        if since is None:
+            self._loaded_since = None
+            self._history_loader = None
+            self.sleep_records = records
+        else:
+            self._loaded_since = since
+    
+    def pack_records(self) -> "PackedSleepRecords":
+        """
+        Упаковывает записи о сне в компактное хранилище.
+        
+        Удобно, когда в памяти нужно держать историю многих детей:
+        упакованная запись занимает во много раз меньше места.
+        
+        Returns:
+            PackedSleepRecords: Упакованные записи в хронологическом порядке
+        """
+        from .columns import PackedSleepRecords
+
+        return PackedSleepRecords.from_records(self.sleep_records)
+    
+    def rebuild_index(self) -> None:
+        """
+        Перестраивает индекс записей о сне и состояние активного сна.
+        
+        Сортирует sleep_records по времени начала, заново строит индекс
+        и находит активную запись. Вызывается автоматически при создании
+        объекта (в том числе при загрузке из хранилища); вызывать вручную
+        нужно после того, как список записей был изменен напрямую,
+        в обход методов start_sleep, end_sleep и add_records.
+        
+        Raises:
+            ValueError: Если среди записей больше одного активного сна
+        """
+        self._page_in(None)
+        # Список могли заменить напрямую
+        self._records = self.sleep_records
+        active_records = [record for record in self._records if record.is_active()]
+        if len(active_records) > 1:
+            raise ValueError(
+                f"Найдено {len(active_records)} активных записей о сне, "
+                "допускается не больше одной"
+            )
+        
+        self._records.sort(key=lambda record: record.start_time)
+        self._starts = [record.start_time for record in self._records]
+        self._max_duration = timedelta(0)
+        for record in self._records:
+            self._update_max_duration(record)
+        self._active_sleep = active_records[0] if active_records else None
+        self._stats_cache.clear()
+    
+    def _update_max_duration(self, record: SleepRecord) -> None:
+        """
+        Учитывает длительность завершенной записи в _max_duration.
+        
+        Args:
+            record (SleepRecord): Запись о сне
+        """
+        if record.end_time is not None:
+            duration = record.end_time - record.start_time
+            if duration > self._max_duration:
+                self._max_duration = duration
+    
+    def _invalidate_days(self, record: SleepRecord) -> None:
+        """
+        Удаляет из кэша статистики все дни, которых касается запись.
+        
+        Для сна через полночь это и день начала, и день окончания.
+        
+        Args:
+            record (SleepRecord): Добавленная или измененная запись
+        """
+        if not self._stats_cache:
+            return
+        calendar = self.calendar
+        day = calendar.day_of(record.start_time)
+        last_day = calendar.day_of(record.end_time or record.start_time)
+        while day <= last_day:
+            self._stats_cache.pop(day, None)
+            day += timedelta(days=1)
+    
+    @property
+    def calendar(self) -> DayCalendar:
+        """
+        Границы дней ребенка в его часовом поясе.
+        
+        Если timezone изменили (например, семья переехала), границы
+        пересчитываются, а кэш статистики по дням сбрасывается.
+        """
+        if self._calendar.zone != self.timezone:
+            self._reset_calendar()
+        return self._calendar
+    
+    def _reset_calendar(self) -> None:
+        """
+        Пересоздает календарь для нового часового пояса и сбрасывает кэш.
+        """
+        self._calendar = DayCalendar(self.timezone)
+        self._stats_cache.clear()
+    
+    def cache_info(self) -> StatsCacheInfo:
+        """
+        Возвращает счетчики кэша статистики по дням.
+        
+        Returns:
+            StatsCacheInfo: Попадания, промахи, максимальный и текущий размер
+        """
+        return StatsCacheInfo(
+            hits=self._cache_hits,
+            misses=self._cache_misses,
+            maxsize=self.STATS_CACHE_SIZE,
+            currsize=len(self._stats_cache),
+        )
+    
+    def cache_clear(self) -> None:
+        """
+        Очищает кэш статистики и сбрасывает счетчики.
+        """
+        self._stats_cache.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    def _insert_record(self, record: SleepRecord) -> None:
+        """
+        Вставляет запись в список с сохранением хронологического порядка.
+        
+        Записи с одинаковым временем начала остаются в порядке добавления.
+        
+        Args:
+            record (SleepRecord): Новая запись о сне
+        """
+        if self._loaded_since is not None and record.start_time < self._loaded_since:
+            self._page_in(record.start_time)
+        position = bisect_right(self._starts, record.start_time)
+        self._starts.insert(position, record.start_time)
+        self._records.insert(position, record)
+        self._update_max_duration(record)
+        self._invalidate_days(record)
+        if record.is_active():
+            self._active_sleep = record
+    
+    def add_records(self, records: Iterable[SleepRecord]) -> None:
+        """
+        Массово добавляет записи о сне (например, при импорте).
+        
+        Если все новые записи начинаются не раньше последней существующей,
+        они просто дописываются в конец, иначе список и индекс
+        перестраиваются целиком.
+        
+        Args:
+            records (Iterable[SleepRecord]): Добавляемые записи
+            
+        Raises:
+            ValueError: Если после добавления окажется больше одного активного сна
+        """
+        new_records = sorted(records, key=lambda record: record.start_time)
+        if not new_records:
+            return
+        
+        new_active = [record for record in new_records if record.is_active()]
+        if new_active and (len(new_active) > 1 or self.get_active_sleep()):
+            raise ValueError("Уже есть активная запись о сне. Допускается не больше одной")
+        
+        if self._loaded_since is not None and new_records[0].start_time < self._loaded_since:
+            self._page_in(new_records[0].start_time)
+        if not self._starts or new_records[0].start_time >= self._starts[-1]:
+            self._records.extend(new_records)
+            self._starts.extend(record.start_time for record in new_records)
+            for record in new_records:
+                self._update_max_duration(record)
+                self._invalidate_days(record)
+            if new_active:
+                self._active_sleep = new_active[0]
+        else:
+            self._records.extend(new_records)
+            self.rebuild_index()
     
     @property
     def age_months(self) -> int:
@@ -59,14 +474,22 @@ class Child:
         """
         Возвращает текущую активную запись о сне, если она есть.
         
+        Активная запись хранится в отдельном атрибуте, поэтому поиск
+        выполняется за O(1), а не перебором всех записей.
+        
         Returns:
             Optional[SleepRecord]: Активная запись о сне или None
         """
-        for record in reversed(self.sleep_records):
-            if record.is_active():
-                return record
-        return None
+        active_sleep = self._active_sleep
+        if active_sleep is not None and not active_sleep.is_active():
+            # Запись завершили напрямую через SleepRecord.end_sleep
+            self._update_max_duration(active_sleep)
+            self._invalidate_days(active_sleep)
+            self._active_sleep = None
+            return None
+        return active_sleep
     
+    @instrumented(records=_history_size)
     def start_sleep(self, start_time: datetime, comment: str = "") -> SleepRecord:
         """
         Создает новую запись о сне.
@@ -85,9 +508,10 @@ class Child:
             raise ValueError("Уже есть активная запись о сне. Чтобы начать новый сон, необходимо завершить текущий")
         
         record = SleepRecord(start_time=start_time, comment=comment)
-        self.sleep_records.append(record)
+        self._insert_record(record)
         return record
     
+    @instrumented(records=_history_size)
     def end_sleep(self, end_time: datetime, comment: Optional[str] = None) -> SleepRecord:
         """
         Завершает активную запись о сне.
@@ -106,17 +530,144 @@ class Child:
         if not active_sleep:
             raise ValueError("Нет активной записи о сне")
         
+        if self._loaded_since is not None and end_time < self._loaded_since:
+            # Запись уходит за границу ленивой истории: догружаем историю
+            # до ее начала, чтобы потом не получить ее из хранилища второй раз
+            self._page_in(active_sleep.start_time)
         active_sleep.end_sleep(end_time)
+        self._update_max_duration(active_sleep)
+        self._invalidate_days(active_sleep)
+        self._active_sleep = None
         if comment:
             active_sleep.comment += f"\n{comment}"
         
         return active_sleep
     
+    def find_record(self, start_time: datetime) -> Optional[SleepRecord]:
+        """
+        Находит запись о сне по времени начала.
+        
+        Args:
+            start_time (datetime): Время начала сна
+            
+        Returns:
+            Optional[SleepRecord]: Первая запись с таким временем начала или None
+        """
+        if self._loaded_since is not None and start_time < self._loaded_since:
+            self._page_in(start_time)
+        position = bisect_left(self._starts, start_time)
+        if position < len(self._starts) and self._starts[position] == start_time:
+            return self._records[position]
+        return None
+
+    def remove_record(self, start_time: datetime) -> Optional[SleepRecord]:
+        """
+        Удаляет запись о сне по времени начала.
+
+        Нужна при слиянии правок нескольких устройств (модуль sync),
+        когда одна и та же запись была сделана дважды.
+
+        Args:
+            start_time (datetime): Время начала сна
+
+        Returns:
+            Optional[SleepRecord]: Удаленная запись или None, если ее не было
+        """
+        if self._loaded_since is not None and start_time < self._loaded_since:
+            self._page_in(start_time)
+        position = bisect_left(self._starts, start_time)
+        if position == len(self._starts) or self._starts[position] != start_time:
+            return None
+        del self._starts[position]
+        record = self._records.pop(position)
+        self._invalidate_days(record)
+        if record is self._active_sleep:
+            self._active_sleep = None
+        return record
+
+    def get_records_between(self, start: datetime, end: datetime) -> List[SleepRecord]:
+        """
+        Возвращает записи о сне, пересекающиеся с интервалом [start, end).
+        
+        Просматриваются только записи, попадающие в окно индекса,
+        а не вся история ребенка. Активный сон считается продолжающимся.
+        
+        Args:
+            start (datetime): Начало интервала
+            end (datetime): Конец интервала (не включается)
+            
+        Returns:
+            List[SleepRecord]: Записи в хронологическом порядке
+        """
+        return list(self.iter_records_between(start, end))
+    
+    def iter_records_between(self, start: datetime, end: datetime) -> Iterator[SleepRecord]:
+        """
+        Лениво перебирает записи о сне, пересекающиеся с интервалом [start, end).
+        
+        Работает как get_records_between, но не создает ни список
+        результатов, ни срез истории, поэтому подходит для выгрузки
+        длинных историй. Пока перебор не закончен, записи ребенка
+        изменять нельзя.
+        
+        Args:
+            start (datetime): Начало интервала
+            end (datetime): Конец интервала (не включается)
+            
+        Yields:
+            SleepRecord: Записи в хронологическом порядке
+        """
+        if self._loaded_since is not None and start < self._loaded_since:
+            self._page_in(start)
+        low = bisect_left(self._starts, start - self._max_duration)
+        high = bisect_left(self._starts, end)
+        records = self._records
+        
+        # Активный сон может начаться сколь угодно давно, раньше окна индекса
+        active_sleep = self.get_active_sleep()
+        if active_sleep is not None and active_sleep.start_time < start - self._max_duration:
+            yield active_sleep
+        
+        for position in range(low, high):
+            record = records[position]
+            if record.end_time is not None:
+                if record.end_time > start:
+                    yield record
+            elif record is active_sleep:
+                yield record
+    
+    def _candidates(self, start: datetime, end: datetime) -> List[SleepRecord]:
+        """
+        Возвращает срез записей, которые могут закончиться в [start, end).
+        
+        Запись, закончившаяся не раньше start, начинается не раньше
+        start - _max_duration, а начаться позже end она не может.
+        Если start раньше границы ленивой истории, недостающие записи
+        сначала загружаются.
+        
+        Args:
+            start (datetime): Начало интервала
+            end (datetime): Конец интервала (не включается)
+            
+        Returns:
+            List[SleepRecord]: Записи-кандидаты в хронологическом порядке
+        """
+        if self._loaded_since is not None and start < self._loaded_since:
+            self._page_in(start)
+        low = bisect_left(self._starts, start - self._max_duration)
+        high = bisect_left(self._starts, end)
+        return self._records[low:high]
+    
+    @instrumented(records=_day_records)
     def get_sleep_stats(self, date_: Optional[date] = None) -> Tuple[int, int, List[SleepRecord]]:
         """
         Возвращает статистику сна за указанный день.
         По умолчанию возвращает статистику за сегодня.
         
+        Результат кэшируется по дате (не больше STATS_CACHE_SIZE дней).
+        Дни в кэше сбрасываются, когда start_sleep, end_sleep или
+        add_records затрагивают их; счетчики доступны через cache_info().
+        
         В статистику включаются:
         1. Ночной сон, который закончился в указанную дату (даже если начался днем ранее)
         2. Все дневные сны за указанную дату
@@ -130,40 +681,111 @@ class Child:
                                                 общее время бодрствования в минутах,
                                                 список записей о сне за день)
         """
-        target_date = date_ or date.today()
+        if self._calendar.zone != self.timezone:
+            self._reset_calendar()
+        if date_ is not None:
+            target_date = date_
+        elif self.timezone is None:
+            target_date = date.today()
+        else:
+            target_date = self._calendar.today()
+        
+        # Замечаем сон, завершенный в обход Child (сбрасывает его дни в кэше)
+        self.get_active_sleep()
+        cached = self._stats_cache.get(target_date)
+        if cached is not None:
+            self._stats_cache.move_to_end(target_date)
+            self._cache_hits += 1
+        else:
+            self._cache_misses += 1
+            cached = self._compute_sleep_stats(target_date)
+            self._stats_cache[target_date] = cached
+            if len(self._stats_cache) > self.STATS_CACHE_SIZE:
+                self._stats_cache.popitem(last=False)
+        
+        # Возвращаем копию списка, чтобы вызывающий код не испортил кэш
+        sleep_minutes, awake_minutes, records = cached
+        return sleep_minutes, awake_minutes, list(records)
+    
+    def _compute_sleep_stats(self, target_date: date) -> DayStats:
+        """
+        Считает статистику сна за день без использования кэша.
+        
+        Args:
+            target_date (date): Дата
         
+        Returns:
+            DayStats: (минуты сна, минуты бодрствования, записи за день)
+        """
         # Собираем записи о сне:
         # 1. Ночной сон, который закончился в этот день
         # 2. Дневные сны этого дня
-        day_records = []
-        
-        for record in self.sleep_records:
-            if not record.end_time:  # Пропускаем незавершенные записи
-                continue
-                
-            # Ночной сон, который закончился в этот день
-            if record.end_time.date() == target_date and record.start_time.date() < target_date:
-                day_records.append(record)
-            # Дневные сны этого дня (исключаем сны, которые закончились на следующий день)
-            elif (record.start_time.date() == target_date and 
-                  record.end_time.date() == target_date):
-                day_records.append(record)
+        # Обе группы - это ровно записи, закончившиеся в этот день
+        # (сон не может закончиться раньше, чем начался), поэтому
+        # достаточно просмотреть кандидатов из индекса.
+        day_start, day_end = self._calendar.day_bounds(target_date)
+        day_records = [
+            record
+            for record in self._candidates(day_start, day_end)
+            if record.end_time is not None and day_start <= record.end_time < day_end
+        ]
         
         # Считаем общее время сна
         total_sleep_minutes = 0
         for record in day_records:
-            if record.duration:  # Если сон завершен
-                start = record.start_time
-                end = record.end_time
-                
-                # Для ночного сна берем только часть от начала дня до окончания
-                if start.date() < target_date:
-                    start = datetime.combine(target_date, datetime.min.time())
-                
-                duration = end - start
-                total_sleep_minutes += int(duration.total_seconds() / 60)
-        
-        # Считаем время бодрствования (24 часа минус время сна)
-        total_awake_minutes = 24 * 60 - total_sleep_minutes
-        
-        return total_sleep_minutes, total_awake_minutes, day_records 
\ No newline at end of file
+            start = record.start_time
+            end = record.end_time
+            assert end is not None
+            
+            # Для ночного сна берем только часть от начала дня до окончания
+            if start < day_start:
+                start = day_start
+            
+            duration = end - start
+            total_sleep_minutes += int(duration.total_seconds() / 60)
+        
+        # Считаем время бодрствования (длительность дня минус время сна;
+        # в дни перехода на летнее или зимнее время день длится 23 или 25 часов)
+        day_minutes = int((day_end - day_start).total_seconds() // 60)
+        total_awake_minutes = day_minutes - total_sleep_minutes
+        
+        return total_sleep_minutes, total_awake_minutes, day_records 
+    
+    @instrumented()
+    def get_sleep_stats_range(
+        self, start_date: date, end_date: date
+    ) -> List[Tuple[date, int, int]]:
+        """
+        Возвращает статистику сна за каждый день диапазона.
+        
+        Результат для каждого дня совпадает с get_sleep_stats, но считается
+        сразу за весь диапазон: нужные записи один раз переводятся
+        в колоночный вид (RecordColumns) и суммируются векторизованно.
+        Удобно для отчетов за 30, 90 или 365 дней. Границы дней берутся
+        из таблицы календаря ребенка, записи в его пояс не переводятся.
+        
+        Args:
+            start_date (date): Первый день диапазона
+            end_date (date): Последний день диапазона (включительно)
+            
+        Returns:
+            List[Tuple[date, int, int]]: Список (дата, минуты сна,
+                                        минуты бодрствования) по дням
+        """
+        if end_date < start_date:
+            return []
+        from .columns import RecordColumns, daily_sleep_minutes
+        
+        bounds = self.calendar.bounds_us(start_date, end_date)
+        range_start, range_end = from_epoch_us(bounds[0]), from_epoch_us(bounds[-1])
+        columns = RecordColumns.from_records(self._candidates(range_start, range_end))
+        sleep_minutes = daily_sleep_minutes(columns, start_date, end_date, bounds)
+        
+        return [
+            (
+                start_date + timedelta(days=offset),
+                int(minutes),
+                (bounds[offset + 1] - bounds[offset]) // MINUTE_US - int(minutes),
+            )
+            for offset, minutes in enumerate(sleep_minutes)
+        ]
@@ -0,0 +1,231 @@
+"""
+Модуль с колоночным представлением записей о сне.
+
+Вместо списка объектов SleepRecord записи хранятся в виде двух массивов
+NumPy: время начала и время окончания в микросекундах от эпохи.
+Над такими массивами статистика за много дней считается одним
+векторизованным проходом, без цикла по дням и по записям на Python.
+
+Тот же формат лежит в основе PackedSleepRecords - компактного хранилища
+для больших историй: 20 байт на запись плюс таблица уникальных
+комментариев вместо объекта с двумя datetime.
+
+Время хранится в микросекундах от эпохи (модуль epoch; его функции
+доступны и отсюда).
+"""
+
+import sys
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# Функции перевода времени остаются доступными и из этого модуля
+from .epoch import DAY_US, EPOCH, MINUTE_US, from_epoch_us, to_epoch_us  # noqa: F401
+from .sleep_record import SleepRecord
+
+# Значение end для незавершенного (активного) сна
+NO_END = int(np.iinfo(np.int64).min)
+
+
+@dataclass
+class RecordColumns:
+    """
+    Записи о сне в колоночном виде.
+
+    Attributes:
+        starts_us (np.ndarray): Время начала сна (int64, микросекунды от эпохи)
+        ends_us (np.ndarray): Время окончания сна (int64, NO_END для активного сна)
+    """
+
+    starts_us: np.ndarray
+    ends_us: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: Sequence[SleepRecord]) -> "RecordColumns":
+        """
+        Однократно переводит список записей в колонки.
+
+        Args:
+            records (Sequence[SleepRecord]): Записи о сне
+
+        Returns:
+            RecordColumns: Колоночное представление записей
+        """
+        starts = np.fromiter(
+            (to_epoch_us(record.start_time) for record in records),
+            dtype=np.int64,
+            count=len(records),
+        )
+        ends = np.fromiter(
+            (
+                NO_END if record.end_time is None else to_epoch_us(record.end_time)
+                for record in records
+            ),
+            dtype=np.int64,
+            count=len(records),
+        )
+        return cls(starts_us=starts, ends_us=ends)
+
+    def __len__(self) -> int:
+        return len(self.starts_us)
+
+
+@dataclass
+class PackedSleepRecords(RecordColumns):
+    """
+    Компактное хранилище записей о сне.
+
+    Время начала и окончания хранится в массивах int64, а комментарии
+    вынесены в отдельную таблицу уникальных строк: у каждой записи есть
+    только номер комментария (int32). Повторяющиеся комментарии хранятся
+    в памяти один раз, пустому комментарию соответствует номер 0.
+
+    Хранилище ведет себя как неизменяемая последовательность: при обращении
+    по индексу создается новый объект SleepRecord. Изменения такого объекта
+    в хранилище не попадают.
+
+    Attributes:
+        starts_us (np.ndarray): Время начала сна (int64, микросекунды от эпохи)
+        ends_us (np.ndarray): Время окончания сна (int64, NO_END для активного сна)
+        comment_ids (np.ndarray): Номера комментариев в comment_table (int32)
+        comment_table (List[str]): Уникальные комментарии, первый - пустой
+    """
+
+    comment_ids: np.ndarray = field(
+        default_factory=lambda: np.zeros(0, dtype=np.int32)
+    )
+    comment_table: List[str] = field(default_factory=lambda: [""])
+
+    @classmethod
+    def from_records(cls, records: Sequence[SleepRecord]) -> "PackedSleepRecords":
+        """
+        Упаковывает список записей.
+
+        Args:
+            records (Sequence[SleepRecord]): Записи о сне
+
+        Returns:
+            PackedSleepRecords: Упакованные записи
+        """
+        columns = RecordColumns.from_records(records)
+        comment_table = [""]
+        known: Dict[str, int] = {"": 0}
+        comment_ids = np.zeros(len(records), dtype=np.int32)
+        for index, record in enumerate(records):
+            comment_id = known.get(record.comment)
+            if comment_id is None:
+                comment_id = known[record.comment] = len(comment_table)
+                comment_table.append(record.comment)
+            comment_ids[index] = comment_id
+        return cls(
+            starts_us=columns.starts_us,
+            ends_us=columns.ends_us,
+            comment_ids=comment_ids,
+            comment_table=comment_table,
+        )
+
+    def __getitem__(self, index: int) -> SleepRecord:
+        """
+        Создает объект SleepRecord для записи с указанным индексом.
+
+        Args:
+            index (int): Индекс записи (допускаются отрицательные)
+
+        Returns:
+            SleepRecord: Новый объект записи о сне
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Индекс записи вне диапазона")
+
+        end_us = int(self.ends_us[index])
+        return SleepRecord(
+            start_time=from_epoch_us(int(self.starts_us[index])),
+            end_time=None if end_us == NO_END else from_epoch_us(end_us),
+            comment=self.comment_table[self.comment_ids[index]],
+        )
+
+    def __iter__(self) -> Iterator[SleepRecord]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_records(self) -> List[SleepRecord]:
+        """
+        Распаковывает все записи.
+
+        Returns:
+            List[SleepRecord]: Список новых объектов SleepRecord
+        """
+        return list(self)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Приблизительный объем памяти, занятый хранилищем.
+
+        Returns:
+            int: Размер массивов и таблицы комментариев в байтах
+        """
+        arrays_size = self.starts_us.nbytes + self.ends_us.nbytes + self.comment_ids.nbytes
+        table_size = sys.getsizeof(self.comment_table) + sum(
+            sys.getsizeof(comment) for comment in self.comment_table
+        )
+        return int(arrays_size) + table_size
+
+
+def daily_sleep_minutes(
+    columns: RecordColumns,
+    first_day: date,
+    last_day: date,
+    bounds_us: Optional[Sequence[int]] = None,
+) -> np.ndarray:
+    """
+    Считает минуты сна за каждый день диапазона одним векторизованным проходом.
+
+    Правила те же, что в Child.get_sleep_stats: запись относится к дню,
+    в который она закончилась, а ночной сон, начавшийся накануне,
+    обрезается по полуночи. Незавершенные записи не учитываются.
+
+    Без bounds_us дни - наивные сутки по 24 часа. Границы дней в часовом
+    поясе ребенка (DayCalendar.bounds_us) задаются таблицей, и день
+    окончания каждой записи находится бинарным поиском по ней.
+
+    Args:
+        columns (RecordColumns): Записи в колоночном виде
+        first_day (date): Первый день диапазона
+        last_day (date): Последний день диапазона (включительно)
+        bounds_us (Optional[Sequence[int]]): Начала дней диапазона и конец
+                                             последнего дня (микросекунды)
+
+    Returns:
+        np.ndarray: Массив int64 длиной в число дней с минутами сна
+    """
+    days = (last_day - first_day).days + 1
+    if days <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    closed = columns.ends_us != NO_END
+    starts = columns.starts_us[closed]
+    ends = columns.ends_us[closed]
+
+    if bounds_us is None:
+        range_start = to_epoch_us(datetime.combine(first_day, datetime.min.time()))
+        day_index = (ends - range_start) // DAY_US
+    else:
+        table = np.asarray(bounds_us, dtype=np.int64)
+        day_index = np.searchsorted(table, ends, side="right") - 1
+    in_range = (day_index >= 0) & (day_index < days)
+    starts, ends, day_index = starts[in_range], ends[in_range], day_index[in_range]
+
+    # Обрезаем начало сна по полуночи дня, в который он закончился
+    if bounds_us is None:
+        midnights = range_start + day_index * DAY_US
+    else:
+        midnights = table[day_index]
+    minutes = (ends - np.maximum(starts, midnights)) // MINUTE_US
+
+    totals = np.bincount(day_index, weights=minutes, minlength=days)
+    return totals.astype(np.int64)
@@ -0,0 +1,195 @@
+"""
+Модуль с границами дней ребенка в его часовом поясе.
+
+Пока у ребенка не задан часовой пояс, время записей - "наивное"
+местное время, а день - это сутки от полуночи до полуночи (24 часа).
+
+Если часовой пояс задан (Child.timezone, имя из базы IANA, например
+"Europe/Moscow"), время записей хранится в UTC без tzinfo, а день
+ребенка - это промежуток между двумя местными полуночами, переведенными
+в UTC. В дни перехода на летнее или зимнее время такой день длится
+23 или 25 часов, а смена пояса (переезд, путешествие) меняет только
+границы дней, но не сами записи.
+
+Границы дней одного года считаются один раз и кэшируются таблицей
+микросекунд от эпохи (модуль epoch), поэтому запрос по диапазону
+дат переводит в пояс ребенка только полуночи, а не каждую запись:
+записи раскладываются по дням бинарным поиском по таблице, в том
+числе векторизованно (columns.daily_sleep_minutes).
+
+Модуль не зависит от NumPy. Для часовых поясов нужен модуль zoneinfo
+(Python 3.9+) и база часовых поясов системы или пакет tzdata.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple
+
+from .epoch import DAY_US, MINUTE_US, from_epoch_us, to_epoch_us
+
+
+def _load_zone(name: str) -> Any:
+    """
+    Загружает часовой пояс по имени.
+
+    zoneinfo импортируется только здесь: детям без часового пояса
+    (и быстрым командам CLI) он не нужен.
+
+    Raises:
+        ValueError: Если пояс неизвестен или zoneinfo недоступен
+    """
+    try:
+        from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    except ImportError:  # Python 3.8
+        raise ValueError("Для часовых поясов нужен Python 3.9+ (модуль zoneinfo)") from None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Неизвестный часовой пояс '{name}'") from None
+
+
+@lru_cache(maxsize=64)
+def _year_midnights_us(zone_name: str, year: int) -> Tuple[int, ...]:
+    """
+    Таблица местных полуночей всех дней года в микросекундах UTC от эпохи.
+
+    Если полночи нет (переход на летнее время в 00:00), день начинается
+    с первого существующего момента.
+    """
+    zone = _load_zone(zone_name)
+    day = date(year, 1, 1)
+    midnights = []
+    while day.year == year:
+        local = datetime.combine(day, time(), tzinfo=zone)
+        utc = local.astimezone(timezone.utc).replace(tzinfo=None)
+        midnights.append(to_epoch_us(utc))
+        day += timedelta(days=1)
+    return tuple(midnights)
+
+
+class DayCalendar:
+    """
+    Границы дней в часовом поясе ребенка.
+
+    Attributes:
+        zone (Optional[str]): Имя часового пояса (None - наивное местное время)
+    """
+
+    __slots__ = ("zone", "_tzinfo")
+
+    def __init__(self, zone: Optional[str] = None) -> None:
+        """
+        Args:
+            zone (Optional[str]): Имя часового пояса IANA
+
+        Raises:
+            ValueError: Если часовой пояс неизвестен
+        """
+        self.zone = zone
+        self._tzinfo = None if zone is None else _load_zone(zone)
+
+    def bounds_us(self, first_day: date, last_day: date) -> List[int]:
+        """
+        Границы дней диапазона в микросекундах от эпохи.
+
+        Args:
+            first_day (date): Первый день
+            last_day (date): Последний день (включительно)
+
+        Returns:
+            List[int]: Начало каждого дня и конец последнего
+                       (на один элемент больше, чем дней)
+        """
+        days = (last_day - first_day).days + 1
+        if days <= 0:
+            return []
+        if self.zone is None:
+            start = to_epoch_us(datetime.combine(first_day, time()))
+            return [start + offset * DAY_US for offset in range(days + 1)]
+
+        year = first_day.year
+        offset = (first_day - date(year, 1, 1)).days
+        bounds = list(_year_midnights_us(self.zone, year)[offset : offset + days + 1])
+        while len(bounds) < days + 1:
+            year += 1
+            bounds.extend(_year_midnights_us(self.zone, year)[: days + 1 - len(bounds)])
+        return bounds
+
+    def day_bounds(self, day: date) -> Tuple[datetime, datetime]:
+        """
+        Начало и конец дня во времени записей.
+
+        Args:
+            day (date): День
+
+        Returns:
+            Tuple[datetime, datetime]: Начало дня и начало следующего дня
+        """
+        if self.zone is None:
+            start = datetime.combine(day, time())
+            return start, start + timedelta(days=1)
+        start_us, end_us = self.bounds_us(day, day)
+        return from_epoch_us(start_us), from_epoch_us(end_us)
+
+    def day_minutes(self, day: date) -> int:
+        """
+        Длина дня в минутах.
+
+        Args:
+            day (date): День
+
+        Returns:
+            int: 24 часа, а в дни перехода на летнее или зимнее время 23 или 25
+        """
+        if self.zone is None:
+            return DAY_US // MINUTE_US
+        start_us, end_us = self.bounds_us(day, day)
+        return (end_us - start_us) // MINUTE_US
+
+    def to_local(self, moment: datetime) -> datetime:
+        """
+        Переводит время записи в местное время ребенка (без tzinfo).
+        """
+        if self._tzinfo is None:
+            return moment
+        local = moment.replace(tzinfo=timezone.utc).astimezone(self._tzinfo)
+        return local.replace(tzinfo=None)
+
+    def from_local(self, local: datetime) -> datetime:
+        """
+        Переводит местное время ребенка (без tzinfo) во время записи.
+
+        Неоднозначное время при переходе на зимнее время понимается
+        как первое из двух.
+        """
+        if self._tzinfo is None:
+            return local
+        aware = local.replace(tzinfo=self._tzinfo)
+        return aware.astimezone(timezone.utc).replace(tzinfo=None)
+
+    def day_of(self, moment: datetime) -> date:
+        """
+        День ребенка, к которому относится время записи.
+        """
+        return self.to_local(moment).date()
+
+    def is_daytime(self, start_time: datetime) -> bool:
+        """
+        Дневной ли сон с этим началом: правило SleepRecord.is_daytime
+        (начало с 8:00 до 20:00) по местному времени ребенка.
+        """
+        return 8 <= self.to_local(start_time).hour < 20
+
+    def now(self) -> datetime:
+        """
+        Текущее время во времени записей.
+        """
+        if self._tzinfo is None:
+            return datetime.now()
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def today(self) -> date:
+        """
+        Сегодняшний день ребенка.
+        """
+        return self.day_of(self.now())
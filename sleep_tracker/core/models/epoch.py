@@ -0,0 +1,46 @@
+"""
+Модуль с переводом времени в целые микросекунды от эпохи.
+
+В таком виде время хранится в SQLite и в колоночном представлении
+записей (модуль columns). Модуль вынесен отдельно и не зависит от NumPy,
+чтобы хранилище и быстрые команды CLI не загружали NumPy при запуске.
+
+Микросекунды (а не секунды) нужны, чтобы результат в точности совпадал
+с Child.get_sleep_stats: время, полученное из datetime.now(), содержит
+доли секунды, и их отбрасывание меняло бы число полных минут.
+"""
+
+from datetime import datetime, timedelta
+
+# Начало отсчета для "наивных" datetime без часового пояса
+EPOCH = datetime(1970, 1, 1)
+MINUTE_US = 60 * 1_000_000
+DAY_US = 24 * 60 * MINUTE_US
+
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_us(moment: datetime) -> int:
+    """
+    Переводит datetime в целое число микросекунд от эпохи.
+
+    Args:
+        moment (datetime): Момент времени
+
+    Returns:
+        int: Микросекунды от 1970-01-01 00:00
+    """
+    return (moment - EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(value: int) -> datetime:
+    """
+    Обратное преобразование для to_epoch_us.
+
+    Args:
+        value (int): Микросекунды от эпохи
+
+    Returns:
+        datetime: Момент времени
+    """
+    return EPOCH + timedelta(microseconds=int(value))
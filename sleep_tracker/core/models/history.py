@@ -0,0 +1,105 @@
+"""
+Модуль с ленивой историей записей о сне.
+
+Ребенок, загруженный лениво (Child.lazy), держит в памяти только
+недавние записи - все, что закончились не раньше границы loaded_since,
+и активный сон. Более старые записи подгружаются из хранилища функцией
+HistoryLoader, когда запрос по диапазону дат доходит до границы.
+
+Снаружи Child.sleep_records такого ребенка - LazySleepRecords: обычная
+изменяемая последовательность, которая при первом обращении загружает
+всю историю и дальше ведет себя как список.
+"""
+
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    MutableSequence,
+    Optional,
+    Union,
+    overload,
+)
+
+from .sleep_record import SleepRecord
+
+# (since, before) -> завершенные записи, закончившиеся в [since, before),
+# в хронологическом порядке; since=None - вся история до before
+HistoryLoader = Callable[[Optional[datetime], datetime], List[SleepRecord]]
+
+
+class LazySleepRecords(MutableSequence[SleepRecord]):
+    """
+    Список записей о сне, загружающий полную историю при первом обращении.
+
+    Все операции выполняются над списком, который возвращает функция
+    load, поэтому изменения видны ребенку так же, как изменения
+    обычного sleep_records.
+    """
+
+    __slots__ = ("_load",)
+    __hash__ = None  # type: ignore[assignment]
+
+    def __init__(self, load: Callable[[], List[SleepRecord]]) -> None:
+        """
+        Args:
+            load (Callable[[], List[SleepRecord]]): Загружает всю историю
+                                                    и возвращает список записей
+        """
+        self._load = load
+
+    @overload
+    def __getitem__(self, index: int) -> SleepRecord:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[SleepRecord]:
+        ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[SleepRecord, List[SleepRecord]]:
+        return self._load()[index]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        self._load()[index] = value
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        del self._load()[index]
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __iter__(self) -> Iterator[SleepRecord]:
+        return iter(self._load())
+
+    def __reversed__(self) -> Iterator[SleepRecord]:
+        return reversed(self._load())
+
+    def __contains__(self, record: object) -> bool:
+        return record in self._load()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LazySleepRecords):
+            other = other._load()
+        return self._load() == other
+
+    def __repr__(self) -> str:
+        return repr(self._load())
+
+    def insert(self, index: int, record: SleepRecord) -> None:
+        self._load().insert(index, record)
+
+    def extend(self, records: Iterable[SleepRecord]) -> None:
+        self._load().extend(records)
+
+    def sort(
+        self, *, key: Optional[Callable[[SleepRecord], Any]] = None, reverse: bool = False
+    ) -> None:
+        self._load().sort(key=key, reverse=reverse)  # type: ignore[arg-type]
+
+    def copy(self) -> List[SleepRecord]:
+        return list(self._load())
@@ -7,14 +7,23 @@
 3. Работа с датами и временем
 4. Свойства (properties) и их использование
 5. Валидация данных
+6. Экономию памяти с помощью __slots__
 """
 
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
+# Начиная с Python 3.10 dataclass умеет создавать __slots__: у объектов
+# не будет __dict__, и каждая запись займет заметно меньше памяти.
+# На более старых версиях запись остается обычным dataclass.
+_DATACLASS_OPTIONS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class SleepRecord:
     """
     Класс для хранения информации о периоде сна ребенка.
@@ -24,6 +33,19 @@ class SleepRecord:
     - методы __repr__ и __eq__ для строкового представления и сравнения
     - и другие полезные методы
     
+    На Python 3.10+ класс объявляется со __slots__, поэтому у записей
+    нет словаря атрибутов. Для очень больших историй есть еще более
+    компактное хранилище PackedSleepRecords (модуль columns).
+    
+    Длительность хранится целым числом секунд: у завершенного сна она
+    считается один раз и запоминается вместе с end_time, для которого
+    посчитана, так что после присваивания end_time (напрямую или через
+    end_sleep) она считается заново. start_time задает место записи
+    в истории ребенка и после создания записи не меняется. Для активного
+    сна берется момент now, переданный вызывающим кодом. Так экран
+    статуса многих детей берет текущее время один раз и показывает
+    согласованные длительности.
+    
     Attributes:
         start_time (datetime): Время начала сна
         end_time (Optional[datetime]): Время окончания сна (None если сон еще не закончен)
@@ -33,6 +55,12 @@ class SleepRecord:
     start_time: datetime
     end_time: Optional[datetime] = None
     comment: str = ""
+    # Длительность завершенного сна в секундах (считается при первом обращении)
+    # и end_time, для которого она посчитана
+    _seconds: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    _seconds_end: Optional[datetime] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def __post_init__(self) -> None:
         """
@@ -61,6 +89,30 @@ class SleepRecord:
         """
         return 8 <= self.start_time.hour < 20
     
+    def duration_seconds(self, now: Optional[datetime] = None) -> int:
+        """
+        Рассчитывает продолжительность сна в целых секундах.
+        
+        Args:
+            now (Optional[datetime]): Текущее время для активного сна
+                                      (по умолчанию datetime.now())
+        
+        Returns:
+            int: Длительность в секундах (для активного сна - до now,
+                 но не меньше нуля)
+        """
+        end_time = self.end_time
+        if end_time is None:
+            delta = (datetime.now() if now is None else now) - self.start_time
+            return max(delta.days * SECONDS_PER_DAY + delta.seconds, 0)
+        seconds = self._seconds
+        if seconds is not None and self._seconds_end is end_time:
+            return seconds
+        delta = end_time - self.start_time
+        seconds = self._seconds = delta.days * SECONDS_PER_DAY + delta.seconds
+        self._seconds_end = end_time
+        return seconds
+    
     @property
     def duration(self) -> Tuple[int, int]:
         """
@@ -70,29 +122,20 @@ class SleepRecord:
         Returns:
             Tuple[int, int]: Кортеж (часы, минуты), показывающий длительность сна
         """
-        # Определяем конечное время: текущее время для активного сна или время окончания для завершенного
-        end = datetime.now() if self.end_time is None else self.end_time
-        
-        # Вычисляем разницу во времени
-        duration = end - self.start_time
-        
-        # Получаем общее количество минут
-        total_minutes = int(duration.total_seconds() / 60)
-        
-        # Разбиваем на часы и минуты
-        hours = total_minutes // 60  # целочисленное деление
-        minutes = total_minutes % 60  # остаток от деления
-        
-        return hours, minutes
+        return divmod(self.duration_seconds() // 60, 60)
     
-    def format_duration(self) -> str:
+    def format_duration(self, now: Optional[datetime] = None) -> str:
         """
         Форматирует длительность сна в строку вида "чч:мм".
         
+        Args:
+            now (Optional[datetime]): Текущее время для активного сна
+                                      (по умолчанию datetime.now())
+        
         Returns:
             str: Строка с длительностью в формате "чч:мм"
         """
-        hours, minutes = self.duration
+        hours, minutes = divmod(self.duration_seconds(now) // 60, 60)
         return f"{hours:02d}:{minutes:02d}"
     
     def end_sleep(self, end_time: datetime) -> None:
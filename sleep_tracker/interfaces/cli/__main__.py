@@ -0,0 +1,9 @@
+"""
+Запуск интерфейса командной строки: python -m sleep_tracker.interfaces.cli
+"""
+
+import sys
+
+from .main import main
+
+sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+Модуль с интерфейсом командной строки sleep-tracker.
+
+Команды:
+    sleep-tracker register Имя ГГГГ-ММ-ДД     - зарегистрировать ребенка или
+                                                изменить имя и дату рождения
+    sleep-tracker start [--at ЧЧ:ММ] [комментарий] - ребенок уснул
+    sleep-tracker stop [--at ЧЧ:ММ] [комментарий]  - ребенок проснулся
+    sleep-tracker status                      - текущий сон и итоги за сегодня
+    sleep-tracker report day|week|month [--date ГГГГ-ММ-ДД] - отчет за период
+    sleep-tracker export ПУТЬ [--kind days|records] - выгрузка в CSV или Parquet
+    sleep-tracker bot                         - запустить Telegram бота
+
+Данные хранятся в базе SQLite (--db, по умолчанию переменная окружения
+SLEEP_TRACKER_DB или sleep_tracker.db, как у бота). Ребенок выбирается
+опцией --child (по умолчанию "default").
+
+start, stop и status вызываются из алиасов оболочки и cron, поэтому
+модуль импортирует только хранилище SQLite: ребенок загружается
+лениво (SQLiteStorage.load_recent), а NumPy, pandas и telegram
+импортируются внутри команд report, export и bot. Время запуска
+проверяет benchmarks/bench_startup.py.
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, datetime
+from typing import List, Optional
+
+from sleep_tracker.core.exceptions import ChildNotFoundError, SleepTrackerError
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+DEFAULT_DB = "sleep_tracker.db"
+DEFAULT_CHILD = "default"
+PERIODS = ("day", "week", "month")
+
+
+def _minutes_text(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _parse_time(value: str) -> datetime:
+    """
+    Разбирает время события: "ЧЧ:ММ" (сегодня) или дату и время в ISO формате.
+    """
+    try:
+        if len(value) <= 5:
+            moment = datetime.strptime(value, "%H:%M").time()
+            return datetime.combine(date.today(), moment)
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Неверное время '{value}', ожидается ЧЧ:ММ или ГГГГ-ММ-ДДTЧЧ:ММ"
+        ) from None
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Неверная дата '{value}', ожидается ГГГГ-ММ-ДД"
+        ) from None
+
+
+def _event_time(child: Child, args: argparse.Namespace) -> datetime:
+    """
+    Время события во времени записей ребенка (--at задается в местном времени).
+    """
+    if args.at is None:
+        return child.calendar.now()
+    return child.calendar.from_local(args.at)
+
+
+def _register(storage: SQLiteStorage, args: argparse.Namespace) -> int:
+    # Повторная регистрация, как в боте, меняет имя и дату рождения,
+    # а история сна и часовой пояс (если --timezone не задан) сохраняются
+    try:
+        current: Optional[Child] = storage.load_child(args.child)
+    except ChildNotFoundError:
+        current = None
+    if current is None:
+        child = Child(name=args.name, birth_date=args.birth_date, timezone=args.timezone)
+    else:
+        child = Child(
+            name=args.name,
+            birth_date=args.birth_date,
+            sleep_records=list(current.sleep_records),
+            timezone=args.timezone or current.timezone,
+        )
+    storage.save_child(args.child, child)
+    if current is None:
+        print(f"{child.name} зарегистрирован(а)")
+    else:
+        print(f"Данные {child.name} обновлены, записей о сне: {len(child.sleep_records)}")
+    return 0
+
+
+def _start(storage: SQLiteStorage, args: argparse.Namespace) -> int:
+    # Для проверки пересечений достаточно последних дней: более старые
+    # записи Child подгрузит сам, если время начала окажется в прошлом
+    child = storage.load_recent(args.child, days=1)
+    record = child.start_sleep(_event_time(child, args), " ".join(args.comment))
+    storage.append_start(args.child, record)
+    print(f"Сон начат в {child.calendar.to_local(record.start_time):%H:%M}")
+    return 0
+
+
+def _stop(storage: SQLiteStorage, args: argparse.Namespace) -> int:
+    child = storage.load_recent(args.child, days=1)
+    record = child.end_sleep(_event_time(child, args), " ".join(args.comment) or None)
+    storage.append_end(args.child, record)
+    print(f"Сон завершен, длительность {record.format_duration()}")
+    return 0
+
+
+def _status(storage: SQLiteStorage, args: argparse.Namespace) -> int:
+    child = storage.load_recent(args.child, days=1)
+    calendar = child.calendar
+    record = child.get_active_sleep()
+    if record is None:
+        print(f"{child.name} не спит")
+    else:
+        print(
+            f"{child.name} спит с {calendar.to_local(record.start_time):%H:%M}, "
+            f"уже {record.format_duration(calendar.now())}"
+        )
+
+    today = calendar.today()
+    rollups = storage.get_rollups(args.child, today, today)
+    if rollups:
+        rollup = rollups[0]
+        print(
+            f"Сегодня: сон {_minutes_text(rollup.sleep_minutes)} "
+            f"(днем {_minutes_text(rollup.daytime_minutes)}, "
+            f"ночью {_minutes_text(rollup.night_minutes)}), "
+            f"дневных снов: {rollup.naps}"
+        )
+    return 0
+
+
+def _report(storage: SQLiteStorage, args: argparse.Namespace) -> int:
+    from sleep_tracker.services.reports.report import period_bounds, report_from_rollups
+
+    child = storage.load_recent(args.child, days=1)
+    first_day, last_day = period_bounds(args.period, args.date or child.calendar.today())
+    rollups = storage.get_rollups(args.child, first_day, last_day)
+    report = report_from_rollups(args.child, rollups, first_day, last_day, child.calendar)
+    for day, sleep_minutes, awake_minutes in report.days:
+        print(
+            f"{day:%d.%m.%Y}  сон {_minutes_text(sleep_minutes)}  "
+            f"бодрствование {_minutes_text(awake_minutes)}"
+        )
+    print(
+        f"Всего: {_minutes_text(report.total_sleep_minutes)}, "
+        f"в среднем за день: {_minutes_text(round(report.average_sleep_minutes))}"
+    )
+    return 0
+
+
+def _export(storage: SQLiteStorage, args: argparse.Namespace) -> int:
+    from sleep_tracker.services.reports.export import ReportExporter
+
+    child_ids = [args.child] if args.child_given else storage.child_ids()
+    children = ((child_id, storage.load_child(child_id)) for child_id in child_ids)
+    rows = ReportExporter().export(
+        children,
+        args.path,
+        kind=args.kind,
+        first_day=args.first_day,
+        last_day=args.last_day,
+        resume=args.resume,
+    )
+    print(f"Выгружено строк: {rows}")
+    return 0
+
+
+def _bot(storage: SQLiteStorage, args: argparse.Namespace) -> int:
+    from sleep_tracker.interfaces.telegram.bot import build_application
+    from sleep_tracker.interfaces.telegram.service import SleepBotService
+
+    token = os.environ.get("SLEEP_TRACKER_BOT_TOKEN")
+    if not token:
+        print("Не задан SLEEP_TRACKER_BOT_TOKEN", file=sys.stderr)
+        return 1
+    build_application(token, SleepBotService(storage)).run_polling()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Создает разборщик аргументов командной строки.
+
+    Returns:
+        argparse.ArgumentParser: Разборщик с подкомандами
+    """
+    parser = argparse.ArgumentParser(
+        prog="sleep-tracker", description="Отслеживание сна ребенка"
+    )
+    parser.add_argument(
+        "--db",
+        default=os.environ.get("SLEEP_TRACKER_DB", DEFAULT_DB),
+        help="Путь к базе SQLite (по умолчанию $SLEEP_TRACKER_DB или %(default)s)",
+    )
+    parser.add_argument("--child", help=f"Идентификатор ребенка (по умолчанию {DEFAULT_CHILD})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    register = commands.add_parser("register", help="Зарегистрировать ребенка")
+    register.add_argument("name", help="Имя")
+    register.add_argument("birth_date", type=_parse_date, help="Дата рождения ГГГГ-ММ-ДД")
+    register.add_argument(
+        "--timezone", help="Часовой пояс IANA, например Europe/Moscow (время хранится в UTC)"
+    )
+    register.set_defaults(handler=_register)
+
+    for name, handler, help_text in (
+        ("start", _start, "Ребенок уснул"),
+        ("stop", _stop, "Ребенок проснулся"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--at", type=_parse_time, help="Время ЧЧ:ММ (по умолчанию сейчас)")
+        command.add_argument("comment", nargs="*", help="Комментарий")
+        command.set_defaults(handler=handler)
+
+    status = commands.add_parser("status", help="Текущий сон и итоги за сегодня")
+    status.set_defaults(handler=_status)
+
+    report = commands.add_parser("report", help="Отчет за календарный период")
+    report.add_argument("period", choices=PERIODS)
+    report.add_argument(
+        "--date", type=_parse_date, help="Любой день периода (по умолчанию сегодня)"
+    )
+    report.set_defaults(handler=_report)
+
+    export = commands.add_parser("export", help="Выгрузка в CSV или Parquet")
+    export.add_argument("path", help="Файл CSV или каталог .parquet")
+    export.add_argument("--kind", choices=("days", "records"), default="days")
+    export.add_argument("--from", dest="first_day", type=_parse_date, help="Первый день")
+    export.add_argument("--to", dest="last_day", type=_parse_date, help="Последний день")
+    export.add_argument("--resume", action="store_true", help="Продолжить прерванную выгрузку")
+    export.set_defaults(handler=_export)
+
+    bot = commands.add_parser("bot", help="Запустить Telegram бота с этой базой")
+    bot.set_defaults(handler=_bot)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Точка входа sleep-tracker.
+
+    Args:
+        argv (Optional[List[str]]): Аргументы (по умолчанию sys.argv[1:])
+
+    Returns:
+        int: Код завершения (0 - успех, 1 - ошибка)
+    """
+    args = build_parser().parse_args(argv)
+    # export без --child выгружает всех детей
+    args.child_given = args.child is not None
+    args.child = args.child or DEFAULT_CHILD
+    try:
+        with SQLiteStorage(args.db, pool_size=1) as storage:
+            return int(args.handler(storage, args))
+    except (SleepTrackerError, ValueError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Модуль с Telegram ботом на python-telegram-bot (версии 20+, asyncio).
+
+Команды:
+    /register Имя ГГГГ-ММ-ДД [пояс] - зарегистрировать ребенка для чата
+    /sleep [комментарий]     - ребенок уснул
+    /wake [комментарий]      - ребенок проснулся
+    /status                  - текущий сон
+    /stats [ГГГГ-ММ-ДД]      - статистика за день (по умолчанию сегодня)
+
+Время событий - текущее время в часовом поясе ребенка (если он задан
+при регистрации, например Europe/Moscow), в ответах время местное.
+
+Обработчики только разбирают команды и форматируют ответы, вся работа
+с данными выполняется в SleepBotService. Обновления обрабатываются
+параллельно (concurrent_updates), согласованность данных ребенка
+обеспечивают блокировки сервиса.
+
+Запуск:
+    SLEEP_TRACKER_BOT_TOKEN=... python -m sleep_tracker.interfaces.telegram.bot
+"""
+
+import os
+from datetime import date
+from typing import Optional
+
+from telegram import Update
+from telegram.ext import Application, CommandHandler, ContextTypes
+
+from sleep_tracker.core.exceptions import ChildNotFoundError
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+from .service import SleepBotService
+
+HELP_TEXT = (
+    "Команды:\n"
+    "/register Имя ГГГГ-ММ-ДД [часовой пояс] - зарегистрировать ребенка\n"
+    "/sleep [комментарий] - ребенок уснул\n"
+    "/wake [комментарий] - ребенок проснулся\n"
+    "/status - текущий сон\n"
+    "/stats [ГГГГ-ММ-ДД] - статистика за день"
+)
+NOT_REGISTERED_TEXT = "Сначала зарегистрируйте ребенка: /register Имя ГГГГ-ММ-ДД"
+
+
+def _minutes_text(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class SleepBot:
+    """
+    Обработчики команд бота.
+
+    Attributes:
+        service (SleepBotService): Сервис с логикой бота
+    """
+
+    def __init__(self, service: SleepBotService) -> None:
+        self.service = service
+
+    async def _reply(self, update: Update, text: str) -> None:
+        if update.effective_message is not None:
+            await update.effective_message.reply_text(text)
+
+    @staticmethod
+    def _chat_id(update: Update) -> int:
+        if update.effective_chat is None:
+            raise ValueError("Обновление без чата")
+        return update.effective_chat.id
+
+    async def help(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        await self._reply(update, HELP_TEXT)
+
+    async def register(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        args = list(context.args or [])
+        # Необязательный последний аргумент - пояс IANA вида Europe/Moscow
+        timezone = args.pop() if args and "/" in args[-1] else None
+        try:
+            name, birth_date = " ".join(args[:-1]), date.fromisoformat(args[-1])
+            if not name:
+                raise ValueError
+        except (IndexError, ValueError):
+            await self._reply(update, "Использование: /register Имя ГГГГ-ММ-ДД [часовой пояс]")
+            return
+
+        try:
+            child = await self.service.register(
+                self._chat_id(update), name, birth_date, timezone
+            )
+        except ValueError as error:
+            await self._reply(update, str(error))
+            return
+        await self._reply(update, f"{child.name} зарегистрирован(а). {HELP_TEXT}")
+
+    async def sleep(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        comment = " ".join(context.args or [])
+        chat_id = self._chat_id(update)
+        try:
+            record = await self.service.start_sleep(chat_id, comment=comment)
+            calendar = await self.service.calendar(chat_id)
+        except ChildNotFoundError:
+            await self._reply(update, NOT_REGISTERED_TEXT)
+        except ValueError as error:
+            await self._reply(update, str(error))
+        else:
+            await self._reply(
+                update, f"Сон начат в {calendar.to_local(record.start_time):%H:%M}"
+            )
+
+    async def wake(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        comment: Optional[str] = " ".join(context.args or []) or None
+        try:
+            record = await self.service.end_sleep(self._chat_id(update), comment=comment)
+        except ChildNotFoundError:
+            await self._reply(update, NOT_REGISTERED_TEXT)
+        except ValueError as error:
+            await self._reply(update, str(error))
+        else:
+            await self._reply(update, f"Сон завершен, длительность {record.format_duration()}")
+
+    async def status(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        chat_id = self._chat_id(update)
+        try:
+            record = await self.service.active_sleep(chat_id)
+            calendar = await self.service.calendar(chat_id)
+        except ChildNotFoundError:
+            await self._reply(update, NOT_REGISTERED_TEXT)
+            return
+        if record is None:
+            await self._reply(update, "Ребенок не спит")
+        else:
+            await self._reply(
+                update,
+                f"Спит с {calendar.to_local(record.start_time):%H:%M}, "
+                f"уже {record.format_duration(calendar.now())}",
+            )
+
+    async def stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        args = context.args or []
+        try:
+            day = date.fromisoformat(args[0]) if args else None
+        except ValueError:
+            await self._reply(update, "Использование: /stats [ГГГГ-ММ-ДД]")
+            return
+
+        chat_id = self._chat_id(update)
+        try:
+            if day is None:
+                day = (await self.service.calendar(chat_id)).today()
+            totals = await self.service.stats(chat_id, day)
+        except ChildNotFoundError:
+            await self._reply(update, NOT_REGISTERED_TEXT)
+            return
+        awake = totals.awake_minutes
+        await self._reply(
+            update,
+            f"Статистика за {day:%d.%m.%Y}:\n"
+            f"Сон: {_minutes_text(totals.sleep_minutes)} "
+            f"(днем {_minutes_text(totals.daytime_minutes)}, "
+            f"ночью {_minutes_text(totals.night_minutes)})\n"
+            f"Дневных снов: {totals.naps}"
+            + ("" if awake is None else f"\nБодрствование: {_minutes_text(awake)}"),
+        )
+
+
+def build_application(
+    token: str, service: SleepBotService, base_url: Optional[str] = None
+) -> Application:
+    """
+    Создает приложение бота с зарегистрированными обработчиками.
+
+    Args:
+        token (str): Токен бота
+        service (SleepBotService): Сервис с логикой бота
+        base_url (Optional[str]): Адрес Bot API (для локального сервера)
+
+    Returns:
+        Application: Приложение python-telegram-bot
+    """
+    builder = Application.builder().token(token).concurrent_updates(True)
+    if base_url is not None:
+        builder = builder.base_url(base_url)
+    application = builder.build()
+
+    bot = SleepBot(service)
+    application.add_handler(CommandHandler(["start", "help"], bot.help))
+    application.add_handler(CommandHandler("register", bot.register))
+    application.add_handler(CommandHandler("sleep", bot.sleep))
+    application.add_handler(CommandHandler("wake", bot.wake))
+    application.add_handler(CommandHandler("status", bot.status))
+    application.add_handler(CommandHandler("stats", bot.stats))
+    return application
+
+
+def main() -> None:
+    """Запускает бота с хранилищем SQLite."""
+    token = os.environ["SLEEP_TRACKER_BOT_TOKEN"]
+    storage = SQLiteStorage(os.environ.get("SLEEP_TRACKER_DB", "sleep_tracker.db"))
+    application = build_application(token, SleepBotService(storage))
+    try:
+        application.run_polling()
+    finally:
+        storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Модуль с логикой Telegram бота, не зависящей от библиотеки python-telegram-bot.
+
+Все обработчики бота асинхронные, поэтому работа, которая может
+заблокировать цикл событий (чтение и запись хранилища, расчет
+статистики), выполняется в пуле потоков через run_in_executor.
+
+Дети чатов держатся в TrackerRegistry со сквозной записью: в памяти
+не больше capacity давно не использованных детей, а каждое событие
+сразу сохраняется в хранилище. Операции с одним ребенком выполняются
+под его блокировкой в реестре: если двое родителей одновременно нажмут
+"проснулся", второй запрос дождется первого и получит понятную ошибку,
+а не испортит запись. Повторные запросы статистики за тот же день
+в течение короткого окна объединяются в одно вычисление.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from datetime import date, datetime
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.days import DayCalendar
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.storage.base import SleepStorage
+from sleep_tracker.services.tracker.accumulator import DayTotals
+from sleep_tracker.services.tracker.registry import TrackerRegistry
+
+T = TypeVar("T")
+
+
+def chat_child_id(chat_id: int) -> str:
+    """
+    Возвращает идентификатор ребенка в хранилище для чата.
+
+    Args:
+        chat_id (int): Идентификатор чата Telegram (у групп отрицательный)
+
+    Returns:
+        str: Идентификатор ребенка
+    """
+    return f"chat{chat_id}"
+
+
+class SleepBotService:
+    """
+    Асинхронный сервис бота: один ребенок на чат.
+
+    Attributes:
+        storage (SleepStorage): Хранилище детей
+        registry (TrackerRegistry): Дети чатов в памяти
+        coalesce_window (float): Сколько секунд переиспользовать результат статистики
+    """
+
+    def __init__(
+        self,
+        storage: SleepStorage,
+        executor: Optional[Executor] = None,
+        coalesce_window: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        capacity: int = 10_000,
+    ) -> None:
+        """
+        Args:
+            storage (SleepStorage): Хранилище детей (должно допускать вызовы
+                                    из разных потоков)
+            executor (Optional[Executor]): Пул для блокирующей работы
+                                           (None - пул цикла событий по умолчанию)
+            coalesce_window (float): Окно объединения запросов статистики в секундах
+            clock (Callable[[], float]): Источник времени для окна объединения
+            capacity (int): Сколько детей держать в памяти
+        """
+        self.storage = storage
+        self.registry = TrackerRegistry(storage, capacity=capacity, write_through=True)
+        self.coalesce_window = coalesce_window
+        self._executor = executor
+        self._clock = clock
+        # (ребенок, дата) -> (время запуска, задача расчета статистики)
+        self._stats: Dict[Tuple[str, date], Tuple[float, "asyncio.Future[DayTotals]"]] = {}
+        self.stats_computations = 0
+
+    async def _run(self, function: Callable[..., T], *args: object) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    def _forget_stats(self, child_id: str) -> None:
+        for key in [key for key in self._stats if key[0] == child_id]:
+            del self._stats[key]
+
+    async def register(
+        self, chat_id: int, name: str, birth_date: date, timezone: Optional[str] = None
+    ) -> Child:
+        """
+        Регистрирует ребенка для чата (или заменяет имя и дату рождения,
+        сохраняя записи о сне).
+
+        Args:
+            chat_id (int): Идентификатор чата
+            name (str): Имя ребенка
+            birth_date (date): Дата рождения
+            timezone (Optional[str]): Часовой пояс IANA (None - оставить
+                                      пояс уже зарегистрированного ребенка)
+
+        Returns:
+            Child: Зарегистрированный ребенок
+
+        Raises:
+            ValueError: Если дата рождения в будущем или пояс неизвестен
+        """
+        child_id = chat_child_id(chat_id)
+
+        def replace(current: Optional[Child]) -> Child:
+            # При повторной регистрации история сна и часовой пояс сохраняются
+            if current is None:
+                return Child(name=name, birth_date=birth_date, timezone=timezone)
+            return Child(
+                name=name,
+                birth_date=birth_date,
+                sleep_records=list(current.sleep_records),
+                timezone=timezone or current.timezone,
+            )
+
+        child = await self._run(self.registry.update, child_id, replace)
+        self._forget_stats(child_id)
+        return child
+
+    async def calendar(self, chat_id: int) -> DayCalendar:
+        """
+        Возвращает границы дней ребенка чата (для местного времени в ответах).
+
+        Raises:
+            ChildNotFoundError: Если ребенок не зарегистрирован
+        """
+        child = await self._run(self.registry.get_child, chat_child_id(chat_id))
+        return child.calendar
+
+    async def start_sleep(
+        self, chat_id: int, start_time: Optional[datetime] = None, comment: str = ""
+    ) -> SleepRecord:
+        """
+        Начинает сон ребенка чата.
+
+        Args:
+            chat_id (int): Идентификатор чата
+            start_time (Optional[datetime]): Время во времени записей ребенка
+                                             (по умолчанию сейчас)
+            comment (str): Комментарий
+
+        Raises:
+            ChildNotFoundError: Если ребенок не зарегистрирован
+            ValueError: Если сон уже идет
+        """
+        child_id = chat_child_id(chat_id)
+
+        def start() -> SleepRecord:
+            with self.registry.locked(child_id) as tracker:
+                moment = start_time or tracker.child.calendar.now()
+                return tracker.start_sleep(moment, comment)
+
+        record = await self._run(start)
+        self._forget_stats(child_id)
+        return record
+
+    async def end_sleep(
+        self,
+        chat_id: int,
+        end_time: Optional[datetime] = None,
+        comment: Optional[str] = None,
+    ) -> SleepRecord:
+        """
+        Завершает сон ребенка чата.
+
+        Args:
+            chat_id (int): Идентификатор чата
+            end_time (Optional[datetime]): Время во времени записей ребенка
+                                           (по умолчанию сейчас)
+            comment (Optional[str]): Дополнительный комментарий
+
+        Raises:
+            ChildNotFoundError: Если ребенок не зарегистрирован
+            ValueError: Если сон не идет
+        """
+        child_id = chat_child_id(chat_id)
+
+        def end() -> SleepRecord:
+            with self.registry.locked(child_id) as tracker:
+                moment = end_time or tracker.child.calendar.now()
+                return tracker.end_sleep(moment, comment)
+
+        record = await self._run(end)
+        self._forget_stats(child_id)
+        return record
+
+    async def active_sleep(self, chat_id: int) -> Optional[SleepRecord]:
+        """
+        Возвращает текущий сон ребенка чата, если он идет.
+        """
+        return await self._run(self.registry.active_sleep, chat_child_id(chat_id))
+
+    async def stats(self, chat_id: int, day: Optional[date] = None) -> DayTotals:
+        """
+        Возвращает итоги сна за день.
+
+        Одновременные и повторные в пределах coalesce_window запросы
+        за тот же день получают результат одного вычисления. Любое
+        изменение записей ребенка сбрасывает сохраненный результат.
+
+        Args:
+            chat_id (int): Идентификатор чата
+            day (Optional[date]): Дата (по умолчанию сегодня у ребенка)
+
+        Returns:
+            DayTotals: Итоги за день
+        """
+        if day is None:
+            day = (await self.calendar(chat_id)).today()
+        key = (chat_child_id(chat_id), day)
+        now = self._clock()
+        cached = self._stats.get(key)
+        if cached is not None and (not cached[1].done() or now - cached[0] < self.coalesce_window):
+            return await asyncio.shield(cached[1])
+
+        self._prune_stats(now)
+        future = asyncio.ensure_future(self._compute_stats(*key))
+        self._stats[key] = (now, future)
+        try:
+            return await asyncio.shield(future)
+        except Exception:
+            # Ошибку не запоминаем: следующий запрос вычислит заново
+            if key in self._stats and self._stats[key][1] is future:
+                del self._stats[key]
+            raise
+
+    def _prune_stats(self, now: float) -> None:
+        """
+        Удаляет устаревшие результаты, чтобы словарь не рос бесконечно.
+        """
+        if len(self._stats) < 1024:
+            return
+        for key, (started, future) in list(self._stats.items()):
+            if future.done() and now - started >= self.coalesce_window:
+                del self._stats[key]
+
+    async def _compute_stats(self, child_id: str, day: date) -> DayTotals:
+        self.stats_computations += 1
+        return await self._run(self.registry.day, child_id, day)
@@ -0,0 +1,329 @@
+"""
+Модуль с потоковым импортом истории сна из CSV и JSON.
+
+Файл читается построчно (или небольшими блоками для массива JSON),
+строки превращаются в записи генераторами, а записи добавляются
+в Child пачками по chunk_size через Child.add_records. В памяти
+одновременно находится не больше одной пачки, поэтому расход памяти
+конвейера не зависит от размера файла.
+
+Поддерживаемые форматы (поля совпадают с serialization.record_to_dict):
+- CSV с заголовком start,end,comment;
+- JSON Lines: по одному объекту {"start", "end", "comment"} на строку;
+- массив JSON из таких объектов.
+
+Время записывается в формате ISO 8601, пустое или отсутствующее
+поле end означает активный сон.
+
+Проверяются те же правила, что в моделях: окончание не раньше начала
+(SleepRecord.__post_init__) и не больше одного активного сна
+(Child). Некорректные строки не прерывают импорт, а попадают в отчет.
+"""
+
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from sleep_tracker.core.metrics import instrumented
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.storage.base import SleepStorage
+
+FORMATS = ("csv", "jsonl", "json")
+_SUFFIX_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "json"}
+
+# Строка источника: (номер строки или элемента, поля записи)
+Row = Tuple[int, Dict[str, Any]]
+
+
+@dataclass
+class ImportIssue:
+    """
+    Некорректная строка источника.
+
+    Attributes:
+        row (int): Номер строки (CSV, JSON Lines) или элемента массива JSON
+        message (str): Описание ошибки
+    """
+
+    row: int
+    message: str
+
+
+@dataclass
+class ImportResult:
+    """
+    Итоги импорта.
+
+    Attributes:
+        imported (int): Количество добавленных записей
+        skipped (int): Количество пропущенных некорректных строк
+        issues (List[ImportIssue]): Первые max_issues ошибок
+    """
+
+    imported: int = 0
+    skipped: int = 0
+    issues: List[ImportIssue] = field(default_factory=list)
+
+
+def iter_csv_rows(stream: TextIO) -> Iterator[Row]:
+    """
+    Читает строки CSV с заголовком.
+
+    Args:
+        stream (TextIO): Текстовый поток (файл открывается с newline="")
+
+    Yields:
+        Row: Номер строки файла и словарь полей
+    """
+    reader = csv.DictReader(stream)
+    for fields in reader:
+        yield reader.line_num, fields
+
+
+def iter_jsonl_rows(stream: TextIO) -> Iterator[Row]:
+    """
+    Читает JSON Lines. Пустые строки пропускаются, строки с некорректным
+    JSON передаются дальше как словарь с ключом "error".
+
+    Args:
+        stream (TextIO): Текстовый поток
+
+    Yields:
+        Row: Номер строки файла и словарь полей
+    """
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as error:
+            yield number, {"error": f"Некорректный JSON: {error}"}
+
+
+def iter_json_rows(stream: TextIO, block_size: int = 1 << 16) -> Iterator[Row]:
+    """
+    Читает массив JSON по одному элементу, не загружая файл целиком.
+
+    Args:
+        stream (TextIO): Текстовый поток
+        block_size (int): Размер читаемого блока в символах
+
+    Yields:
+        Row: Номер элемента массива (с единицы) и словарь полей
+
+    Raises:
+        ValueError: Если файл не является массивом JSON
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    finished = False
+
+    def fill() -> bool:
+        nonlocal buffer, position, finished
+        block = stream.read(block_size)
+        buffer = buffer[position:] + block
+        position = 0
+        finished = not block
+        return bool(block)
+
+    def skip(separators: str) -> None:
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in separators:
+                position += 1
+            if position < len(buffer) or not fill():
+                return
+
+    skip(" \t\r\n")
+    if buffer[position:position + 1] != "[":
+        raise ValueError("Ожидается массив JSON")
+    position += 1
+
+    number = 0
+    while True:
+        skip(" \t\r\n,")
+        if position >= len(buffer) or buffer[position] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except ValueError:
+            if finished or not fill():
+                raise ValueError(f"Некорректный JSON в элементе {number + 1}") from None
+            continue
+        if end == len(buffer) and not finished:
+            # Число на границе блока могло быть прочитано не полностью
+            fill()
+            continue
+        position = end
+        number += 1
+        yield number, item
+
+
+def parse_rows(
+    rows: Iterable[Row], result: ImportResult, max_issues: int = 100
+) -> Iterator[Tuple[int, SleepRecord]]:
+    """
+    Превращает строки источника в записи о сне, пропуская некорректные.
+
+    Args:
+        rows (Iterable[Row]): Строки источника
+        result (ImportResult): Итоги, куда записываются ошибки
+        max_issues (int): Сколько ошибок сохранять в result.issues
+
+    Yields:
+        Tuple[int, SleepRecord]: Номер строки и запись
+    """
+    for number, fields in rows:
+        try:
+            if not isinstance(fields, dict):
+                raise ValueError("Ожидается объект с полями start, end, comment")
+            if "error" in fields:
+                raise ValueError(fields["error"])
+            end = fields.get("end")
+            record = SleepRecord(
+                start_time=datetime.fromisoformat(fields["start"]),
+                end_time=datetime.fromisoformat(end) if end else None,
+                comment=fields.get("comment") or "",
+            )
+        except KeyError as error:
+            _report(result, number, f"Нет поля {error}", max_issues)
+        except (TypeError, ValueError) as error:
+            _report(result, number, str(error), max_issues)
+        else:
+            yield number, record
+
+
+def _report(result: ImportResult, row: int, message: str, max_issues: int) -> None:
+    result.skipped += 1
+    if len(result.issues) < max_issues:
+        result.issues.append(ImportIssue(row, message))
+
+
+class SleepImporter:
+    """
+    Потоковый импорт записей о сне в Child (и, при необходимости, в хранилище).
+
+    Attributes:
+        chunk_size (int): Количество записей в одной пачке
+        max_issues (int): Сколько ошибок сохранять в отчете
+    """
+
+    def __init__(self, chunk_size: int = 10_000, max_issues: int = 100) -> None:
+        """
+        Args:
+            chunk_size (int): Количество записей в одной пачке
+            max_issues (int): Сколько ошибок сохранять в отчете
+        """
+        if chunk_size < 1:
+            raise ValueError("Размер пачки должен быть положительным")
+        self.chunk_size = chunk_size
+        self.max_issues = max_issues
+
+    @instrumented(records=lambda result, *args, **kwargs: result.imported)
+    def import_rows(
+        self,
+        rows: Iterable[Row],
+        child: Child,
+        storage: Optional[SleepStorage] = None,
+        child_id: str = "",
+    ) -> ImportResult:
+        """
+        Импортирует строки источника в историю ребенка.
+
+        Записи добавляются через Child.add_records: если источник
+        упорядочен по времени начала, каждая пачка просто дописывается
+        в конец истории, иначе индекс ребенка перестраивается.
+
+        Args:
+            rows (Iterable[Row]): Строки источника
+            child (Child): Ребенок
+            storage (Optional[SleepStorage]): Хранилище, куда сохраняются пачки
+            child_id (str): Идентификатор ребенка в хранилище
+
+        Returns:
+            ImportResult: Количество импортированных записей и ошибки
+        """
+        if storage is not None and not child_id:
+            raise ValueError("Для работы с хранилищем нужен идентификатор ребенка")
+
+        result = ImportResult()
+        has_active = child.get_active_sleep() is not None
+        chunk: List[SleepRecord] = []
+        for number, record in parse_rows(rows, result, self.max_issues):
+            if record.end_time is None:
+                if has_active:
+                    _report(
+                        result,
+                        number,
+                        "Уже есть активная запись о сне. Допускается не больше одной",
+                        self.max_issues,
+                    )
+                    continue
+                has_active = True
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk, child, storage, child_id, result)
+                chunk = []
+        self._flush(chunk, child, storage, child_id, result)
+        return result
+
+    def import_file(
+        self,
+        path: Union[str, Path],
+        child: Child,
+        storage: Optional[SleepStorage] = None,
+        child_id: str = "",
+        file_format: Optional[str] = None,
+    ) -> ImportResult:
+        """
+        Импортирует файл CSV, JSON Lines или массив JSON.
+
+        Args:
+            path (Union[str, Path]): Путь к файлу
+            child (Child): Ребенок
+            storage (Optional[SleepStorage]): Хранилище, куда сохраняются пачки
+            child_id (str): Идентификатор ребенка в хранилище
+            file_format (Optional[str]): "csv", "jsonl" или "json"
+                                         (по умолчанию по расширению файла)
+
+        Returns:
+            ImportResult: Количество импортированных записей и ошибки
+
+        Raises:
+            ValueError: Если формат неизвестен
+        """
+        path = Path(path)
+        file_format = file_format or _SUFFIX_FORMATS.get(path.suffix.lower())
+        if file_format not in FORMATS:
+            raise ValueError(
+                f"Неизвестный формат файла '{path.name}', ожидается один из {FORMATS}"
+            )
+
+        with path.open(encoding="utf-8", newline="") as stream:
+            if file_format == "csv":
+                rows = iter_csv_rows(stream)
+            elif file_format == "jsonl":
+                rows = iter_jsonl_rows(stream)
+            else:
+                rows = iter_json_rows(stream)
+            return self.import_rows(rows, child, storage, child_id)
+
+    @staticmethod
+    def _flush(
+        chunk: List[SleepRecord],
+        child: Child,
+        storage: Optional[SleepStorage],
+        child_id: str,
+        result: ImportResult,
+    ) -> None:
+        if not chunk:
+            return
+        child.add_records(chunk)
+        if storage is not None:
+            storage.append_records(child_id, chunk)
+        result.imported += len(chunk)
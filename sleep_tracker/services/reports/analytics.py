@@ -0,0 +1,362 @@
+"""
+Модуль с аналитикой режима сна за период.
+
+Помимо итогов по дням (модуль report) считаются:
+- окна бодрствования - промежутки между окончанием сна и началом
+  следующего (относятся ко дню начала следующего сна);
+- дневные сны по правилу SleepRecord.is_daytime (начало с 8:00
+  до 20:00 по местному времени) и регулярность их количества;
+- время отхода ко сну - начало первого ночного сна между полуднем
+  дня и полуднем следующего - и его разброс;
+- скользящие средние сна за 7 и 30 дней и наклон тренда;
+- сравнение со средней нормой сна для возраста ребенка.
+
+Записи всех детей пачки склеиваются в общие массивы NumPy,
+упорядоченные по (ребенок, начало сна), и все величины считаются
+векторизованно (searchsorted, bincount), без циклов Python по записям
+и дням. Границы дней каждого ребенка берутся из его календаря
+(Child.calendar), поэтому учитываются часовой пояс и дни по 23
+и 25 часов; местный час начала сна определяется по смещению пояса
+в начале дня.
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from sleep_tracker.core.metrics import instrumented
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.columns import NO_END, RecordColumns
+from sleep_tracker.core.models.days import DayCalendar
+from sleep_tracker.core.models.epoch import DAY_US, MINUTE_US, from_epoch_us
+
+HOUR_US = 60 * MINUTE_US
+NOON_US = 12 * HOUR_US
+# Промежуток между снами длиннее суток считается пропуском в записях,
+# а не окном бодрствования
+MAX_WAKE_WINDOW_US = DAY_US
+
+# Рекомендуемая продолжительность сна за сутки (с дневным сном):
+# (возраст до, месяцев; минимум и максимум минут)
+SLEEP_NORMS: Tuple[Tuple[int, int, int], ...] = (
+    (4, 14 * 60, 17 * 60),
+    (12, 12 * 60, 16 * 60),
+    (24, 11 * 60, 14 * 60),
+    (60, 10 * 60, 13 * 60),
+    (156, 9 * 60, 12 * 60),
+    (216, 8 * 60, 10 * 60),
+)
+
+
+def sleep_norm(age_months: int) -> Tuple[int, int]:
+    """
+    Рекомендуемая продолжительность сна за сутки для возраста.
+
+    Args:
+        age_months (int): Возраст в месяцах
+
+    Returns:
+        Tuple[int, int]: Минимум и максимум минут сна
+    """
+    for max_age, low, high in SLEEP_NORMS:
+        if age_months < max_age:
+            return low, high
+    return SLEEP_NORMS[-1][1], SLEEP_NORMS[-1][2]
+
+
+@dataclass
+class SleepAnalytics:
+    """
+    Аналитика сна ребенка за период; списки содержат значения по дням.
+
+    Attributes:
+        child_id (str): Идентификатор ребенка
+        first_day (date): Первый день периода
+        last_day (date): Последний день периода (включительно)
+        age_months (int): Возраст ребенка в месяцах
+        sleep_minutes (List[int]): Минуты сна (как в get_sleep_stats)
+        naps (List[int]): Количество дневных снов
+        nap_minutes (List[int]): Минуты дневного сна
+        wake_windows (List[int]): Количество окон бодрствования
+        wake_minutes (List[int]): Суммарная длина окон бодрствования
+        bedtimes (List[Optional[int]]): Отход ко сну в минутах после полудня
+                                        (None - ночного сна не было)
+    """
+
+    child_id: str
+    first_day: date
+    last_day: date
+    age_months: int
+    sleep_minutes: List[int]
+    naps: List[int]
+    nap_minutes: List[int]
+    wake_windows: List[int]
+    wake_minutes: List[int]
+    bedtimes: List[Optional[int]]
+
+    @property
+    def average_sleep_minutes(self) -> float:
+        """Среднее время сна в день в минутах."""
+        return float(np.mean(self.sleep_minutes)) if self.sleep_minutes else 0.0
+
+    @property
+    def average_wake_window_minutes(self) -> float:
+        """Средняя длина окна бодрствования в минутах."""
+        windows = sum(self.wake_windows)
+        return sum(self.wake_minutes) / windows if windows else 0.0
+
+    @property
+    def nap_regularity(self) -> float:
+        """
+        Стандартное отклонение количества дневных снов по дням
+        (0 - каждый день одинаковое число снов).
+        """
+        return float(np.std(self.naps)) if self.naps else 0.0
+
+    @property
+    def bedtime_std_minutes(self) -> Optional[float]:
+        """
+        Стандартное отклонение времени отхода ко сну в минутах
+        (None - меньше двух ночей с известным временем).
+        """
+        bedtimes = [bedtime for bedtime in self.bedtimes if bedtime is not None]
+        if len(bedtimes) < 2:
+            return None
+        return float(np.std(bedtimes))
+
+    def rolling_sleep_minutes(self, window: int = 7) -> List[float]:
+        """
+        Скользящее среднее сна за window дней, заканчивающихся каждым днем.
+
+        В первые дни периода среднее берется по имеющимся дням.
+
+        Args:
+            window (int): Ширина окна в днях (обычно 7 или 30)
+
+        Returns:
+            List[float]: Среднее за каждый день периода
+        """
+        if window < 1:
+            raise ValueError("Ширина окна должна быть положительной")
+        sums = np.concatenate(([0], np.cumsum(self.sleep_minutes)))
+        ends = np.arange(1, len(sums))
+        begins = np.maximum(ends - window, 0)
+        result: List[float] = ((sums[ends] - sums[begins]) / (ends - begins)).tolist()
+        return result
+
+    @property
+    def sleep_trend(self) -> float:
+        """
+        Наклон линейного тренда сна в минутах за день
+        (положительный - ребенок спит все больше).
+        """
+        if len(self.sleep_minutes) < 2:
+            return 0.0
+        days = np.arange(len(self.sleep_minutes))
+        return float(np.polyfit(days, self.sleep_minutes, 1)[0])
+
+    @property
+    def sleep_norm(self) -> Tuple[int, int]:
+        """Рекомендуемые минимум и максимум минут сна для возраста."""
+        return sleep_norm(self.age_months)
+
+    @property
+    def sleep_vs_norm(self) -> float:
+        """
+        Отношение среднего сна к середине нормы для возраста
+        (1.0 - ровно середина, меньше - ребенок спит меньше сверстников).
+        """
+        low, high = self.sleep_norm
+        return self.average_sleep_minutes / ((low + high) / 2)
+
+
+def _day_index(values: np.ndarray, owners: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """
+    Номер дня каждого значения по таблице границ его ребенка.
+
+    Таблицы всех детей сдвигаются на owner * span и склеиваются в один
+    возрастающий массив, поэтому один searchsorted обслуживает всех.
+
+    Args:
+        values (np.ndarray): Моменты времени (микросекунды)
+        owners (np.ndarray): Номер ребенка каждого значения
+        bounds (np.ndarray): Границы дней детей (дети x границы)
+
+    Returns:
+        np.ndarray: Номер дня: -1 - раньше первой границы,
+                    последний номер - не раньше последней
+    """
+    origin = min(int(bounds.min()), int(values.min()))
+    span = max(int(bounds.max()), int(values.max())) - origin + 1
+    shifts = np.arange(len(bounds), dtype=np.int64) * span
+    flat = (bounds - origin + shifts[:, None]).ravel()
+    keys = values - origin + shifts[owners]
+    index: np.ndarray = np.searchsorted(flat, keys, side="right") - 1 - owners * bounds.shape[1]
+    return index
+
+
+def _analyze_chunk(
+    chunk: List[Tuple[str, Child]], first_day: date, last_day: date
+) -> List[SleepAnalytics]:
+    """
+    Считает аналитику для пачки детей одним набором векторных операций.
+    """
+    days = (last_day - first_day).days + 1
+    # Соседние дни нужны для окон и отхода ко сну на границах периода
+    bounds_first, bounds_last = first_day - timedelta(days=1), last_day + timedelta(days=1)
+    naive_bounds = np.asarray(DayCalendar().bounds_us(bounds_first, bounds_last))
+
+    columns: List[RecordColumns] = []
+    child_bounds: List[List[int]] = []
+    for _, child in chunk:
+        own_bounds = child.calendar.bounds_us(bounds_first, bounds_last)
+        records = child.get_records_between(
+            from_epoch_us(own_bounds[0]), from_epoch_us(own_bounds[-1])
+        )
+        columns.append(RecordColumns.from_records(records))
+        child_bounds.append(own_bounds)
+
+    slots = len(chunk) * days
+    bounds = np.asarray(child_bounds, dtype=np.int64)
+    owners = np.repeat(np.arange(len(chunk)), [len(column) for column in columns])
+    starts = np.concatenate([column.starts_us for column in columns] + [np.zeros(0, np.int64)])
+    ends = np.concatenate([column.ends_us for column in columns] + [np.zeros(0, np.int64)])
+    closed = ends != NO_END
+    last_bound = bounds.shape[1] - 1
+
+    if len(starts):
+        start_days = _day_index(starts, owners, bounds)
+        end_days = np.where(closed, _day_index(np.where(closed, ends, starts), owners, bounds), -1)
+    else:
+        start_days = end_days = np.zeros(0, dtype=np.int64)
+
+    # Местное время начала: сдвиг пояса в начале дня начала сна
+    offsets = naive_bounds[None, :] - bounds
+    local_starts = starts + offsets[owners, np.clip(start_days, 0, last_bound)]
+    hours = (local_starts // HOUR_US) % 24
+    daytime = (hours >= 8) & (hours < 20)
+
+    # Сон относится ко дню окончания и обрезается по его началу
+    counted = closed & (end_days >= 1) & (end_days <= days)
+    end_slots = owners * days + end_days - 1
+    midnights = bounds[owners, np.clip(end_days, 0, last_bound)]
+    minutes = (ends - np.maximum(starts, midnights)) // MINUTE_US
+    sleep = np.bincount(end_slots[counted], weights=minutes[counted], minlength=slots)
+    nap = counted & daytime
+    naps = np.bincount(end_slots[nap], minlength=slots)
+    nap_minutes = np.bincount(end_slots[nap], weights=minutes[nap], minlength=slots)
+
+    # Окна бодрствования: от окончания сна до начала следующего сна того же ребенка
+    gaps = starts[1:] - ends[:-1]
+    next_days = start_days[1:]
+    windows = (
+        (owners[1:] == owners[:-1])
+        & closed[:-1]
+        & (gaps >= 0)
+        & (gaps <= MAX_WAKE_WINDOW_US)
+        & (next_days >= 1)
+        & (next_days <= days)
+    )
+    window_slots = (owners[1:] * days + next_days - 1)[windows]
+    wake_windows = np.bincount(window_slots, minlength=slots)
+    wake_minutes = np.bincount(
+        window_slots, weights=(gaps // MINUTE_US)[windows], minlength=slots
+    )
+
+    # Отход ко сну: первый ночной сон с полудня дня до полудня следующего
+    bed_days = (local_starts - NOON_US) // DAY_US - naive_bounds[0] // DAY_US
+    nights = ~daytime & (bed_days >= 1) & (bed_days <= days)
+    bed_slots, first_nights = np.unique(
+        (owners * days + bed_days - 1)[nights], return_index=True
+    )
+    night_starts = local_starts[nights][first_nights]
+    bedtimes = np.full(slots, -1, dtype=np.int64)
+    bedtimes[bed_slots] = (night_starts - NOON_US) % DAY_US // MINUTE_US
+
+    def per_child(values: np.ndarray) -> List[List[int]]:
+        rows: List[List[int]] = values.astype(np.int64).reshape(len(chunk), days).tolist()
+        return rows
+
+    sleep_rows, nap_rows, nap_minute_rows = per_child(sleep), per_child(naps), per_child(nap_minutes)
+    window_rows, wake_rows, bedtime_rows = (
+        per_child(wake_windows),
+        per_child(wake_minutes),
+        per_child(bedtimes),
+    )
+    return [
+        SleepAnalytics(
+            child_id=child_id,
+            first_day=first_day,
+            last_day=last_day,
+            age_months=child.age_months,
+            sleep_minutes=sleep_rows[index],
+            naps=nap_rows[index],
+            nap_minutes=nap_minute_rows[index],
+            wake_windows=window_rows[index],
+            wake_minutes=wake_rows[index],
+            bedtimes=[None if bedtime < 0 else bedtime for bedtime in bedtime_rows[index]],
+        )
+        for index, (child_id, child) in enumerate(chunk)
+    ]
+
+
+@instrumented()
+def analyze(child_id: str, child: Child, first_day: date, last_day: date) -> SleepAnalytics:
+    """
+    Считает аналитику сна одного ребенка за период.
+
+    Args:
+        child_id (str): Идентификатор ребенка
+        child (Child): Ребенок
+        first_day (date): Первый день периода
+        last_day (date): Последний день периода (включительно)
+
+    Returns:
+        SleepAnalytics: Аналитика за период
+
+    Raises:
+        ValueError: Если период пустой
+    """
+    if last_day < first_day:
+        raise ValueError("Последний день периода раньше первого")
+    return _analyze_chunk([(child_id, child)], first_day, last_day)[0]
+
+
+def analyze_children(
+    children: Iterable[Tuple[str, Child]],
+    first_day: date,
+    last_day: date,
+    chunk_size: int = 1000,
+) -> Iterator[SleepAnalytics]:
+    """
+    Считает аналитику для многих детей пачками по chunk_size.
+
+    Записи пачки обрабатываются одним набором векторных операций,
+    а в памяти одновременно находится только одна пачка.
+
+    Args:
+        children (Iterable[Tuple[str, Child]]): Пары (идентификатор, ребенок)
+        first_day (date): Первый день периода
+        last_day (date): Последний день периода (включительно)
+        chunk_size (int): Количество детей в пачке
+
+    Yields:
+        SleepAnalytics: Аналитика очередного ребенка (в порядке children)
+
+    Raises:
+        ValueError: Если период пустой или размер пачки не положительный
+    """
+    if last_day < first_day:
+        raise ValueError("Последний день периода раньше первого")
+    if chunk_size < 1:
+        raise ValueError("Размер пачки должен быть положительным")
+    chunk: List[Tuple[str, Child]] = []
+    for item in children:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield from _analyze_chunk(chunk, first_day, last_day)
+            chunk = []
+    if chunk:
+        yield from _analyze_chunk(chunk, first_day, last_day)
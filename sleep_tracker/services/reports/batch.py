@@ -0,0 +1,139 @@
+"""
+Модуль с пакетной генерацией отчетов для многих детей.
+
+Расчет распределяется по процессам (ProcessPoolExecutor). Дети
+группируются в пачки по chunk_size, и в рабочий процесс передаются
+только массивы времени начала и окончания нужного периода, а не
+сериализованные списки SleepRecord. Готовые отчеты возвращаются
+по мере завершения пачек, а число пачек в работе ограничено, поэтому
+входной поток детей не загружается в память целиком. Раздача пачек
+общая с модулем cohort (модуль pool).
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date
+from functools import partial
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.services.storage.base import SleepStorage
+
+from .pool import Chunk, check_period, load_children, period_chunks, run_chunks
+from .report import SleepReport, build_report
+
+
+def _build_chunk(chunk: Chunk[str], first_day: date, last_day: date) -> List[SleepReport]:
+    """
+    Строит отчеты для пачки детей (выполняется в рабочем процессе).
+    """
+    return [
+        build_report(child_id, columns, first_day, last_day, bounds_us)
+        for child_id, columns, bounds_us in chunk
+    ]
+
+
+def _child_id(child_id: str, child: Child) -> str:
+    return child_id
+
+
+class BatchReportService:
+    """
+    Сервис пакетной генерации отчетов.
+
+    Attributes:
+        max_workers (Optional[int]): Количество процессов (None - по числу ядер)
+        chunk_size (int): Количество детей в одной пачке
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 64) -> None:
+        """
+        Args:
+            max_workers (Optional[int]): Количество процессов
+            chunk_size (int): Количество детей в одной пачке
+        """
+        if chunk_size < 1:
+            raise ValueError("Размер пачки должен быть положительным")
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+
+    def generate(
+        self,
+        children: Iterable[Tuple[str, Child]],
+        first_day: date,
+        last_day: date,
+        executor: Optional[Executor] = None,
+    ) -> Iterator[SleepReport]:
+        """
+        Строит отчеты за период для всех детей.
+
+        Отчеты возвращаются в порядке готовности, а не в порядке детей.
+
+        Args:
+            children (Iterable[Tuple[str, Child]]): Пары (идентификатор, ребенок)
+            first_day (date): Первый день периода
+            last_day (date): Последний день периода (включительно)
+            executor (Optional[Executor]): Готовый пул (по умолчанию создается
+                                           ProcessPoolExecutor на время генерации)
+
+        Returns:
+            Iterator[SleepReport]: Отчеты детей
+
+        Raises:
+            ValueError: Если период пустой
+        """
+        check_period(first_day, last_day)
+        return self._generate(children, first_day, last_day, executor)
+
+    def generate_for_ids(
+        self,
+        storage: SleepStorage,
+        child_ids: Iterable[str],
+        first_day: date,
+        last_day: date,
+        executor: Optional[Executor] = None,
+    ) -> Iterator[SleepReport]:
+        """
+        Строит отчеты для детей из хранилища, загружая их по мере надобности.
+
+        У каждого ребенка читаются только записи с первого дня периода
+        (см. pool.load_children), а не вся история.
+
+        Args:
+            storage (SleepStorage): Хранилище
+            child_ids (Iterable[str]): Идентификаторы детей
+            first_day (date): Первый день периода
+            last_day (date): Последний день периода (включительно)
+            executor (Optional[Executor]): Готовый пул
+
+        Returns:
+            Iterator[SleepReport]: Отчеты детей
+
+        Raises:
+            ValueError: Если период пустой
+        """
+        return self.generate(load_children(storage, child_ids), first_day, last_day, executor)
+
+    def _generate(
+        self,
+        children: Iterable[Tuple[str, Child]],
+        first_day: date,
+        last_day: date,
+        executor: Optional[Executor],
+    ) -> Iterator[SleepReport]:
+        if executor is not None:
+            yield from self._run(executor, children, first_day, last_day)
+            return
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            yield from self._run(pool, children, first_day, last_day)
+
+    def _run(
+        self,
+        executor: Executor,
+        children: Iterable[Tuple[str, Child]],
+        first_day: date,
+        last_day: date,
+    ) -> Iterator[SleepReport]:
+        chunks = period_chunks(children, first_day, last_day, self.chunk_size, _child_id)
+        task = partial(_build_chunk, first_day=first_day, last_day=last_day)
+        for reports in run_chunks(executor, chunks, task, self.max_workers):
+            yield from reports
@@ -0,0 +1,372 @@
+"""
+Модуль со статистикой сна по возрастным группам всех детей.
+
+Для дашбордов нужны медиана, p90 и другие процентили минут сна за день
+по группам возраста (как Child.age_months) среди всех детей хранилища.
+Дни детей не собираются в общий список: минуты сна каждого дня попадают
+в гистограмму своей группы (MinuteSketch). Сон за день - целое число
+минут от 0 до 1500 (день длится не больше 25 часов), поэтому гистограмма
+с шагом в одну минуту занимает около 12 КБ на группу при любом числе
+детей и дает точные процентили, а с шагом bin_minutes - процентили
+с ошибкой не больше половины шага. Гистограммы складываются поэлементно,
+поэтому частичные итоги рабочих процессов объединяются в любом порядке
+с одним и тем же результатом.
+
+Расчет распределяется по процессам так же, как в модуле batch (общая
+часть - модуль pool): в рабочий процесс передаются дата рождения
+и колонки записей периода, обратно возвращается только частичная
+статистика (CohortStats), а число пачек в работе ограничено.
+
+Возраст считается на каждый день периода, поэтому за длинный период
+ребенок может попасть в несколько групп. Дни без сна (записи не велись)
+и дни до рождения не учитываются.
+"""
+
+import math
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import partial
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from sleep_tracker.core.metrics import instrumented
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.columns import daily_sleep_minutes
+from sleep_tracker.services.storage.base import SleepStorage
+
+from .analytics import SLEEP_NORMS
+from .pool import Chunk, check_period, load_children, period_chunks, run_chunks
+
+# Максимум минут сна за день (день перехода на зимнее время - 25 часов)
+MAX_DAY_MINUTES = 25 * 60
+# Нижние границы возрастных групп в месяцах (группы норм сна из analytics)
+AGE_EDGES: Tuple[int, ...] = (0,) + tuple(max_age for max_age, _, _ in SLEEP_NORMS)
+
+
+class MinuteSketch:
+    """
+    Гистограмма минут сна за день для процентилей.
+
+    Attributes:
+        bin_minutes (int): Ширина столбца гистограммы в минутах
+        counts (np.ndarray): Количество дней в каждом столбце
+        total (int): Сумма минут всех дней (для среднего)
+    """
+
+    __slots__ = ("bin_minutes", "counts", "total")
+
+    def __init__(self, bin_minutes: int = 1) -> None:
+        """
+        Args:
+            bin_minutes (int): Ширина столбца (1 - точные процентили)
+
+        Raises:
+            ValueError: Если ширина столбца не положительная
+        """
+        if bin_minutes < 1:
+            raise ValueError("Ширина столбца должна быть положительной")
+        self.bin_minutes = bin_minutes
+        self.counts = np.zeros(MAX_DAY_MINUTES // bin_minutes + 1, dtype=np.int64)
+        self.total = 0
+
+    @property
+    def count(self) -> int:
+        """Количество учтенных дней."""
+        return int(self.counts.sum())
+
+    def add(self, minutes: Any) -> None:
+        """
+        Добавляет минуты сна за дни.
+
+        Args:
+            minutes: Массив или последовательность минут сна за день
+        """
+        values = np.clip(np.asarray(minutes, dtype=np.int64), 0, MAX_DAY_MINUTES)
+        self.counts += np.bincount(values // self.bin_minutes, minlength=len(self.counts))
+        self.total += int(values.sum())
+
+    def merge(self, other: "MinuteSketch") -> None:
+        """
+        Добавляет дни другой гистограммы.
+
+        Raises:
+            ValueError: Если ширина столбцов различается
+        """
+        if other.bin_minutes != self.bin_minutes:
+            raise ValueError("Нельзя объединить гистограммы с разной шириной столбцов")
+        self.counts += other.counts
+        self.total += other.total
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Квантиль минут сна (по рангу: наименьшее значение, не меньше
+        которого q доли дней).
+
+        Args:
+            q (float): Доля от 0 до 1 (0.5 - медиана, 0.9 - p90)
+
+        Returns:
+            Optional[float]: Середина столбца с квантилем (None - дней нет)
+
+        Raises:
+            ValueError: Если q вне отрезка [0, 1]
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Квантиль должен быть от 0 до 1")
+        count = self.count
+        if count == 0:
+            return None
+        rank = max(1, math.ceil(q * count))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return index * self.bin_minutes + (self.bin_minutes - 1) / 2
+
+    def mean(self) -> Optional[float]:
+        """Среднее минут сна за день (None - дней нет)."""
+        count = self.count
+        return self.total / count if count else None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MinuteSketch):
+            return NotImplemented
+        return (
+            self.bin_minutes == other.bin_minutes
+            and self.total == other.total
+            and bool(np.array_equal(self.counts, other.counts))
+        )
+
+
+@dataclass
+class CohortBucket:
+    """
+    Возрастная группа.
+
+    Attributes:
+        min_age (int): Возраст от, месяцев
+        max_age (Optional[int]): Возраст до, месяцев (None - без ограничения)
+        sketch (MinuteSketch): Гистограмма минут сна за день
+        children (int): Количество детей с днями в группе
+    """
+
+    min_age: int
+    max_age: Optional[int]
+    sketch: MinuteSketch
+    children: int = 0
+
+    @property
+    def label(self) -> str:
+        """Название группы, например "4-12" или "216+" (месяцы)."""
+        if self.max_age is None:
+            return f"{self.min_age}+"
+        return f"{self.min_age}-{self.max_age}"
+
+    @property
+    def days(self) -> int:
+        """Количество дней детей группы."""
+        return self.sketch.count
+
+    @property
+    def median(self) -> Optional[float]:
+        """Медиана минут сна за день."""
+        return self.sketch.quantile(0.5)
+
+    @property
+    def p90(self) -> Optional[float]:
+        """90-й процентиль минут сна за день."""
+        return self.sketch.quantile(0.9)
+
+
+@dataclass
+class CohortStats:
+    """
+    Статистика сна по возрастным группам за период.
+
+    Attributes:
+        first_day (date): Первый день периода
+        last_day (date): Последний день периода (включительно)
+        buckets (List[CohortBucket]): Группы в порядке возраста (AGE_EDGES)
+    """
+
+    first_day: date
+    last_day: date
+    buckets: List[CohortBucket]
+
+    @classmethod
+    def empty(cls, first_day: date, last_day: date, bin_minutes: int = 1) -> "CohortStats":
+        """
+        Создает статистику без дней.
+
+        Args:
+            first_day (date): Первый день периода
+            last_day (date): Последний день периода (включительно)
+            bin_minutes (int): Ширина столбца гистограмм
+        """
+        upper: List[Optional[int]] = [*AGE_EDGES[1:], None]
+        buckets = [
+            CohortBucket(min_age, max_age, MinuteSketch(bin_minutes))
+            for min_age, max_age in zip(AGE_EDGES, upper)
+        ]
+        return cls(first_day, last_day, buckets)
+
+    def bucket(self, age_months: int) -> CohortBucket:
+        """
+        Возвращает группу для возраста.
+
+        Raises:
+            ValueError: Если возраст отрицательный
+        """
+        if age_months < 0:
+            raise ValueError("Возраст не может быть отрицательным")
+        index = int(np.searchsorted(AGE_EDGES, age_months, side="right")) - 1
+        return self.buckets[index]
+
+    def merge(self, other: "CohortStats") -> "CohortStats":
+        """
+        Добавляет частичную статистику другого набора детей.
+
+        Returns:
+            CohortStats: Эта же статистика
+
+        Raises:
+            ValueError: Если периоды различаются
+        """
+        if (other.first_day, other.last_day) != (self.first_day, self.last_day):
+            raise ValueError("Нельзя объединить статистику за разные периоды")
+        for bucket, other_bucket in zip(self.buckets, other.buckets):
+            bucket.sketch.merge(other_bucket.sketch)
+            bucket.children += other_bucket.children
+        return self
+
+
+def _aggregate_chunk(
+    chunk: Chunk[date], first_day: date, last_day: date, bin_minutes: int
+) -> CohortStats:
+    """
+    Считает частичную статистику пачки детей (выполняется в рабочем процессе).
+    """
+    stats = CohortStats.empty(first_day, last_day, bin_minutes)
+    days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+    years = np.array([day.year for day in days], dtype=np.int64)
+    months = np.array([day.month for day in days], dtype=np.int64)
+    month_days = np.array([day.day for day in days], dtype=np.int64)
+
+    for birth_date, columns, bounds_us in chunk:
+        minutes = daily_sleep_minutes(columns, first_day, last_day, bounds_us)
+        # Возраст в месяцах на каждый день (как Child.age_months)
+        ages = (
+            (years - birth_date.year) * 12
+            + (months - birth_date.month)
+            - (month_days < birth_date.day)
+        )
+        tracked = (minutes > 0) & (ages >= 0)
+        minutes, ages = minutes[tracked], ages[tracked]
+        groups = np.searchsorted(AGE_EDGES, ages, side="right") - 1
+        for group in np.unique(groups):
+            bucket = stats.buckets[group]
+            bucket.sketch.add(minutes[groups == group])
+            bucket.children += 1
+    return stats
+
+
+def _birth_date(child_id: str, child: Child) -> date:
+    return child.birth_date
+
+
+class CohortService:
+    """
+    Сервис статистики сна по возрастным группам.
+
+    Attributes:
+        max_workers (Optional[int]): Количество процессов (None - по числу ядер)
+        chunk_size (int): Количество детей в одной пачке
+        bin_minutes (int): Ширина столбца гистограмм (1 - точные процентили)
+    """
+
+    def __init__(
+        self, max_workers: Optional[int] = None, chunk_size: int = 64, bin_minutes: int = 1
+    ) -> None:
+        """
+        Args:
+            max_workers (Optional[int]): Количество процессов
+            chunk_size (int): Количество детей в одной пачке
+            bin_minutes (int): Ширина столбца гистограмм в минутах
+        """
+        if chunk_size < 1:
+            raise ValueError("Размер пачки должен быть положительным")
+        if bin_minutes < 1:
+            raise ValueError("Ширина столбца должна быть положительной")
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.bin_minutes = bin_minutes
+
+    @instrumented()
+    def aggregate(
+        self,
+        children: Iterable[Tuple[str, Child]],
+        first_day: date,
+        last_day: date,
+        executor: Optional[Executor] = None,
+    ) -> CohortStats:
+        """
+        Считает статистику по группам за период для всех детей.
+
+        Результат не зависит ни от числа процессов, ни от порядка,
+        в котором завершаются пачки.
+
+        Args:
+            children (Iterable[Tuple[str, Child]]): Пары (идентификатор, ребенок)
+            first_day (date): Первый день периода
+            last_day (date): Последний день периода (включительно)
+            executor (Optional[Executor]): Готовый пул (по умолчанию создается
+                                           ProcessPoolExecutor на время расчета)
+
+        Returns:
+            CohortStats: Статистика по возрастным группам
+
+        Raises:
+            ValueError: Если период пустой
+        """
+        check_period(first_day, last_day)
+        if executor is not None:
+            return self._run(executor, children, first_day, last_day)
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            return self._run(pool, children, first_day, last_day)
+
+    def aggregate_storage(
+        self,
+        storage: SleepStorage,
+        first_day: date,
+        last_day: date,
+        executor: Optional[Executor] = None,
+    ) -> CohortStats:
+        """
+        Считает статистику для всех детей хранилища, загружая их по одному.
+
+        Args:
+            storage (SleepStorage): Хранилище
+            first_day (date): Первый день периода
+            last_day (date): Последний день периода (включительно)
+            executor (Optional[Executor]): Готовый пул
+
+        Returns:
+            CohortStats: Статистика по возрастным группам
+        """
+        children = load_children(storage, storage.child_ids())
+        return self.aggregate(children, first_day, last_day, executor)
+
+    def _run(
+        self,
+        executor: Executor,
+        children: Iterable[Tuple[str, Child]],
+        first_day: date,
+        last_day: date,
+    ) -> CohortStats:
+        stats = CohortStats.empty(first_day, last_day, self.bin_minutes)
+        chunks = period_chunks(children, first_day, last_day, self.chunk_size, _birth_date)
+        task = partial(
+            _aggregate_chunk, first_day=first_day, last_day=last_day, bin_minutes=self.bin_minutes
+        )
+        for partial_stats in run_chunks(executor, chunks, task, self.max_workers):
+            stats.merge(partial_stats)
+        return stats
@@ -0,0 +1,382 @@
+"""
+Модуль с потоковой выгрузкой статистики и записей о сне в CSV и Parquet.
+
+Строки выгрузки создаются генераторами и пишутся пачками по chunk_size,
+поэтому в памяти одновременно находится не больше одной пачки, сколько
+бы детей и записей ни выгружалось. Фильтр по датам применяется
+к индексу записей ребенка (Child.iter_records_between,
+Child.get_sleep_stats_range), а не ко всей истории.
+
+Выгружаются:
+- "days" - статистика по дням: child_id, date, sleep_minutes, awake_minutes
+  (как в Child.get_sleep_stats);
+- "records" - записи о сне: child_id, start, end, comment.
+
+CSV пишется в один файл. Parquet (нужны pandas и pyarrow) пишется
+в каталог, по файлу part-NNNNN.parquet на пачку; такой каталог читается
+целиком через pandas.read_parquet.
+
+После каждой пачки рядом с выгрузкой сохраняется контрольная точка
+(<путь>.checkpoint.json). Если выгрузка прервалась, повторный вызов
+с resume=True продолжит ее с последней записанной пачки. После
+успешного завершения контрольная точка удаляется.
+"""
+
+import csv
+import json
+import os
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sleep_tracker.core.metrics import instrumented
+from sleep_tracker.core.models.child import Child
+
+KINDS = ("days", "records")
+FORMATS = ("csv", "parquet")
+COLUMNS = {
+    "days": ("child_id", "date", "sleep_minutes", "awake_minutes"),
+    "records": ("child_id", "start", "end", "comment"),
+}
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+
+ExportRow = Tuple[Any, ...]
+
+
+@dataclass
+class ExportCheckpoint:
+    """
+    Состояние прерванной выгрузки.
+
+    Attributes:
+        kind (str): Что выгружается ("days" или "records")
+        file_format (str): Формат ("csv" или "parquet")
+        child_id (str): Ребенок, на котором остановилась выгрузка
+        offset (int): Сколько строк этого ребенка уже записано
+        rows (int): Сколько строк записано всего
+        size (int): Размер файла CSV или количество файлов Parquet
+        first_day (Optional[str]): Первый день периода (ISO) или None
+        last_day (Optional[str]): Последний день периода (ISO) или None
+    """
+
+    kind: str
+    file_format: str
+    child_id: str = ""
+    offset: int = 0
+    rows: int = 0
+    size: int = 0
+    first_day: Optional[str] = None
+    last_day: Optional[str] = None
+
+
+def iter_day_rows(
+    child_id: str,
+    child: Child,
+    first_day: Optional[date] = None,
+    last_day: Optional[date] = None,
+    window_days: int = 366,
+) -> Iterator[ExportRow]:
+    """
+    Перебирает статистику ребенка по дням.
+
+    Статистика считается окнами по window_days дней через
+    Child.get_sleep_stats_range. Без границ выгружаются местные дни
+    ребенка от начала первой записи до окончания последней. Старая
+    история ленивого ребенка загружается, только начиная с first_day.
+
+    Args:
+        child_id (str): Идентификатор ребенка
+        child (Child): Ребенок
+        first_day (Optional[date]): Первый день
+        last_day (Optional[date]): Последний день (включительно)
+        window_days (int): Сколько дней считать за один вызов
+
+    Yields:
+        ExportRow: (child_id, дата, минуты сна, минуты бодрствования)
+    """
+    last_record = child.last_record
+    if last_record is None:
+        return
+    calendar = child.calendar
+    if first_day is None:
+        first_day = calendar.day_of(child.sleep_records[0].start_time)
+    if last_day is None:
+        last_day = calendar.day_of(last_record.end_time or last_record.start_time)
+
+    window_start = first_day
+    while window_start <= last_day:
+        window_end = min(last_day, window_start + timedelta(days=window_days - 1))
+        for day, sleep_minutes, awake_minutes in child.get_sleep_stats_range(
+            window_start, window_end
+        ):
+            yield child_id, day, sleep_minutes, awake_minutes
+        window_start = window_end + timedelta(days=1)
+
+
+def iter_record_rows(
+    child_id: str,
+    child: Child,
+    first_day: Optional[date] = None,
+    last_day: Optional[date] = None,
+) -> Iterator[ExportRow]:
+    """
+    Перебирает записи ребенка, пересекающиеся с периодом (по местным
+    дням ребенка).
+
+    Args:
+        child_id (str): Идентификатор ребенка
+        child (Child): Ребенок
+        first_day (Optional[date]): Первый день
+        last_day (Optional[date]): Последний день (включительно)
+
+    Yields:
+        ExportRow: (child_id, начало, окончание или None, комментарий)
+    """
+    if child.last_record is None:
+        return
+    if first_day is None:
+        start = child.sleep_records[0].start_time
+    else:
+        start, _ = child.calendar.day_bounds(first_day)
+    if last_day is None:
+        end = datetime.max
+    else:
+        _, end = child.calendar.day_bounds(last_day)
+    for record in child.iter_records_between(start, end):
+        yield child_id, record.start_time, record.end_time, record.comment
+
+
+class _CsvWriter:
+    """
+    Запись пачек в один файл CSV; позиция - размер файла в байтах.
+    """
+
+    def __init__(
+        self, path: Path, columns: Sequence[str], checkpoint: ExportCheckpoint
+    ) -> None:
+        if checkpoint.size:
+            # Отрезаем строки, записанные после последней контрольной точки
+            with path.open("r+b") as damaged:
+                damaged.truncate(checkpoint.size)
+            self._file = path.open("a", encoding="utf-8", newline="")
+        else:
+            self._file = path.open("w", encoding="utf-8", newline="")
+            csv.writer(self._file).writerow(columns)
+        self._writer = csv.writer(self._file)
+
+    def write(self, rows: List[ExportRow]) -> int:
+        self._writer.writerows(
+            [value.isoformat() if isinstance(value, date) else value for value in row]
+            for row in rows
+        )
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetWriter:
+    """
+    Запись пачек в каталог Parquet, по файлу на пачку; позиция - число файлов.
+    """
+
+    def __init__(
+        self, path: Path, columns: Sequence[str], checkpoint: ExportCheckpoint
+    ) -> None:
+        try:
+            import pandas as pd
+            import pyarrow  # noqa: F401
+        except ImportError as error:
+            raise ImportError("Для выгрузки в Parquet нужны pandas и pyarrow") from error
+
+        self._pd = pd
+        self._path = path
+        self._columns = list(columns)
+        self._parts = checkpoint.size
+        path.mkdir(parents=True, exist_ok=True)
+        # Удаляем файлы, записанные после последней контрольной точки
+        for part in path.glob("part-*.parquet"):
+            if int(part.stem.split("-")[1]) >= self._parts:
+                part.unlink()
+
+    def write(self, rows: List[ExportRow]) -> int:
+        frame = self._pd.DataFrame.from_records(rows, columns=self._columns)
+        part = self._path / f"part-{self._parts:05d}.parquet"
+        temporary = part.with_name(part.name + ".tmp")
+        frame.to_parquet(temporary, engine="pyarrow", index=False)
+        os.replace(temporary, part)
+        self._parts += 1
+        return self._parts
+
+    def close(self) -> None:
+        pass
+
+
+class ReportExporter:
+    """
+    Потоковая выгрузка статистики и записей о сне.
+
+    Attributes:
+        chunk_size (int): Количество строк в одной пачке
+    """
+
+    def __init__(self, chunk_size: int = 10_000) -> None:
+        """
+        Args:
+            chunk_size (int): Количество строк в одной пачке
+        """
+        if chunk_size < 1:
+            raise ValueError("Размер пачки должен быть положительным")
+        self.chunk_size = chunk_size
+
+    @instrumented(records=lambda rows, *args, **kwargs: rows)
+    def export(
+        self,
+        children: Iterable[Tuple[str, Child]],
+        path: Union[str, Path],
+        kind: str = "days",
+        file_format: Optional[str] = None,
+        first_day: Optional[date] = None,
+        last_day: Optional[date] = None,
+        resume: bool = False,
+    ) -> int:
+        """
+        Выгружает данные детей в файл CSV или каталог Parquet.
+
+        Для продолжения прерванной выгрузки дети должны передаваться
+        в том же порядке, что и при первом запуске.
+
+        Args:
+            children (Iterable[Tuple[str, Child]]): Пары (идентификатор, ребенок)
+            path (Union[str, Path]): Файл CSV или каталог Parquet
+            kind (str): "days" или "records"
+            file_format (Optional[str]): "csv" или "parquet"
+                                         (по умолчанию по расширению пути)
+            first_day (Optional[date]): Первый день периода
+            last_day (Optional[date]): Последний день периода (включительно)
+            resume (bool): Продолжить с контрольной точки, если она есть
+
+        Returns:
+            int: Общее количество выгруженных строк
+
+        Raises:
+            ValueError: Если вид выгрузки или формат неизвестен, контрольная
+                        точка относится к другой выгрузке (вид, формат или
+                        период) или ребенка из нее нет среди children
+        """
+        path = Path(path)
+        if kind not in KINDS:
+            raise ValueError(
+                f"Неизвестный вид выгрузки '{kind}', ожидается один из {KINDS}"
+            )
+        file_format = file_format or ("parquet" if path.suffix == ".parquet" else "csv")
+        if file_format not in FORMATS:
+            raise ValueError(
+                f"Неизвестный формат '{file_format}', ожидается один из {FORMATS}"
+            )
+
+        checkpoint_path = path.with_name(path.name + CHECKPOINT_SUFFIX)
+        checkpoint = ExportCheckpoint(
+            kind,
+            file_format,
+            first_day=None if first_day is None else first_day.isoformat(),
+            last_day=None if last_day is None else last_day.isoformat(),
+        )
+        if resume and checkpoint_path.exists():
+            saved = ExportCheckpoint(
+                **json.loads(checkpoint_path.read_text(encoding="utf-8"))
+            )
+            if (saved.kind, saved.file_format) != (kind, file_format):
+                raise ValueError(
+                    f"Контрольная точка относится к выгрузке '{saved.kind}' "
+                    f"в формате '{saved.file_format}'"
+                )
+            if (saved.first_day, saved.last_day) != (
+                checkpoint.first_day,
+                checkpoint.last_day,
+            ):
+                raise ValueError(
+                    f"Контрольная точка относится к периоду "
+                    f"{saved.first_day or '...'} - {saved.last_day or '...'}"
+                )
+            checkpoint = saved
+
+        writer_class = _CsvWriter if file_format == "csv" else _ParquetWriter
+        writer = writer_class(path, COLUMNS[kind], checkpoint)
+        try:
+            chunk: List[ExportRow] = []
+            child_id, offset = "", 0
+            rows = self._rows(children, kind, first_day, last_day, checkpoint)
+            for child_id, offset, row in rows:
+                chunk.append(row)
+                if len(chunk) >= self.chunk_size:
+                    self._flush(writer, chunk, checkpoint, checkpoint_path, child_id, offset)
+                    chunk = []
+            if chunk:
+                self._flush(writer, chunk, checkpoint, checkpoint_path, child_id, offset)
+        finally:
+            writer.close()
+
+        if checkpoint_path.exists():
+            checkpoint_path.unlink()
+        return checkpoint.rows
+
+    @staticmethod
+    def _rows(
+        children: Iterable[Tuple[str, Child]],
+        kind: str,
+        first_day: Optional[date],
+        last_day: Optional[date],
+        checkpoint: ExportCheckpoint,
+    ) -> Iterator[Tuple[str, int, ExportRow]]:
+        """
+        Перебирает строки всех детей, пропуская уже выгруженные.
+
+        Yields:
+            Tuple[str, int, ExportRow]: Ребенок, номер строки ребенка
+                                        после текущей и сама строка
+
+        Raises:
+            ValueError: Если ребенка из контрольной точки нет среди children
+        """
+        skipping = bool(checkpoint.child_id)
+        for child_id, child in children:
+            skip = 0
+            if skipping:
+                if child_id != checkpoint.child_id:
+                    continue
+                skipping = False
+                skip = checkpoint.offset
+
+            if kind == "days":
+                rows = iter_day_rows(child_id, child, first_day, last_day)
+            else:
+                rows = iter_record_rows(child_id, child, first_day, last_day)
+            for offset, row in enumerate(islice(rows, skip, None), start=skip + 1):
+                yield child_id, offset, row
+        if skipping:
+            raise ValueError(
+                f"Ребенок '{checkpoint.child_id}' из контрольной точки не найден"
+            )
+
+    @staticmethod
+    def _flush(
+        writer: Union[_CsvWriter, _ParquetWriter],
+        chunk: List[ExportRow],
+        checkpoint: ExportCheckpoint,
+        checkpoint_path: Path,
+        child_id: str,
+        offset: int,
+    ) -> None:
+        checkpoint.size = writer.write(chunk)
+        checkpoint.rows += len(chunk)
+        checkpoint.child_id = child_id
+        checkpoint.offset = offset
+
+        temporary = checkpoint_path.with_name(checkpoint_path.name + ".tmp")
+        temporary.write_text(json.dumps(asdict(checkpoint)), encoding="utf-8")
+        os.replace(temporary, checkpoint_path)
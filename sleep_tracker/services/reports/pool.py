@@ -0,0 +1,140 @@
+"""
+Модуль с общей частью пакетных расчетов по многим детям (batch и cohort).
+
+Дети переводятся в пачки колонок за период (period_chunks): в рабочий
+процесс передаются только массивы времени начала и окончания записей
+периода и границы дней ребенка, а не сериализованные списки SleepRecord.
+Пачки раздаются пулу процессов (run_chunks) так, что в работе их не
+больше двух на процесс, поэтому входной поток детей не загружается
+в память целиком.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from datetime import date
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.columns import RecordColumns
+from sleep_tracker.core.models.epoch import from_epoch_us
+from sleep_tracker.services.storage.base import SleepStorage
+
+KeyT = TypeVar("KeyT")
+ChunkT = TypeVar("ChunkT")
+ResultT = TypeVar("ResultT")
+
+# Пачка для рабочего процесса: (ключ ребенка, колонки записей периода,
+# границы дней в часовом поясе или None для наивных суток)
+Chunk = List[Tuple[KeyT, RecordColumns, Optional[List[int]]]]
+
+
+def check_period(first_day: date, last_day: date) -> None:
+    """
+    Проверяет, что период не пустой.
+
+    Raises:
+        ValueError: Если последний день раньше первого
+    """
+    if last_day < first_day:
+        raise ValueError("Последний день периода раньше первого")
+
+
+def load_children(
+    storage: SleepStorage, child_ids: Iterable[str]
+) -> Iterator[Tuple[str, Child]]:
+    """
+    Загружает детей по одному без всей истории.
+
+    Ребенок читается через load_recent: в памяти только последняя запись,
+    а записи периода подгружаются при переводе в колонки, начиная
+    с первого дня периода (Child.lazy).
+
+    Args:
+        storage (SleepStorage): Хранилище
+        child_ids (Iterable[str]): Идентификаторы детей
+
+    Yields:
+        Tuple[str, Child]: Пары (идентификатор, ребенок)
+    """
+    for child_id in child_ids:
+        yield child_id, storage.load_recent(child_id, days=0)
+
+
+def period_chunks(
+    children: Iterable[Tuple[str, Child]],
+    first_day: date,
+    last_day: date,
+    size: int,
+    key: Callable[[str, Child], KeyT],
+) -> Iterator[Chunk[KeyT]]:
+    """
+    Переводит детей в пачки колонок за период.
+
+    Период берется по местным дням каждого ребенка (DayCalendar).
+
+    Args:
+        children (Iterable[Tuple[str, Child]]): Пары (идентификатор, ребенок)
+        first_day (date): Первый день периода
+        last_day (date): Последний день периода (включительно)
+        size (int): Количество детей в пачке
+        key (Callable[[str, Child], KeyT]): Что передать в рабочий процесс
+                                            вместо ребенка
+
+    Yields:
+        Chunk[KeyT]: Очередная пачка
+    """
+    check_period(first_day, last_day)
+    chunk: Chunk[KeyT] = []
+    for child_id, child in children:
+        bounds_us = child.calendar.bounds_us(first_day, last_day)
+        records = child.get_records_between(
+            from_epoch_us(bounds_us[0]), from_epoch_us(bounds_us[-1])
+        )
+        chunk.append(
+            (
+                key(child_id, child),
+                RecordColumns.from_records(records),
+                None if child.timezone is None else bounds_us,
+            )
+        )
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_chunks(
+    executor: Executor,
+    chunks: Iterable[ChunkT],
+    task: Callable[[ChunkT], ResultT],
+    max_workers: Optional[int] = None,
+) -> Iterator[ResultT]:
+    """
+    Выполняет task для каждой пачки в пуле и возвращает результаты.
+
+    Args:
+        executor (Executor): Пул
+        chunks (Iterable[ChunkT]): Пачки (перебираются по мере надобности)
+        task (Callable[[ChunkT], ResultT]): Расчет пачки (для пула процессов -
+                                            функция модуля или partial от нее)
+        max_workers (Optional[int]): Количество процессов (None - по числу ядер)
+
+    Yields:
+        ResultT: Результаты в порядке готовности, а не в порядке пачек
+    """
+    # Держим в работе не больше двух пачек на процесс
+    max_pending = 2 * (max_workers or os.cpu_count() or 1)
+    pending: Set["Future[ResultT]"] = set()
+
+    for chunk in chunks:
+        if len(pending) >= max_pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(executor.submit(task, chunk))
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
@@ -0,0 +1,171 @@
+"""
+Модуль с отчетами о сне за период.
+
+Отчет строится по колоночному представлению записей (RecordColumns),
+поэтому его можно считать в другом процессе, передав туда только
+два массива int64 вместо списка объектов SleepRecord. Если хранилище
+ведет дневные итоги (модуль rollups), отчет строится прямо по ним.
+"""
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sleep_tracker.core.metrics import instrumented
+from sleep_tracker.core.models.columns import RecordColumns, daily_sleep_minutes
+from sleep_tracker.core.models.days import DayCalendar
+from sleep_tracker.core.models.epoch import DAY_US, MINUTE_US
+from sleep_tracker.services.storage.rollups import DayRollup
+
+PERIODS = ("day", "week", "month")
+
+
+def period_bounds(period: str, day: date) -> Tuple[date, date]:
+    """
+    Возвращает первый и последний день календарного периода, содержащего day.
+
+    Args:
+        period (str): "day", "week" (с понедельника) или "month"
+        day (date): Любой день периода
+
+    Returns:
+        Tuple[date, date]: Первый и последний день периода (включительно)
+
+    Raises:
+        ValueError: Если период неизвестен
+    """
+    if period == "day":
+        return day, day
+    if period == "week":
+        first_day = day - timedelta(days=day.weekday())
+        return first_day, first_day + timedelta(days=6)
+    if period == "month":
+        first_day = day.replace(day=1)
+        next_month = (first_day + timedelta(days=32)).replace(day=1)
+        return first_day, next_month - timedelta(days=1)
+    raise ValueError(f"Неизвестный период '{period}', ожидается один из {PERIODS}")
+
+
+@dataclass
+class SleepReport:
+    """
+    Отчет о сне ребенка за период.
+
+    Attributes:
+        child_id (str): Идентификатор ребенка
+        first_day (date): Первый день периода
+        last_day (date): Последний день периода (включительно)
+        sleep_minutes (List[int]): Минуты сна за каждый день периода
+        day_minutes (Optional[List[int]]): Длина каждого дня периода
+                                           (None - все дни по 24 часа)
+    """
+
+    child_id: str
+    first_day: date
+    last_day: date
+    sleep_minutes: List[int]
+    day_minutes: Optional[List[int]] = None
+
+    @property
+    def days(self) -> List[Tuple[date, int, int]]:
+        """
+        Статистика по дням в формате Child.get_sleep_stats_range.
+
+        Returns:
+            List[Tuple[date, int, int]]: (дата, минуты сна, минуты бодрствования)
+        """
+        day_minutes = self.day_minutes or [DAY_US // MINUTE_US] * len(self.sleep_minutes)
+        return [
+            (self.first_day + timedelta(days=offset), minutes, length - minutes)
+            for offset, (minutes, length) in enumerate(zip(self.sleep_minutes, day_minutes))
+        ]
+
+    @property
+    def total_sleep_minutes(self) -> int:
+        """Суммарное время сна за период в минутах."""
+        return sum(self.sleep_minutes)
+
+    @property
+    def average_sleep_minutes(self) -> float:
+        """Среднее время сна в день в минутах."""
+        if not self.sleep_minutes:
+            return 0.0
+        return self.total_sleep_minutes / len(self.sleep_minutes)
+
+
+@instrumented(records=lambda report, child_id, columns, *args: len(columns))
+def build_report(
+    child_id: str,
+    columns: RecordColumns,
+    first_day: date,
+    last_day: date,
+    bounds_us: Optional[Sequence[int]] = None,
+) -> SleepReport:
+    """
+    Строит отчет по колоночным записям ребенка.
+
+    Args:
+        child_id (str): Идентификатор ребенка
+        columns (RecordColumns): Записи в колоночном виде
+        first_day (date): Первый день периода
+        last_day (date): Последний день периода (включительно)
+        bounds_us (Optional[Sequence[int]]): Границы дней ребенка
+                                             (DayCalendar.bounds_us, None - наивные сутки)
+
+    Returns:
+        SleepReport: Отчет за период
+    """
+    minutes = daily_sleep_minutes(columns, first_day, last_day, bounds_us)
+    day_minutes = None
+    if bounds_us is not None:
+        day_minutes = [
+            (end - start) // MINUTE_US for start, end in zip(bounds_us, bounds_us[1:])
+        ]
+    return SleepReport(
+        child_id=child_id,
+        first_day=first_day,
+        last_day=last_day,
+        sleep_minutes=minutes.tolist(),
+        day_minutes=day_minutes,
+    )
+
+
+def report_from_rollups(
+    child_id: str,
+    rollups: Iterable[DayRollup],
+    first_day: date,
+    last_day: date,
+    calendar: Optional[DayCalendar] = None,
+) -> SleepReport:
+    """
+    Строит отчет по дневным итогам (SleepStorage.get_rollups).
+
+    Args:
+        child_id (str): Идентификатор ребенка
+        rollups (Iterable[DayRollup]): Итоги дней периода (дни без сна можно пропускать)
+        first_day (date): Первый день периода
+        last_day (date): Последний день периода (включительно)
+        calendar (Optional[DayCalendar]): Календарь ребенка для длины дней
+                                          (None - все дни по 24 часа)
+
+    Returns:
+        SleepReport: Отчет за период
+    """
+    minutes = [0] * ((last_day - first_day).days + 1)
+    for rollup in rollups:
+        offset = (rollup.day - first_day).days
+        if 0 <= offset < len(minutes):
+            minutes[offset] = rollup.sleep_minutes
+    day_minutes = None
+    if calendar is not None:
+        day_minutes = [
+            calendar.day_minutes(first_day + timedelta(days=offset))
+            for offset in range(len(minutes))
+        ]
+    return SleepReport(
+        child_id=child_id,
+        first_day=first_day,
+        last_day=last_day,
+        sleep_minutes=minutes,
+        day_minutes=day_minutes,
+    )
@@ -0,0 +1,221 @@
+"""
+Модуль с общим интерфейсом хранилищ.
+
+Хранилище сохраняет ребенка целиком (save_child) и отдельные события
+его записей о сне: начало, завершение и изменение комментария.
+Сервисы работают с хранилищем только через этот интерфейс, поэтому
+конкретный формат (журнал, SQLite и т.д.) можно заменить.
+
+Методы интерфейса в каждом наследнике автоматически оборачиваются
+декоратором instrumented, поэтому метрики новых хранилищ собираются
+без изменений в их коде.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from types import TracebackType
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, TypeVar
+
+from sleep_tracker.core.metrics import instrumented
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+
+from .rollups import DayRollup, compute_rollups
+
+StorageT = TypeVar("StorageT", bound="SleepStorage")
+
+
+def _loaded_records(result: Child, *args: Any, **kwargs: Any) -> int:
+    return result.loaded_records
+
+
+def _saved_records(result: None, storage: Any, child_id: str, child: Child) -> int:
+    return len(child.sleep_records)
+
+
+# Методы, которые измеряются у всех хранилищ, и датчики количества записей
+INSTRUMENTED_METHODS: Dict[str, Optional[Callable[..., int]]] = {
+    "child_ids": None,
+    "save_child": _saved_records,
+    "load_child": _loaded_records,
+    "load_recent": _loaded_records,
+    "append_start": None,
+    "append_end": None,
+    "append_comment": None,
+    "append_records": None,
+    "get_sleep_stats": None,
+    "get_sleep_stats_range": None,
+    "get_rollups": lambda result, *args, **kwargs: len(result),
+}
+
+
+class SleepStorage(ABC):
+    """
+    Абстрактное хранилище детей и их записей о сне.
+
+    Методы append_* вызываются после того, как изменение уже внесено
+    в объект Child (например, после Child.start_sleep).
+    """
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        for name, records in INSTRUMENTED_METHODS.items():
+            method = cls.__dict__.get(name)
+            if callable(method) and not getattr(method, "__isabstractmethod__", False):
+                setattr(cls, name, instrumented(records=records)(method))
+
+    @abstractmethod
+    def child_ids(self) -> List[str]:
+        """
+        Возвращает идентификаторы всех сохраненных детей.
+
+        Returns:
+            List[str]: Идентификаторы в отсортированном порядке
+        """
+
+    @abstractmethod
+    def save_child(self, child_id: str, child: Child) -> None:
+        """
+        Сохраняет ребенка и все его записи, заменяя прежнее состояние.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            child (Child): Ребенок
+        """
+
+    @abstractmethod
+    def load_child(self, child_id: str) -> Child:
+        """
+        Загружает ребенка со всеми записями о сне.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+
+        Returns:
+            Child: Загруженный ребенок
+
+        Raises:
+            ChildNotFoundError: Если ребенок не найден
+        """
+
+    def load_recent(self, child_id: str, days: int = 7) -> Child:
+        """
+        Загружает ребенка с недавними записями, остальные - по требованию.
+
+        В памяти оказываются записи, закончившиеся за days дней до
+        последнего окончания сна, и активный сон; более старые
+        подгружаются, когда запрос по диапазону дат до них доходит
+        (см. Child.lazy). По умолчанию загружается вся история;
+        хранилища, умеющие читать записи по диапазону, переопределяют метод.
+        Подгрузка обращается к хранилищу, поэтому оно должно оставаться
+        открытым, пока используется ребенок.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            days (int): Сколько последних дней держать в памяти
+
+        Returns:
+            Child: Загруженный ребенок
+
+        Raises:
+            ChildNotFoundError: Если ребенок не найден
+        """
+        return self.load_child(child_id)
+
+    @abstractmethod
+    def append_start(self, child_id: str, record: SleepRecord) -> None:
+        """
+        Сохраняет начало нового сна.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            record (SleepRecord): Новая активная запись
+        """
+
+    @abstractmethod
+    def append_end(self, child_id: str, record: SleepRecord) -> None:
+        """
+        Сохраняет завершение активного сна (время окончания и комментарий).
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            record (SleepRecord): Завершенная запись
+        """
+
+    @abstractmethod
+    def append_comment(self, child_id: str, record: SleepRecord) -> None:
+        """
+        Сохраняет новый комментарий записи.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            record (SleepRecord): Запись с измененным комментарием
+        """
+
+    def append_records(self, child_id: str, records: Iterable[SleepRecord]) -> None:
+        """
+        Сохраняет пачку новых записей (например, при импорте истории).
+
+        По умолчанию каждая запись сохраняется событиями append_start
+        и append_end; хранилища переопределяют метод, чтобы записать
+        пачку за одну транзакцию.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            records (Iterable[SleepRecord]): Записи, уже добавленные в Child
+        """
+        for record in records:
+            self.append_start(child_id, record)
+            if record.end_time is not None:
+                self.append_end(child_id, record)
+
+    def get_rollups(
+        self,
+        child_id: str,
+        first_day: Optional[date] = None,
+        last_day: Optional[date] = None,
+    ) -> List[DayRollup]:
+        """
+        Возвращает дневные итоги сна (см. модуль rollups).
+
+        По умолчанию итоги считаются по записям загруженного ребенка;
+        хранилища, которые ведут итоги сами, переопределяют метод.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            first_day (Optional[date]): Первый день (по умолчанию без ограничения)
+            last_day (Optional[date]): Последний день (включительно)
+
+        Returns:
+            List[DayRollup]: Итоги дней, в которые заканчивался сон, по порядку дат
+
+        Raises:
+            ChildNotFoundError: Если ребенок не найден
+        """
+        child = self.load_child(child_id)
+        records: Iterable[SleepRecord] = child.sleep_records
+        if first_day is not None:
+            start, end = child.calendar.day_bounds(first_day)[0], datetime.max
+            if last_day is not None:
+                _, end = child.calendar.day_bounds(last_day)
+            records = child.iter_records_between(start, end)
+        rollups = compute_rollups(records, child.calendar)
+        return [
+            rollups[day]
+            for day in sorted(rollups)
+            if (first_day is None or day >= first_day) and (last_day is None or day <= last_day)
+        ]
+
+    def close(self) -> None:
+        """Освобождает ресурсы хранилища."""
+
+    def __enter__(self: StorageT) -> StorageT:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
@@ -0,0 +1,271 @@
+"""
+Модуль с двоичным файлом записей о сне фиксированной ширины.
+
+Файл предназначен для быстрой загрузки больших историй: он
+отображается в память (mmap), и записи читаются через numpy.frombuffer
+без разбора и без создания объектов. Статистику по дням можно считать
+прямо по отображенному буферу.
+
+Формат файла (все числа little-endian):
+- заголовок, 32 байта: сигнатура MAGIC (8 байт), количество записей (u8),
+  смещение блока комментариев от начала файла (u8), резерв (u8);
+- записи по 32 байта (RECORD_DTYPE), отсортированные по ребенку
+  и времени начала: child_id (u4), длина комментария в байтах (u4),
+  начало и окончание сна в микросекундах от эпохи (i8, окончание
+  равно NO_END для активного сна), смещение комментария в блоке
+  комментариев (i8, -1 если комментария нет);
+- блок комментариев: строки UTF-8 подряд, одинаковые строки хранятся один раз.
+"""
+
+import mmap
+import os
+import struct
+from datetime import date
+from pathlib import Path
+from types import TracebackType
+from typing import Dict, List, Mapping, Optional, Sequence, Type, Union
+
+import numpy as np
+
+from sleep_tracker.core.exceptions import ChildNotFoundError, StorageError
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.columns import (
+    NO_END,
+    RecordColumns,
+    daily_sleep_minutes,
+    from_epoch_us,
+)
+from sleep_tracker.core.models.sleep_record import SleepRecord
+
+MAGIC = b"SLEEPR01"
+HEADER = struct.Struct("<8sQQQ")
+RECORD_DTYPE = np.dtype(
+    [
+        ("child_id", "<u4"),
+        ("comment_length", "<u4"),
+        ("start", "<i8"),
+        ("end", "<i8"),
+        ("comment_offset", "<i8"),
+    ]
+)
+
+
+def write_record_file(
+    path: Union[str, Path], histories: Mapping[int, Sequence[SleepRecord]]
+) -> None:
+    """
+    Записывает истории сна нескольких детей в двоичный файл.
+
+    Файл сначала пишется во временный и затем атомарно подменяется.
+
+    Args:
+        path (Union[str, Path]): Путь к файлу
+        histories (Mapping[int, Sequence[SleepRecord]]): Записи по номеру ребенка
+    """
+    blocks = []
+    comments = bytearray()
+    comment_offsets: Dict[str, int] = {}
+    for child_id in sorted(histories):
+        records = sorted(histories[child_id], key=lambda record: record.start_time)
+        columns = RecordColumns.from_records(records)
+        block = np.zeros(len(records), dtype=RECORD_DTYPE)
+        block["child_id"] = child_id
+        block["start"] = columns.starts_us
+        block["end"] = columns.ends_us
+        block["comment_offset"] = -1
+        for index, record in enumerate(records):
+            if not record.comment:
+                continue
+            encoded = record.comment.encode("utf-8")
+            if record.comment not in comment_offsets:
+                comment_offsets[record.comment] = len(comments)
+                comments += encoded
+            block["comment_offset"][index] = comment_offsets[record.comment]
+            block["comment_length"][index] = len(encoded)
+        blocks.append(block)
+
+    table = np.concatenate(blocks) if blocks else np.zeros(0, dtype=RECORD_DTYPE)
+    comments_offset = HEADER.size + table.nbytes
+
+    path = Path(path)
+    temporary_path = path.with_name(path.name + ".tmp")
+    with temporary_path.open("wb") as output:
+        output.write(HEADER.pack(MAGIC, len(table), comments_offset, 0))
+        output.write(table.tobytes())
+        output.write(bytes(comments))
+        output.flush()
+        os.fsync(output.fileno())
+    os.replace(temporary_path, path)
+
+
+def write_children(path: Union[str, Path], children: Mapping[int, Child]) -> None:
+    """
+    Записывает в двоичный файл истории сна детей.
+
+    Args:
+        path (Union[str, Path]): Путь к файлу
+        children (Mapping[int, Child]): Дети по номеру
+    """
+    write_record_file(
+        path, {child_id: child.sleep_records for child_id, child in children.items()}
+    )
+
+
+class RecordFile:
+    """
+    Двоичный файл записей, отображенный в память.
+
+    Пока файл открыт, массивы, полученные из него (records, columns),
+    ссылаются на отображенную память без копирования. Перед close()
+    такие массивы нужно освободить.
+
+    Attributes:
+        path (Path): Путь к файлу
+        records (np.ndarray): Все записи файла (массив RECORD_DTYPE)
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """
+        Args:
+            path (Union[str, Path]): Путь к файлу
+
+        Raises:
+            StorageError: Если файл поврежден или имеет другой формат
+        """
+        self.path = Path(path)
+        with self.path.open("rb") as source:
+            size = os.fstat(source.fileno()).st_size
+            if size < HEADER.size:
+                raise StorageError(f"Файл {self.path} слишком мал для заголовка")
+            self._mmap = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+
+        opened = False
+        try:
+            magic, count, comments_offset, _ = HEADER.unpack_from(self._mmap)
+            if (
+                magic != MAGIC
+                or comments_offset != HEADER.size + count * RECORD_DTYPE.itemsize
+            ):
+                raise StorageError(f"Файл {self.path} не является файлом записей о сне")
+            if size < comments_offset:
+                raise StorageError(
+                    f"Файл {self.path} обрезан: {size} байт вместо не менее "
+                    f"{comments_offset} по заголовку"
+                )
+            self._comments_offset = comments_offset
+            self.records = np.frombuffer(
+                self._mmap, dtype=RECORD_DTYPE, count=count, offset=HEADER.size
+            )
+            opened = True
+        finally:
+            if not opened:
+                self._mmap.close()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def child_ids(self) -> List[int]:
+        """
+        Возвращает номера детей, записи которых есть в файле.
+
+        Returns:
+            List[int]: Номера в порядке возрастания
+        """
+        return [int(child_id) for child_id in np.unique(self.records["child_id"])]
+
+    def _slice(self, child_id: int) -> np.ndarray:
+        child_ids = self.records["child_id"]
+        low = int(np.searchsorted(child_ids, child_id, side="left"))
+        high = int(np.searchsorted(child_ids, child_id, side="right"))
+        if low == high:
+            raise ChildNotFoundError(str(child_id))
+        return self.records[low:high]
+
+    def columns(self, child_id: int) -> RecordColumns:
+        """
+        Возвращает записи ребенка в колоночном виде без копирования.
+
+        Args:
+            child_id (int): Номер ребенка
+
+        Returns:
+            RecordColumns: Колонки, ссылающиеся на отображенную память
+        """
+        block = self._slice(child_id)
+        return RecordColumns(starts_us=block["start"], ends_us=block["end"])
+
+    def daily_sleep_minutes(
+        self, child_id: int, first_day: date, last_day: date
+    ) -> np.ndarray:
+        """
+        Считает минуты сна по дням прямо по отображенному буферу.
+
+        Args:
+            child_id (int): Номер ребенка
+            first_day (date): Первый день диапазона
+            last_day (date): Последний день диапазона (включительно)
+
+        Returns:
+            np.ndarray: Минуты сна за каждый день
+        """
+        return daily_sleep_minutes(self.columns(child_id), first_day, last_day)
+
+    def to_records(self, child_id: int) -> List[SleepRecord]:
+        """
+        Создает объекты SleepRecord для записей ребенка.
+
+        Args:
+            child_id (int): Номер ребенка
+
+        Returns:
+            List[SleepRecord]: Записи в хронологическом порядке
+
+        Raises:
+            StorageError: Если комментарий записи выходит за конец файла
+        """
+        records = []
+        for _, length, start, end, offset in self._slice(child_id).tolist():
+            comment = ""
+            if offset >= 0:
+                position = self._comments_offset + offset
+                if position + length > len(self._mmap):
+                    raise StorageError(f"Файл {self.path} обрезан: нет комментария записи")
+                comment = self._mmap[position : position + length].decode("utf-8")
+            records.append(
+                SleepRecord(
+                    start_time=from_epoch_us(start),
+                    end_time=None if end == NO_END else from_epoch_us(end),
+                    comment=comment,
+                )
+            )
+        return records
+
+    def load_child(self, child_id: int, name: str, birth_date: date) -> Child:
+        """
+        Создает ребенка с записями из файла.
+
+        Args:
+            child_id (int): Номер ребенка
+            name (str): Имя ребенка
+            birth_date (date): Дата рождения
+
+        Returns:
+            Child: Ребенок с загруженными записями
+        """
+        return Child(name=name, birth_date=birth_date, sleep_records=self.to_records(child_id))
+
+    def close(self) -> None:
+        """Закрывает отображение файла."""
+        del self.records
+        self._mmap.close()
+
+    def __enter__(self) -> "RecordFile":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
@@ -0,0 +1,386 @@
+"""
+Модуль с хранилищем на основе журнала событий (append-only).
+
+Для каждого ребенка ведутся два файла:
+- <id>.journal - журнал событий, по одной строке JSON на событие
+  (начало сна, завершение сна, изменение комментария, готовая запись
+  из импорта);
+- <id>.snapshot.json - снимок состояния ребенка на момент события seq.
+
+Событие дописывается в конец журнала, поэтому запись стоит O(1)
+независимо от размера истории. Периодически журнал сворачивается
+в новый снимок, и при загрузке воспроизводится только его хвост.
+
+Устойчивость к сбоям:
+- строка журнала считается записанной, только если заканчивается
+  переводом строки; оборванный хвост отбрасывается при открытии;
+- снимок пишется во временный файл и атомарно подменяется (os.replace);
+- события с seq не больше seq снимка при загрузке пропускаются, поэтому
+  сбой между записью снимка и очисткой журнала не дублирует записи.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from sleep_tracker.core.exceptions import ChildNotFoundError, StorageError
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+
+from .base import SleepStorage
+from .serialization import child_from_dict, child_to_dict
+
+JOURNAL_SUFFIX = ".journal"
+SNAPSHOT_SUFFIX = ".snapshot.json"
+
+_CHILD_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+@dataclass
+class _Journal:
+    """
+    Открытый журнал одного ребенка.
+
+    Attributes:
+        file (BinaryIO): Файл журнала, открытый на дозапись
+        seq (int): Номер последнего записанного события
+        snapshot_seq (int): Номер события, на котором сделан снимок
+        last_sync (float): Время последнего fsync по часам хранилища
+        pending (int): Количество событий, записанных без fsync
+    """
+
+    file: BinaryIO
+    seq: int
+    snapshot_seq: int
+    last_sync: float
+    pending: int = 0
+
+
+def read_journal(path: Path) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Читает события журнала до первой поврежденной строки.
+
+    Args:
+        path (Path): Путь к файлу журнала
+
+    Returns:
+        Tuple[List[Dict[str, Any]], int]: (события, длина корректной части в байтах)
+    """
+    if not path.exists():
+        return [], 0
+
+    events = []
+    valid_length = 0
+    with path.open("rb") as journal:
+        for line in journal:
+            if not line.endswith(b"\n"):
+                break  # Оборванная запись: сбой во время write
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                break
+            valid_length += len(line)
+    return events, valid_length
+
+
+class JournalStorage(SleepStorage):
+    """
+    Хранилище детей в виде журналов событий и периодических снимков.
+
+    fsync выполняется группами: не чаще одного раза в commit_interval
+    секунд. Если после события fsync был отложен, фоновый таймер
+    выполнит его не позже чем через commit_interval секунд. При
+    commit_interval=0 каждое событие сразу сбрасывается на диск.
+
+    Attributes:
+        directory (Path): Каталог с файлами хранилища
+        commit_interval (float): Интервал групповой фиксации в секундах
+        snapshot_every (int): Через сколько событий журнал сворачивается в снимок
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        commit_interval: float = 0.0,
+        snapshot_every: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            directory (Union[str, Path]): Каталог с файлами хранилища
+            commit_interval (float): Интервал групповой фиксации в секундах
+            snapshot_every (int): Через сколько событий делать снимок
+            clock (Callable[[], float]): Источник времени для групповой фиксации
+        """
+        if commit_interval < 0:
+            raise ValueError("Интервал фиксации не может быть отрицательным")
+        if snapshot_every < 1:
+            raise ValueError("Интервал снимков должен быть положительным")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.commit_interval = commit_interval
+        self.snapshot_every = snapshot_every
+        self._clock = clock
+        self._journals: Dict[str, _Journal] = {}
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+
+    def child_ids(self) -> List[str]:
+        return sorted(
+            path.name[: -len(SNAPSHOT_SUFFIX)]
+            for path in self.directory.glob(f"*{SNAPSHOT_SUFFIX}")
+        )
+
+    def save_child(self, child_id: str, child: Child) -> None:
+        with self._lock:
+            journal = self._journal(child_id, create=True)
+            self._sync(journal)
+            self._write_snapshot(child_id, child, journal.seq)
+            self._truncate(child_id, journal)
+
+    def load_child(self, child_id: str) -> Child:
+        with self._lock:
+            snapshot_path = self._path(child_id, SNAPSHOT_SUFFIX)
+            if not snapshot_path.exists():
+                raise ChildNotFoundError(child_id)
+
+            journal = self._journals.get(child_id)
+            if journal is not None:
+                journal.file.flush()
+
+            snapshot = json.loads(snapshot_path.read_text(encoding="utf-8"))
+            child = child_from_dict(snapshot)
+            events, _ = read_journal(self._path(child_id, JOURNAL_SUFFIX))
+            # Подряд идущие готовые записи добавляются одним add_records
+            imported: List[SleepRecord] = []
+            for event in events:
+                if event["seq"] <= snapshot["seq"]:
+                    continue
+                if event["op"] == "record":
+                    imported.append(_event_record(event))
+                    continue
+                if imported:
+                    child.add_records(imported)
+                    imported = []
+                self._apply(child, event)
+            if imported:
+                child.add_records(imported)
+            return child
+
+    def append_start(self, child_id: str, record: SleepRecord) -> None:
+        self._append(child_id, [_start_event(record)])
+
+    def append_end(self, child_id: str, record: SleepRecord) -> None:
+        self._append(child_id, [_end_event(record)])
+
+    def append_comment(self, child_id: str, record: SleepRecord) -> None:
+        self._append(
+            child_id,
+            [{"op": "comment", "start": record.start_time.isoformat(), "comment": record.comment}],
+        )
+
+    def append_records(self, child_id: str, records: Iterable[SleepRecord]) -> None:
+        # Каждая запись - одно событие "record": при загрузке оно добавляется
+        # через add_records, а не start_sleep и end_sleep, поэтому старые
+        # записи не конфликтуют с уже идущим сном. Вся пачка пишется одним
+        # вызовом: один fsync и не больше одного снимка
+        events = [_record_event(record) for record in records]
+        if events:
+            self._append(child_id, events)
+
+    def compact(self, child_id: str) -> None:
+        """
+        Сворачивает журнал ребенка в новый снимок.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+        """
+        with self._lock:
+            journal = self._journal(child_id)
+            self._sync(journal)
+            child = self.load_child(child_id)
+            self._write_snapshot(child_id, child, journal.seq)
+            self._truncate(child_id, journal)
+
+    def flush(self) -> None:
+        """Выполняет fsync всех журналов с несохраненными событиями."""
+        with self._lock:
+            self._timer = None
+            for journal in self._journals.values():
+                if journal.pending:
+                    self._sync(journal)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self.flush()
+            for journal in self._journals.values():
+                journal.file.close()
+            self._journals.clear()
+
+    def _path(self, child_id: str, suffix: str) -> Path:
+        if not _CHILD_ID_PATTERN.match(child_id):
+            raise ValueError(
+                f"Некорректный идентификатор ребенка '{child_id}': "
+                "допускаются латинские буквы, цифры, '_' и '-'"
+            )
+        return self.directory / f"{child_id}{suffix}"
+
+    def _journal(self, child_id: str, create: bool = False) -> _Journal:
+        """
+        Возвращает открытый журнал ребенка, открывая его при необходимости.
+
+        При открытии оборванный хвост журнала обрезается, а номер
+        последнего события восстанавливается из снимка и журнала.
+        """
+        journal = self._journals.get(child_id)
+        if journal is not None:
+            return journal
+
+        snapshot_path = self._path(child_id, SNAPSHOT_SUFFIX)
+        journal_path = self._path(child_id, JOURNAL_SUFFIX)
+        if snapshot_path.exists():
+            snapshot_seq = json.loads(snapshot_path.read_text(encoding="utf-8"))["seq"]
+        elif create:
+            snapshot_seq = 0
+        else:
+            raise ChildNotFoundError(child_id)
+
+        events, valid_length = read_journal(journal_path)
+        if journal_path.exists() and journal_path.stat().st_size > valid_length:
+            with journal_path.open("r+b") as damaged:
+                damaged.truncate(valid_length)
+                os.fsync(damaged.fileno())
+
+        seq = max([snapshot_seq] + [event["seq"] for event in events])
+        journal = _Journal(
+            file=journal_path.open("ab"),
+            seq=seq,
+            snapshot_seq=snapshot_seq,
+            last_sync=self._clock(),
+        )
+        self._journals[child_id] = journal
+        return journal
+
+    def _append(self, child_id: str, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            journal = self._journal(child_id)
+            lines = []
+            for event in events:
+                journal.seq += 1
+                lines.append(json.dumps({"seq": journal.seq, **event}, ensure_ascii=False) + "\n")
+            journal.file.write("".join(lines).encode("utf-8"))
+            journal.pending += len(events)
+
+            if self._clock() - journal.last_sync >= self.commit_interval:
+                self._sync(journal)
+            elif self._timer is None:
+                self._timer = threading.Timer(self.commit_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+            if journal.seq - journal.snapshot_seq >= self.snapshot_every:
+                self.compact(child_id)
+
+    def _sync(self, journal: _Journal) -> None:
+        journal.file.flush()
+        os.fsync(journal.file.fileno())
+        journal.last_sync = self._clock()
+        journal.pending = 0
+
+    def _write_snapshot(self, child_id: str, child: Child, seq: int) -> None:
+        snapshot_path = self._path(child_id, SNAPSHOT_SUFFIX)
+        temporary_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+        data = {"seq": seq, **child_to_dict(child)}
+        with temporary_path.open("w", encoding="utf-8") as snapshot:
+            json.dump(data, snapshot, ensure_ascii=False)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary_path, snapshot_path)
+        self._sync_directory()
+
+    def _truncate(self, child_id: str, journal: _Journal) -> None:
+        journal.file.close()
+        journal.file = self._path(child_id, JOURNAL_SUFFIX).open("wb")
+        os.fsync(journal.file.fileno())
+        journal.file.close()
+        journal.file = self._path(child_id, JOURNAL_SUFFIX).open("ab")
+        journal.snapshot_seq = journal.seq
+        journal.pending = 0
+
+    def _sync_directory(self) -> None:
+        # Фиксируем переименование файла; на Windows каталоги не открываются
+        if os.name == "posix":
+            descriptor = os.open(self.directory, os.O_RDONLY)
+            try:
+                os.fsync(descriptor)
+            finally:
+                os.close(descriptor)
+
+    @staticmethod
+    def _apply(child: Child, event: Dict[str, Any]) -> None:
+        """
+        Применяет событие журнала к ребенку.
+
+        Raises:
+            StorageError: Если событие не согласуется с состоянием ребенка
+        """
+        start_time = datetime.fromisoformat(event["start"])
+        operation = event["op"]
+        if operation == "start":
+            child.start_sleep(start_time, event["comment"])
+            return
+
+        if operation == "end":
+            record = child.get_active_sleep()
+            if record is None or record.start_time != start_time:
+                raise StorageError(f"Событие {event['seq']}: нет активного сна с началом {start_time}")
+            child.end_sleep(datetime.fromisoformat(event["end"]))
+        elif operation == "comment":
+            record = child.find_record(start_time)
+            if record is None:
+                raise StorageError(f"Событие {event['seq']}: нет записи с началом {start_time}")
+        else:
+            raise StorageError(f"Событие {event['seq']}: неизвестная операция '{operation}'")
+        record.comment = event["comment"]
+
+
+def _record_event(record: SleepRecord) -> Dict[str, Any]:
+    return {
+        "op": "record",
+        "start": record.start_time.isoformat(),
+        "end": None if record.end_time is None else record.end_time.isoformat(),
+        "comment": record.comment,
+    }
+
+
+def _event_record(event: Dict[str, Any]) -> SleepRecord:
+    end = event["end"]
+    return SleepRecord(
+        start_time=datetime.fromisoformat(event["start"]),
+        end_time=None if end is None else datetime.fromisoformat(end),
+        comment=event["comment"],
+    )
+
+
+def _start_event(record: SleepRecord) -> Dict[str, Any]:
+    return {"op": "start", "start": record.start_time.isoformat(), "comment": record.comment}
+
+
+def _end_event(record: SleepRecord) -> Dict[str, Any]:
+    if record.end_time is None:
+        raise ValueError("Запись о сне еще не завершена")
+    return {
+        "op": "end",
+        "start": record.start_time.isoformat(),
+        "end": record.end_time.isoformat(),
+        "comment": record.comment,
+    }
@@ -0,0 +1,224 @@
+"""
+Модуль с дневными итогами сна (rollups), которые хранятся рядом с записями.
+
+Итог дня DayRollup содержит минуты сна (всего, дневного и ночного),
+количество дневных снов, самый длинный сон и время первого засыпания
+и последнего пробуждения. Правила совпадают с Child.get_sleep_stats
+и SleepAccumulator: сон относится ко дню, в который закончился, а ночной
+сон, начавшийся накануне, учитывается с полуночи. Дни и дневной сон
+считаются по календарю ребенка (DayCalendar) в его часовом поясе.
+
+Хранилище, которое ведет итоги (SQLiteStorage), обновляет их в той же
+транзакции, в которой закрывается запись, поэтому отчету за месяц или
+год достаточно прочитать 30 или 365 строк вместо всех записей.
+Для остальных хранилищ итоги считаются по записям при запросе.
+
+Запуск для существующей базы SQLite:
+    python -m sleep_tracker.services.storage.rollups backfill sleep.db
+    python -m sleep_tracker.services.storage.rollups verify sleep.db
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+from sleep_tracker.core.models.days import DayCalendar
+from sleep_tracker.core.models.sleep_record import SleepRecord
+
+if TYPE_CHECKING:
+    from .base import SleepStorage
+
+
+@dataclass
+class DayRollup:
+    """
+    Итоги сна ребенка за один день.
+
+    Attributes:
+        day (date): Дата
+        sleep_minutes (int): Всего минут сна
+        daytime_minutes (int): Минут дневного сна
+        night_minutes (int): Минут ночного сна
+        naps (int): Количество дневных снов
+        longest_minutes (int): Длительность самого длинного сна
+                               (целиком, без обрезки по полуночи)
+        first_start (Optional[datetime]): Начало первого сна дня
+        last_end (Optional[datetime]): Окончание последнего сна дня
+    """
+
+    day: date
+    sleep_minutes: int = 0
+    daytime_minutes: int = 0
+    night_minutes: int = 0
+    naps: int = 0
+    longest_minutes: int = 0
+    first_start: Optional[datetime] = None
+    last_end: Optional[datetime] = None
+
+    def awake_minutes(self, calendar: Optional[DayCalendar] = None) -> int:
+        """
+        Минуты бодрствования (длина дня минус время сна), как в get_sleep_stats.
+
+        Args:
+            calendar (Optional[DayCalendar]): Календарь ребенка
+                                              (по умолчанию наивные сутки)
+
+        Returns:
+            int: Минуты бодрствования
+        """
+        return (calendar or DayCalendar()).day_minutes(self.day) - self.sleep_minutes
+
+    @classmethod
+    def from_record(
+        cls, record: SleepRecord, calendar: Optional[DayCalendar] = None
+    ) -> "DayRollup":
+        """
+        Итоги дня окончания записи, состоящие из одной этой записи.
+
+        Args:
+            record (SleepRecord): Завершенная запись
+            calendar (Optional[DayCalendar]): Календарь ребенка
+                                              (по умолчанию наивные сутки)
+
+        Returns:
+            DayRollup: Итоги дня
+        """
+        if record.end_time is None:
+            raise ValueError("Запись о сне еще не завершена")
+        calendar = calendar or DayCalendar()
+        rollup = cls(day=calendar.day_of(record.end_time))
+        rollup.add(record, calendar)
+        return rollup
+
+    def add(self, record: SleepRecord, calendar: Optional[DayCalendar] = None) -> None:
+        """
+        Учитывает завершенный сон, закончившийся в этот день.
+
+        Args:
+            record (SleepRecord): Завершенная запись
+            calendar (Optional[DayCalendar]): Календарь ребенка
+                                              (по умолчанию наивные сутки)
+        """
+        calendar = calendar or DayCalendar()
+        end_time = record.end_time
+        assert end_time is not None and calendar.day_of(end_time) == self.day
+        day_start, _ = calendar.day_bounds(self.day)
+        start = max(record.start_time, day_start)
+        minutes = int((end_time - start).total_seconds() / 60)
+
+        self.sleep_minutes += minutes
+        if calendar.is_daytime(record.start_time):
+            self.daytime_minutes += minutes
+            self.naps += 1
+        else:
+            self.night_minutes += minutes
+        longest = int((end_time - record.start_time).total_seconds() / 60)
+        self.longest_minutes = max(self.longest_minutes, longest)
+        if self.first_start is None or record.start_time < self.first_start:
+            self.first_start = record.start_time
+        if self.last_end is None or end_time > self.last_end:
+            self.last_end = end_time
+
+
+def compute_rollups(
+    records: Iterable[SleepRecord], calendar: Optional[DayCalendar] = None
+) -> Dict[date, DayRollup]:
+    """
+    Считает итоги по дням по записям о сне.
+
+    Args:
+        records (Iterable[SleepRecord]): Записи (активные пропускаются)
+        calendar (Optional[DayCalendar]): Календарь ребенка
+                                          (по умолчанию наивные сутки)
+
+    Returns:
+        Dict[date, DayRollup]: Итоги только за дни, в которые заканчивался сон
+    """
+    calendar = calendar or DayCalendar()
+    rollups: Dict[date, DayRollup] = {}
+    for record in records:
+        if record.end_time is None:
+            continue
+        day = calendar.day_of(record.end_time)
+        rollup = rollups.get(day)
+        if rollup is None:
+            rollup = rollups[day] = DayRollup(day)
+        rollup.add(record, calendar)
+    return rollups
+
+
+@dataclass
+class RollupMismatch:
+    """
+    Расхождение сохраненных итогов с пересчетом по записям.
+
+    Attributes:
+        child_id (str): Идентификатор ребенка
+        day (date): Дата
+        stored (Optional[DayRollup]): Сохраненные итоги (None - строки нет)
+        expected (Optional[DayRollup]): Итоги по записям (None - сна не было)
+    """
+
+    child_id: str
+    day: date
+    stored: Optional[DayRollup]
+    expected: Optional[DayRollup]
+
+
+def verify_rollups(
+    storage: "SleepStorage", child_ids: Optional[Iterable[str]] = None
+) -> List[RollupMismatch]:
+    """
+    Сравнивает итоги хранилища с пересчетом по записям детей.
+
+    Args:
+        storage (SleepStorage): Хранилище
+        child_ids (Optional[Iterable[str]]): Проверяемые дети (по умолчанию все)
+
+    Returns:
+        List[RollupMismatch]: Расхождения (пустой список - итоги верны)
+    """
+    mismatches: List[RollupMismatch] = []
+    for child_id in storage.child_ids() if child_ids is None else child_ids:
+        child = storage.load_child(child_id)
+        expected = compute_rollups(child.sleep_records, child.calendar)
+        stored = {rollup.day: rollup for rollup in storage.get_rollups(child_id)}
+        for day in sorted(expected.keys() | stored.keys()):
+            if stored.get(day) != expected.get(day):
+                mismatches.append(
+                    RollupMismatch(child_id, day, stored.get(day), expected.get(day))
+                )
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .sqlite import SQLiteStorage
+
+    parser = argparse.ArgumentParser(description="Дневные итоги сна в базе SQLite")
+    parser.add_argument("command", choices=["backfill", "verify"])
+    parser.add_argument("database", help="Путь к базе SQLite")
+    parser.add_argument("--child", action="append", help="Только этот ребенок")
+    args = parser.parse_args(argv)
+
+    with SQLiteStorage(args.database) as storage:
+        if args.command == "backfill":
+            days = storage.rebuild_rollups(args.child)
+            print(f"Пересчитано дней: {days}")
+            return 0
+
+        mismatches = verify_rollups(storage, args.child)
+        for mismatch in mismatches:
+            print(
+                f"{mismatch.child_id} {mismatch.day}: "
+                f"сохранено {mismatch.stored}, ожидалось {mismatch.expected}"
+            )
+        if mismatches:
+            return 1
+        print("Итоги совпадают с записями")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Модуль с преобразованием моделей в словари JSON и обратно.
+
+Время хранится в формате ISO 8601 (datetime.isoformat), чтобы файлы
+оставались читаемыми человеком.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+
+
+def record_to_dict(record: SleepRecord) -> Dict[str, Any]:
+    """
+    Преобразует запись о сне в словарь.
+
+    Args:
+        record (SleepRecord): Запись о сне
+
+    Returns:
+        Dict[str, Any]: Словарь с ключами start, end, comment
+    """
+    return {
+        "start": record.start_time.isoformat(),
+        "end": None if record.end_time is None else record.end_time.isoformat(),
+        "comment": record.comment,
+    }
+
+
+def record_from_dict(data: Dict[str, Any]) -> SleepRecord:
+    """
+    Создает запись о сне из словаря record_to_dict.
+
+    Args:
+        data (Dict[str, Any]): Словарь записи
+
+    Returns:
+        SleepRecord: Запись о сне
+    """
+    return SleepRecord(
+        start_time=datetime.fromisoformat(data["start"]),
+        end_time=None if data["end"] is None else datetime.fromisoformat(data["end"]),
+        comment=data.get("comment", ""),
+    )
+
+
+def child_to_dict(child: Child) -> Dict[str, Any]:
+    """
+    Преобразует ребенка со всеми записями в словарь.
+
+    Args:
+        child (Child): Ребенок
+
+    Returns:
+        Dict[str, Any]: Словарь с ключами name, birth_date, records
+                        и timezone (если часовой пояс задан)
+    """
+    data = {
+        "name": child.name,
+        "birth_date": child.birth_date.isoformat(),
+        "records": [record_to_dict(record) for record in child.sleep_records],
+    }
+    if child.timezone is not None:
+        data["timezone"] = child.timezone
+    return data
+
+
+def child_from_dict(data: Dict[str, Any]) -> Child:
+    """
+    Создает ребенка из словаря child_to_dict.
+
+    Args:
+        data (Dict[str, Any]): Словарь ребенка
+
+    Returns:
+        Child: Ребенок с восстановленными записями
+    """
+    return Child(
+        name=data["name"],
+        birth_date=date.fromisoformat(data["birth_date"]),
+        sleep_records=[record_from_dict(record) for record in data["records"]],
+        timezone=data.get("timezone"),
+    )
@@ -0,0 +1,595 @@
+"""
+Модуль с хранилищем на основе SQLite (стандартный модуль sqlite3).
+
+Записи о сне лежат в таблице sleep_records с индексами по
+(child_id, start_time) и (child_id, end_time), поэтому статистика
+за диапазон дат считается агрегатами SQL по нужному окну, без загрузки
+всех записей в объекты Python.
+
+Рядом ведется таблица day_rollups с дневными итогами (модуль rollups).
+Итоги обновляются в той же транзакции, что и закрытие записи, а для
+баз, созданных до появления таблицы, пересчитываются rebuild_rollups.
+
+База работает в режиме WAL: читатели не блокируют писателя и друг друга.
+Соединения берутся из небольшого пула, чтобы параллельные обработчики
+бота не открывали новое соединение на каждый запрос.
+"""
+
+import queue
+import sqlite3
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from sleep_tracker.core.exceptions import ChildNotFoundError, StorageError
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.days import DayCalendar
+from sleep_tracker.core.models.epoch import (
+    DAY_US,
+    MINUTE_US,
+    from_epoch_us,
+    to_epoch_us,
+)
+from sleep_tracker.core.models.sleep_record import SleepRecord
+
+from .base import SleepStorage
+from .rollups import DayRollup, compute_rollups
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS children (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    birth_date TEXT NOT NULL,
+    timezone TEXT                 -- NULL: наивное местное время
+);
+CREATE TABLE IF NOT EXISTS sleep_records (
+    id INTEGER PRIMARY KEY,
+    child_id TEXT NOT NULL REFERENCES children (id) ON DELETE CASCADE,
+    start_time INTEGER NOT NULL,  -- микросекунды от эпохи
+    end_time INTEGER,             -- NULL для активного сна
+    comment TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS ix_sleep_records_child_start
+    ON sleep_records (child_id, start_time);
+CREATE INDEX IF NOT EXISTS ix_sleep_records_child_end
+    ON sleep_records (child_id, end_time);
+CREATE TABLE IF NOT EXISTS day_rollups (
+    child_id TEXT NOT NULL REFERENCES children (id) ON DELETE CASCADE,
+    day TEXT NOT NULL,            -- дата ISO
+    sleep_minutes INTEGER NOT NULL,
+    daytime_minutes INTEGER NOT NULL,
+    night_minutes INTEGER NOT NULL,
+    naps INTEGER NOT NULL,
+    longest_minutes INTEGER NOT NULL,
+    first_start INTEGER NOT NULL, -- микросекунды от эпохи
+    last_end INTEGER NOT NULL,
+    PRIMARY KEY (child_id, day)
+) WITHOUT ROWID;
+"""
+
+# Добавляет к итогам дня итоги новой записи
+_ADD_ROLLUP_SQL = """
+INSERT INTO day_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (child_id, day) DO UPDATE SET
+    sleep_minutes = sleep_minutes + excluded.sleep_minutes,
+    daytime_minutes = daytime_minutes + excluded.daytime_minutes,
+    night_minutes = night_minutes + excluded.night_minutes,
+    naps = naps + excluded.naps,
+    longest_minutes = MAX(longest_minutes, excluded.longest_minutes),
+    first_start = MIN(first_start, excluded.first_start),
+    last_end = MAX(last_end, excluded.last_end)
+"""
+
+# Минуты сна по дням: запись относится к дню окончания, а начало
+# ночного сна обрезается по полуночи этого дня (как в Child.get_sleep_stats)
+_DAILY_TOTALS_SQL = """
+SELECT day, SUM((end_time - MAX(start_time, :range_start + day * :day_us)) / :minute_us)
+FROM (
+    SELECT (end_time - :range_start) / :day_us AS day, start_time, end_time
+    FROM sleep_records
+    WHERE child_id = :child_id AND end_time >= :range_start AND end_time < :range_end
+)
+GROUP BY day
+"""
+
+
+class ConnectionPool:
+    """
+    Пул соединений SQLite, которые можно использовать из разных потоков.
+
+    Attributes:
+        path (str): Путь к файлу базы
+        size (int): Количество соединений в пуле
+    """
+
+    def __init__(self, path: str, size: int = 4, timeout: float = 30.0) -> None:
+        """
+        Args:
+            path (str): Путь к файлу базы
+            size (int): Количество соединений
+            timeout (float): Время ожидания блокировки базы в секундах
+        """
+        if size < 1:
+            raise ValueError("Размер пула должен быть положительным")
+        self.path = path
+        self.size = size
+        self._connections: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(size):
+            connection = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+            connection.execute("PRAGMA foreign_keys = ON")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._connections.put(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Выдает свободное соединение и возвращает его в пул после использования.
+
+        Yields:
+            sqlite3.Connection: Соединение с базой
+        """
+        connection = self._connections.get()
+        try:
+            yield connection
+        finally:
+            self._connections.put(connection)
+
+    def close(self) -> None:
+        """Закрывает все соединения пула."""
+        for _ in range(self.size):
+            self._connections.get().close()
+
+
+class SQLiteStorage(SleepStorage):
+    """
+    Хранилище детей и записей о сне в базе SQLite.
+
+    Attributes:
+        path (Path): Путь к файлу базы
+    """
+
+    def __init__(
+        self, path: Union[str, Path], pool_size: int = 4, timeout: float = 30.0
+    ) -> None:
+        """
+        Args:
+            path (Union[str, Path]): Путь к файлу базы (создается при необходимости)
+            pool_size (int): Количество соединений в пуле
+            timeout (float): Время ожидания блокировки базы в секундах
+        """
+        self.path = Path(path)
+        # Режим WAL сохраняется в самом файле базы, поэтому включается один раз
+        with sqlite3.connect(str(self.path), timeout=timeout) as connection:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+            # Базы, созданные до появления часовых поясов
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(children)")}
+            if "timezone" not in columns:
+                connection.execute("ALTER TABLE children ADD COLUMN timezone TEXT")
+        connection.close()
+        self._pool = ConnectionPool(str(self.path), pool_size, timeout)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Выдает соединение внутри транзакции: commit при успехе, rollback при ошибке.
+        """
+        with self._pool.connection() as connection:
+            with connection:
+                yield connection
+
+    def child_ids(self) -> List[str]:
+        with self._pool.connection() as connection:
+            rows = connection.execute("SELECT id FROM children ORDER BY id").fetchall()
+        return [child_id for (child_id,) in rows]
+
+    def save_child(self, child_id: str, child: Child) -> None:
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO children (id, name, birth_date, timezone) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET name = excluded.name, "
+                "birth_date = excluded.birth_date, timezone = excluded.timezone",
+                (child_id, child.name, child.birth_date.isoformat(), child.timezone),
+            )
+            connection.execute("DELETE FROM sleep_records WHERE child_id = ?", (child_id,))
+            connection.executemany(
+                "INSERT INTO sleep_records (child_id, start_time, end_time, comment) "
+                "VALUES (?, ?, ?, ?)",
+                (_record_row(child_id, record) for record in child.sleep_records),
+            )
+            connection.execute("DELETE FROM day_rollups WHERE child_id = ?", (child_id,))
+            connection.executemany(
+                _ADD_ROLLUP_SQL,
+                (
+                    _rollup_row(child_id, rollup)
+                    for rollup in compute_rollups(child.sleep_records, child.calendar).values()
+                ),
+            )
+
+    def load_child(self, child_id: str) -> Child:
+        with self._pool.connection() as connection:
+            row = connection.execute(
+                "SELECT name, birth_date, timezone FROM children WHERE id = ?", (child_id,)
+            ).fetchone()
+            if row is None:
+                raise ChildNotFoundError(child_id)
+            records = connection.execute(
+                "SELECT start_time, end_time, comment FROM sleep_records "
+                "WHERE child_id = ? ORDER BY start_time, id",
+                (child_id,),
+            ).fetchall()
+
+        name, birth_date, timezone = row
+        return Child(
+            name=name,
+            birth_date=date.fromisoformat(birth_date),
+            sleep_records=[_row_record(*record) for record in records],
+            timezone=timezone,
+        )
+
+    def load_recent(self, child_id: str, days: int = 7) -> Child:
+        with self._pool.connection() as connection:
+            row = connection.execute(
+                "SELECT name, birth_date, timezone FROM children WHERE id = ?", (child_id,)
+            ).fetchone()
+            if row is None:
+                raise ChildNotFoundError(child_id)
+            (latest_end,) = connection.execute(
+                "SELECT MAX(end_time) FROM sleep_records WHERE child_id = ?", (child_id,)
+            ).fetchone()
+            # Все запросы идут по индексу (child_id, end_time); активный сон
+            # выбирается отдельно, иначе SQLite просматривает все записи
+            # ребенка. Порядок восстанавливает Child при создании
+            boundary = 0 if latest_end is None else latest_end - days * DAY_US
+            records = connection.execute(
+                "SELECT start_time, end_time, comment FROM sleep_records "
+                "WHERE child_id = ? AND end_time >= ? ORDER BY start_time, id",
+                (child_id, boundary),
+            ).fetchall()
+            records += connection.execute(
+                "SELECT start_time, end_time, comment FROM sleep_records "
+                "WHERE child_id = ? AND end_time IS NULL",
+                (child_id,),
+            ).fetchall()
+
+        name, birth_date, timezone = row
+        recent = [_row_record(*record) for record in records]
+        if latest_end is None:
+            return Child(
+                name=name,
+                birth_date=date.fromisoformat(birth_date),
+                sleep_records=recent,
+                timezone=timezone,
+            )
+
+        def load_history(since: Optional[datetime], before: datetime) -> List[SleepRecord]:
+            return self._load_history(child_id, since, before)
+
+        return Child.lazy(
+            name=name,
+            birth_date=date.fromisoformat(birth_date),
+            recent_records=recent,
+            loaded_since=from_epoch_us(boundary),
+            loader=load_history,
+            timezone=timezone,
+        )
+
+    def _load_history(
+        self, child_id: str, since: Optional[datetime], before: datetime
+    ) -> List[SleepRecord]:
+        """
+        Загружает завершенные записи, закончившиеся в [since, before).
+        """
+        with self._pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT start_time, end_time, comment FROM sleep_records "
+                "WHERE child_id = ? AND end_time >= ? AND end_time < ? "
+                "ORDER BY start_time, id",
+                (child_id, to_epoch_us(since or datetime.min), to_epoch_us(before)),
+            ).fetchall()
+        return [_row_record(*row) for row in rows]
+
+    def append_start(self, child_id: str, record: SleepRecord) -> None:
+        try:
+            with self._transaction() as connection:
+                connection.execute(
+                    "INSERT INTO sleep_records (child_id, start_time, end_time, comment) "
+                    "VALUES (?, ?, ?, ?)",
+                    _record_row(child_id, record),
+                )
+                _add_rollups(connection, child_id, [record])
+        except sqlite3.IntegrityError as error:
+            raise ChildNotFoundError(child_id) from error
+
+    def append_records(self, child_id: str, records: Iterable[SleepRecord]) -> None:
+        records = list(records)
+        try:
+            with self._transaction() as connection:
+                connection.executemany(
+                    "INSERT INTO sleep_records (child_id, start_time, end_time, comment) "
+                    "VALUES (?, ?, ?, ?)",
+                    (_record_row(child_id, record) for record in records),
+                )
+                _add_rollups(connection, child_id, records)
+        except sqlite3.IntegrityError as error:
+            raise ChildNotFoundError(child_id) from error
+
+    def append_end(self, child_id: str, record: SleepRecord) -> None:
+        if record.end_time is None:
+            raise ValueError("Запись о сне еще не завершена")
+        self._update(
+            "UPDATE sleep_records SET end_time = ?, comment = ? "
+            "WHERE child_id = ? AND start_time = ? AND end_time IS NULL",
+            (to_epoch_us(record.end_time), record.comment),
+            child_id,
+            record,
+            closes=True,
+        )
+
+    def append_comment(self, child_id: str, record: SleepRecord) -> None:
+        self._update(
+            "UPDATE sleep_records SET comment = ? WHERE child_id = ? AND start_time = ?",
+            (record.comment,),
+            child_id,
+            record,
+        )
+
+    def _update(
+        self,
+        sql: str,
+        values: Tuple[object, ...],
+        child_id: str,
+        record: SleepRecord,
+        closes: bool = False,
+    ) -> None:
+        """
+        Изменяет запись; если closes, в той же транзакции обновляет итоги дня.
+        """
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                sql, (*values, child_id, to_epoch_us(record.start_time))
+            )
+            if cursor.rowcount == 0:
+                raise StorageError(
+                    f"У ребенка '{child_id}' нет подходящей записи с началом {record.start_time}"
+                )
+            if closes:
+                _add_rollups(connection, child_id, [record])
+
+    def get_rollups(
+        self,
+        child_id: str,
+        first_day: Optional[date] = None,
+        last_day: Optional[date] = None,
+    ) -> List[DayRollup]:
+        """
+        Читает сохраненные дневные итоги: по строке на день, без записей.
+        """
+        with self._pool.connection() as connection:
+            rows = connection.execute(
+                "SELECT day, sleep_minutes, daytime_minutes, night_minutes, naps, "
+                "longest_minutes, first_start, last_end FROM day_rollups "
+                "WHERE child_id = ? AND day >= ? AND day <= ? ORDER BY day",
+                (
+                    child_id,
+                    (first_day or date.min).isoformat(),
+                    (last_day or date.max).isoformat(),
+                ),
+            ).fetchall()
+        return [
+            DayRollup(
+                day=date.fromisoformat(day),
+                sleep_minutes=sleep_minutes,
+                daytime_minutes=daytime_minutes,
+                night_minutes=night_minutes,
+                naps=naps,
+                longest_minutes=longest_minutes,
+                first_start=from_epoch_us(first_start),
+                last_end=from_epoch_us(last_end),
+            )
+            for (
+                day,
+                sleep_minutes,
+                daytime_minutes,
+                night_minutes,
+                naps,
+                longest_minutes,
+                first_start,
+                last_end,
+            ) in rows
+        ]
+
+    def rebuild_rollups(self, child_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Пересчитывает дневные итоги по записям (для существующих баз).
+
+        Записи каждого ребенка читаются курсором в порядке окончания,
+        поэтому в памяти одновременно находятся итоги только одного дня.
+
+        Args:
+            child_ids (Optional[Iterable[str]]): Дети (по умолчанию все)
+
+        Returns:
+            int: Количество записанных дней
+        """
+        days = 0
+        for child_id in self.child_ids() if child_ids is None else child_ids:
+            with self._transaction() as connection:
+                connection.execute("DELETE FROM day_rollups WHERE child_id = ?", (child_id,))
+                rows = connection.execute(
+                    "SELECT start_time, end_time, comment FROM sleep_records "
+                    "WHERE child_id = ? AND end_time IS NOT NULL ORDER BY end_time",
+                    (child_id,),
+                )
+                calendar = _calendar(connection, child_id)
+                rollup: Optional[DayRollup] = None
+                for row in rows:
+                    record = _row_record(*row)
+                    assert record.end_time is not None
+                    day = calendar.day_of(record.end_time)
+                    if rollup is None or rollup.day != day:
+                        if rollup is not None:
+                            connection.execute(_ADD_ROLLUP_SQL, _rollup_row(child_id, rollup))
+                            days += 1
+                        rollup = DayRollup(day)
+                    rollup.add(record, calendar)
+                if rollup is not None:
+                    connection.execute(_ADD_ROLLUP_SQL, _rollup_row(child_id, rollup))
+                    days += 1
+        return days
+
+    def get_sleep_stats_range(
+        self, child_id: str, start_date: date, end_date: date
+    ) -> List[Tuple[date, int, int]]:
+        """
+        Возвращает статистику сна по дням, посчитанную агрегатами SQL.
+
+        Результат совпадает с Child.get_sleep_stats_range, но в Python
+        передаются только итоговые суммы по дням. Для ребенка с часовым
+        поясом дни неравной длины, поэтому в Python читаются времена
+        записей диапазона и раскладываются по таблице границ дней.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            start_date (date): Первый день диапазона
+            end_date (date): Последний день диапазона (включительно)
+
+        Returns:
+            List[Tuple[date, int, int]]: Список (дата, минуты сна,
+                                        минуты бодрствования) по дням
+
+        Raises:
+            ChildNotFoundError: Если ребенка нет в базе
+        """
+        days = (end_date - start_date).days + 1
+        if days <= 0:
+            return []
+
+        with self._pool.connection() as connection:
+            calendar = _calendar(connection, child_id)
+            bounds = calendar.bounds_us(start_date, end_date)
+            if calendar.zone is None:
+                totals = dict(
+                    connection.execute(
+                        _DAILY_TOTALS_SQL,
+                        {
+                            "child_id": child_id,
+                            "range_start": bounds[0],
+                            "range_end": bounds[-1],
+                            "day_us": DAY_US,
+                            "minute_us": MINUTE_US,
+                        },
+                    ).fetchall()
+                )
+            else:
+                totals = {}
+                rows = connection.execute(
+                    "SELECT start_time, end_time FROM sleep_records "
+                    "WHERE child_id = ? AND end_time >= ? AND end_time < ?",
+                    (child_id, bounds[0], bounds[-1]),
+                )
+                for start, end in rows:
+                    offset = bisect_right(bounds, end) - 1
+                    minutes = (end - max(start, bounds[offset])) // MINUTE_US
+                    totals[offset] = totals.get(offset, 0) + minutes
+
+        return [
+            (
+                start_date + timedelta(days=offset),
+                totals.get(offset, 0),
+                (bounds[offset + 1] - bounds[offset]) // MINUTE_US - totals.get(offset, 0),
+            )
+            for offset in range(days)
+        ]
+
+    def get_sleep_stats(
+        self, child_id: str, date_: date
+    ) -> Tuple[int, int, List[SleepRecord]]:
+        """
+        Возвращает статистику сна за день в формате Child.get_sleep_stats.
+
+        Загружаются только записи, закончившиеся в этот день.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            date_ (date): Дата
+
+        Returns:
+            Tuple[int, int, List[SleepRecord]]: (минуты сна, минуты
+                                                бодрствования, записи за день)
+
+        Raises:
+            ChildNotFoundError: Если ребенка нет в базе
+        """
+        with self._pool.connection() as connection:
+            day_start, day_end = _calendar(connection, child_id).bounds_us(date_, date_)
+            rows = connection.execute(
+                "SELECT start_time, end_time, comment FROM sleep_records "
+                "WHERE child_id = ? AND end_time >= ? AND end_time < ? "
+                "ORDER BY start_time, id",
+                (child_id, day_start, day_end),
+            ).fetchall()
+
+        sleep_minutes = sum((end - max(start, day_start)) // MINUTE_US for start, end, _ in rows)
+        awake_minutes = (day_end - day_start) // MINUTE_US - sleep_minutes
+        return sleep_minutes, awake_minutes, [_row_record(*row) for row in rows]
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+def _record_row(
+    child_id: str, record: SleepRecord
+) -> Tuple[str, int, Optional[int], str]:
+    end_time = None if record.end_time is None else to_epoch_us(record.end_time)
+    return child_id, to_epoch_us(record.start_time), end_time, record.comment
+
+
+def _rollup_row(child_id: str, rollup: DayRollup) -> Tuple[object, ...]:
+    assert rollup.first_start is not None and rollup.last_end is not None
+    return (
+        child_id,
+        rollup.day.isoformat(),
+        rollup.sleep_minutes,
+        rollup.daytime_minutes,
+        rollup.night_minutes,
+        rollup.naps,
+        rollup.longest_minutes,
+        to_epoch_us(rollup.first_start),
+        to_epoch_us(rollup.last_end),
+    )
+
+
+def _add_rollups(
+    connection: sqlite3.Connection, child_id: str, records: Iterable[SleepRecord]
+) -> None:
+    """
+    Добавляет завершенные записи к итогам их дней (внутри транзакции вызывающего).
+    """
+    rollups = compute_rollups(records, _calendar(connection, child_id))
+    connection.executemany(
+        _ADD_ROLLUP_SQL, (_rollup_row(child_id, rollup) for rollup in rollups.values())
+    )
+
+
+def _calendar(connection: sqlite3.Connection, child_id: str) -> DayCalendar:
+    """
+    Границы дней ребенка по его часовому поясу в базе.
+
+    Raises:
+        ChildNotFoundError: Если ребенка нет в базе
+    """
+    row = connection.execute("SELECT timezone FROM children WHERE id = ?", (child_id,)).fetchone()
+    if row is None:
+        raise ChildNotFoundError(child_id)
+    return DayCalendar(row[0])
+
+
+def _row_record(start_time: int, end_time: Optional[int], comment: str) -> SleepRecord:
+    return SleepRecord(
+        start_time=from_epoch_us(start_time),
+        end_time=None if end_time is None else from_epoch_us(end_time),
+        comment=comment,
+    )
@@ -0,0 +1,168 @@
+"""
+Модуль с накопительной статистикой сна.
+
+Вместо пересчета истории при каждом запросе итоги по дням обновляются
+в момент завершения сна: одно событие меняет счетчики одного дня за O(1).
+Суммы за неделю и месяц складываются из не более чем 30 дневных итогов,
+поэтому стоимость отчета не зависит от длины истории.
+
+Правила подсчета совпадают с Child.get_sleep_stats: сон относится ко дню,
+в который он закончился, а ночной сон, начавшийся накануне, учитывается
+с полуночи. Дни и дневной сон (правило SleepRecord.is_daytime) считаются
+по календарю ребенка (DayCalendar), то есть по его местному времени.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+from sleep_tracker.core.models.days import DayCalendar
+from sleep_tracker.core.models.sleep_record import SleepRecord
+
+
+@dataclass
+class DayTotals:
+    """
+    Итоги сна за один день или сумма итогов за несколько дней.
+
+    Attributes:
+        sleep_minutes (int): Всего минут сна
+        daytime_minutes (int): Минут дневного сна
+        night_minutes (int): Минут ночного сна
+        naps (int): Количество дневных снов
+        day_minutes (Optional[int]): Длина дня по календарю ребенка
+                                     (None - итоги за несколько дней)
+    """
+
+    sleep_minutes: int = 0
+    daytime_minutes: int = 0
+    night_minutes: int = 0
+    naps: int = 0
+    day_minutes: Optional[int] = field(default=None, compare=False)
+
+    @property
+    def awake_minutes(self) -> Optional[int]:
+        """
+        Минуты бодрствования (длина дня минус время сна), как в get_sleep_stats.
+
+        Returns:
+            Optional[int]: Минуты бодрствования (None для итогов за несколько дней)
+        """
+        if self.day_minutes is None:
+            return None
+        return self.day_minutes - self.sleep_minutes
+
+    def __iadd__(self, other: "DayTotals") -> "DayTotals":
+        self.sleep_minutes += other.sleep_minutes
+        self.daytime_minutes += other.daytime_minutes
+        self.night_minutes += other.night_minutes
+        self.naps += other.naps
+        self.day_minutes = None
+        return self
+
+
+class SleepAccumulator:
+    """
+    Накопитель итогов сна по дням для одного ребенка.
+
+    Attributes:
+        calendar (DayCalendar): Границы дней ребенка
+    """
+
+    def __init__(self, calendar: Optional[DayCalendar] = None) -> None:
+        """
+        Args:
+            calendar (Optional[DayCalendar]): Календарь ребенка
+                                              (по умолчанию наивные сутки)
+        """
+        self.calendar = calendar or DayCalendar()
+        self._days: Dict[date, DayTotals] = {}
+
+    @classmethod
+    def from_records(
+        cls, records: Iterable[SleepRecord], calendar: Optional[DayCalendar] = None
+    ) -> "SleepAccumulator":
+        """
+        Строит накопитель с нуля по истории записей.
+
+        Args:
+            records (Iterable[SleepRecord]): Записи о сне (активные пропускаются)
+            calendar (Optional[DayCalendar]): Календарь ребенка
+
+        Returns:
+            SleepAccumulator: Заполненный накопитель
+        """
+        accumulator = cls(calendar)
+        for record in records:
+            accumulator.add(record)
+        return accumulator
+
+    def add(self, record: SleepRecord) -> None:
+        """
+        Учитывает завершенный сон. Выполняется за O(1).
+
+        Args:
+            record (SleepRecord): Завершенная запись (активная игнорируется)
+        """
+        if record.end_time is None:
+            return
+
+        day = self.calendar.day_of(record.end_time)
+        day_start, _ = self.calendar.day_bounds(day)
+        start = max(record.start_time, day_start)
+        minutes = int((record.end_time - start).total_seconds() / 60)
+
+        totals = self._days.get(day)
+        if totals is None:
+            totals = self._days[day] = DayTotals()
+        totals.sleep_minutes += minutes
+        if self.calendar.is_daytime(record.start_time):
+            totals.daytime_minutes += minutes
+            totals.naps += 1
+        else:
+            totals.night_minutes += minutes
+
+    def day(self, day: date) -> DayTotals:
+        """
+        Возвращает итоги за день.
+
+        Args:
+            day (date): Дата
+
+        Returns:
+            DayTotals: Копия итогов (нулевые, если сна не было)
+        """
+        totals = DayTotals()
+        totals += self._days.get(day, totals)
+        totals.day_minutes = self.calendar.day_minutes(day)
+        return totals
+
+    def window(self, last_day: date, days: int) -> DayTotals:
+        """
+        Возвращает сумму итогов за days дней, заканчивая last_day.
+
+        Args:
+            last_day (date): Последний день окна (включительно)
+            days (int): Длина окна в днях
+
+        Returns:
+            DayTotals: Суммарные итоги за окно
+        """
+        totals = DayTotals()
+        for offset in range(days):
+            day_totals = self._days.get(last_day - timedelta(days=offset))
+            if day_totals is not None:
+                totals += day_totals
+        return totals
+
+    def week(self, last_day: date) -> DayTotals:
+        """
+        Итоги за скользящие 7 дней, заканчивая last_day.
+        """
+        return self.window(last_day, 7)
+
+    def month(self, last_day: date) -> DayTotals:
+        """
+        Итоги за скользящие 30 дней, заканчивая last_day.
+        """
+        return self.window(last_day, 30)
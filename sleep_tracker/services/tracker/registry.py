@@ -0,0 +1,385 @@
+"""
+Модуль с реестром детей в памяти для процессов, обслуживающих много семей.
+
+TrackerRegistry сопоставляет идентификатор ребенка (например, чата)
+с сервисом SleepTracker и обеспечивает:
+- ленивую загрузку: ребенок читается из хранилища при первом обращении;
+- блокировки по ребенку: каждая запись реестра имеет свою блокировку,
+  а словари записей разбиты на сегменты (lock striping) со своими
+  короткими блокировками, поэтому потоки, работающие с разными детьми,
+  не ждут друг друга ни на операциях, ни на загрузке из хранилища;
+- вытеснение по LRU с отложенной записью (write-back): изменения
+  копятся в памяти, а ребенок целиком сохраняется в хранилище при
+  вытеснении или вызове flush;
+- или, с write_through=True, сквозную запись: каждое событие сразу
+  дописывается в хранилище (как у SleepTracker с хранилищем), и
+  вытеснение только освобождает память. Так работает бот: после
+  подтверждения пользователю событие уже сохранено.
+
+LRU ведется в каждом сегменте отдельно (емкость делится между
+сегментами, в сумме ровно capacity), чтобы вытеснение не требовало общей блокировки.
+Запись, которая используется в данный момент, не вытесняется.
+
+Реестр потокобезопасен. Из асинхронного кода его методы вызываются
+через run_in_executor, как остальная блокирующая работа бота.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime
+from types import TracebackType
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from sleep_tracker.core.exceptions import ChildNotFoundError
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.storage.base import SleepStorage
+
+from .accumulator import DayTotals
+from .service import SleepTracker
+
+
+class _Entry:
+    """
+    Запись реестра: сервис ребенка и его блокировка.
+
+    Attributes:
+        lock (threading.Lock): Блокировка операций с ребенком
+        tracker (Optional[SleepTracker]): Сервис (None - еще не загружен)
+        dirty (bool): Есть ли изменения, не сохраненные в хранилище
+        pins (int): Сколько потоков сейчас используют запись
+    """
+
+    __slots__ = ("lock", "tracker", "dirty", "pins")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.tracker: Optional[SleepTracker] = None
+        self.dirty = False
+        self.pins = 0
+
+
+class _Shard:
+    """
+    Сегмент реестра: часть записей в порядке LRU под своей блокировкой.
+    """
+
+    __slots__ = ("lock", "capacity", "entries", "evicting")
+
+    def __init__(self, capacity: int) -> None:
+        self.lock = threading.Lock()
+        self.capacity = capacity
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Вытесняемые записи, которые еще сохраняются в хранилище
+        self.evicting: Dict[str, _Entry] = {}
+
+
+class TrackerRegistry:
+    """
+    Потокобезопасный реестр сервисов отслеживания сна.
+
+    Attributes:
+        storage (SleepStorage): Хранилище детей (должно допускать вызовы
+                                из разных потоков)
+        capacity (int): Сколько детей держать в памяти
+        write_through (bool): Сохранять события сразу, а не при вытеснении
+        loads (int): Количество загрузок из хранилища
+        evictions (int): Количество вытесненных детей
+        writes (int): Количество сохранений в хранилище
+    """
+
+    def __init__(
+        self,
+        storage: SleepStorage,
+        capacity: int = 10_000,
+        shards: int = 64,
+        write_through: bool = False,
+    ) -> None:
+        """
+        Args:
+            storage (SleepStorage): Хранилище детей
+            capacity (int): Сколько детей держать в памяти
+            shards (int): Количество сегментов с отдельными блокировками
+            write_through (bool): Сохранять события сразу, а не при вытеснении
+        """
+        if capacity < 1 or shards < 1:
+            raise ValueError("Емкость и количество сегментов должны быть положительными")
+        self.storage = storage
+        self.capacity = capacity
+        self.write_through = write_through
+        # Емкость делится между сегментами так, что в сумме дает capacity:
+        # сегментов не больше емкости, и первые получают на одного больше
+        count = min(shards, capacity)
+        size, extra = divmod(capacity, count)
+        self._shards = [_Shard(size + (number < extra)) for number in range(count)]
+        self._counters_lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+        self.writes = 0
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def _shard(self, child_id: str) -> _Shard:
+        return self._shards[hash(child_id) % len(self._shards)]
+
+    def _count(self, counter: str) -> None:
+        with self._counters_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _pin(self, child_id: str) -> _Entry:
+        """
+        Находит или создает запись и отмечает ее как используемую,
+        вытесняя из сегмента записи сверх емкости.
+        """
+        shard = self._shard(child_id)
+        with shard.lock:
+            entry = shard.entries.get(child_id)
+            if entry is None:
+                # Запись могла еще сохраняться после вытеснения: возвращаем ее
+                entry = shard.evicting.pop(child_id, None) or _Entry()
+                shard.entries[child_id] = entry
+            else:
+                shard.entries.move_to_end(child_id)
+            entry.pins += 1
+            victims = self._take_victims(shard)
+        self._write_back(shard, victims)
+        return entry
+
+    def _unpin(self, child_id: str, entry: _Entry) -> None:
+        shard = self._shard(child_id)
+        with shard.lock:
+            entry.pins -= 1
+            # Ребенок не загрузился (например, его нет в хранилище):
+            # пустую запись не держим, чтобы она не вытесняла других
+            if not entry.pins and entry.tracker is None and shard.entries.get(child_id) is entry:
+                del shard.entries[child_id]
+            victims = self._take_victims(shard)
+        self._write_back(shard, victims)
+
+    def _take_victims(self, shard: _Shard) -> Dict[str, _Entry]:
+        """
+        Убирает из сегмента давно не использованные записи сверх емкости.
+        Вызывается под блокировкой сегмента.
+        """
+        victims: Dict[str, _Entry] = {}
+        excess = len(shard.entries) - shard.capacity
+        if excess <= 0:
+            return victims
+        for child_id, entry in list(shard.entries.items()):
+            if entry.pins == 0:
+                del shard.entries[child_id]
+                shard.evicting[child_id] = entry
+                victims[child_id] = entry
+                excess -= 1
+                if not excess:
+                    break
+        return victims
+
+    def _write_back(self, shard: _Shard, victims: Dict[str, _Entry]) -> None:
+        """
+        Сохраняет вытесненные записи и окончательно удаляет их из сегмента.
+        """
+        for child_id, entry in victims.items():
+            with entry.lock:
+                self._save(child_id, entry)
+            with shard.lock:
+                if shard.evicting.get(child_id) is entry:
+                    del shard.evicting[child_id]
+            self._count("evictions")
+
+    def _save(self, child_id: str, entry: _Entry) -> None:
+        """
+        Сохраняет ребенка, если есть несохраненные изменения.
+        Вызывается под блокировкой записи.
+        """
+        if entry.dirty and entry.tracker is not None:
+            self.storage.save_child(child_id, entry.tracker.child)
+            entry.dirty = False
+            self._count("writes")
+
+    def _tracker(self, child_id: str, child: Child) -> SleepTracker:
+        """
+        Сервис ребенка: со сквозной записью он сам дописывает события в хранилище.
+        """
+        if self.write_through:
+            return SleepTracker(child, child_id, self.storage)
+        return SleepTracker(child)
+
+    def _install(self, child_id: str, entry: _Entry, child: Child) -> None:
+        """
+        Заменяет ребенка записи. Вызывается под блокировкой записи.
+        """
+        if self.write_through:
+            self.storage.save_child(child_id, child)
+            self._count("writes")
+        entry.tracker = self._tracker(child_id, child)
+        entry.dirty = not self.write_through
+
+    @contextmanager
+    def locked(self, child_id: str, modify: bool = True) -> Iterator[SleepTracker]:
+        """
+        Дает монопольный доступ к сервису ребенка, загружая его при необходимости.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            modify (bool): Будет ли ребенок изменен (тогда при успешном
+                           завершении блока он будет сохранен при
+                           вытеснении или flush)
+
+        Yields:
+            SleepTracker: Сервис ребенка (без хранилища, если изменения
+                          сохраняет реестр)
+
+        Raises:
+            ChildNotFoundError: Если ребенка нет ни в памяти, ни в хранилище
+        """
+        entry = self._pin(child_id)
+        try:
+            with entry.lock:
+                if entry.tracker is None:
+                    child = self.storage.load_child(child_id)
+                    self._count("loads")
+                    entry.tracker = self._tracker(child_id, child)
+                yield entry.tracker
+                # Блок, завершившийся исключением, ребенка не изменил
+                if modify and not self.write_through:
+                    entry.dirty = True
+        finally:
+            self._unpin(child_id, entry)
+
+    def register(self, child_id: str, child: Child) -> None:
+        """
+        Добавляет ребенка в реестр (или заменяет его).
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            child (Child): Ребенок
+        """
+        entry = self._pin(child_id)
+        try:
+            with entry.lock:
+                self._install(child_id, entry, child)
+        finally:
+            self._unpin(child_id, entry)
+
+    def update(
+        self, child_id: str, function: Callable[[Optional[Child]], Child]
+    ) -> Child:
+        """
+        Заменяет ребенка результатом function под блокировкой ребенка.
+
+        Например, повторная регистрация меняет имя, сохраняя записи:
+        между чтением старого ребенка и заменой никто не добавит сон.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            function (Callable[[Optional[Child]], Child]): Получает текущего
+                ребенка (None - его нет ни в памяти, ни в хранилище)
+                и возвращает нового
+
+        Returns:
+            Child: Новый ребенок
+        """
+        entry = self._pin(child_id)
+        try:
+            with entry.lock:
+                current: Optional[Child] = None
+                if entry.tracker is not None:
+                    current = entry.tracker.child
+                else:
+                    try:
+                        current = self.storage.load_child(child_id)
+                        self._count("loads")
+                    except ChildNotFoundError:
+                        pass
+                child = function(current)
+                self._install(child_id, entry, child)
+                return child
+        finally:
+            self._unpin(child_id, entry)
+
+    def get_child(self, child_id: str) -> Child:
+        """
+        Возвращает ребенка, загружая его при необходимости.
+
+        Raises:
+            ChildNotFoundError: Если ребенок не найден
+        """
+        with self.locked(child_id, modify=False) as tracker:
+            return tracker.child
+
+    def start_sleep(self, child_id: str, start_time: datetime, comment: str = "") -> SleepRecord:
+        """
+        Начинает сон ребенка.
+
+        Raises:
+            ChildNotFoundError: Если ребенок не найден
+            ValueError: Если сон уже идет
+        """
+        with self.locked(child_id) as tracker:
+            return tracker.start_sleep(start_time, comment)
+
+    def end_sleep(
+        self, child_id: str, end_time: datetime, comment: Optional[str] = None
+    ) -> SleepRecord:
+        """
+        Завершает сон ребенка.
+
+        Raises:
+            ChildNotFoundError: Если ребенок не найден
+            ValueError: Если сон не идет
+        """
+        with self.locked(child_id) as tracker:
+            return tracker.end_sleep(end_time, comment)
+
+    def active_sleep(self, child_id: str) -> Optional[SleepRecord]:
+        """
+        Возвращает текущий сон ребенка, если он идет.
+        """
+        with self.locked(child_id, modify=False) as tracker:
+            return tracker.child.get_active_sleep()
+
+    def day(self, child_id: str, day: Optional[date] = None) -> DayTotals:
+        """
+        Итоги сна ребенка за день (по умолчанию за сегодня).
+        """
+        with self.locked(child_id, modify=False) as tracker:
+            return tracker.day(day)
+
+    def flush(self) -> int:
+        """
+        Сохраняет в хранилище всех измененных детей, оставляя их в памяти.
+
+        Returns:
+            int: Количество сохраненных детей
+        """
+        saved = 0
+        for shard in self._shards:
+            with shard.lock:
+                entries: List[Tuple[str, _Entry]] = list(shard.entries.items())
+            for child_id, entry in entries:
+                with entry.lock:
+                    if entry.dirty:
+                        self._save(child_id, entry)
+                        saved += 1
+        return saved
+
+    def close(self) -> None:
+        """Сохраняет изменения и очищает реестр (хранилище не закрывается)."""
+        self.flush()
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+
+    def __enter__(self) -> "TrackerRegistry":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
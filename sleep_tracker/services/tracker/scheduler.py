@@ -0,0 +1,434 @@
+"""
+Модуль с фоновым расчетом отчетов за прошедший день.
+
+Запросы отчетов приходят волнами - утром и перед сном. Чтобы они не
+считали статистику по истории на лету, ReportScheduler после местной
+полуночи каждого ребенка считает в фоне отчеты, заканчивающиеся
+вчерашним днем: за день (как Child.get_sleep_stats), за 7 и за 30 дней
+(как SleepTracker.week и month), - и кладет их в ReportStore. Запрос
+отчета (ReportScheduler.report) становится поиском в словаре; если
+отчета еще нет, он считается сразу и тоже сохраняется.
+
+Расписание:
+- каждый ребенок получает свое смещение от полуночи (jitter), одно и то
+  же при каждом запуске, чтобы тысячи детей не пересчитывались в одну
+  секунду;
+- в работе одновременно не больше max_pending расчетов, остальные
+  дожидаются следующего вызова run_pending (backpressure), а сами
+  расчеты выполняются в пуле из max_workers потоков;
+- неудачный расчет повторяется через retry_delay, 2 * retry_delay и т.д.,
+  но не больше max_attempts раз; повтор уже сделанного расчета ничего
+  не меняет (отчет за тот же день перезаписывается тем же значением);
+- если планировщик не работал несколько дней, считается только
+  последний прошедший день.
+
+Часовой пояс ребенка перечитывается при каждом расчете: если он
+сменился, следующий расчет назначается по новым местным полуночам.
+
+Текущее время берется из clock (UTC с tzinfo), поэтому расписание
+проверяется в тестах вызовами run_pending без ожидания реального времени.
+Фоновый поток (start/stop) просто вызывает run_pending раз в interval секунд.
+Ошибка чтения одного ребенка (например, удаленного между списком детей
+и загрузкой) или всего списка пишется в журнал и в метрики
+(ReportScheduler._plan и ReportScheduler.run_pending), а поток продолжает работу.
+"""
+
+import logging
+import threading
+import zlib
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sleep_tracker.core.metrics import instrumented
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.days import DayCalendar
+from sleep_tracker.core.models.epoch import from_epoch_us
+from sleep_tracker.services.reports.report import SleepReport
+from sleep_tracker.services.storage.base import SleepStorage
+
+# Периоды готовых отчетов: название -> количество дней, заканчивающихся вчера
+PERIOD_DAYS: Dict[str, int] = {"day": 1, "week": 7, "month": 30}
+
+# Текущее время в UTC с tzinfo
+Clock = Callable[[], datetime]
+
+logger = logging.getLogger(__name__)
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass(frozen=True)
+class PrecomputedReport:
+    """
+    Готовый отчет за период.
+
+    Attributes:
+        child_id (str): Идентификатор ребенка
+        period (str): "day", "week" или "month" (см. PERIOD_DAYS)
+        first_day (date): Первый день периода
+        last_day (date): Последний день периода (включительно)
+        days (Tuple[Tuple[date, int, int], ...]): Результат
+            Child.get_sleep_stats_range: (дата, минуты сна, минуты бодрствования)
+    """
+
+    child_id: str
+    period: str
+    first_day: date
+    last_day: date
+    days: Tuple[Tuple[date, int, int], ...]
+
+    @property
+    def report(self) -> SleepReport:
+        """Отчет с итогами за период."""
+        minutes = [sleep_minutes for _, sleep_minutes, _ in self.days]
+        day_minutes = [sleep_minutes + awake for _, sleep_minutes, awake in self.days]
+        return SleepReport(self.child_id, self.first_day, self.last_day, minutes, day_minutes)
+
+
+class ReportStore:
+    """
+    Готовые отчеты в памяти: (ребенок, период, последний день) -> отчет.
+
+    Потокобезопасно. Для каждого ребенка и периода хранятся отчеты
+    только за последние keep_days дней.
+
+    Attributes:
+        keep_days (int): Сколько последних дней хранить
+    """
+
+    def __init__(self, keep_days: int = 7) -> None:
+        """
+        Args:
+            keep_days (int): Сколько последних дней хранить
+        """
+        if keep_days < 1:
+            raise ValueError("Количество дней должно быть положительным")
+        self.keep_days = keep_days
+        self._reports: Dict[Tuple[str, str], Dict[date, PrecomputedReport]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(reports) for reports in self._reports.values())
+
+    def put(self, report: PrecomputedReport) -> None:
+        """
+        Сохраняет отчет (отчет за тот же период заменяется).
+        """
+        with self._lock:
+            reports = self._reports.setdefault((report.child_id, report.period), {})
+            reports[report.last_day] = report
+            oldest = max(reports) - timedelta(days=self.keep_days - 1)
+            for last_day in [day for day in reports if day < oldest]:
+                del reports[last_day]
+
+    def get(self, child_id: str, period: str, last_day: date) -> Optional[PrecomputedReport]:
+        """
+        Возвращает готовый отчет или None.
+        """
+        with self._lock:
+            return self._reports.get((child_id, period), {}).get(last_day)
+
+
+class _Plan:
+    """
+    Расписание ребенка.
+
+    Attributes:
+        calendar (DayCalendar): Границы дней в часовом поясе ребенка
+        day (date): Следующий день, за который нужно посчитать отчеты
+        due (datetime): Когда запускать расчет (UTC без tzinfo)
+        attempts (int): Сколько раз расчет за day уже не удался
+        future (Optional[Future[List[PrecomputedReport]]]): Расчет в работе
+    """
+
+    __slots__ = ("calendar", "day", "due", "attempts", "future")
+
+    def __init__(self, calendar: DayCalendar, day: date, due: datetime) -> None:
+        self.calendar = calendar
+        self.day = day
+        self.due = due
+        self.attempts = 0
+        self.future: Optional["Future[List[PrecomputedReport]]"] = None
+
+
+class ReportScheduler:
+    """
+    Планировщик фонового расчета отчетов за прошедший день.
+
+    Attributes:
+        storage (SleepStorage): Хранилище детей (должно допускать вызовы
+                                из разных потоков)
+        store (ReportStore): Готовые отчеты
+        max_pending (int): Сколько расчетов может быть в работе одновременно
+        jitter (timedelta): Наибольшее смещение расчета от местной полуночи
+        retry_delay (timedelta): Пауза перед первым повтором
+        max_attempts (int): Сколько раз пробовать посчитать один день
+        computed (int): Количество выполненных расчетов
+        failures (int): Количество неудачных попыток
+        hits (int): Запросы, найденные среди готовых отчетов
+        misses (int): Запросы, посчитанные на месте
+    """
+
+    def __init__(
+        self,
+        storage: SleepStorage,
+        store: Optional[ReportStore] = None,
+        max_workers: int = 4,
+        max_pending: int = 16,
+        jitter: timedelta = timedelta(minutes=30),
+        retry_delay: timedelta = timedelta(minutes=1),
+        max_attempts: int = 5,
+        clock: Clock = _utc_now,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        """
+        Args:
+            storage (SleepStorage): Хранилище детей
+            store (Optional[ReportStore]): Готовые отчеты (по умолчанию новое)
+            max_workers (int): Размер пула потоков (если executor не задан)
+            max_pending (int): Сколько расчетов может быть в работе одновременно
+            jitter (timedelta): Наибольшее смещение расчета от местной полуночи
+            retry_delay (timedelta): Пауза перед первым повтором
+            max_attempts (int): Сколько раз пробовать посчитать один день
+            clock (Clock): Текущее время в UTC с tzinfo
+            executor (Optional[Executor]): Готовый пул для расчетов
+        """
+        if max_workers < 1 or max_pending < 1 or max_attempts < 1:
+            raise ValueError(
+                "Размер пула, число расчетов в работе и число попыток должны быть положительными"
+            )
+        self.storage = storage
+        self.store = store if store is not None else ReportStore()
+        self.max_pending = max_pending
+        self.jitter = jitter
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self._clock = clock
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers)
+        self._plans: Dict[str, _Plan] = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.computed = 0
+        self.failures = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _offset(self, child_id: str) -> timedelta:
+        """
+        Смещение ребенка от полуночи: одно и то же при каждом запуске.
+        """
+        seconds = int(self.jitter.total_seconds())
+        if seconds <= 0:
+            return timedelta(0)
+        return timedelta(seconds=zlib.crc32(child_id.encode("utf-8")) % seconds)
+
+    def _record_now(self, calendar: DayCalendar) -> datetime:
+        """
+        Текущее время во времени записей ребенка (UTC или местное наивное).
+        """
+        now = self._clock()
+        if calendar.zone is not None:
+            return now.astimezone(timezone.utc).replace(tzinfo=None)
+        return now.astimezone().replace(tzinfo=None)
+
+    def _yesterday(self, calendar: DayCalendar) -> date:
+        return calendar.day_of(self._record_now(calendar)) - timedelta(days=1)
+
+    def _due(self, child_id: str, calendar: DayCalendar, day: date) -> datetime:
+        """
+        Момент расчета отчетов за day: местная полночь после day плюс смещение.
+        """
+        midnight = from_epoch_us(calendar.bounds_us(day, day)[1])
+        return midnight + self._offset(child_id)
+
+    @instrumented()
+    def _plan(self, child_id: str) -> _Plan:
+        """
+        Расписание ребенка; новый ребенок читается из хранилища вне блокировки.
+        """
+        with self._lock:
+            plan = self._plans.get(child_id)
+        if plan is not None:
+            return plan
+        calendar = self.storage.load_recent(child_id, days=1).calendar
+        day = self._yesterday(calendar)
+        with self._lock:
+            return self._plans.setdefault(
+                child_id, _Plan(calendar, day, self._due(child_id, calendar, day))
+            )
+
+    @instrumented()
+    def run_pending(self) -> int:
+        """
+        Учитывает завершенные расчеты и запускает те, чье время пришло.
+
+        Ребенок, расписание которого не удалось прочитать, пропускается
+        до следующего вызова.
+
+        Returns:
+            int: Сколько расчетов запущено
+        """
+        child_ids = self.storage.child_ids()
+        with self._lock:
+            self._reap()
+        started = 0
+        for child_id in child_ids:
+            with self._lock:
+                if self._in_flight >= self.max_pending:
+                    break
+            try:
+                plan = self._plan(child_id)
+            except Exception:
+                logger.exception("Не удалось прочитать расписание ребенка '%s'", child_id)
+                continue
+            with self._lock:
+                if plan.future is not None:
+                    continue
+                yesterday = self._yesterday(plan.calendar)
+                if plan.day < yesterday:
+                    # Планировщик не работал: пропущенные дни посчитает report
+                    plan.day, plan.attempts = yesterday, 0
+                    plan.due = self._due(child_id, plan.calendar, yesterday)
+                if plan.day > yesterday or plan.due > self._record_now(plan.calendar):
+                    continue
+                plan.future = self._executor.submit(self._compute, child_id, plan.day)
+                self._in_flight += 1
+                started += 1
+        return started
+
+    def drain(self) -> None:
+        """
+        Дожидается расчетов в работе и учитывает их результаты.
+        """
+        with self._lock:
+            futures = [plan.future for plan in self._plans.values() if plan.future is not None]
+        wait(futures)
+        with self._lock:
+            self._reap()
+
+    def _reap(self) -> None:
+        """
+        Переводит расписания завершенных расчетов на следующий день
+        или назначает повтор (вызывается под блокировкой).
+        """
+        for child_id, plan in self._plans.items():
+            future = plan.future
+            if future is None or not future.done():
+                continue
+            plan.future = None
+            self._in_flight -= 1
+            if future.exception() is None:
+                self.computed += 1
+                plan.attempts = 0
+                plan.day += timedelta(days=1)
+                plan.due = self._due(child_id, plan.calendar, plan.day)
+                continue
+            self.failures += 1
+            plan.attempts += 1
+            if plan.attempts >= self.max_attempts:
+                # День пропускается: отчет посчитает report при запросе
+                plan.attempts = 0
+                plan.day += timedelta(days=1)
+                plan.due = self._due(child_id, plan.calendar, plan.day)
+            else:
+                delay = self.retry_delay * (2 ** (plan.attempts - 1))
+                plan.due = self._record_now(plan.calendar) + delay
+
+    def _compute(self, child_id: str, last_day: date) -> List[PrecomputedReport]:
+        """
+        Считает и сохраняет отчеты всех периодов, заканчивающихся last_day.
+        """
+        child = self.storage.load_recent(child_id, days=max(PERIOD_DAYS.values()) + 1)
+        with self._lock:
+            plan = self._plans.get(child_id)
+            if plan is not None and plan.calendar.zone != child.calendar.zone:
+                # Часовой пояс сменился: следующий расчет - по новым полуночам
+                plan.calendar = child.calendar
+        reports = self._reports(child_id, child, last_day)
+        for report in reports:
+            self.store.put(report)
+        return reports
+
+    @staticmethod
+    def _reports(child_id: str, child: Child, last_day: date) -> List[PrecomputedReport]:
+        reports = []
+        for period, days in PERIOD_DAYS.items():
+            first_day = last_day - timedelta(days=days - 1)
+            stats = child.get_sleep_stats_range(first_day, last_day)
+            reports.append(PrecomputedReport(child_id, period, first_day, last_day, tuple(stats)))
+        return reports
+
+    def report(
+        self, child_id: str, period: str, last_day: Optional[date] = None
+    ) -> PrecomputedReport:
+        """
+        Отчет за период, заканчивающийся last_day (по умолчанию вчера).
+
+        Готовый отчет возвращается из ReportStore, иначе считается сразу.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            period (str): "day", "week" или "month"
+            last_day (Optional[date]): Последний день периода
+
+        Returns:
+            PrecomputedReport: Отчет
+
+        Raises:
+            ValueError: Если период неизвестен
+            ChildNotFoundError: Если ребенок не найден
+        """
+        if period not in PERIOD_DAYS:
+            raise ValueError(f"Неизвестный период '{period}', ожидается один из {tuple(PERIOD_DAYS)}")
+        if last_day is None:
+            last_day = self._yesterday(self._plan(child_id).calendar)
+        report = self.store.get(child_id, period, last_day)
+        with self._lock:
+            if report is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if report is not None:
+            return report
+        # Отчет за давний день хранилище может сразу вытеснить,
+        # поэтому возвращается посчитанный, а не прочитанный из него
+        reports = self._compute(child_id, last_day)
+        return next(report for report in reports if report.period == period)
+
+    def start(self, interval: float = 60.0) -> None:
+        """
+        Запускает фоновый поток, вызывающий run_pending раз в interval секунд.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def _loop(self, interval: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+            except Exception:
+                logger.exception("Ошибка фонового расчета отчетов")
+            self._stop.wait(interval)
+
+    def stop(self) -> None:
+        """
+        Останавливает фоновый поток и дожидается расчетов в работе.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.drain()
+        if self._own_executor:
+            self._executor.shutdown()
@@ -0,0 +1,153 @@
+"""
+Модуль с сервисом отслеживания сна одного ребенка.
+
+SleepTracker связывает модель Child, хранилище и накопительную
+статистику: каждое действие пользователя применяется к Child,
+сохраняется в хранилище и обновляет итоги за O(1).
+
+Для ребенка с ленивой историей (SleepStorage.load_recent) итоги
+сначала строятся только по записям в памяти, а более старые дни
+подгружаются, когда запрос до них доходит.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.storage.base import SleepStorage
+
+from .accumulator import DayTotals, SleepAccumulator
+
+
+class SleepTracker:
+    """
+    Сервис отслеживания сна ребенка.
+
+    Attributes:
+        child (Child): Ребенок
+        child_id (str): Идентификатор ребенка в хранилище
+        storage (Optional[SleepStorage]): Хранилище (None - только в памяти)
+    """
+
+    def __init__(
+        self,
+        child: Child,
+        child_id: str = "",
+        storage: Optional[SleepStorage] = None,
+    ) -> None:
+        """
+        Args:
+            child (Child): Ребенок
+            child_id (str): Идентификатор ребенка в хранилище
+            storage (Optional[SleepStorage]): Хранилище для сохранения событий
+        """
+        if storage is not None and not child_id:
+            raise ValueError("Для работы с хранилищем нужен идентификатор ребенка")
+        self.child = child
+        self.child_id = child_id
+        self.storage = storage
+        # Первый день, итоги которого есть в накопителе (None - вся история)
+        self._first_day: Optional[date] = None
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        Пересчитывает накопительную статистику по записям в памяти.
+
+        Нужен, если записи ребенка были изменены в обход сервиса.
+        """
+        child = self.child
+        loaded_since = child.loaded_since
+        if loaded_since is None:
+            self._first_day = None
+            self._accumulator = SleepAccumulator.from_records(child.sleep_records, child.calendar)
+            return
+        # День границы загружен не целиком, итоги ведутся со следующего
+        calendar = child.calendar
+        self._first_day = calendar.day_of(loaded_since) + timedelta(days=1)
+        self._accumulator = SleepAccumulator(calendar)
+        for record in child.iter_records_between(loaded_since, datetime.max):
+            if self._counted(record):
+                self._accumulator.add(record)
+
+    def _counted(self, record: SleepRecord) -> bool:
+        """
+        Относится ли завершенная запись к дням, которые ведет накопитель.
+        """
+        if record.end_time is None:
+            return False
+        first_day = self._first_day
+        return first_day is None or self.child.calendar.day_of(record.end_time) >= first_day
+
+    def _cover(self, first_day: date) -> None:
+        """
+        Добавляет к итогам дни истории начиная с first_day, которых в них еще нет.
+        """
+        if self._first_day is None or first_day >= self._first_day:
+            return
+        day = first_day
+        while day < self._first_day:
+            # Записи, закончившиеся в этот день (старая история загружается)
+            for record in self.child.get_sleep_stats(day)[2]:
+                self._accumulator.add(record)
+            day += timedelta(days=1)
+        self._first_day = first_day
+
+    def start_sleep(self, start_time: datetime, comment: str = "") -> SleepRecord:
+        """
+        Начинает сон и сохраняет событие.
+
+        Args:
+            start_time (datetime): Время начала сна
+            comment (str, optional): Комментарий к записи
+
+        Returns:
+            SleepRecord: Новая запись о сне
+        """
+        record = self.child.start_sleep(start_time, comment)
+        if self.storage is not None:
+            self.storage.append_start(self.child_id, record)
+        return record
+
+    def end_sleep(self, end_time: datetime, comment: Optional[str] = None) -> SleepRecord:
+        """
+        Завершает активный сон, сохраняет событие и обновляет итоги.
+
+        Args:
+            end_time (datetime): Время окончания сна
+            comment (Optional[str]): Дополнительный комментарий
+
+        Returns:
+            SleepRecord: Завершенная запись о сне
+        """
+        record = self.child.end_sleep(end_time, comment)
+        if self.storage is not None:
+            self.storage.append_end(self.child_id, record)
+        if self._counted(record):
+            self._accumulator.add(record)
+        return record
+
+    def day(self, day: Optional[date] = None) -> DayTotals:
+        """
+        Итоги за день (по умолчанию за сегодняшний день ребенка).
+        """
+        day = day or self.child.calendar.today()
+        self._cover(day)
+        return self._accumulator.day(day)
+
+    def week(self, last_day: Optional[date] = None) -> DayTotals:
+        """
+        Итоги за 7 дней, заканчивая last_day (по умолчанию сегодня).
+        """
+        last_day = last_day or self.child.calendar.today()
+        self._cover(last_day - timedelta(days=6))
+        return self._accumulator.week(last_day)
+
+    def month(self, last_day: Optional[date] = None) -> DayTotals:
+        """
+        Итоги за 30 дней, заканчивая last_day (по умолчанию сегодня).
+        """
+        last_day = last_day or self.child.calendar.today()
+        self._cover(last_day - timedelta(days=29))
+        return self._accumulator.month(last_day)
@@ -0,0 +1,729 @@
+"""
+Модуль с синхронизацией записей о сне между устройствами (снимок и дельта).
+
+Одного ребенка ведут несколько взрослых с разных телефонов и из чатов
+бота. Чтобы не пересылать при каждой синхронизации всю историю, сервер
+(SyncServer) дает каждому изменению записи о сне номер версии, монотонно
+растущий для ребенка, и отдает клиенту (SyncClient) только записи,
+измененные после известной клиенту версии. Клиент, отставший сильнее,
+чем помнит журнал изменений (max_log версий), или пришедший к другому
+экземпляру сервера (другая эпоха), получает полный снимок.
+
+Запись о сне определяется временем начала, как в хранилищах. По сети
+передаются словари (SyncServer.handle), а дельта кодируется компактно
+(encode_delta): времена - целые микросекунды от эпохи, начала записей -
+разностями с предыдущим, окончание - длительностью сна.
+
+Правки, сделанные на разных устройствах без связи, сливаются так, что
+результат зависит только от набора правок, а не от порядка их прихода.
+Сервер помнит исходные записи ребенка и все полученные правки и после
+каждой синхронизации заново раскладывает по снам правки из промежутка
+времени, который задели новые:
+- правки упорядочиваются канонически: по началу сна, начало раньше
+  завершения, затем по окончанию и комментарию;
+- завершение сна занимает промежуток [начало, окончание), начало сна
+  без завершения - [начало, начало + SAME_SLEEP_WINDOW], а начало сна,
+  для которого есть завершение, - только само начало; пересекающиеся
+  промежутки (в том числе цепочкой) - это один сон;
+- у сна остается самое раннее начало и самое раннее окончание
+  ("побеждает первое сообщение о событии"), строки комментариев
+  объединяются в каноническом порядке без повторов;
+- незавершенным может быть только последний сон: более раннее начало
+  без завершения отбрасывается (запись восстановит завершение сна
+  с того же устройства).
+Правки - множество, поэтому повтор запроса после обрыва связи ничего
+не меняет. Каждая изменившаяся запись получает новую версию, а ключ
+клиента, слившийся с другой записью, - версию удаления, поэтому клиент,
+применив ответ, совпадает с сервером.
+
+Журнал версий и правки хранятся в памяти сервера. Записи сохраняются
+в хранилище: новое начало и завершение сна - событиями append_start
+и append_end, остальные результаты слияния - сохранением ребенка целиком.
+"""
+
+import threading
+import uuid
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sleep_tracker.core.exceptions import ChildNotFoundError
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.epoch import from_epoch_us, to_epoch_us
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.storage.base import SleepStorage
+
+# Начала сна, записанные разными взрослыми с такой разницей, - один сон
+SAME_SLEEP_WINDOW = timedelta(hours=1)
+_TICK = timedelta(microseconds=1)
+
+# Транспорт клиента: отправляет запрос серверу и возвращает ответ
+Transport = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+# Правка в каноническом виде: (начало, 0 - начало сна или 1 - завершение,
+# окончание, комментарий); кортежи сортируются в каноническом порядке
+Evidence = Tuple[datetime, int, Optional[datetime], str]
+_START, _END = 0, 1
+
+
+@dataclass
+class SyncOp:
+    """
+    Правка, сделанная на устройстве.
+
+    Attributes:
+        kind (str): "start" (начало сна) или "end" (завершение сна)
+        start (datetime): Время начала сна (ключ записи на устройстве)
+        end (Optional[datetime]): Время окончания сна (для "end")
+        comment (str): Комментарий
+    """
+
+    kind: str
+    start: datetime
+    end: Optional[datetime] = None
+    comment: str = ""
+
+
+@dataclass
+class SyncDelta:
+    """
+    Изменения записей ребенка после версии клиента.
+
+    Attributes:
+        epoch (str): Эпоха сервера (версии сравнимы только внутри эпохи)
+        version (int): Текущая версия ребенка на сервере
+        snapshot (bool): Полный снимок (клиент заменяет все записи)
+        records (List[SleepRecord]): Новые и измененные записи
+        removed (List[datetime]): Времена начала удаленных записей
+        child (Optional[Dict[str, Any]]): Имя, дата рождения и часовой
+                                          пояс ребенка (только в снимке)
+    """
+
+    epoch: str
+    version: int
+    snapshot: bool
+    records: List[SleepRecord]
+    removed: List[datetime]
+    child: Optional[Dict[str, Any]] = None
+
+
+def _encode_times(times: Sequence[datetime]) -> List[int]:
+    """
+    Кодирует возрастающие времена разностями в микросекундах.
+    """
+    encoded = []
+    previous = 0
+    for moment in times:
+        value = to_epoch_us(moment)
+        encoded.append(value - previous)
+        previous = value
+    return encoded
+
+
+def _decode_times(encoded: Sequence[int]) -> List[datetime]:
+    times = []
+    value = 0
+    for difference in encoded:
+        value += difference
+        times.append(from_epoch_us(value))
+    return times
+
+
+def encode_delta(delta: SyncDelta) -> Dict[str, Any]:
+    """
+    Кодирует дельту для передачи по сети (словарь для JSON).
+
+    Запись - список [разность начала с предыдущей, длительность или None]
+    и комментарий третьим элементом, если он не пустой.
+
+    Args:
+        delta (SyncDelta): Дельта
+
+    Returns:
+        Dict[str, Any]: Закодированная дельта
+    """
+    records = sorted(delta.records, key=lambda record: record.start_time)
+    starts = _encode_times([record.start_time for record in records])
+    rows: List[List[Any]] = []
+    for record, start in zip(records, starts):
+        duration = None
+        if record.end_time is not None:
+            duration = to_epoch_us(record.end_time) - to_epoch_us(record.start_time)
+        rows.append([start, duration, record.comment] if record.comment else [start, duration])
+    data: Dict[str, Any] = {"epoch": delta.epoch, "version": delta.version, "put": rows}
+    if delta.removed:
+        data["del"] = _encode_times(sorted(delta.removed))
+    if delta.snapshot:
+        data["snapshot"] = True
+        data["child"] = delta.child
+    return data
+
+
+def decode_delta(data: Dict[str, Any]) -> SyncDelta:
+    """
+    Восстанавливает дельту из encode_delta.
+
+    Args:
+        data (Dict[str, Any]): Закодированная дельта
+
+    Returns:
+        SyncDelta: Дельта
+    """
+    rows = data["put"]
+    starts = _decode_times([row[0] for row in rows])
+    records = []
+    for row, start in zip(rows, starts):
+        end = None if row[1] is None else start + timedelta(microseconds=row[1])
+        records.append(SleepRecord(start, end, row[2] if len(row) > 2 else ""))
+    return SyncDelta(
+        epoch=data["epoch"],
+        version=data["version"],
+        snapshot=data.get("snapshot", False),
+        records=records,
+        removed=_decode_times(data.get("del", [])),
+        child=data.get("child"),
+    )
+
+
+def encode_ops(ops: Sequence[SyncOp]) -> List[List[Any]]:
+    """
+    Кодирует правки устройства: ["s", начало, комментарий]
+    или ["e", начало, окончание, комментарий] (времена в микросекундах).
+    """
+    encoded: List[List[Any]] = []
+    for op in ops:
+        if op.kind == "start":
+            encoded.append(["s", to_epoch_us(op.start), op.comment])
+        else:
+            assert op.end is not None
+            encoded.append(["e", to_epoch_us(op.start), to_epoch_us(op.end), op.comment])
+    return encoded
+
+
+def decode_ops(encoded: Sequence[Sequence[Any]]) -> List[SyncOp]:
+    """
+    Восстанавливает правки из encode_ops.
+
+    Raises:
+        ValueError: Если правка не распознана
+    """
+    ops = []
+    for row in encoded:
+        if row[0] == "s":
+            ops.append(SyncOp("start", from_epoch_us(row[1]), comment=row[2]))
+        elif row[0] == "e":
+            ops.append(SyncOp("end", from_epoch_us(row[1]), from_epoch_us(row[2]), row[3]))
+        else:
+            raise ValueError(f"Неизвестная правка '{row[0]}'")
+    return ops
+
+
+def _merge_comment(comment: str, other: str) -> str:
+    """
+    Дописывает к комментарию строки other, которых в нем еще нет.
+    """
+    lines = comment.split("\n") if comment else []
+    for line in other.split("\n"):
+        if line and line not in lines:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _evidence(op: SyncOp) -> Evidence:
+    if op.kind == "start":
+        return (op.start, _START, None, op.comment)
+    if op.kind == "end":
+        assert op.end is not None
+        return (op.start, _END, op.end, op.comment)
+    raise ValueError(f"Неизвестная правка '{op.kind}'")
+
+
+def _record_evidence(record: SleepRecord) -> Evidence:
+    if record.end_time is None:
+        return (record.start_time, _START, None, record.comment)
+    return (record.start_time, _END, record.end_time, record.comment)
+
+
+def _reach(item: Evidence, closed: Set[datetime]) -> datetime:
+    """
+    Конец промежутка, который занимает правка.
+
+    Args:
+        item (Evidence): Правка
+        closed (Set[datetime]): Начала, для которых есть завершение сна
+    """
+    start, kind, end, _ = item
+    if kind == _END:
+        assert end is not None
+        return max(end, start + _TICK)
+    if start in closed:
+        return start + _TICK  # Сон уже завершен: промежуток задает завершение
+    return start + SAME_SLEEP_WINDOW + _TICK
+
+
+def _group(evidence: Iterable[Evidence]) -> List[Tuple[datetime, List[Evidence]]]:
+    """
+    Делит правки на группы пересекающихся промежутков.
+
+    Returns:
+        List[Tuple[datetime, List[Evidence]]]: Группы по порядку: конец
+                                               промежутка группы и ее правки
+                                               в каноническом порядке
+    """
+    items = sorted(evidence)
+    closed = {item[0] for item in items if item[1] == _END}
+    groups: List[Tuple[datetime, List[Evidence]]] = []
+    reach = datetime.min
+    for item in items:
+        if groups and item[0] < reach:
+            groups[-1][1].append(item)
+            reach = max(reach, _reach(item, closed))
+            groups[-1] = (reach, groups[-1][1])
+            continue
+        reach = _reach(item, closed)
+        groups.append((reach, [item]))
+    return groups
+
+
+def _sleep(group: List[Evidence]) -> SleepRecord:
+    """
+    Сон из правок одной группы (в каноническом порядке).
+    """
+    ends = [end for _, kind, end, _ in group if kind == _END and end is not None]
+    comment = ""
+    for *_, other in group:
+        comment = _merge_comment(comment, other)
+    return SleepRecord(group[0][0], min(ends) if ends else None, comment)
+
+
+def _is_closed(group: List[Evidence]) -> bool:
+    return any(item[1] == _END for item in group)
+
+
+def merge_evidence(evidence: Iterable[Evidence]) -> List[SleepRecord]:
+    """
+    Раскладывает правки по снам (правила - в описании модуля).
+
+    Результат зависит только от набора правок, а не от их порядка.
+
+    Args:
+        evidence (Iterable[Evidence]): Правки и исходные записи ребенка
+
+    Returns:
+        List[SleepRecord]: Записи в хронологическом порядке
+    """
+    groups = [items for _, items in _group(evidence)]
+    return [
+        _sleep(items)
+        for position, items in enumerate(groups)
+        if _is_closed(items) or position == len(groups) - 1
+    ]
+
+
+class _ChildLog:
+    """
+    Ребенок на сервере и журнал версий его записей.
+
+    Правки хранятся разложенными по группам (см. _group), чтобы новая
+    правка заново сливалась только с группами, которые она задевает.
+
+    Attributes:
+        child (Child): Состояние ребенка
+        evidence (Set[Evidence]): Исходные записи и все полученные правки
+        starts (List[datetime]): Начало промежутка каждой группы
+        reaches (List[datetime]): Конец промежутка каждой группы
+        groups (List[List[Evidence]]): Правки каждой группы
+        version (int): Последняя выданная версия
+        floor (int): Версии не выше floor забыты (клиенту нужен снимок)
+        versions (Dict[datetime, int]): Последняя версия каждого ключа из журнала
+        log (List[Tuple[int, datetime]]): Журнал (версия, время начала записи)
+        lock (threading.Lock): Блокировка запросов этого ребенка
+    """
+
+    __slots__ = (
+        "child",
+        "evidence",
+        "starts",
+        "reaches",
+        "groups",
+        "version",
+        "floor",
+        "versions",
+        "log",
+        "lock",
+    )
+
+    def __init__(self, child: Child) -> None:
+        self.child = child
+        self.evidence: Set[Evidence] = {
+            _record_evidence(record) for record in child.sleep_records
+        }
+        self.starts: List[datetime] = []
+        self.reaches: List[datetime] = []
+        self.groups: List[List[Evidence]] = []
+        self.regroup(0, 0, self.evidence)
+        self.version = 0
+        self.floor = 0
+        self.versions: Dict[datetime, int] = {}
+        self.log: List[Tuple[int, datetime]] = []
+        self.lock = threading.Lock()
+
+    def affected(self, new: Iterable[Evidence]) -> Tuple[int, int]:
+        """
+        Номера групп [first, last), которые задевают новые правки.
+
+        Если правки ничего не задевают, first == last - место их вставки.
+        """
+        first, last = len(self.groups), 0
+        for item in new:
+            start, reach = item[0], _reach(item, set())
+            lo = bisect_right(self.reaches, start)
+            first = min(first, lo)
+            last = max(last, lo, bisect_left(self.starts, reach))
+        return first, max(first, last)
+
+    def regroup(self, first: int, last: int, new: Iterable[Evidence]) -> int:
+        """
+        Заново делит на группы правки групп [first, last) вместе с new.
+
+        Returns:
+            int: Число получившихся групп (они встают на место [first, last))
+        """
+        items = [item for group in self.groups[first:last] for item in group]
+        items.extend(new)
+        groups = _group(items)
+        self.starts[first:last] = [group[0][0] for _, group in groups]
+        self.reaches[first:last] = [reach for reach, _ in groups]
+        self.groups[first:last] = [group for _, group in groups]
+        return len(groups)
+
+    def sleeps(self, first: int, last: int) -> Dict[datetime, SleepRecord]:
+        """
+        Записи групп [first, last): незавершенной остается только последняя.
+        """
+        final = len(self.groups) - 1
+        return {
+            group[0][0]: _sleep(group)
+            for position, group in enumerate(self.groups[first:last], first)
+            if _is_closed(group) or position == final
+        }
+
+    def touch(self, key: datetime) -> None:
+        self.version += 1
+        self.versions[key] = self.version
+        self.log.append((self.version, key))
+
+    def trim(self, max_log: int) -> None:
+        """
+        Забывает старую половину журнала, если он длиннее max_log.
+        """
+        if len(self.log) <= max_log:
+            return
+        cut = len(self.log) - max_log // 2
+        for version, key in self.log[:cut]:
+            if self.versions.get(key) == version:
+                del self.versions[key]
+        self.floor = self.log[cut - 1][0]
+        del self.log[:cut]
+
+
+class SyncServer:
+    """
+    Сервер синхронизации: версии записей, дельты и слияние правок.
+
+    Потокобезопасен: запросы одного ребенка выполняются под его
+    блокировкой, а разные дети синхронизируются параллельно.
+
+    Attributes:
+        storage (Optional[SleepStorage]): Хранилище (None - только в памяти)
+        max_log (int): Сколько версий на ребенка помнить для дельт
+        epoch (str): Эпоха сервера
+    """
+
+    def __init__(
+        self,
+        storage: Optional[SleepStorage] = None,
+        max_log: int = 10_000,
+        epoch: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            storage (Optional[SleepStorage]): Хранилище детей
+            max_log (int): Сколько версий на ребенка помнить для дельт
+            epoch (Optional[str]): Эпоха (по умолчанию случайная при создании)
+        """
+        if max_log < 2:
+            raise ValueError("Журнал версий должен вмещать хотя бы две версии")
+        self.storage = storage
+        self.max_log = max_log
+        self.epoch = epoch or uuid.uuid4().hex
+        self._logs: Dict[str, _ChildLog] = {}
+        self._lock = threading.Lock()
+
+    def add_child(self, child_id: str, child: Child) -> None:
+        """
+        Регистрирует ребенка (и сохраняет его в хранилище, если оно есть).
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            child (Child): Ребенок
+        """
+        if self.storage is not None:
+            self.storage.save_child(child_id, child)
+        log = _ChildLog(child)
+        with self._lock:
+            self._logs[child_id] = log
+
+    def version(self, child_id: str) -> int:
+        """
+        Текущая версия ребенка.
+
+        Raises:
+            ChildNotFoundError: Если ребенок не найден
+        """
+        log = self._log(child_id)
+        with log.lock:
+            return log.version
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Обрабатывает запрос клиента в сетевом виде (см. SyncClient.sync).
+
+        Args:
+            request (Dict[str, Any]): {"child", "epoch", "since", "ops"}
+
+        Returns:
+            Dict[str, Any]: Дельта, закодированная encode_delta
+        """
+        delta = self.sync(
+            request["child"],
+            request.get("epoch"),
+            request.get("since", 0),
+            decode_ops(request.get("ops", [])),
+        )
+        return encode_delta(delta)
+
+    def sync(
+        self,
+        child_id: str,
+        epoch: Optional[str],
+        since: int,
+        ops: Sequence[SyncOp] = (),
+    ) -> SyncDelta:
+        """
+        Применяет правки клиента и возвращает изменения после его версии.
+
+        Args:
+            child_id (str): Идентификатор ребенка
+            epoch (Optional[str]): Эпоха, в которой получена версия клиента
+                                   (None - у клиента еще нет данных)
+            since (int): Последняя известная клиенту версия
+            ops (Sequence[SyncOp]): Правки клиента в порядке их выполнения
+
+        Returns:
+            SyncDelta: Дельта или снимок, если дельту выдать нельзя
+
+        Raises:
+            ChildNotFoundError: Если ребенок не найден
+        """
+        log = self._log(child_id)
+        with log.lock:
+            self._apply(child_id, log, ops)
+            if epoch != self.epoch or not log.floor <= since <= log.version:
+                delta = self._snapshot(log)
+            else:
+                delta = self._delta(log, since)
+            log.trim(self.max_log)
+            return delta
+
+    def _log(self, child_id: str) -> _ChildLog:
+        with self._lock:
+            log = self._logs.get(child_id)
+        if log is not None:
+            return log
+        if self.storage is None:
+            raise ChildNotFoundError(child_id)
+        # Ребенок загружается без общей блокировки: другие дети не ждут
+        loaded = _ChildLog(self.storage.load_child(child_id))
+        with self._lock:
+            return self._logs.setdefault(child_id, loaded)
+
+    def _snapshot(self, log: _ChildLog) -> SyncDelta:
+        child = log.child
+        return SyncDelta(
+            epoch=self.epoch,
+            version=log.version,
+            snapshot=True,
+            records=[_copy(record) for record in child.sleep_records],
+            removed=[],
+            child={
+                "name": child.name,
+                "birth_date": child.birth_date.isoformat(),
+                "timezone": child.timezone,
+            },
+        )
+
+    def _delta(self, log: _ChildLog, since: int) -> SyncDelta:
+        records, removed = [], []
+        for version, key in log.log[bisect_right(log.log, (since, datetime.max)) :]:
+            if log.versions.get(key) != version:
+                continue  # У ключа есть версия новее
+            record = log.child.find_record(key)
+            if record is None:
+                removed.append(key)
+            else:
+                records.append(_copy(record))
+        return SyncDelta(self.epoch, log.version, False, records, removed)
+
+    def _apply(self, child_id: str, log: _ChildLog, ops: Sequence[SyncOp]) -> None:
+        """
+        Добавляет правки клиента и заново сливает записи в задетом ими
+        промежутке времени (см. описание модуля).
+        """
+        new = {_evidence(op) for op in ops} - log.evidence
+        if not new:
+            return
+        log.evidence |= new
+        first, last = log.affected(new)
+        # Прежняя последняя группа перестает быть последней, и ее
+        # незавершенный сон отбрасывается, поэтому она тоже сравнивается
+        lo = min(first, max(len(log.groups) - 1, 0))
+        current = log.sleeps(lo, last)
+        count = log.regroup(first, last, new)
+        merged = log.sleeps(lo, first + count)
+        changed = sorted(
+            key for key in merged.keys() | current.keys() if merged.get(key) != current.get(key)
+        )
+        child = log.child
+        for key in changed:
+            if key in current:
+                child.remove_record(key)
+        child.add_records(_copy(merged[key]) for key in changed if key in merged)
+        self._store(child_id, child, changed, current, merged)
+
+        # Клиент получит новые записи и удаление своих ключей, слившихся с другими
+        orphans = {item[0] for item in new} - merged.keys() - set(changed)
+        for key in sorted(set(changed) | orphans):
+            log.touch(key)
+
+    def _store(
+        self,
+        child_id: str,
+        child: Child,
+        changed: List[datetime],
+        current: Dict[datetime, SleepRecord],
+        merged: Dict[datetime, SleepRecord],
+    ) -> None:
+        """
+        Сохраняет результат слияния: событием, если изменилась одна запись.
+        """
+        if self.storage is None or not changed:
+            return
+        if len(changed) == 1:
+            before, after = current.get(changed[0]), merged.get(changed[0])
+            if before is None and after is not None:
+                self.storage.append_records(child_id, [after])
+                return
+            if before is not None and before.end_time is None and after is not None:
+                self.storage.append_end(child_id, after)
+                return
+        self._save(child_id, child)
+
+    def _save(self, child_id: str, child: Child) -> None:
+        if self.storage is not None:
+            self.storage.save_child(child_id, child)
+
+
+def _copy(record: SleepRecord) -> SleepRecord:
+    return SleepRecord(record.start_time, record.end_time, record.comment)
+
+
+class SyncClient:
+    """
+    Устройство взрослого: локальная копия ребенка и неотправленные правки.
+
+    Правки сразу применяются к локальной копии и отправляются при
+    следующей синхронизации; если связи нет, они копятся в pending.
+
+    Attributes:
+        child_id (str): Идентификатор ребенка
+        transport (Transport): Отправка запроса серверу
+        child (Optional[Child]): Локальная копия (None - до первой синхронизации)
+        epoch (Optional[str]): Эпоха сервера
+        version (int): Последняя полученная версия
+        pending (List[SyncOp]): Неотправленные правки
+    """
+
+    def __init__(self, child_id: str, transport: Transport) -> None:
+        """
+        Args:
+            child_id (str): Идентификатор ребенка
+            transport (Transport): Отправка запроса серверу
+        """
+        self.child_id = child_id
+        self.transport = transport
+        self.child: Optional[Child] = None
+        self.epoch: Optional[str] = None
+        self.version = 0
+        self.pending: List[SyncOp] = []
+
+    def _local(self) -> Child:
+        if self.child is None:
+            raise ValueError("Ребенок еще не получен: сначала выполните синхронизацию")
+        return self.child
+
+    def start_sleep(self, start_time: datetime, comment: str = "") -> SleepRecord:
+        """
+        Начинает сон на устройстве.
+
+        Raises:
+            ValueError: Если на устройстве уже есть активный сон
+        """
+        record = self._local().start_sleep(start_time, comment)
+        self.pending.append(SyncOp("start", start_time, comment=comment))
+        return record
+
+    def end_sleep(self, end_time: datetime, comment: Optional[str] = None) -> SleepRecord:
+        """
+        Завершает активный сон на устройстве.
+
+        Raises:
+            ValueError: Если на устройстве нет активного сна
+        """
+        record = self._local().end_sleep(end_time, comment)
+        self.pending.append(SyncOp("end", record.start_time, end_time, comment or ""))
+        return record
+
+    def sync(self) -> SyncDelta:
+        """
+        Отправляет неотправленные правки и получает изменения с сервера.
+
+        Если транспорт выбросил исключение, правки остаются в pending
+        и будут отправлены повторно (сервер применит их один раз).
+
+        Returns:
+            SyncDelta: Полученная дельта или снимок
+        """
+        request = {
+            "child": self.child_id,
+            "epoch": self.epoch,
+            "since": self.version,
+            "ops": encode_ops(self.pending),
+        }
+        delta = decode_delta(self.transport(request))
+        if delta.snapshot or self.child is None:
+            info = delta.child or {}
+            self.child = Child(
+                name=info["name"],
+                birth_date=date.fromisoformat(info["birth_date"]),
+                sleep_records=delta.records,
+                timezone=info.get("timezone"),
+            )
+        else:
+            for key in delta.removed + [record.start_time for record in delta.records]:
+                self.child.remove_record(key)
+            self.child.add_records(delta.records)
+        self.epoch, self.version = delta.epoch, delta.version
+        self.pending = []
+        return delta
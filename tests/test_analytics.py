@@ -0,0 +1,140 @@
+"""
+Модуль с тестами для аналитики режима сна.
+
+Демонстрирует:
+1. Проверку показателей на небольшой истории, посчитанной вручную
+2. Сравнение векторизованного расчета с прямым перебором записей
+3. Пакетный расчет для многих детей и время расчета для длинной истории
+"""
+
+from datetime import date, datetime, timedelta
+import random
+import time
+
+import pytest
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.reports.analytics import analyze, analyze_children, sleep_norm
+
+
+def _random_child(count, seed=7, timezone=None, start=datetime(2024, 1, 1, 20, 0)):
+    """
+    Ребенок со случайной историей: ночной сон и 1-3 дневных сна в день.
+    """
+    rng = random.Random(seed)
+    records = []
+    current = start
+    while len(records) < count:
+        end = current + timedelta(hours=rng.uniform(8, 12))
+        records.append(SleepRecord(current, end))
+        current = end
+        for _ in range(rng.randint(1, 3)):
+            current += timedelta(hours=rng.uniform(1.5, 3.5))
+            end = current + timedelta(minutes=rng.uniform(20, 120))
+            records.append(SleepRecord(current, end))
+            current = end
+        evening = datetime.combine(current.date(), datetime.min.time())
+        current = max(evening + timedelta(hours=rng.uniform(19, 22)), current + timedelta(hours=1))
+    return Child(
+        name="Анна", birth_date=date(2023, 6, 1), sleep_records=records, timezone=timezone
+    )
+
+
+def test_small_history():
+    """
+    Тест показателей на двух днях, посчитанных вручную.
+    """
+    day = date(2024, 5, 10)
+
+    def at(hours, minutes=0):
+        return datetime.combine(day, datetime.min.time()) + timedelta(hours=hours, minutes=minutes)
+
+    child = Child(
+        name="Анна",
+        birth_date=date(2024, 1, 1),
+        sleep_records=[
+            SleepRecord(at(-4), at(7)),  # ночь с 20:00
+            SleepRecord(at(9, 30), at(11)),  # окно 2:30
+            SleepRecord(at(14), at(15)),  # окно 3:00
+            SleepRecord(at(20, 30), at(31)),  # окно 5:30, отход ко сну 20:30
+            SleepRecord(at(34), at(35, 30)),  # окно 3:00, 11 мая
+        ],
+    )
+    analytics = analyze("anna", child, day, day + timedelta(days=1))
+
+    # Сон относится к дню, в который закончился (как в Child.get_sleep_stats)
+    assert analytics.sleep_minutes == [7 * 60 + 90 + 60, 7 * 60 + 90]
+    assert analytics.naps == [2, 1]
+    assert analytics.nap_minutes == [150, 90]
+    assert analytics.wake_windows == [3, 1]
+    assert analytics.wake_minutes == [150 + 180 + 330, 180]
+    assert analytics.average_wake_window_minutes == (150 + 180 + 330 + 180) / 4
+    assert analytics.bedtimes == [8 * 60 + 30, None]
+    assert analytics.bedtime_std_minutes is None
+    assert analytics.nap_regularity == 0.5
+    assert analytics.rolling_sleep_minutes(7) == [570.0, (570 + 510) / 2]
+    assert analytics.sleep_trend == pytest.approx(510 - 570)
+
+    assert analytics.age_months == child.age_months
+    assert analytics.sleep_norm == sleep_norm(child.age_months)
+    assert sleep_norm(2) == (14 * 60, 17 * 60)
+    assert sleep_norm(30) == (10 * 60, 13 * 60)
+    with pytest.raises(ValueError):
+        analyze("anna", child, day, day - timedelta(days=1))
+
+
+@pytest.mark.parametrize("timezone", [None, "Europe/Berlin"])
+def test_matches_brute_force(timezone):
+    """
+    Тест совпадения с прямым перебором записей (в том числе через переход
+    на летнее время).
+    """
+    child = _random_child(400, timezone=timezone, start=datetime(2024, 2, 20, 19, 0))
+    first_day, last_day = date(2024, 3, 1), date(2024, 4, 20)
+    analytics = analyze("anna", child, first_day, last_day)
+
+    stats = child.get_sleep_stats_range(first_day, last_day)
+    assert analytics.sleep_minutes == [sleep_minutes for _, sleep_minutes, _ in stats]
+
+    calendar = child.calendar
+    records = child.sleep_records
+    for offset in range((last_day - first_day).days + 1):
+        day = first_day + timedelta(days=offset)
+        day_records = child.get_sleep_stats(day)[2]
+        naps = [
+            record for record in day_records if 8 <= calendar.to_local(record.start_time).hour < 20
+        ]
+        assert analytics.naps[offset] == len(naps)
+
+        windows = [
+            int((record.start_time - previous.end_time).total_seconds() // 60)
+            for previous, record in zip(records, records[1:])
+            if calendar.day_of(record.start_time) == day
+        ]
+        assert (analytics.wake_windows[offset], analytics.wake_minutes[offset]) == (
+            len(windows),
+            sum(windows),
+        )
+
+
+def test_batch_and_latency():
+    """
+    Тест пакетного расчета.
+    Проверяем:
+    1. Результат для ребенка в пачке совпадает с отдельным расчетом
+    2. Порядок детей сохраняется при разбиении на пачки
+    3. История из 10k записей считается быстрее секунды
+    """
+    children = [(f"child-{seed}", _random_child(300, seed=seed)) for seed in range(25)]
+    first_day, last_day = date(2024, 1, 1), date(2024, 3, 31)
+    results = list(analyze_children(children, first_day, last_day, chunk_size=10))
+    assert [result.child_id for result in results] == [child_id for child_id, _ in children]
+    assert results[13] == analyze("child-13", children[13][1], first_day, last_day)
+
+    child = _random_child(10_000)
+    last_day = child.sleep_records[-1].start_time.date()
+    started = time.perf_counter()
+    analytics = analyze("anna", child, last_day - timedelta(days=3 * 365), last_day)
+    assert time.perf_counter() - started < 1.0
+    assert sum(analytics.naps) > 0 and analytics.bedtime_std_minutes is not None
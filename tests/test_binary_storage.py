@@ -0,0 +1,127 @@
+"""
+Модуль с тестами для двоичного файла записей о сне.
+
+Демонстрирует:
+1. Проверку формата файла и обработку поврежденных файлов
+2. Расчет статистики прямо по отображенной памяти
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from sleep_tracker.core.exceptions import ChildNotFoundError, StorageError
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.storage.binary import (
+    RECORD_DTYPE,
+    RecordFile,
+    write_children,
+)
+
+
+@pytest.fixture
+def children():
+    """
+    Фикстура с двумя детьми: история со снами через полночь и активным сном.
+    """
+    first = Child(name="Анна", birth_date=date(2023, 1, 1))
+    start = datetime(2024, 3, 1, 20, 0)
+    for day in range(20):
+        first.start_sleep(start + timedelta(days=day), "Ночной сон" if day % 2 else "")
+        first.end_sleep(start + timedelta(days=day, hours=10, minutes=day))
+    first.start_sleep(datetime(2024, 3, 21, 13, 0), "Дневной сон")
+
+    second = Child(name="Борис", birth_date=date(2022, 5, 1))
+    second.add_records([
+        SleepRecord(datetime(2024, 3, 5, 13, 0), datetime(2024, 3, 5, 14, 30), "Ночной сон"),
+    ])
+    return {7: first, 3: second}
+
+
+def test_round_trip(tmp_path, children):
+    """
+    Тест записи и чтения файла.
+    Проверяем:
+    1. Фиксированный размер записи и сортировку по ребенку
+    2. Восстановление записей, комментариев и активного сна
+    """
+    path = tmp_path / "records.bin"
+    write_children(path, children)
+
+    with RecordFile(path) as record_file:
+        assert RECORD_DTYPE.itemsize == 32
+        assert len(record_file) == 22
+        assert record_file.child_ids() == [3, 7]
+        for child_id, child in children.items():
+            loaded = record_file.load_child(child_id, child.name, child.birth_date)
+            assert loaded == child
+            assert loaded.get_active_sleep() == child.get_active_sleep()
+        with pytest.raises(ChildNotFoundError):
+            record_file.to_records(5)
+
+
+def test_stats_on_mapped_buffer(tmp_path, children):
+    """
+    Тест статистики по отображенному буферу: совпадает с Child
+    и не копирует данные.
+    """
+    path = tmp_path / "records.bin"
+    write_children(path, children)
+    first_day, last_day = date(2024, 2, 28), date(2024, 3, 25)
+
+    with RecordFile(path) as record_file:
+        columns = record_file.columns(7)
+        assert not columns.starts_us.flags.owndata
+        minutes = record_file.daily_sleep_minutes(7, first_day, last_day)
+        expected = [sleep for _, sleep, _ in children[7].get_sleep_stats_range(first_day, last_day)]
+        assert minutes.tolist() == expected
+        del columns
+
+
+def test_invalid_file(tmp_path):
+    """
+    Тест открытия файла другого формата.
+    """
+    path = tmp_path / "broken.bin"
+    path.write_bytes(b"not a record file at all, definitely not" * 2)
+    with pytest.raises(StorageError):
+        RecordFile(path)
+
+    path.write_bytes(b"tiny")
+    with pytest.raises(StorageError):
+        RecordFile(path)
+
+
+def test_truncated_file(tmp_path, children):
+    """
+    Тест обрезанного файла.
+    Проверяем:
+    1. Обрезанная таблица записей - StorageError, а не ValueError numpy
+    2. Обрезанные комментарии - StorageError при чтении записей
+    """
+    path = tmp_path / "records.bin"
+    write_children(path, children)
+    data = path.read_bytes()
+
+    path.write_bytes(data[: len(data) // 2])
+    with pytest.raises(StorageError):
+        RecordFile(path)
+
+    path.write_bytes(data[:-3])
+    with RecordFile(path) as record_file:
+        with pytest.raises(StorageError):
+            record_file.to_records(7)
+
+
+def test_empty_file(tmp_path):
+    """
+    Тест пустого файла без записей.
+    """
+    path = tmp_path / "empty.bin"
+    write_children(path, {})
+    with RecordFile(path) as record_file:
+        assert len(record_file) == 0
+        assert record_file.child_ids() == []
+        assert np.array_equal(record_file.records["start"], np.zeros(0))
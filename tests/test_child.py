@@ -9,10 +9,12 @@
 """
 
 from datetime import datetime, date, timedelta
+import random
 import pytest
 from unittest.mock import patch
 
 from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
 
 
 @pytest.fixture
@@ -191,4 +193,213 @@ def test_get_sleep_stats(mock_date, sample_child):
     default_sleep_minutes, default_awake_minutes, default_records = sample_child.get_sleep_stats()
     assert default_sleep_minutes == sleep_minutes
     assert default_awake_minutes == awake_minutes
-    assert default_records == records 
\ No newline at end of file
+    assert default_records == records 
+
+def _reference_sleep_minutes(records, target_date):
+    """
+    Исходный алгоритм get_sleep_stats с полным просмотром истории.
+    Используется как эталон для проверки индекса.
+    """
+    day_records = [
+        record
+        for record in records
+        if record.end_time and record.end_time.date() == target_date
+    ]
+    total = 0
+    for record in day_records:
+        start = max(record.start_time, datetime.combine(target_date, datetime.min.time()))
+        total += int((record.end_time - start).total_seconds() / 60)
+    return total, day_records
+
+
+def _random_history(rng, count):
+    """
+    Генерирует историю сна без пересечений со случайными длительностями.
+    """
+    records = []
+    current = datetime(2024, 1, 1, 7, 0)
+    for _ in range(count):
+        current += timedelta(minutes=rng.randint(30, 300), seconds=rng.randint(0, 59))
+        end = current + timedelta(minutes=rng.randint(15, 720), microseconds=rng.randint(0, 999999))
+        records.append(SleepRecord(start_time=current, end_time=end))
+        current = end
+    return records
+
+
+def test_sleep_stats_index_matches_full_scan(sample_child):
+    """
+    Тест индекса записей.
+    Проверяем, что статистика через индекс совпадает с полным просмотром
+    истории для каждого дня, включая сны через полночь.
+    """
+    rng = random.Random(42)
+    records = _random_history(rng, 300)
+    sample_child.add_records(records)
+
+    first_day = records[0].start_time.date()
+    last_day = records[-1].end_time.date()
+    day = first_day
+    while day <= last_day + timedelta(days=1):
+        expected_minutes, expected_records = _reference_sleep_minutes(records, day)
+        sleep_minutes, awake_minutes, day_records = sample_child.get_sleep_stats(day)
+        assert sleep_minutes == expected_minutes
+        assert awake_minutes == 24 * 60 - expected_minutes
+        assert day_records == expected_records
+        day += timedelta(days=1)
+
+
+def test_add_records_keeps_chronological_order(sample_child):
+    """
+    Тест массового добавления записей.
+    Проверяем:
+    1. Сортировку записей, добавленных не по порядку
+    2. Вставку старой записи через start_sleep в середину истории
+    """
+    late = SleepRecord(datetime(2024, 3, 15, 13, 0), datetime(2024, 3, 15, 15, 0))
+    early = SleepRecord(datetime(2024, 3, 14, 13, 0), datetime(2024, 3, 14, 14, 0))
+    sample_child.add_records([late, early])
+    assert sample_child.sleep_records == [early, late]
+
+    middle = sample_child.start_sleep(datetime(2024, 3, 14, 20, 0))
+    sample_child.end_sleep(datetime(2024, 3, 15, 6, 0))
+    assert sample_child.sleep_records == [early, middle, late]
+
+    sleep_minutes, _, records = sample_child.get_sleep_stats(date(2024, 3, 15))
+    assert sleep_minutes == 6 * 60 + 2 * 60
+    assert records == [middle, late]
+
+
+def test_get_records_between(sample_child):
+    """
+    Тест выборки записей за произвольный интервал.
+    Проверяем:
+    1. Попадание записей, пересекающих границы интервала
+    2. Учет активного сна
+    """
+    night = SleepRecord(datetime(2024, 3, 14, 20, 0), datetime(2024, 3, 15, 6, 0))
+    nap = SleepRecord(datetime(2024, 3, 15, 13, 0), datetime(2024, 3, 15, 15, 0))
+    sample_child.add_records([night, nap])
+    active = sample_child.start_sleep(datetime(2024, 3, 15, 20, 0))
+
+    assert sample_child.get_records_between(
+        datetime(2024, 3, 15, 5, 0), datetime(2024, 3, 15, 14, 0)
+    ) == [night, nap]
+    assert sample_child.get_records_between(
+        datetime(2024, 3, 15, 16, 0), datetime(2024, 3, 16, 0, 0)
+    ) == [active]
+    assert sample_child.get_records_between(
+        datetime(2024, 3, 15, 7, 0), datetime(2024, 3, 15, 12, 0)
+    ) == []
+
+
+def test_active_sleep_tracking(sample_child):
+    """
+    Тест отслеживания активного сна.
+    Проверяем:
+    1. Активную запись после start_sleep и ее сброс после end_sleep
+    2. Завершение записи напрямую через SleepRecord.end_sleep
+    3. Запрет второй активной записи при массовом добавлении
+    """
+    assert sample_child.get_active_sleep() is None
+
+    record = sample_child.start_sleep(datetime(2024, 3, 15, 13, 0))
+    assert sample_child.get_active_sleep() is record
+    sample_child.end_sleep(datetime(2024, 3, 15, 15, 0))
+    assert sample_child.get_active_sleep() is None
+
+    record = sample_child.start_sleep(datetime(2024, 3, 15, 20, 0))
+    record.end_sleep(datetime(2024, 3, 16, 6, 0))
+    assert sample_child.get_active_sleep() is None
+    assert sample_child.get_sleep_stats(date(2024, 3, 16))[0] == 6 * 60
+
+    sample_child.start_sleep(datetime(2024, 3, 16, 13, 0))
+    with pytest.raises(ValueError) as exc_info:
+        sample_child.add_records([SleepRecord(start_time=datetime(2024, 3, 17, 13, 0))])
+    assert "Уже есть активная запись о сне" in str(exc_info.value)
+
+
+def test_rebuild_index_after_loading():
+    """
+    Тест восстановления состояния при загрузке записей.
+    Проверяем:
+    1. Поиск активной записи среди загруженных
+    2. Ошибку при нескольких активных записях
+    3. Перестроение после прямого изменения списка
+    """
+    closed = SleepRecord(datetime(2024, 3, 15, 13, 0), datetime(2024, 3, 15, 15, 0))
+    active = SleepRecord(datetime(2024, 3, 15, 20, 0))
+    child = Child(name="Тест", birth_date=date(2023, 1, 1), sleep_records=[active, closed])
+    assert child.sleep_records == [closed, active]
+    assert child.get_active_sleep() is active
+
+    with pytest.raises(ValueError) as exc_info:
+        Child(
+            name="Тест",
+            birth_date=date(2023, 1, 1),
+            sleep_records=[active, SleepRecord(datetime(2024, 3, 16, 20, 0))],
+        )
+    assert "активных записей" in str(exc_info.value)
+
+    child.sleep_records.remove(active)
+    child.rebuild_index()
+    assert child.get_active_sleep() is None
+
+
+def test_sleep_stats_cache(sample_child):
+    """
+    Тест кэша статистики по дням.
+    Проверяем:
+    1. Попадания и промахи
+    2. Сброс обоих дней при завершении сна через полночь
+    3. Защиту кэша от изменения возвращенного списка
+    """
+    today, tomorrow = date(2024, 3, 15), date(2024, 3, 16)
+    sample_child.start_sleep(datetime(2024, 3, 15, 13, 0))
+    sample_child.end_sleep(datetime(2024, 3, 15, 15, 0))
+
+    assert sample_child.get_sleep_stats(today)[0] == 120
+    assert sample_child.get_sleep_stats(tomorrow)[0] == 0
+    records = sample_child.get_sleep_stats(today)[2]
+    records.clear()
+    assert len(sample_child.get_sleep_stats(today)[2]) == 1
+    assert sample_child.cache_info()[:2] == (2, 2)
+
+    sample_child.start_sleep(datetime(2024, 3, 15, 20, 0))
+    sample_child.end_sleep(datetime(2024, 3, 16, 6, 0))
+    assert sample_child.cache_info().currsize == 0
+    assert sample_child.get_sleep_stats(today)[0] == 120
+    assert sample_child.get_sleep_stats(tomorrow)[0] == 6 * 60
+
+    sample_child.cache_clear()
+    assert sample_child.cache_info() == (0, 0, Child.STATS_CACHE_SIZE, 0)
+
+
+def test_sleep_stats_cache_invalidation(sample_child, monkeypatch):
+    """
+    Тест сброса и вытеснения кэша.
+    Проверяем:
+    1. Сброс только затронутых дней при массовом добавлении
+    2. Сон, завершенный напрямую через SleepRecord.end_sleep
+    3. Ограничение размера кэша (LRU)
+    """
+    monkeypatch.setattr(Child, "STATS_CACHE_SIZE", 3)
+    days = [date(2024, 3, 10) + timedelta(days=offset) for offset in range(3)]
+    for day in days:
+        sample_child.get_sleep_stats(day)
+
+    sample_child.add_records([
+        SleepRecord(datetime(2024, 3, 11, 13, 0), datetime(2024, 3, 11, 14, 0)),
+    ])
+    assert sample_child.cache_info().currsize == 2
+    assert sample_child.get_sleep_stats(days[1])[0] == 60
+
+    record = sample_child.start_sleep(datetime(2024, 3, 11, 20, 0))
+    record.end_sleep(datetime(2024, 3, 12, 7, 0))
+    assert sample_child.get_sleep_stats(days[2])[0] == 7 * 60
+
+    sample_child.get_sleep_stats(date(2024, 3, 20))
+    sample_child.get_sleep_stats(date(2024, 3, 21))
+    assert sample_child.cache_info().currsize == 3
+    misses = sample_child.cache_info().misses
+    sample_child.get_sleep_stats(days[0])
+    assert sample_child.cache_info().misses == misses + 1
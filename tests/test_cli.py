@@ -0,0 +1,112 @@
+"""
+Модуль с тестами для интерфейса командной строки.
+
+Демонстрирует:
+1. Проверку команд через main(argv) на временной базе
+2. Запуск команды в отдельном процессе с -X importtime
+"""
+
+from datetime import date, datetime
+import subprocess
+import sys
+
+import pytest
+
+from sleep_tracker.interfaces.cli.main import main
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+
+@pytest.fixture
+def run(tmp_path, capsys):
+    """
+    Фикстура: запускает команду на временной базе и возвращает (код, вывод, ошибки).
+    """
+    database = str(tmp_path / "cli.db")
+
+    def run(*arguments):
+        code = main(["--db", database, *arguments])
+        captured = capsys.readouterr()
+        return code, captured.out, captured.err
+
+    run.database = database
+    return run
+
+
+def test_commands(run):
+    """
+    Тест основных команд.
+    Проверяем:
+    1. start и stop сохраняют запись в хранилище
+    2. status показывает текущий сон и итоги дня
+    3. report строит отчет по дневным итогам
+    4. Ошибки выводятся в stderr с кодом 1
+    5. Повторная регистрация меняет данные ребенка, сохраняя историю сна
+    """
+    assert run("register", "Анна", "2023-01-01")[0] == 0
+    assert run("start", "--at", "2024-03-05T13:00", "после", "прогулки") == (
+        0,
+        "Сон начат в 13:00\n",
+        "",
+    )
+    code, _, error = run("start", "--at", "2024-03-05T14:00")
+    assert code == 1 and "активная запись" in error
+    assert "Анна спит с 13:00" in run("status")[1]
+    assert run("stop", "--at", "2024-03-05T14:30")[1] == "Сон завершен, длительность 01:30\n"
+    assert "Анна не спит" in run("status")[1]
+
+    code, output, _ = run("report", "week", "--date", "2024-03-05")
+    assert code == 0
+    assert "05.03.2024  сон 01:30" in output
+    assert output.count("\n") == 8
+
+    # Повторная регистрация не стирает историю сна
+    assert run("register", "Анна", "2023-01-02") == (
+        0,
+        "Данные Анна обновлены, записей о сне: 1\n",
+        "",
+    )
+    assert "05.03.2024  сон 01:30" in run("report", "day", "--date", "2024-03-05")[1]
+
+    code, _, error = run("--child", "boris", "status")
+    assert code == 1 and "boris" in error
+
+    with SQLiteStorage(run.database) as storage:
+        (record,) = storage.load_child("default").sleep_records
+        assert (record.start_time, record.end_time, record.comment) == (
+            datetime(2024, 3, 5, 13, 0),
+            datetime(2024, 3, 5, 14, 30),
+            "после прогулки",
+        )
+        assert [rollup.day for rollup in storage.get_rollups("default")] == [
+            date(2024, 3, 5)
+        ]
+
+
+def test_start_skips_heavy_imports(run):
+    """
+    Тест холодного запуска: start и stop не загружают NumPy, pandas и telegram.
+    """
+    run("register", "Анна", "2023-01-01")
+    for arguments in (["start", "--at", "2024-03-05T13:00"], ["stop", "--at", "2024-03-05T14:00"]):
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-m",
+                "sleep_tracker.interfaces.cli",
+                "--db",
+                run.database,
+                *arguments,
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        modules = {
+            line.split("|")[-1].strip()
+            for line in completed.stderr.splitlines()
+            if line.startswith("import time:")
+        }
+        assert "sleep_tracker.services.storage.sqlite" in modules
+        assert not {"numpy", "pandas", "telegram"} & modules
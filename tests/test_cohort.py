@@ -0,0 +1,147 @@
+"""
+Модуль с тестами для статистики сна по возрастным группам.
+
+Демонстрирует:
+1. Процентили гистограммы и их ошибку относительно точных
+2. Совпадение с прямым расчетом по дням всех детей
+3. Одинаковый результат при любом числе процессов и размере пачки
+"""
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import random
+
+import numpy as np
+import pytest
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.services.reports.cohort import CohortService, CohortStats, MinuteSketch
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+FIRST_DAY, LAST_DAY = date(2024, 3, 1), date(2024, 5, 31)
+
+
+def _children(count, seed=11):
+    """
+    Дети разного возраста со случайными историями (фиксированный seed).
+    """
+    rng = random.Random(seed)
+    children = []
+    for number in range(count):
+        birth_date = date(2024, 4, 15) - timedelta(days=rng.randint(0, 7 * 365))
+        timezone = "Europe/Berlin" if number % 3 == 0 else None
+        child = Child(name=f"Ребенок {number}", birth_date=birth_date, timezone=timezone)
+        current = datetime(2024, 2, 25, 20, 0) + timedelta(minutes=rng.randint(0, 600))
+        for _ in range(rng.randint(0, 250)):
+            child.start_sleep(current)
+            current += timedelta(minutes=rng.randint(20, 700))
+            child.end_sleep(current)
+            current += timedelta(minutes=rng.randint(60, 300))
+        children.append((f"child-{number}", child))
+    return children
+
+
+def _age_months(birth_date, day):
+    return (
+        (day.year - birth_date.year) * 12
+        + (day.month - birth_date.month)
+        - (day.day < birth_date.day)
+    )
+
+
+def test_sketch_quantiles():
+    """
+    Тест гистограммы.
+    Проверяем:
+    1. С шагом в минуту процентили точные, с шагом 5 минут - с ошибкой до 2 минут
+    2. Объединение частей равно гистограмме всех значений
+    3. Пустая гистограмма и несовместимые шаги
+    """
+    rng = np.random.default_rng(3)
+    values = rng.integers(300, 1000, size=5_000)
+    exact, coarse = MinuteSketch(), MinuteSketch(bin_minutes=5)
+    exact.add(values)
+    coarse.add(values)
+    for q in (0.0, 0.1, 0.5, 0.9, 0.99, 1.0):
+        expected = float(np.percentile(values, q * 100, method="inverted_cdf"))
+        assert exact.quantile(q) == expected
+        assert abs(coarse.quantile(q) - expected) <= 2
+    assert exact.mean() == pytest.approx(values.mean())
+
+    merged = MinuteSketch()
+    merged.add(values[:1234])
+    other = MinuteSketch()
+    other.add(values[1234:])
+    merged.merge(other)
+    assert merged == exact
+
+    assert MinuteSketch().quantile(0.5) is None
+    with pytest.raises(ValueError):
+        exact.merge(coarse)
+    with pytest.raises(ValueError):
+        exact.quantile(1.5)
+
+
+@pytest.mark.parametrize("executor_class", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_matches_exact_percentiles(executor_class):
+    """
+    Тест статистики по группам.
+    Проверяем:
+    1. Медиана и p90 каждой группы совпадают с точными по всем дням детей
+    2. Количество детей и дней в группах
+    """
+    children = _children(40)
+    with executor_class(max_workers=2) as executor:
+        stats = CohortService(max_workers=2, chunk_size=6).aggregate(
+            children, FIRST_DAY, LAST_DAY, executor
+        )
+
+    groups = CohortStats.empty(FIRST_DAY, LAST_DAY)
+    exact_days = {bucket.label: [] for bucket in groups.buckets}
+    exact_children = Counter()
+    for _, child in children:
+        labels = set()
+        for day, sleep_minutes, _ in child.get_sleep_stats_range(FIRST_DAY, LAST_DAY):
+            age = _age_months(child.birth_date, day)
+            if sleep_minutes and age >= 0:
+                label = groups.bucket(age).label
+                exact_days[label].append(sleep_minutes)
+                labels.add(label)
+        exact_children.update(labels)
+
+    assert sum(bucket.days for bucket in stats.buckets) > 1000
+    for bucket in stats.buckets:
+        days = exact_days[bucket.label]
+        assert bucket.days == len(days)
+        assert bucket.children == exact_children[bucket.label]
+        if days:
+            assert bucket.median == float(np.percentile(days, 50, method="inverted_cdf"))
+            assert bucket.p90 == float(np.percentile(days, 90, method="inverted_cdf"))
+        else:
+            assert bucket.median is None
+
+
+def test_deterministic_and_storage(tmp_path):
+    """
+    Тест независимости результата от пула, размера пачки и источника детей.
+    """
+    children = _children(15, seed=4)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        first = CohortService(chunk_size=1).aggregate(children, FIRST_DAY, LAST_DAY, executor)
+    second = CohortService(max_workers=2, chunk_size=7).aggregate(
+        reversed(children), FIRST_DAY, LAST_DAY
+    )
+    assert first == second
+
+    with SQLiteStorage(tmp_path / "sleep.db") as storage:
+        for child_id, child in children:
+            storage.save_child(child_id, child)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            loaded = CohortService().aggregate_storage(storage, FIRST_DAY, LAST_DAY, executor)
+    assert loaded == first
+
+    with pytest.raises(ValueError):
+        CohortService().aggregate(children, LAST_DAY, FIRST_DAY)
+    with pytest.raises(ValueError):
+        first.merge(CohortStats.empty(FIRST_DAY, FIRST_DAY))
@@ -0,0 +1,122 @@
+"""
+Модуль с тестами для колоночного представления записей и статистики
+за диапазон дат.
+
+Демонстрирует:
+1. Проверку свойств на случайных данных с фиксированным seed
+2. Сравнение векторизованного и поэлементного вычисления
+"""
+
+from datetime import date, datetime, timedelta
+import random
+
+import pytest
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.columns import (
+    NO_END,
+    RecordColumns,
+    from_epoch_us,
+    to_epoch_us,
+)
+from sleep_tracker.core.models.sleep_record import SleepRecord
+
+
+def _random_child(rng):
+    """
+    Создает ребенка со случайной историей: короткие и многодневные сны,
+    доли секунд во времени и активный сон в конце.
+    """
+    child = Child(name="Тест", birth_date=date(2023, 1, 1))
+    current = datetime(2024, 1, 1, 0, 0) + timedelta(minutes=rng.randint(0, 1440))
+    records = []
+    for _ in range(rng.randint(0, 200)):
+        current += timedelta(seconds=rng.randint(0, 8 * 3600), microseconds=rng.randint(0, 999999))
+        length = rng.choice([
+            timedelta(seconds=rng.randint(0, 120)),
+            timedelta(minutes=rng.randint(20, 180)),
+            timedelta(hours=rng.randint(6, 14), microseconds=rng.randint(0, 999999)),
+            timedelta(days=rng.randint(1, 3), minutes=rng.randint(0, 600)),
+        ])
+        records.append(SleepRecord(start_time=current, end_time=current + length))
+        current += length
+    if rng.random() < 0.5:
+        records.append(SleepRecord(start_time=current + timedelta(hours=1)))
+    child.add_records(records)
+    return child
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_range_stats_match_daily_stats(seed):
+    """
+    Свойство: статистика за диапазон совпадает с get_sleep_stats
+    для каждого дня, в том числе для дней до и после истории.
+    """
+    rng = random.Random(seed)
+    child = _random_child(rng)
+    first_day = date(2023, 12, 30) + timedelta(days=rng.randint(0, 10))
+    last_day = first_day + timedelta(days=rng.randint(0, 120))
+
+    stats = child.get_sleep_stats_range(first_day, last_day)
+
+    assert [day for day, _, _ in stats] == [
+        first_day + timedelta(days=offset)
+        for offset in range((last_day - first_day).days + 1)
+    ]
+    for day, sleep_minutes, awake_minutes in stats:
+        expected_sleep, expected_awake, _ = child.get_sleep_stats(day)
+        assert (sleep_minutes, awake_minutes) == (expected_sleep, expected_awake)
+
+
+def test_range_stats_empty_range():
+    """
+    Тест пустого диапазона: конец раньше начала.
+    """
+    child = Child(name="Тест", birth_date=date(2023, 1, 1))
+    assert child.get_sleep_stats_range(date(2024, 3, 2), date(2024, 3, 1)) == []
+
+
+def test_record_columns():
+    """
+    Тест преобразования записей в колонки.
+    Проверяем:
+    1. Перевод времени в микросекунды и обратно
+    2. Отметку активного сна значением NO_END
+    """
+    moment = datetime(2024, 3, 15, 20, 30, 15, 123456)
+    assert from_epoch_us(to_epoch_us(moment)) == moment
+
+    records = [
+        SleepRecord(datetime(2024, 3, 15, 13, 0), datetime(2024, 3, 15, 15, 0)),
+        SleepRecord(datetime(2024, 3, 15, 20, 0)),
+    ]
+    columns = RecordColumns.from_records(records)
+    assert len(columns) == 2
+    assert from_epoch_us(columns.starts_us[1]) == datetime(2024, 3, 15, 20, 0)
+    assert from_epoch_us(columns.ends_us[0]) == datetime(2024, 3, 15, 15, 0)
+    assert columns.ends_us[1] == NO_END
+
+
+def test_packed_records_round_trip():
+    """
+    Тест упакованного хранилища.
+    Проверяем:
+    1. Восстановление записей с комментариями и активным сном
+    2. Общую таблицу для повторяющихся комментариев
+    3. Создание ребенка из упакованных записей
+    """
+    child = _random_child(random.Random(7))
+    child.sleep_records[0].comment = "Уснул быстро"
+    child.sleep_records[-1].comment = "Уснул быстро"
+    packed = child.pack_records()
+
+    assert len(packed) == len(child.sleep_records)
+    assert packed.to_records() == child.sleep_records
+    assert packed[-1] == child.sleep_records[-1]
+    assert packed.comment_table == ["", "Уснул быстро"]
+    with pytest.raises(IndexError):
+        packed[len(packed)]
+
+    restored = Child.from_packed(child.name, child.birth_date, packed)
+    assert restored == child
+    assert restored.get_active_sleep() == child.get_active_sleep()
@@ -0,0 +1,213 @@
+"""
+Модуль с тестами для границ дней в часовом поясе ребенка.
+
+Демонстрирует:
+1. Дни по 23 и 25 часов при переходе на летнее и зимнее время
+2. Совпадение статистики за день, за диапазон и из SQLite
+3. Смену часового пояса (путешествие) без изменения записей
+4. Местные дни в итогах SQLite, SleepTracker, пакетных отчетах и выгрузке
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import random
+
+import pytest
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.days import DayCalendar
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.reports.batch import BatchReportService
+from sleep_tracker.services.reports.export import iter_day_rows, iter_record_rows
+from sleep_tracker.services.reports.report import report_from_rollups
+from sleep_tracker.services.storage.rollups import DayRollup, verify_rollups
+from sleep_tracker.services.storage.serialization import child_from_dict, child_to_dict
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+from sleep_tracker.services.tracker.accumulator import DayTotals
+from sleep_tracker.services.tracker.service import SleepTracker
+
+# В 2024 году Европа перешла на летнее время 31 марта, на зимнее - 27 октября
+SPRING, AUTUMN = date(2024, 3, 31), date(2024, 10, 27)
+
+
+def _child(timezone, seed=3):
+    """
+    Ребенок со случайной историей вокруг обоих переходов (время в UTC).
+    """
+    rng = random.Random(seed)
+    records = []
+    for first_day in (SPRING, AUTUMN):
+        current = datetime.combine(first_day - timedelta(days=5), datetime.min.time())
+        while current.date() < first_day + timedelta(days=5):
+            end = current + timedelta(minutes=rng.randint(30, 660))
+            records.append(SleepRecord(current, end))
+            current = end + timedelta(minutes=rng.randint(60, 240))
+    return Child(
+        name="Анна", birth_date=date(2023, 1, 1), sleep_records=records, timezone=timezone
+    )
+
+
+def test_dst_day_lengths():
+    """
+    Тест границ дней.
+    Проверяем:
+    1. Дни перехода длятся 23 и 25 часов, остальные - 24
+    2. Границы - местные полуночи в UTC, в том числе через границу года
+    3. Без часового пояса дни по 24 часа
+    """
+    berlin = DayCalendar("Europe/Berlin")
+    for day, hours in [(SPRING, 23), (AUTUMN, 25), (date(2024, 6, 1), 24)]:
+        start, end = berlin.day_bounds(day)
+        assert end - start == timedelta(hours=hours)
+    assert berlin.day_bounds(SPRING)[0] == datetime(2024, 3, 30, 23, 0)
+    assert berlin.day_bounds(AUTUMN)[1] == datetime(2024, 10, 27, 23, 0)
+
+    bounds = berlin.bounds_us(date(2024, 12, 30), date(2025, 1, 2))
+    assert len(bounds) == 5
+    assert {second - first for first, second in zip(bounds, bounds[1:])} == {
+        24 * 3600 * 1_000_000
+    }
+
+    assert DayCalendar().day_bounds(SPRING) == (
+        datetime(2024, 3, 31),
+        datetime(2024, 4, 1),
+    )
+    with pytest.raises(ValueError):
+        Child(name="Анна", birth_date=date(2023, 1, 1), timezone="Mars/Olympus")
+
+
+def test_stats_across_dst(tmp_path):
+    """
+    Тест статистики около переходов.
+    Проверяем:
+    1. Ночь через переход на летнее время на час короче, на зимнее - длиннее
+    2. Сон плюс бодрствование равны длине дня
+    3. get_sleep_stats, get_sleep_stats_range и SQLite дают одно и то же
+    4. Бодрствование в итогах дня, SleepTracker и отчетах считается от той же
+       длины дня, а у итогов за неделю его нет
+    """
+    child = Child(
+        name="Анна",
+        birth_date=date(2023, 1, 1),
+        sleep_records=[
+            # 20:00 - 07:00 по местному времени
+            SleepRecord(datetime(2024, 3, 30, 19, 0), datetime(2024, 3, 31, 5, 0)),
+            SleepRecord(datetime(2024, 10, 26, 18, 0), datetime(2024, 10, 27, 6, 0)),
+        ],
+        timezone="Europe/Berlin",
+    )
+    assert child.get_sleep_stats(SPRING)[:2] == (6 * 60, 17 * 60)
+    assert child.get_sleep_stats(AUTUMN)[:2] == (8 * 60, 17 * 60)
+    assert child.get_sleep_stats(SPRING - timedelta(days=1))[0] == 0
+
+    child = _child("Europe/Berlin")
+    with SQLiteStorage(tmp_path / "days.db") as storage:
+        storage.save_child("anna", child)
+        loaded = storage.load_child("anna")
+        assert loaded.timezone == "Europe/Berlin"
+        for first_day in (SPRING, AUTUMN):
+            start, end = first_day - timedelta(days=4), first_day + timedelta(days=4)
+            stats = child.get_sleep_stats_range(start, end)
+            assert stats == storage.get_sleep_stats_range("anna", start, end)
+            for day, sleep_minutes, awake_minutes in stats:
+                assert child.get_sleep_stats(day)[:2] == (sleep_minutes, awake_minutes)
+                assert storage.get_sleep_stats("anna", day)[:2] == (sleep_minutes, awake_minutes)
+            lengths = {day: sleep + awake for day, sleep, awake in stats}
+            assert lengths[first_day] in (23 * 60, 25 * 60)
+
+            rollups = {rollup.day: rollup for rollup in storage.get_rollups("anna", start, end)}
+            tracker = SleepTracker(loaded, "anna")
+            report = report_from_rollups("anna", rollups.values(), start, end, child.calendar)
+            assert report.days == stats
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                (batch,) = BatchReportService().generate([("anna", child)], start, end, executor)
+            assert batch.days == stats
+            for day, _, awake_minutes in stats:
+                assert tracker.day(day).awake_minutes == awake_minutes
+                if day in rollups:
+                    assert rollups[day].awake_minutes(child.calendar) == awake_minutes
+            assert tracker.week(end).awake_minutes is None
+
+
+def test_timezone_change_and_serialization():
+    """
+    Тест смены часового пояса и сохранения его в словаре.
+    Проверяем:
+    1. Смена пояса меняет дни записей и сбрасывает кэш статистики
+    2. Пояс переживает child_to_dict и child_from_dict
+    """
+    child = Child(
+        name="Анна",
+        birth_date=date(2023, 1, 1),
+        sleep_records=[SleepRecord(datetime(2024, 6, 1, 22, 0), datetime(2024, 6, 2, 2, 0))],
+        timezone="Europe/London",
+    )
+    # 23:00 - 03:00 по Лондону: сон относится к 2 июня
+    assert child.get_sleep_stats(date(2024, 6, 2))[0] == 3 * 60
+    # Переезд в Нью-Йорк: 18:00 - 22:00 1 июня
+    child.timezone = "America/New_York"
+    assert child.get_sleep_stats(date(2024, 6, 2))[0] == 0
+    assert child.get_sleep_stats(date(2024, 6, 1))[0] == 4 * 60
+
+    restored = child_from_dict(child_to_dict(child))
+    assert restored == child
+    assert "timezone" not in child_to_dict(_child(None))
+
+
+def test_sleep_after_local_midnight(tmp_path):
+    """
+    Тест сна сразу после местной полуночи.
+    Проверяем:
+    1. Сон с 00:05 по Москве (21:05 UTC накануне) относится к местному дню
+       в итогах SleepTracker и SQLite (при сохранении, событиях и пересчете)
+    2. Дневной сон определяется по местному времени начала
+    3. Пакетный отчет и выгрузка берут те же местные дни
+    """
+    night = SleepRecord(datetime(2024, 5, 9, 20, 0), datetime(2024, 5, 10, 2, 0))
+    after_midnight = SleepRecord(datetime(2024, 5, 10, 21, 5), datetime(2024, 5, 10, 23, 0))
+    nap = SleepRecord(datetime(2024, 5, 11, 6, 0), datetime(2024, 5, 11, 7, 0))
+    child = Child(
+        name="Анна",
+        birth_date=date(2023, 1, 1),
+        sleep_records=[night, after_midnight],
+        timezone="Europe/Moscow",
+    )
+    first_day, last_day = date(2024, 5, 10), date(2024, 5, 11)
+
+    with SQLiteStorage(tmp_path / "midnight.db") as storage:
+        storage.save_child("anna", child)
+        tracker = SleepTracker(child, "anna", storage)
+        tracker.start_sleep(nap.start_time)
+        tracker.end_sleep(nap.end_time)
+
+        # Ночной сон 23:00 - 05:00 учитывается с местной полуночи
+        assert tracker.day(first_day) == DayTotals(300, 0, 300, 0)
+        assert tracker.day(last_day) == DayTotals(175, 60, 115, 1)
+        expected = [
+            DayRollup(first_day, 300, 0, 300, 0, 360, night.start_time, night.end_time),
+            DayRollup(
+                last_day, 175, 60, 115, 1, 115, after_midnight.start_time, nap.end_time
+            ),
+        ]
+        assert storage.get_rollups("anna") == expected
+        assert verify_rollups(storage) == []
+        storage.rebuild_rollups()
+        assert storage.get_rollups("anna", last_day, last_day) == expected[1:]
+
+    stats = child.get_sleep_stats_range(first_day, last_day)
+    assert [minutes for _, minutes, _ in stats] == [300, 175]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        (report,) = BatchReportService().generate(
+            [("anna", child)], first_day, last_day, executor
+        )
+    assert report.sleep_minutes == [300, 175]
+    # Выгрузка начинается с местного дня начала первой записи (23:00 9 мая)
+    assert [row[1:3] for row in iter_day_rows("anna", child)] == [
+        (date(2024, 5, 9), 0),
+        (first_day, 300),
+        (last_day, 175),
+    ]
+    assert [row[1] for row in iter_record_rows("anna", child, last_day, last_day)] == [
+        after_midnight.start_time,
+        nap.start_time,
+    ]
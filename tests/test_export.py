@@ -0,0 +1,222 @@
+"""
+Модуль с тестами для потоковой выгрузки в CSV и Parquet.
+
+Демонстрирует:
+1. Сравнение выгрузки с расчетом в памяти
+2. Имитацию сбоя посреди выгрузки и продолжение с контрольной точки
+3. Пропуск тестов при отсутствии необязательной зависимости (importorskip)
+4. Выгрузку периода ребенка с ленивой историей без загрузки всей истории
+"""
+
+import csv
+from datetime import date, datetime, timedelta
+import random
+
+import pytest
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.services.reports.export import (
+    CHECKPOINT_SUFFIX,
+    ReportExporter,
+    iter_day_rows,
+    iter_record_rows,
+)
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+
+def _children(count):
+    """
+    Создает детей со случайными историями (фиксированный seed).
+    """
+    rng = random.Random(7)
+    children = []
+    for number in range(count):
+        child = Child(name=f"Ребенок {number}", birth_date=date(2023, 1, 1))
+        current = datetime(2024, 1, 1, 20, 0) + timedelta(hours=rng.randint(0, 48))
+        for _ in range(rng.randint(1, 60)):
+            child.start_sleep(current, rng.choice(["", "Ночной, крепко", "Дневной"]))
+            current += timedelta(minutes=rng.randint(20, 700), seconds=rng.randint(0, 59))
+            child.end_sleep(current)
+            current += timedelta(minutes=rng.randint(60, 300))
+        children.append((f"child-{number}", child))
+    return children
+
+
+def _read_csv(path):
+    with path.open(encoding="utf-8", newline="") as stream:
+        return list(csv.DictReader(stream))
+
+
+def test_export_days(tmp_path):
+    """
+    Тест выгрузки статистики по дням.
+    Проверяем:
+    1. Совпадение с get_sleep_stats за каждый день
+    2. Фильтр по датам
+    3. Удаление контрольной точки после завершения
+    """
+    children = _children(5)
+    path = tmp_path / "days.csv"
+
+    rows = ReportExporter(chunk_size=16).export(
+        children, path, first_day=date(2024, 1, 3), last_day=date(2024, 1, 12)
+    )
+
+    assert rows == 5 * 10
+    assert not (tmp_path / ("days.csv" + CHECKPOINT_SUFFIX)).exists()
+    exported = _read_csv(path)
+    for row in exported:
+        child = dict(children)[row["child_id"]]
+        sleep_minutes, awake_minutes, _ = child.get_sleep_stats(date.fromisoformat(row["date"]))
+        assert int(row["sleep_minutes"]) == sleep_minutes
+        assert int(row["awake_minutes"]) == awake_minutes
+
+
+def test_export_records(tmp_path):
+    """
+    Тест выгрузки записей: фильтр совпадает с get_records_between,
+    активный сон выгружается с пустым окончанием.
+    """
+    children = _children(3)
+    active = children[0][1].start_sleep(datetime(2025, 1, 1, 20, 0))
+    path = tmp_path / "records.csv"
+
+    ReportExporter(chunk_size=10).export(children, path, kind="records")
+    exported = _read_csv(path)
+    assert len(exported) == sum(len(child.sleep_records) for _, child in children)
+    assert exported[0]["start"] == children[0][1].sleep_records[0].start_time.isoformat()
+    assert [row for row in exported if not row["end"]] == [
+        {"child_id": "child-0", "start": active.start_time.isoformat(), "end": "", "comment": ""}
+    ]
+
+    first_day, last_day = date(2024, 1, 5), date(2024, 1, 6)
+    ReportExporter().export(children, path, kind="records", first_day=first_day, last_day=last_day)
+    expected = [
+        record.start_time.isoformat()
+        for _, child in children
+        for record in child.get_records_between(
+            datetime(2024, 1, 5), datetime(2024, 1, 7)
+        )
+    ]
+    assert [row["start"] for row in _read_csv(path)] == expected
+
+
+@pytest.mark.parametrize("kind", ["days", "records"])
+def test_resume_after_interruption(tmp_path, kind):
+    """
+    Тест продолжения выгрузки после сбоя.
+    Проверяем:
+    1. Контрольная точка остается после сбоя
+    2. Результат с продолжением совпадает с выгрузкой без сбоя
+    """
+    children = _children(8)
+    expected_path = tmp_path / "expected.csv"
+    ReportExporter(chunk_size=7).export(children, expected_path, kind=kind)
+
+    def failing_children():
+        for number, item in enumerate(children):
+            if number == 5:
+                raise RuntimeError("Сбой")
+            yield item
+
+    path = tmp_path / "export.csv"
+    with pytest.raises(RuntimeError):
+        ReportExporter(chunk_size=7).export(failing_children(), path, kind=kind)
+    assert (tmp_path / ("export.csv" + CHECKPOINT_SUFFIX)).exists()
+
+    rows = ReportExporter(chunk_size=7).export(children, path, kind=kind, resume=True)
+    assert path.read_text(encoding="utf-8") == expected_path.read_text(encoding="utf-8")
+    assert rows == len(_read_csv(path))
+
+    with pytest.raises(ValueError):
+        ReportExporter().export(children, path, kind="weeks")
+
+
+def test_resume_rejects_other_export(tmp_path):
+    """
+    Тест продолжения с чужой контрольной точки.
+    Проверяем:
+    1. Другой период при продолжении - ValueError
+    2. Ребенка из контрольной точки нет среди детей - ValueError
+    3. Контрольная точка при этом не удаляется
+    """
+    children = _children(4)
+    first_day, last_day = date(2024, 1, 2), date(2024, 1, 20)
+
+    def failing_children():
+        yield children[0]
+        raise RuntimeError("Сбой")
+
+    path = tmp_path / "export.csv"
+    checkpoint_path = tmp_path / ("export.csv" + CHECKPOINT_SUFFIX)
+    with pytest.raises(RuntimeError):
+        ReportExporter(chunk_size=3).export(
+            failing_children(), path, first_day=first_day, last_day=last_day
+        )
+    assert checkpoint_path.exists()
+
+    with pytest.raises(ValueError):
+        ReportExporter(chunk_size=3).export(
+            children, path, first_day=first_day, last_day=date(2024, 1, 10), resume=True
+        )
+    with pytest.raises(ValueError):
+        ReportExporter(chunk_size=3).export(children, path, resume=True)
+    with pytest.raises(ValueError):
+        ReportExporter(chunk_size=3).export(
+            children[1:], path, first_day=first_day, last_day=last_day, resume=True
+        )
+    assert checkpoint_path.exists()
+
+    rows = ReportExporter(chunk_size=3).export(
+        children, path, first_day=first_day, last_day=last_day, resume=True
+    )
+    assert rows == len(_read_csv(path))
+    assert not checkpoint_path.exists()
+
+
+def test_export_parquet(tmp_path):
+    """
+    Тест выгрузки в Parquet (пропускается без pyarrow).
+    """
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    children = _children(4)
+    path = tmp_path / "days.parquet"
+
+    rows = ReportExporter(chunk_size=25).export(children, path)
+    frame = pd.read_parquet(path)
+    assert len(frame) == rows
+    assert len(list(path.glob("part-*.parquet"))) == (rows + 24) // 25
+    assert list(frame.columns) == ["child_id", "date", "sleep_minutes", "awake_minutes"]
+    child_id, child = children[0]
+    first = frame[frame["child_id"] == child_id].iloc[0]
+    assert first["sleep_minutes"] == child.get_sleep_stats(first["date"])[0]
+
+
+def test_export_lazy_child(tmp_path):
+    """
+    Тест выгрузки периода ребенка, загруженного через load_recent.
+    Проверяем:
+    1. Строки совпадают с выгрузкой полностью загруженного ребенка
+    2. Подгружается только история периода
+    3. У ребенка без записей строк нет
+    """
+    child_id, child = max(_children(5), key=lambda item: len(item[1].sleep_records))
+    first_day = child.sleep_records[-1].start_time.date() - timedelta(days=3)
+    with SQLiteStorage(tmp_path / "lazy.db") as storage:
+        storage.save_child(child_id, child)
+        storage.save_child("empty", Child(name="Пусто", birth_date=date(2023, 1, 1)))
+        lazy = storage.load_recent(child_id, days=2)
+
+        assert list(iter_day_rows(child_id, lazy, first_day)) == list(
+            iter_day_rows(child_id, child, first_day)
+        )
+        assert list(iter_record_rows(child_id, lazy, first_day)) == list(
+            iter_record_rows(child_id, child, first_day)
+        )
+        assert not lazy.history_loaded
+        assert lazy.loaded_records < len(child.sleep_records)
+
+        empty = storage.load_recent("empty")
+        assert list(iter_day_rows("empty", empty)) == []
+        assert list(iter_record_rows("empty", empty)) == []
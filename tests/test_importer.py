@@ -0,0 +1,143 @@
+"""
+Модуль с тестами для потокового импорта истории сна.
+
+Демонстрирует:
+1. Запись тестовых файлов во временный каталог
+2. Проверку отчета о некорректных строках
+3. Импорт сразу в хранилище
+"""
+
+from datetime import date, datetime, timedelta
+import io
+import json
+
+import pytest
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.services.importer.pipeline import SleepImporter, iter_json_rows
+from sleep_tracker.services.storage.journal import JournalStorage
+from sleep_tracker.services.storage.serialization import record_to_dict
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+CSV_TEXT = """start,end,comment
+2024-03-15T13:00:00,2024-03-15T14:30:00,Дневной
+2024-03-15T16:00:00,2024-03-15T15:00:00,Конец раньше начала
+не дата,2024-03-15T17:00:00,
+2024-03-15T20:00:00,2024-03-16T07:00:00,"Ночной, с запятой"
+2024-03-16T13:00:00,,Активный
+2024-03-16T15:00:00,,Второй активный
+"""
+
+
+@pytest.fixture
+def child():
+    return Child(name="Тест", birth_date=date(2023, 1, 1))
+
+
+def _records(count):
+    start = datetime(2024, 1, 1, 20, 0)
+    return [
+        {
+            "start": (start + timedelta(hours=5 * number)).isoformat(),
+            "end": (start + timedelta(hours=5 * number + 2)).isoformat(),
+            "comment": f"Запись {number}",
+        }
+        for number in range(count)
+    ]
+
+
+def test_csv_import(tmp_path, child):
+    """
+    Тест импорта CSV.
+    Проверяем:
+    1. Корректные строки импортированы в хронологическом порядке
+    2. Ошибки собраны с номерами строк, импорт не прерван
+    3. Допускается только один активный сон
+    """
+    path = tmp_path / "history.csv"
+    path.write_text(CSV_TEXT, encoding="utf-8")
+
+    result = SleepImporter(chunk_size=2).import_file(path, child)
+
+    assert result.imported == 3
+    assert result.skipped == 3
+    assert [issue.row for issue in result.issues] == [3, 4, 7]
+    assert [record.comment for record in child.sleep_records] == [
+        "Дневной",
+        "Ночной, с запятой",
+        "Активный",
+    ]
+    assert child.get_active_sleep() is child.sleep_records[-1]
+    assert child.get_sleep_stats(date(2024, 3, 16))[0] == 7 * 60
+
+
+def test_json_formats_match(tmp_path, child):
+    """
+    Тест JSON Lines и массива JSON.
+    Проверяем:
+    1. Оба формата дают одинаковый результат
+    2. Массив читается по частям, даже если блок меньше одной записи
+    3. Некорректная строка JSON Lines попадает в отчет
+    """
+    rows = _records(50)
+    (tmp_path / "history.json").write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    lines = [json.dumps(row) for row in rows]
+    lines.insert(10, "{оборванная строка")
+    (tmp_path / "history.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    jsonl_child = Child(name="Тест", birth_date=date(2023, 1, 1))
+    jsonl_result = SleepImporter(chunk_size=7).import_file(tmp_path / "history.jsonl", jsonl_child)
+    json_result = SleepImporter(chunk_size=7).import_file(tmp_path / "history.json", child)
+
+    assert json_result.imported == jsonl_result.imported == 50
+    assert [issue.row for issue in jsonl_result.issues] == [11]
+    assert child.sleep_records == jsonl_child.sleep_records
+    assert [record_to_dict(record) for record in child.sleep_records] == rows
+
+    items = list(iter_json_rows(io.StringIO(json.dumps(rows)), block_size=5))
+    assert [item for _, item in items] == rows
+    with pytest.raises(ValueError):
+        list(iter_json_rows(io.StringIO('{"start": 1}')))
+
+
+def test_existing_history(child):
+    """
+    Тест импорта в ребенка с существующей историей.
+    Проверяем:
+    1. Записи старше существующих встают на свое место
+    2. Активный сон в файле отклоняется, если у ребенка уже есть активный
+    """
+    child.start_sleep(datetime(2024, 6, 1, 20, 0))
+    rows = list(enumerate(_records(10), start=1)) + [
+        (11, {"start": "2024-05-01T10:00:00", "end": None})
+    ]
+
+    result = SleepImporter(chunk_size=3).import_rows(rows, child)
+
+    assert result.imported == 10
+    assert [issue.row for issue in result.issues] == [11]
+    starts = [record.start_time for record in child.sleep_records]
+    assert starts == sorted(starts)
+    assert child.get_active_sleep().start_time == datetime(2024, 6, 1, 20, 0)
+
+
+@pytest.mark.parametrize("storage_class", ["sqlite", "journal"])
+def test_import_to_storage(tmp_path, child, storage_class):
+    """
+    Тест импорта с сохранением пачек в хранилище.
+    """
+    if storage_class == "sqlite":
+        storage = SQLiteStorage(tmp_path / "sleep.db")
+    else:
+        storage = JournalStorage(tmp_path / "journal", snapshot_every=25)
+    with storage:
+        storage.save_child("anna", child)
+        rows = list(enumerate(_records(100), start=1))
+        rows.append((101, {"start": "2024-03-01T20:00:00", "comment": "Активный"}))
+        result = SleepImporter(chunk_size=30).import_rows(rows, child, storage, "anna")
+
+        assert result.imported == 101
+        assert storage.load_child("anna") == child
+
+    with pytest.raises(ValueError):
+        SleepImporter().import_rows([], child, storage)
@@ -0,0 +1,228 @@
+"""
+Модуль с тестами для хранилища на основе журнала событий.
+
+Демонстрирует:
+1. Работу с временными каталогами (фикстура tmp_path)
+2. Имитацию сбоев: оборванная запись, падение процесса, сбой при снимке
+3. Подмену функций через monkeypatch
+4. Импорт истории рядом с идущим сном
+"""
+
+from datetime import date, datetime, timedelta
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from sleep_tracker.core.exceptions import ChildNotFoundError
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.services.importer.pipeline import SleepImporter
+from sleep_tracker.services.storage import journal as journal_module
+from sleep_tracker.services.storage.journal import JournalStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """
+    Фикстура с хранилищем во временном каталоге.
+    """
+    with JournalStorage(tmp_path) as storage:
+        yield storage
+
+
+@pytest.fixture
+def child():
+    return Child(name="Тест", birth_date=date(2023, 1, 1))
+
+
+def _sleep_cycle(storage, child, child_id, start, comment=""):
+    """
+    Начинает и завершает сон, записывая события в хранилище.
+    """
+    record = child.start_sleep(start, comment)
+    storage.append_start(child_id, record)
+    child.end_sleep(start + timedelta(hours=2), "Проснулся сам")
+    storage.append_end(child_id, record)
+    return record
+
+
+def test_round_trip(storage, child):
+    """
+    Тест сохранения и загрузки.
+    Проверяем:
+    1. Воспроизведение событий начала, завершения и комментария
+    2. Активный сон после загрузки
+    3. Список сохраненных детей
+    """
+    storage.save_child("anna", child)
+    record = _sleep_cycle(storage, child, "anna", datetime(2024, 3, 15, 13, 0), "Дневной")
+    record.comment += "\nКрепко спал"
+    storage.append_comment("anna", record)
+    active = child.start_sleep(datetime(2024, 3, 15, 20, 0))
+    storage.append_start("anna", active)
+
+    loaded = storage.load_child("anna")
+    assert loaded == child
+    assert loaded.get_active_sleep() == active
+    assert storage.child_ids() == ["anna"]
+
+
+def test_import_next_to_active_sleep(storage, child):
+    """
+    Тест импорта старых записей в ребенка с идущим сном.
+    Проверяем:
+    1. Импортированные записи не воспроизводятся через start_sleep:
+       ребенок загружается, активный сон сохраняется
+    2. Активная запись файла раньше завершенных тоже загружается
+    3. Сворачивание журнала в снимок проходит без ошибок
+    """
+    storage.save_child("anna", child)
+    active = child.start_sleep(datetime(2024, 3, 15, 20, 0))
+    storage.append_start("anna", active)
+    rows = [(1, {"start": "2024-03-14T13:00:00", "end": "2024-03-14T14:30:00"})]
+    result = SleepImporter().import_rows(rows, child, storage, "anna")
+    assert result.imported == 1
+
+    loaded = storage.load_child("anna")
+    assert loaded == child
+    assert loaded.get_active_sleep() == active
+    storage.compact("anna")
+    assert storage.load_child("anna") == child
+
+    other = Child(name="Другой", birth_date=date(2023, 1, 1))
+    storage.save_child("boris", other)
+    rows = [
+        (1, {"start": "2024-03-10T20:00:00", "comment": "Активный"}),
+        (2, {"start": "2024-03-09T13:00:00", "end": "2024-03-09T14:00:00"}),
+        (3, {"start": "2024-03-11T13:00:00", "end": "2024-03-11T14:00:00"}),
+    ]
+    SleepImporter().import_rows(rows, other, storage, "boris")
+    assert storage.load_child("boris") == other
+
+
+def test_unknown_child(storage):
+    """
+    Тест обращения к несуществующему ребенку и некорректному идентификатору.
+    """
+    with pytest.raises(ChildNotFoundError):
+        storage.load_child("nobody")
+    with pytest.raises(ValueError):
+        storage.load_child("../etc")
+
+
+def test_torn_write_is_discarded(tmp_path, child):
+    """
+    Тест восстановления после оборванной записи.
+    Последняя строка журнала записана не полностью: она отбрасывается,
+    а новые события продолжают журнал с корректной позиции.
+    """
+    with JournalStorage(tmp_path) as storage:
+        storage.save_child("anna", child)
+        _sleep_cycle(storage, child, "anna", datetime(2024, 3, 15, 13, 0))
+
+    with (tmp_path / "anna.journal").open("ab") as journal:
+        journal.write(b'{"seq": 3, "op": "start", "start": "2024-03-15T2')
+
+    with JournalStorage(tmp_path) as storage:
+        assert storage.load_child("anna") == child
+        _sleep_cycle(storage, child, "anna", datetime(2024, 3, 16, 13, 0))
+
+    with JournalStorage(tmp_path) as storage:
+        assert storage.load_child("anna") == child
+
+
+def test_process_crash(tmp_path):
+    """
+    Тест падения процесса без закрытия хранилища.
+    Дочерний процесс записывает события и аварийно завершается через
+    os._exit; все зафиксированные события должны быть восстановлены.
+    """
+    script = textwrap.dedent(
+        f"""
+        import os
+        from datetime import date, datetime, timedelta
+        from sleep_tracker.core.models.child import Child
+        from sleep_tracker.services.storage.journal import JournalStorage
+
+        storage = JournalStorage({str(tmp_path)!r})
+        child = Child(name="Тест", birth_date=date(2023, 1, 1))
+        storage.save_child("anna", child)
+        start = datetime(2024, 3, 1, 13, 0)
+        for day in range(10):
+            record = child.start_sleep(start + timedelta(days=day))
+            storage.append_start("anna", record)
+            child.end_sleep(start + timedelta(days=day, hours=2))
+            storage.append_end("anna", record)
+        record = child.start_sleep(start + timedelta(days=10))
+        storage.append_start("anna", record)
+        os._exit(1)
+        """
+    )
+    result = subprocess.run([sys.executable, "-c", script], check=False)
+    assert result.returncode == 1
+
+    with JournalStorage(tmp_path) as storage:
+        child = storage.load_child("anna")
+    assert len(child.sleep_records) == 11
+    assert child.get_active_sleep().start_time == datetime(2024, 3, 11, 13, 0)
+
+
+def test_crash_during_compaction(tmp_path, child, monkeypatch):
+    """
+    Тест сбоя между записью снимка и очисткой журнала.
+    События, уже вошедшие в снимок, не должны примениться повторно.
+    """
+    storage = JournalStorage(tmp_path, snapshot_every=4)
+    storage.save_child("anna", child)
+    _sleep_cycle(storage, child, "anna", datetime(2024, 3, 15, 13, 0))
+
+    def crash(*args):
+        raise OSError("Сбой диска")
+
+    monkeypatch.setattr(JournalStorage, "_truncate", crash)
+    with pytest.raises(OSError):
+        _sleep_cycle(storage, child, "anna", datetime(2024, 3, 16, 13, 0))
+    monkeypatch.undo()
+
+    with JournalStorage(tmp_path) as recovered:
+        assert recovered.load_child("anna") == child
+
+
+def test_periodic_snapshot(tmp_path, child):
+    """
+    Тест периодического снимка: после snapshot_every событий журнал
+    очищается, а состояние переносится в снимок.
+    """
+    with JournalStorage(tmp_path, snapshot_every=4) as storage:
+        storage.save_child("anna", child)
+        for day in range(3):
+            _sleep_cycle(storage, child, "anna", datetime(2024, 3, 15 + day, 13, 0))
+        assert len((tmp_path / "anna.journal").read_bytes().splitlines()) == 2
+        assert storage.load_child("anna") == child
+
+
+def test_group_commit(tmp_path, child, monkeypatch):
+    """
+    Тест групповой фиксации.
+    Проверяем, что в пределах интервала события не вызывают fsync,
+    а по истечении интервала фиксируются одним вызовом.
+    """
+    now = [0.0]
+    storage = JournalStorage(tmp_path, commit_interval=10.0, clock=lambda: now[0])
+    storage.save_child("anna", child)
+
+    calls = []
+    monkeypatch.setattr(journal_module.os, "fsync", calls.append)
+    for day in range(5):
+        _sleep_cycle(storage, child, "anna", datetime(2024, 3, 15 + day, 13, 0))
+    assert calls == []
+
+    now[0] = 11.0
+    _sleep_cycle(storage, child, "anna", datetime(2024, 3, 21, 13, 0))
+    assert len(calls) == 1
+
+    storage.close()
+    assert len(calls) == 2
+    with JournalStorage(tmp_path) as reopened:
+        assert reopened.load_child("anna") == child
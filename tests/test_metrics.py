@@ -0,0 +1,144 @@
+"""
+Модуль с тестами для метрик горячих путей.
+
+Демонстрирует:
+1. Фикстуру, включающую сбор метрик только на время теста
+2. Проверку автоматической разметки методов хранилищ
+3. Сравнение времени вызова с оберткой и без нее (timeit)
+"""
+
+from datetime import date, datetime, timedelta
+import json
+import timeit
+
+import pytest
+
+from sleep_tracker.core.metrics import METRICS, MetricsRegistry, instrumented
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.services.storage.journal import JournalStorage
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+
+@pytest.fixture
+def metrics():
+    """
+    Включает глобальный реестр на время теста.
+    """
+    METRICS.reset()
+    METRICS.enable()
+    yield METRICS
+    METRICS.disable()
+    METRICS.reset()
+
+
+def _child(days):
+    """
+    Создает ребенка с дневным и ночным сном за days дней.
+    """
+    child = Child(name="Тест", birth_date=date(2023, 1, 1))
+    start = datetime(2024, 1, 1)
+    for day in range(days):
+        current = start + timedelta(days=day)
+        child.start_sleep(current + timedelta(hours=13))
+        child.end_sleep(current + timedelta(hours=14, minutes=30))
+        child.start_sleep(current + timedelta(hours=20))
+        child.end_sleep(current + timedelta(days=1, hours=7))
+    return child
+
+
+def test_child_operations(metrics):
+    """
+    Тест метрик операций Child.
+    Проверяем:
+    1. Счетчики вызовов и ошибок
+    2. Датчик количества записей
+    3. Гистограмма учитывает каждый вызов
+    """
+    child = _child(3)
+    child.get_sleep_stats(date(2024, 1, 2))
+    with pytest.raises(ValueError):
+        child.end_sleep(datetime(2024, 2, 1))
+
+    start = metrics.get("Child.start_sleep")
+    end = metrics.get("Child.end_sleep")
+    assert (start.calls, start.records) == (6, 6)
+    assert (end.calls, end.errors, end.records) == (7, 1, 6)
+    assert sum(end.buckets) == end.calls
+    assert metrics.get("Child.get_sleep_stats").records == 2
+
+    metrics.disable()
+    child.get_sleep_stats(date(2024, 1, 3))
+    assert metrics.get("Child.get_sleep_stats").calls == 1
+
+
+@pytest.mark.parametrize("storage_class", [SQLiteStorage, JournalStorage])
+def test_storage_operations(tmp_path, metrics, storage_class):
+    """
+    Тест автоматической разметки методов хранилищ по имени класса.
+    """
+    child = _child(5)
+    with storage_class(tmp_path / "storage") as storage:
+        storage.save_child("anna", child)
+        storage.load_child("anna")
+
+    name = storage_class.__name__
+    assert metrics.get(f"{name}.save_child").records == 10
+    assert metrics.get(f"{name}.load_child").calls == 1
+    assert metrics.get(f"{name}.load_child").records == 10
+
+
+def test_export_formats():
+    """
+    Тест выгрузки реестра в Prometheus и JSON.
+    """
+    registry = MetricsRegistry(enabled=True)
+
+    @instrumented("test.sum", records=lambda result, values: len(values), registry=registry)
+    def total(values):
+        return sum(values)
+
+    total([1, 2, 3])
+    registry.observe("test.sum", 2.0, error=True)
+
+    text = registry.to_prometheus()
+    assert 'sleep_tracker_operation_calls_total{operation="test.sum"} 2' in text
+    assert 'sleep_tracker_operation_errors_total{operation="test.sum"} 1' in text
+    assert 'sleep_tracker_operation_seconds_bucket{operation="test.sum",le="+Inf"} 2' in text
+    assert 'sleep_tracker_operation_seconds_count{operation="test.sum"} 2' in text
+    assert 'sleep_tracker_operation_records{operation="test.sum"} 3' in text
+
+    snapshot = json.loads(json.dumps(registry.snapshot()))
+    assert snapshot["operations"]["test.sum"]["calls"] == 2
+    assert sum(snapshot["operations"]["test.sum"]["buckets"]) == 2
+
+    registry.reset()
+    assert registry.snapshot()["operations"] == {}
+
+
+def test_disabled_overhead():
+    """
+    Тест накладных расходов выключенных метрик на случае бенчмарка
+    get_sleep_stats_cold_30d: статистика за 30 дней с холодным кэшем.
+    Берем лучший из нескольких замеров, допуск щедрый из-за шума.
+    """
+    assert not METRICS.enabled
+    child = _child(400)
+    days = [date(2025, 1, 1) - timedelta(days=offset) for offset in range(30)]
+    raw = Child.get_sleep_stats.__wrapped__
+
+    def wrapped_run():
+        child.cache_clear()
+        for day in days:
+            child.get_sleep_stats(day)
+
+    def raw_run():
+        child.cache_clear()
+        for day in days:
+            raw(child, day)
+
+    # Замеры чередуются, чтобы фоновая нагрузка влияла на оба варианта
+    wrapped, unwrapped = float("inf"), float("inf")
+    for _ in range(7):
+        wrapped = min(wrapped, timeit.timeit(wrapped_run, number=50))
+        unwrapped = min(unwrapped, timeit.timeit(raw_run, number=50))
+    assert wrapped < unwrapped * 1.25
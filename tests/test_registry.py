@@ -0,0 +1,201 @@
+"""
+Модуль с тестами для реестра детей в памяти.
+
+Демонстрирует:
+1. Проверку ленивой загрузки и вытеснения по счетчикам реестра
+2. Сквозную запись событий в хранилище
+3. Нагрузочный тест: потоки и задачи asyncio одновременно работают
+   с общими детьми при маленькой емкости реестра
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import threading
+
+import pytest
+
+from sleep_tracker.core.exceptions import ChildNotFoundError
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+from sleep_tracker.services.tracker.registry import TrackerRegistry
+
+START = datetime(2024, 1, 1, 20, 0)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """
+    Фикстура с базой SQLite, в которой сохранены 20 детей без записей.
+    """
+    with SQLiteStorage(tmp_path / "registry.db", pool_size=8) as storage:
+        for number in range(20):
+            child = Child(name=f"Ребенок {number}", birth_date=date(2023, 1, 1))
+            storage.save_child(f"child-{number}", child)
+        yield storage
+
+
+def test_lazy_load_and_write_back(storage):
+    """
+    Тест ленивой загрузки и вытеснения.
+    Проверяем:
+    1. Ребенок читается из хранилища один раз
+    2. Вытесненный измененный ребенок сохраняется, неизмененный - нет
+    3. flush сохраняет оставшихся в памяти
+    4. Неудачная загрузка не оставляет пустой записи, а в памяти
+       не больше capacity детей при любом числе сегментов
+    """
+    registry = TrackerRegistry(storage, capacity=2, shards=1)
+    registry.start_sleep("child-0", START)
+    registry.end_sleep("child-0", START + timedelta(hours=10))
+    assert registry.active_sleep("child-0") is None
+    assert (registry.loads, registry.writes) == (1, 0)
+    assert storage.load_child("child-0").sleep_records == []
+
+    registry.get_child("child-1")
+    registry.day("child-2", date(2024, 1, 2))
+    assert len(registry) == 2
+    assert (registry.evictions, registry.writes) == (1, 1)
+    assert len(storage.load_child("child-0").sleep_records) == 1
+
+    registry.get_child("child-3")
+    assert (registry.evictions, registry.writes) == (2, 1)
+
+    registry.start_sleep("child-0", START + timedelta(days=1))
+    assert registry.loads == 5
+    registry.register("new", Child(name="Новый", birth_date=date(2024, 1, 1)))
+    with pytest.raises(ChildNotFoundError):
+        registry.get_child("missing")
+    assert "missing" not in registry._shard("missing").entries
+
+    # Сегментов не больше емкости, и в сумме они держат ровно capacity детей
+    wide = TrackerRegistry(storage, capacity=5, shards=64)
+    for number in range(20):
+        wide.get_child(f"child-{number}")
+    assert len(wide) == 5
+
+    registry.close()
+    assert storage.load_child("child-0").get_active_sleep() is not None
+    assert storage.load_child("new").name == "Новый"
+
+
+def test_failed_block_and_write_through(storage):
+    """
+    Тест ошибок и сквозной записи.
+    Проверяем:
+    1. Блок, завершившийся исключением, не помечает ребенка измененным
+    2. Со сквозной записью событие сохранено сразу, а вытеснение ничего не пишет
+    3. update заменяет ребенка, сохраняя записи, и создает нового
+    """
+    registry = TrackerRegistry(storage, capacity=1, shards=1)
+    with pytest.raises(ValueError):
+        registry.end_sleep("child-0", START)
+    registry.get_child("child-1")
+    assert (registry.evictions, registry.writes) == (1, 0)
+
+    registry = TrackerRegistry(storage, capacity=1, shards=1, write_through=True)
+    registry.start_sleep("child-0", START)
+    assert storage.load_child("child-0").get_active_sleep().start_time == START
+    registry.end_sleep("child-0", START + timedelta(hours=10))
+    registry.get_child("child-1")
+    assert registry.evictions == 1 and registry.writes == 0
+    assert storage.load_child("child-0").sleep_records[0].end_time == START + timedelta(hours=10)
+
+    def rename(current):
+        records = [] if current is None else list(current.sleep_records)
+        return Child(name="Другое имя", birth_date=date(2023, 1, 1), sleep_records=records)
+
+    assert len(registry.update("child-0", rename).sleep_records) == 1
+    assert registry.update("fresh", rename).sleep_records == []
+    assert storage.load_child("child-0").name == "Другое имя"
+    assert storage.load_child("fresh").name == "Другое имя"
+    assert registry.writes == 2
+
+
+def test_concurrent_threads_and_tasks(storage):
+    """
+    Нагрузочный тест: 8 потоков и 1200 задач asyncio меняют 20 детей
+    при емкости реестра 4, так что дети постоянно вытесняются и загружаются.
+    Проверяем:
+    1. Одновременный старт одного сна удается ровно один раз
+    2. После сохранения число записей совпадает с числом удачных стартов
+    3. Записи не пересекаются, незавершенным остается только последний сон
+    """
+    registry = TrackerRegistry(storage, capacity=4, shards=2)
+    child_ids = [f"child-{number}" for number in range(20)]
+    starts = {child_id: 0 for child_id in child_ids}
+    duplicates = []
+    counter_lock = threading.Lock()
+
+    def step(worker, number):
+        """
+        Переключает сон ребенка: начинает, если он не идет, иначе завершает.
+        """
+        child_id = child_ids[(worker * 7 + number) % len(child_ids)]
+        with registry.locked(child_id) as tracker:
+            records = tracker.child.sleep_records
+            last = records[-1] if records else None
+            if last is not None and last.end_time is None:
+                tracker.end_sleep(last.start_time + timedelta(hours=1))
+                return
+            start = START if last is None else last.end_time + timedelta(hours=1)
+            tracker.start_sleep(start)
+        with counter_lock:
+            starts[child_id] += 1
+
+    def race(number):
+        """
+        Все участники пытаются начать один и тот же сон.
+        """
+        child_id = child_ids[number % len(child_ids)]
+        try:
+            registry.start_sleep(child_id, START + timedelta(days=400 + number))
+        except ValueError:
+            with counter_lock:
+                duplicates.append(child_id)
+            return
+        with counter_lock:
+            starts[child_id] += 1
+
+    def thread_worker(worker):
+        for number in range(150):
+            step(worker, number)
+
+    async def async_workers(executor):
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, step, worker, number)
+                for worker in range(8, 48)
+                for number in range(30)
+            )
+        )
+
+    threads = [threading.Thread(target=thread_worker, args=(worker,)) for worker in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for thread in threads:
+            thread.start()
+        asyncio.run(async_workers(executor))
+        for thread in threads:
+            thread.join()
+
+        # Каждый ребенок должен закончить сон перед гонкой за старт
+        for child_id in child_ids:
+            with registry.locked(child_id) as tracker:
+                active = tracker.child.get_active_sleep()
+                if active is not None:
+                    tracker.end_sleep(active.start_time + timedelta(hours=1))
+        racers = [executor.submit(race, 3) for _ in range(16)]
+        for future in racers:
+            future.result()
+
+    assert duplicates == [child_ids[3]] * 15
+    assert registry.evictions > 0
+    registry.close()
+
+    for child_id in child_ids:
+        records = storage.load_child(child_id).sleep_records
+        assert len(records) == starts[child_id]
+        for previous, record in zip(records, records[1:]):
+            assert previous.end_time is not None
+            assert previous.end_time <= record.start_time
@@ -0,0 +1,101 @@
+"""
+Модуль с тестами для отчетов и их пакетной генерации.
+
+Демонстрирует:
+1. Проверку календарных периодов
+2. Запуск расчета в пуле процессов
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import random
+
+import pytest
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.services.reports.batch import BatchReportService
+from sleep_tracker.services.reports.report import period_bounds
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+
+def _children(count):
+    """
+    Создает детей со случайными историями (фиксированный seed).
+    """
+    rng = random.Random(5)
+    children = []
+    for number in range(count):
+        child = Child(name=f"Ребенок {number}", birth_date=date(2023, 1, 1))
+        current = datetime(2024, 2, 20, 20, 0)
+        for _ in range(rng.randint(0, 80)):
+            child.start_sleep(current)
+            current += timedelta(minutes=rng.randint(20, 700))
+            child.end_sleep(current)
+            current += timedelta(minutes=rng.randint(60, 300))
+        children.append((f"child-{number}", child))
+    return children
+
+
+def test_period_bounds():
+    """
+    Тест календарных периодов: день, неделя с понедельника, месяц
+    (включая високосный февраль и декабрь).
+    """
+    day = date(2024, 2, 14)
+    assert period_bounds("day", day) == (day, day)
+    assert period_bounds("week", day) == (date(2024, 2, 12), date(2024, 2, 18))
+    assert period_bounds("month", day) == (date(2024, 2, 1), date(2024, 2, 29))
+    assert period_bounds("month", date(2024, 12, 31)) == (date(2024, 12, 1), date(2024, 12, 31))
+    with pytest.raises(ValueError):
+        period_bounds("year", day)
+
+
+@pytest.mark.parametrize("executor_class", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_batch_reports_match_child(executor_class):
+    """
+    Тест пакетной генерации.
+    Проверяем:
+    1. Отчет для каждого ребенка ровно один раз
+    2. Совпадение со статистикой Child за каждый день
+    """
+    children = _children(23)
+    first_day, last_day = period_bounds("month", date(2024, 3, 1))
+    service = BatchReportService(max_workers=2, chunk_size=4)
+
+    with executor_class(max_workers=2) as executor:
+        reports = list(service.generate(children, first_day, last_day, executor))
+
+    assert sorted(report.child_id for report in reports) == sorted(key for key, _ in children)
+    by_id = dict(children)
+    for report in reports:
+        assert report.days == by_id[report.child_id].get_sleep_stats_range(first_day, last_day)
+        assert report.total_sleep_minutes == sum(report.sleep_minutes)
+
+
+def test_batch_reports_from_storage(tmp_path, monkeypatch):
+    """
+    Тест генерации отчетов для детей из хранилища с пулом процессов по умолчанию.
+    Проверяем:
+    1. Отчеты совпадают со статистикой Child
+    2. Вся история детей не загружается (load_child не вызывается)
+    3. Пустой период отклоняется сразу, а не при переборе отчетов
+    """
+    children = _children(5)
+    first_day, last_day = date(2024, 3, 1), date(2024, 3, 7)
+    with SQLiteStorage(tmp_path / "sleep.db") as storage:
+        for child_id, child in children:
+            storage.save_child(child_id, child)
+
+        def load_child(child_id):
+            raise AssertionError("вся история не нужна")
+
+        monkeypatch.setattr(storage, "load_child", load_child)
+        service = BatchReportService(max_workers=1, chunk_size=2)
+        reports = list(service.generate_for_ids(storage, storage.child_ids(), first_day, last_day))
+        with pytest.raises(ValueError):
+            service.generate_for_ids(storage, storage.child_ids(), last_day, first_day)
+
+    assert len(reports) == 5
+    by_id = dict(children)
+    for report in reports:
+        assert report.days == by_id[report.child_id].get_sleep_stats_range(first_day, last_day)
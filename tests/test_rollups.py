@@ -0,0 +1,155 @@
+"""
+Модуль с тестами для дневных итогов сна.
+
+Демонстрирует:
+1. Сравнение сохраненных итогов с пересчетом по записям
+2. Имитацию старой базы без итогов и их пересчет командой backfill
+3. Проверку транзакционности: неудачное закрытие записи не меняет итоги
+"""
+
+from datetime import date, datetime, timedelta
+import random
+import sqlite3
+
+import pytest
+
+from sleep_tracker.core.exceptions import StorageError
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.columns import RecordColumns
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.reports.report import build_report, report_from_rollups
+from sleep_tracker.services.storage.journal import JournalStorage
+from sleep_tracker.services.storage.rollups import compute_rollups, main, verify_rollups
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+from sleep_tracker.services.tracker.service import SleepTracker
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """
+    Фикстура с базой SQLite во временном каталоге.
+    """
+    with SQLiteStorage(tmp_path / "sleep.db") as storage:
+        yield storage
+
+
+def _fill(tracker, count, seed=5):
+    """
+    Проводит через сервис случайную историю сна (фиксированный seed).
+    """
+    rng = random.Random(seed)
+    current = datetime(2024, 1, 1, 20, 0)
+    for _ in range(count):
+        tracker.start_sleep(current)
+        current += timedelta(minutes=rng.randint(20, 700), seconds=rng.randint(0, 59))
+        tracker.end_sleep(current)
+        current += timedelta(minutes=rng.randint(60, 300))
+
+
+def test_rollups_follow_events(storage):
+    """
+    Тест итогов, которые обновляются при закрытии записей.
+    Проверяем:
+    1. Итоги совпадают с пересчетом и с get_sleep_stats
+    2. Дневные и ночные минуты совпадают с SleepTracker
+    3. Импорт пачкой и сохранение ребенка целиком тоже обновляют итоги
+    """
+    storage.save_child("anna", Child(name="Анна", birth_date=date(2023, 1, 1)))
+    tracker = SleepTracker(storage.load_child("anna"), "anna", storage)
+    _fill(tracker, 200)
+
+    rollups = storage.get_rollups("anna")
+    assert verify_rollups(storage) == []
+    assert {rollup.day: rollup for rollup in rollups} == compute_rollups(
+        tracker.child.sleep_records
+    )
+    for rollup in rollups:
+        assert rollup.sleep_minutes == tracker.child.get_sleep_stats(rollup.day)[0]
+        totals = tracker.day(rollup.day)
+        assert (rollup.daytime_minutes, rollup.night_minutes, rollup.naps) == (
+            totals.daytime_minutes,
+            totals.night_minutes,
+            totals.naps,
+        )
+        assert rollup.first_start <= rollup.last_end
+        assert rollup.last_end.date() == rollup.day
+
+    imported = [
+        SleepRecord(datetime(2025, 3, 1, 13, 0), datetime(2025, 3, 1, 14, 30)),
+        SleepRecord(datetime(2025, 3, 1, 20, 0), datetime(2025, 3, 2, 7, 0)),
+    ]
+    tracker.child.add_records(imported)
+    storage.append_records("anna", imported)
+    assert [rollup.sleep_minutes for rollup in storage.get_rollups("anna", date(2025, 3, 1))] == [
+        90,
+        7 * 60,
+    ]
+    assert verify_rollups(storage) == []
+
+    del tracker.child.sleep_records[:50]
+    tracker.child.rebuild_index()
+    storage.save_child("anna", tracker.child)
+    assert verify_rollups(storage) == []
+
+
+def test_backfill_and_verify(tmp_path, storage, capsys):
+    """
+    Тест пересчета итогов для базы, созданной до появления таблицы.
+    """
+    for child_id, seed in [("anna", 1), ("boris", 2)]:
+        storage.save_child(child_id, Child(name=child_id, birth_date=date(2023, 1, 1)))
+        _fill(SleepTracker(storage.load_child(child_id), child_id, storage), 50, seed)
+
+    connection = sqlite3.connect(storage.path)
+    with connection:
+        connection.execute("DELETE FROM day_rollups WHERE child_id = 'boris'")
+        connection.execute("UPDATE day_rollups SET naps = naps + 1 WHERE child_id = 'anna'")
+    connection.close()
+
+    mismatches = verify_rollups(storage)
+    assert {mismatch.child_id for mismatch in mismatches} == {"anna", "boris"}
+    assert all(mismatch.stored is None for mismatch in mismatches if mismatch.child_id == "boris")
+    assert main(["verify", str(storage.path)]) == 1
+
+    assert main(["backfill", str(storage.path)]) == 0
+    assert main(["verify", str(storage.path)]) == 0
+    assert verify_rollups(storage) == []
+    assert "Итоги совпадают" in capsys.readouterr().out
+
+
+def test_failed_close_keeps_rollups(storage):
+    """
+    Тест транзакционности: если запись не найдена, итоги не меняются.
+    """
+    storage.save_child("anna", Child(name="Анна", birth_date=date(2023, 1, 1)))
+    before = storage.get_rollups("anna")
+
+    missing = SleepRecord(datetime(2024, 5, 1, 13, 0), datetime(2024, 5, 1, 14, 0))
+    with pytest.raises(StorageError):
+        storage.append_end("anna", missing)
+    assert storage.get_rollups("anna") == before == []
+
+
+def test_default_rollups_and_report(tmp_path, storage):
+    """
+    Тест итогов хранилища без таблицы итогов и отчета по итогам.
+    Проверяем:
+    1. JournalStorage считает те же итоги по записям
+    2. Отчет по итогам совпадает с отчетом по колонкам записей
+    """
+    child = Child(name="Анна", birth_date=date(2023, 1, 1))
+    _fill(SleepTracker(child), 300)
+    storage.save_child("anna", child)
+    first_day, last_day = date(2024, 2, 1), date(2024, 2, 29)
+
+    with JournalStorage(tmp_path / "journal") as journal:
+        journal.save_child("anna", child)
+        assert journal.get_rollups("anna", first_day, last_day) == storage.get_rollups(
+            "anna", first_day, last_day
+        )
+        assert verify_rollups(journal) == []
+
+    columns = RecordColumns.from_records(child.sleep_records)
+    assert report_from_rollups(
+        "anna", storage.get_rollups("anna", first_day, last_day), first_day, last_day
+    ) == build_report("anna", columns, first_day, last_day)
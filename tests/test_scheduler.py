@@ -0,0 +1,311 @@
+"""
+Модуль с тестами для фонового расчета отчетов.
+
+Время задается часами теста, поэтому расписание проверяется без ожидания.
+
+Демонстрирует:
+1. Расчет после местной полуночи ребенка со смещением
+2. Готовые отчеты совпадают с расчетом по истории и отдаются без пересчета
+3. Повтор неудачного расчета и ограничение числа расчетов в работе
+4. Фоновый поток переживает ошибки хранилища и смену часового пояса
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+import logging
+import time
+
+import pytest
+
+from sleep_tracker.core.metrics import METRICS
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+from sleep_tracker.services.tracker.scheduler import ReportScheduler, ReportStore
+
+# Берлин летом: UTC+2, местная полночь 11 мая - 22:00 UTC 10 мая
+BERLIN_MIDNIGHT = datetime(2024, 5, 10, 22, 0, tzinfo=timezone.utc)
+YESTERDAY = date(2024, 5, 10)
+
+
+class FakeClock:
+    """
+    Часы теста.
+    """
+
+    def __init__(self, now: datetime) -> None:
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def _child(zone="Europe/Berlin", days=40):
+    records = []
+    for offset in range(days, 0, -1):
+        night = datetime(2024, 5, 11, 18, 0) - timedelta(days=offset)
+        records.append(SleepRecord(night, night + timedelta(hours=10, minutes=offset)))
+        nap = night + timedelta(hours=14)
+        records.append(SleepRecord(nap, nap + timedelta(hours=1)))
+    return Child(name="Анна", birth_date=date(2023, 1, 1), sleep_records=records, timezone=zone)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    with SQLiteStorage(tmp_path / "scheduler.db") as storage:
+        storage.save_child("anna", _child())
+        yield storage
+
+
+class FlakyStorage:
+    """
+    Обертка хранилища, первые failures загрузок которой падают.
+    """
+
+    def __init__(self, storage, failures):
+        self.storage = storage
+        self.failures = failures
+        self.loads = 0
+
+    def child_ids(self):
+        return self.storage.child_ids()
+
+    def load_recent(self, child_id, days=7):
+        self.loads += 1
+        if days > 1 and self.failures:
+            self.failures -= 1
+            raise OSError("диск недоступен")
+        return self.storage.load_recent(child_id, days)
+
+
+class GhostStorage:
+    """
+    Обертка хранилища, в списке детей которой есть удаленный ребенок "ghost".
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.broken = False
+
+    def child_ids(self):
+        if self.broken:
+            raise OSError("диск недоступен")
+        return self.storage.child_ids() + ["ghost"]
+
+    def load_recent(self, child_id, days=7):
+        return self.storage.load_recent(child_id, days)
+
+
+def test_nightly_reports(storage):
+    """
+    Тест ночного расчета.
+    Проверяем:
+    1. При запуске считается уже закончившийся день, а следующий -
+       не раньше местной полуночи со смещением
+    2. После нее отчеты за день, неделю и месяц совпадают с get_sleep_stats_range
+    3. Запрос отчета отдает готовый результат без пересчета
+    4. Следующий расчет назначен на следующую ночь
+    5. Отчет за давний день возвращается, даже если хранилище его не держит,
+       а счетчики запросов не теряются при запросах из многих потоков
+    """
+    clock = FakeClock(BERLIN_MIDNIGHT - timedelta(minutes=1))
+    scheduler = ReportScheduler(storage, clock=clock, jitter=timedelta(minutes=30))
+    try:
+        assert scheduler.run_pending() == 1
+        scheduler.drain()
+        assert scheduler.report("anna", "day").last_day == YESTERDAY - timedelta(days=1)
+        due = BERLIN_MIDNIGHT + scheduler._offset("anna")
+        clock.now = due - timedelta(seconds=1)
+        assert scheduler.run_pending() == 0
+        clock.now = due
+        assert scheduler.run_pending() == 1
+        scheduler.drain()
+        assert scheduler.computed == 2
+
+        child = storage.load_child("anna")
+        for period, days in (("day", 1), ("week", 7), ("month", 30)):
+            report = scheduler.report("anna", period)
+            first_day = YESTERDAY - timedelta(days=days - 1)
+            assert (report.first_day, report.last_day) == (first_day, YESTERDAY)
+            assert list(report.days) == child.get_sleep_stats_range(first_day, YESTERDAY)
+            assert report.report.total_sleep_minutes == sum(day[1] for day in report.days)
+        sleep_minutes, awake_minutes, _ = child.get_sleep_stats(YESTERDAY)
+        assert scheduler.report("anna", "day").days == ((YESTERDAY, sleep_minutes, awake_minutes),)
+        assert (scheduler.hits, scheduler.misses) == (5, 0)
+
+        assert scheduler.run_pending() == 0
+        clock.now += timedelta(days=1)
+        assert scheduler.run_pending() == 1
+        scheduler.drain()
+        assert scheduler.report("anna", "week").last_day == YESTERDAY + timedelta(days=1)
+
+        older = scheduler.report("anna", "month", YESTERDAY - timedelta(days=3))
+        assert scheduler.misses == 1
+        assert older.days == tuple(
+            child.get_sleep_stats_range(older.first_day, older.last_day)
+        )
+        # Отчет старше keep_days хранилище вытесняет сразу, но запрос его получает
+        ancient = scheduler.report("anna", "week", YESTERDAY - timedelta(days=20))
+        assert scheduler.misses == 2
+        assert ancient.last_day == YESTERDAY - timedelta(days=20)
+        assert scheduler.store.get("anna", "week", ancient.last_day) is None
+
+        requests = scheduler.hits + scheduler.misses
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: scheduler.report("anna", "day"), range(200)))
+        assert scheduler.hits + scheduler.misses == requests + 200
+        with pytest.raises(ValueError):
+            scheduler.report("anna", "year")
+    finally:
+        scheduler.stop()
+
+
+def test_jitter_spreads_children(tmp_path):
+    """
+    Тест смещения.
+    Проверяем:
+    1. Дети одного часового пояса считаются не в одну минуту
+    2. Смещение ребенка одинаково при каждом запуске
+    3. Ребенок без часового пояса считается по местной полуночи сервера
+    """
+    with SQLiteStorage(tmp_path / "jitter.db") as storage:
+        for number in range(20):
+            storage.save_child(f"child-{number}", _child(days=2))
+        clock = FakeClock(BERLIN_MIDNIGHT)
+        scheduler = ReportScheduler(storage, clock=clock, jitter=timedelta(hours=1))
+        started = []
+        try:
+            for _ in range(60):
+                started.append(scheduler.run_pending())
+                clock.now += timedelta(minutes=1)
+            scheduler.drain()
+        finally:
+            scheduler.stop()
+        assert sum(started) == 20
+        assert max(started) < 20
+        assert ReportScheduler(storage, jitter=timedelta(hours=1))._offset("child-3") == (
+            scheduler._offset("child-3")
+        )
+
+    with SQLiteStorage(tmp_path / "naive.db") as storage:
+        storage.save_child("naive", _child(zone=None, days=2))
+        local_midnight = datetime(2024, 5, 11).astimezone()
+        clock.now = local_midnight.astimezone(timezone.utc) - timedelta(seconds=1)
+        naive = ReportScheduler(storage, clock=clock, jitter=timedelta(0))
+        try:
+            naive.run_pending()
+            naive.drain()
+            assert naive._plans["naive"].day == YESTERDAY
+            assert naive.run_pending() == 0
+            clock.now += timedelta(seconds=1)
+            assert naive.run_pending() == 1
+            naive.drain()
+            assert naive.report("naive", "day").last_day == YESTERDAY
+            assert naive.misses == 0
+        finally:
+            naive.stop()
+
+
+def test_retry_and_backpressure(storage):
+    """
+    Тест повторов и ограничения.
+    Проверяем:
+    1. Неудачный расчет повторяется с растущей паузой, отчет не дублируется
+    2. После max_attempts день пропускается, а не повторяется бесконечно
+    3. В работе не больше max_pending расчетов
+    """
+    flaky = FlakyStorage(storage, failures=2)
+    clock = FakeClock(BERLIN_MIDNIGHT + timedelta(hours=1))
+    store = ReportStore()
+    scheduler = ReportScheduler(
+        flaky, store, clock=clock, retry_delay=timedelta(minutes=1), max_attempts=3
+    )
+    try:
+        assert scheduler.run_pending() == 1
+        scheduler.drain()
+        assert scheduler.failures == 1
+        assert scheduler.run_pending() == 0
+        clock.now += timedelta(minutes=1)
+        assert scheduler.run_pending() == 1
+        scheduler.drain()
+        assert scheduler.failures == 2
+        clock.now += timedelta(minutes=1)
+        assert scheduler.run_pending() == 0
+        clock.now += timedelta(minutes=1)
+        assert scheduler.run_pending() == 1
+        scheduler.drain()
+        assert (scheduler.computed, scheduler.failures) == (1, 2)
+        assert len(store) == 3
+
+        flaky.failures = 10
+        clock.now += timedelta(days=1)
+        for _ in range(5):
+            scheduler.run_pending()
+            scheduler.drain()
+            clock.now += timedelta(hours=1)
+        assert scheduler.failures == 5
+        assert scheduler._plans["anna"].day == YESTERDAY + timedelta(days=2)
+    finally:
+        scheduler.stop()
+
+    for number in range(10):
+        storage.save_child(f"child-{number}", _child(days=2))
+    scheduler = ReportScheduler(storage, clock=clock, max_pending=3, max_workers=2)
+    try:
+        assert scheduler.run_pending() == 3
+        in_flight = sum(1 for plan in scheduler._plans.values() if plan.future is not None)
+        assert in_flight <= 3
+        scheduler.drain()
+        while scheduler.run_pending():
+            scheduler.drain()
+        scheduler.drain()
+        assert scheduler.computed == 11
+    finally:
+        scheduler.stop()
+
+
+def test_errors_and_timezone_change(storage, caplog):
+    """
+    Тест ошибок хранилища и смены часового пояса.
+    Проверяем:
+    1. Ребенок, удаленный между списком детей и загрузкой, пропускается
+       с записью в журнал и в метрики, а остальные дети считаются
+    2. После смены часового пояса следующий расчет назначается
+       по местной полуночи нового пояса
+    3. Фоновый поток не останавливается, если не удалось прочитать список детей
+    """
+    ghost = GhostStorage(storage)
+    clock = FakeClock(BERLIN_MIDNIGHT + timedelta(hours=1))
+    scheduler = ReportScheduler(ghost, clock=clock, jitter=timedelta(0))
+    METRICS.reset()
+    METRICS.enable()
+    try:
+        with caplog.at_level(logging.ERROR):
+            assert scheduler.run_pending() == 1
+        assert "ghost" in caplog.text
+        assert METRICS.get("ReportScheduler._plan").errors == 1
+        scheduler.drain()
+        assert scheduler.computed == 1
+
+        child = storage.load_child("anna")
+        child.timezone = "Asia/Tokyo"
+        storage.save_child("anna", child)
+        clock.now = BERLIN_MIDNIGHT + timedelta(days=1)
+        assert scheduler.run_pending() == 1
+        scheduler.drain()
+        plan = scheduler._plans["anna"]
+        # Полночь 13 мая в Токио (UTC+9) - 15:00 UTC 12 мая
+        assert (plan.calendar.zone, plan.day) == ("Asia/Tokyo", YESTERDAY + timedelta(days=2))
+        assert plan.due == datetime(2024, 5, 12, 15, 0)
+
+        ghost.broken = True
+        scheduler.start(interval=0.01)
+        deadline = time.monotonic() + 5
+        while METRICS.get("ReportScheduler.run_pending").errors < 3:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert scheduler._thread is not None and scheduler._thread.is_alive()
+    finally:
+        scheduler.stop()
+        METRICS.disable()
+        METRICS.reset()
@@ -9,6 +9,7 @@
 """
 
 from datetime import datetime, timedelta
+import sys
 import pytest
 from unittest.mock import patch
 
@@ -147,4 +148,54 @@ def test_is_active(sample_sleep_record):
     sample_sleep_record.end_sleep(end_time)
     
     # Проверяем, что запись стала неактивной
-    assert sample_sleep_record.is_active() is False 
\ No newline at end of file
+    assert sample_sleep_record.is_active() is False 
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="slots в dataclass с Python 3.10")
+def test_slots(sample_sleep_record):
+    """
+    Тест компактного представления записи.
+    Проверяем, что у записи нет словаря атрибутов и нельзя добавить
+    произвольный атрибут.
+    """
+    assert not hasattr(sample_sleep_record, "__dict__")
+    with pytest.raises(AttributeError):
+        sample_sleep_record.unknown = 1
+
+
+def test_duration_cache(sample_sleep_record):
+    """
+    Тест длительности завершенного сна.
+    Проверяем:
+    1. Длительность в целых секундах (доли секунды отбрасываются)
+    2. Повторное завершение сна пересчитывает длительность
+    3. Прямое присваивание end_time тоже пересчитывает длительность
+    """
+    start = sample_sleep_record.start_time
+    sample_sleep_record.end_sleep(start + timedelta(hours=1, seconds=59, microseconds=999))
+    assert sample_sleep_record.duration_seconds() == 3659
+    assert sample_sleep_record.duration == (1, 0)
+
+    sample_sleep_record.end_sleep(start + timedelta(days=1, hours=2, minutes=5))
+    assert sample_sleep_record.duration_seconds() == 26 * 3600 + 300
+    assert sample_sleep_record.format_duration() == "26:05"
+
+    sample_sleep_record.end_time = start + timedelta(minutes=45)
+    assert sample_sleep_record.duration_seconds() == 45 * 60
+    assert sample_sleep_record.duration == (0, 45)
+
+
+@patch('sleep_tracker.core.models.sleep_record.datetime')
+def test_shared_now(mock_datetime):
+    """
+    Тест активного сна с общим моментом now.
+    Проверяем:
+    1. При переданном now текущее время не запрашивается
+    2. now раньше начала сна дает нулевую длительность
+    """
+    start = datetime(2024, 3, 15, 20, 30)
+    records = [SleepRecord(start + timedelta(minutes=minutes)) for minutes in (0, 15, 90)]
+    now = start + timedelta(hours=2)
+    assert [record.format_duration(now) for record in records] == ["02:00", "01:45", "00:30"]
+    mock_datetime.now.assert_not_called()
+
+    assert records[0].duration_seconds(start - timedelta(minutes=5)) == 0
@@ -0,0 +1,175 @@
+"""
+Модуль с тестами для хранилища SQLite.
+
+Демонстрирует:
+1. Проверку схемы базы (режим WAL, индексы)
+2. Сравнение агрегатов SQL с вычислениями в Python
+3. Параллельное чтение из нескольких потоков
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import random
+import sqlite3
+
+import pytest
+
+from sleep_tracker.core.exceptions import ChildNotFoundError, StorageError
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """
+    Фикстура с базой во временном каталоге.
+    """
+    with SQLiteStorage(tmp_path / "sleep.db") as storage:
+        yield storage
+
+
+@pytest.fixture
+def child():
+    """
+    Фикстура с ребенком и случайной историей сна (фиксированный seed).
+    """
+    rng = random.Random(3)
+    child = Child(name="Тест", birth_date=date(2023, 1, 1))
+    current = datetime(2024, 1, 1, 20, 0)
+    records = []
+    for _ in range(400):
+        length = timedelta(minutes=rng.randint(20, 700), microseconds=rng.randint(0, 999999))
+        records.append(SleepRecord(current, current + length, rng.choice(["", "Уснул быстро"])))
+        current += length + timedelta(minutes=rng.randint(60, 300))
+    child.add_records(records)
+    return child
+
+
+def test_schema(storage):
+    """
+    Тест схемы: режим WAL и индексы по времени начала и окончания.
+    """
+    connection = sqlite3.connect(storage.path)
+    assert connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    indexes = {
+        row[1] for row in connection.execute("PRAGMA index_list(sleep_records)")
+    }
+    assert {"ix_sleep_records_child_start", "ix_sleep_records_child_end"} <= indexes
+    connection.close()
+
+
+def test_round_trip(storage, child):
+    """
+    Тест сохранения и загрузки.
+    Проверяем:
+    1. Полное сохранение ребенка и повторное сохранение (замену)
+    2. События начала, завершения и комментария
+    3. Ошибки для неизвестного ребенка и неизвестной записи
+    """
+    storage.save_child("anna", child)
+    storage.save_child("anna", child)
+    assert storage.load_child("anna") == child
+    assert storage.child_ids() == ["anna"]
+
+    record = child.start_sleep(datetime(2024, 6, 1, 13, 0), "Дневной")
+    storage.append_start("anna", record)
+    assert storage.load_child("anna").get_active_sleep() == record
+
+    child.end_sleep(datetime(2024, 6, 1, 14, 30), "Проснулся сам")
+    storage.append_end("anna", record)
+    record.comment += "\nВсе хорошо"
+    storage.append_comment("anna", record)
+    assert storage.load_child("anna") == child
+
+    with pytest.raises(ChildNotFoundError):
+        storage.load_child("nobody")
+    with pytest.raises(ChildNotFoundError):
+        storage.append_start("nobody", SleepRecord(datetime(2024, 6, 2, 13, 0)))
+    with pytest.raises(StorageError):
+        storage.append_comment("anna", SleepRecord(datetime(2020, 1, 1, 13, 0)))
+
+
+def test_stats_match_child(storage, child):
+    """
+    Тест агрегатов SQL.
+    Проверяем, что статистика из базы совпадает со статистикой Child
+    за каждый день, в том числе записи за день, а для неизвестного
+    ребенка, как и load_child, выбрасывается ChildNotFoundError.
+    """
+    storage.save_child("anna", child)
+    first_day = date(2023, 12, 30)
+    last_day = child.sleep_records[-1].end_time.date() + timedelta(days=1)
+
+    assert storage.get_sleep_stats_range("anna", first_day, last_day) == (
+        child.get_sleep_stats_range(first_day, last_day)
+    )
+    for offset in range(0, (last_day - first_day).days, 7):
+        day = first_day + timedelta(days=offset)
+        assert storage.get_sleep_stats("anna", day) == child.get_sleep_stats(day)
+    assert storage.get_sleep_stats_range("anna", last_day, first_day) == []
+
+    with pytest.raises(ChildNotFoundError):
+        storage.get_sleep_stats("missing", first_day)
+    with pytest.raises(ChildNotFoundError):
+        storage.get_sleep_stats_range("missing", first_day, last_day)
+
+
+def test_concurrent_readers(storage, child):
+    """
+    Тест параллельного чтения: потоков больше, чем соединений в пуле.
+    """
+    storage.save_child("anna", child)
+    expected = child.get_sleep_stats_range(date(2024, 1, 1), date(2024, 3, 1))
+
+    def read(_):
+        return storage.get_sleep_stats_range("anna", date(2024, 1, 1), date(2024, 3, 1))
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(read, range(64)))
+    assert all(result == expected for result in results)
+
+
+def test_load_recent(storage, child):
+    """
+    Тест ленивой загрузки истории.
+    Проверяем:
+    1. В памяти только недавние записи и активный сон
+    2. Статистика и запросы по диапазону совпадают с полной загрузкой,
+       старые записи подгружаются по мере надобности
+    3. sleep_records ведет себя как список и загружает всю историю
+    """
+    child.start_sleep(child.sleep_records[-1].end_time + timedelta(hours=2))
+    storage.save_child("anna", child)
+
+    lazy = storage.load_recent("anna", days=7)
+    assert not lazy.history_loaded
+    assert 1 < lazy.loaded_records < 30
+    assert lazy.get_active_sleep() == child.get_active_sleep()
+
+    last_day = child.sleep_records[-1].start_time.date()
+    for offset in range(10):
+        day = last_day - timedelta(days=offset)
+        assert lazy.get_sleep_stats(day) == child.get_sleep_stats(day)
+    loaded = lazy.loaded_records
+    assert loaded < 40
+
+    first_day = last_day - timedelta(days=60)
+    assert lazy.get_sleep_stats_range(first_day, last_day) == child.get_sleep_stats_range(
+        first_day, last_day
+    )
+    start = datetime.combine(first_day, datetime.min.time())
+    assert lazy.get_records_between(start, datetime.max) == child.get_records_between(
+        start, datetime.max
+    )
+    assert loaded < lazy.loaded_records < len(child.sleep_records)
+
+    lazy.end_sleep(child.get_active_sleep().start_time + timedelta(hours=1))
+    assert not lazy.history_loaded
+    assert len(lazy.sleep_records) == len(child.sleep_records)
+    assert lazy.history_loaded
+    assert lazy.sleep_records[0] == child.sleep_records[0]
+
+    assert storage.load_recent("anna") == storage.load_child("anna")
+    with pytest.raises(ChildNotFoundError):
+        storage.load_recent("missing")
@@ -0,0 +1,313 @@
+"""
+Модуль с тестами для синхронизации записей между устройствами.
+
+Сервер работает в том же процессе, а запросы и ответы проходят через
+JSON, как по сети.
+
+Демонстрирует:
+1. Получение только изменений после версии клиента
+2. Одинаковый результат слияния при любом порядке синхронизации
+   (в том числе для всех перестановок трех устройств)
+3. Повтор запроса после обрыва связи и полный снимок для отставших клиентов
+4. Сны одного устройства подряд не сливаются друг с другом
+"""
+
+from datetime import date, datetime, timedelta
+import itertools
+import json
+
+import pytest
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+from sleep_tracker.services.tracker.sync import (
+    SyncClient,
+    SyncDelta,
+    SyncServer,
+    decode_delta,
+    encode_delta,
+    merge_evidence,
+)
+
+NIGHT = datetime(2024, 5, 10, 20, 0)
+
+
+def _wire(server, log=None):
+    """
+    Транспорт к серверу в том же процессе: запрос и ответ проходят через JSON.
+    """
+
+    def transport(request):
+        response = json.dumps(server.handle(json.loads(json.dumps(request))))
+        if log is not None:
+            log.append(len(response))
+        return json.loads(response)
+
+    return transport
+
+
+def _history(days):
+    records = []
+    for offset in range(days):
+        start = NIGHT - timedelta(days=days - offset)
+        records.append(SleepRecord(start, start + timedelta(hours=10), f"ночь {offset}"))
+        nap = start + timedelta(hours=16)
+        records.append(SleepRecord(nap, nap + timedelta(hours=1, minutes=30)))
+    return records
+
+
+def _server(days=0, **kwargs):
+    server = SyncServer(epoch="test", **kwargs)
+    child = Child(name="Анна", birth_date=date(2023, 1, 1), sleep_records=_history(days))
+    server.add_child("anna", child)
+    return server
+
+
+def _state(child):
+    return [(record.start_time, record.end_time, record.comment) for record in child.sleep_records]
+
+
+def test_delta_only():
+    """
+    Тест дельты.
+    Проверяем:
+    1. Первый запрос получает снимок, следующий - только новые записи
+    2. Версия растет с каждым изменением записи
+    3. Дельта во много раз меньше снимка и переживает кодирование
+    """
+    server = _server(days=500)
+    sizes = []
+    phone, bot = SyncClient("anna", _wire(server, sizes)), SyncClient("anna", _wire(server))
+    assert phone.sync().snapshot and bot.sync().snapshot
+    assert len(phone.child.sleep_records) == 1000
+
+    bot.start_sleep(NIGHT, "уснул")
+    bot.sync()
+    bot.end_sleep(NIGHT + timedelta(hours=10), "проснулся")
+    bot.sync()
+    assert server.version("anna") == 2
+
+    delta = phone.sync()
+    assert not delta.snapshot and delta.version == 2
+    assert [record.start_time for record in delta.records] == [NIGHT]
+    assert _state(phone.child) == _state(bot.child)
+    assert phone.child.sleep_records[-1].comment == "уснул\nпроснулся"
+    assert sizes[1] * 100 < sizes[0]
+
+    assert phone.sync().records == []
+    roundtrip = decode_delta(json.loads(json.dumps(encode_delta(delta))))
+    assert roundtrip == delta
+
+
+@pytest.mark.parametrize("order", ["ab", "ba"])
+def test_concurrent_edits_converge(order):
+    """
+    Тест слияния: два взрослых записали один и тот же сон без связи.
+    Проверяем:
+    1. При любом порядке синхронизации остается одна запись
+       с первым началом и первым пробуждением
+    2. После синхронизации устройства совпадают с сервером
+    3. Следующий сон записывается как обычно
+    """
+    server = _server(days=3)
+    clients = {"a": SyncClient("anna", _wire(server)), "b": SyncClient("anna", _wire(server))}
+    for client in clients.values():
+        client.sync()
+    clients["a"].start_sleep(NIGHT, "мама")
+    clients["b"].start_sleep(NIGHT + timedelta(minutes=5), "папа")
+    clients["b"].end_sleep(NIGHT + timedelta(hours=10, minutes=10))
+    clients["a"].end_sleep(NIGHT + timedelta(hours=10))
+
+    for name in order + order:
+        clients[name].sync()
+
+    fresh = SyncClient("anna", _wire(server))
+    fresh.sync()
+    server_child = fresh.child
+    tonight = server_child.get_records_between(NIGHT - timedelta(hours=1), NIGHT + timedelta(days=1))
+    assert [(record.start_time, record.end_time) for record in tonight] == [
+        (NIGHT, NIGHT + timedelta(hours=10))
+    ]
+    assert set(tonight[0].comment.split("\n")) == {"мама", "папа"}
+    assert _state(clients["a"].child) == _state(server_child) == _state(clients["b"].child)
+
+    nap = NIGHT + timedelta(hours=15)
+    clients[order[0]].start_sleep(nap)
+    clients[order[0]].sync()
+    clients[order[1]].sync()
+    assert clients[order[1]].child.get_active_sleep().start_time == nap
+
+
+def _offline_edits(clients):
+    """
+    Три взрослых без связи записали одну ночь по-разному, а двое - еще и дневной сон.
+    """
+    clients["a"].start_sleep(NIGHT, "мама")
+    clients["a"].end_sleep(NIGHT + timedelta(hours=10))
+    clients["a"].start_sleep(NIGHT + timedelta(hours=15))
+    clients["b"].start_sleep(NIGHT + timedelta(minutes=5), "папа")
+    clients["b"].end_sleep(NIGHT + timedelta(hours=10, minutes=10))
+    clients["b"].start_sleep(NIGHT + timedelta(hours=15, minutes=20))
+    clients["b"].end_sleep(NIGHT + timedelta(hours=16, minutes=30), "дневной")
+    # Начало внутри сна, записанного другими, и более раннее пробуждение
+    clients["c"].start_sleep(NIGHT + timedelta(hours=2), "бабушка")
+    clients["c"].end_sleep(NIGHT + timedelta(hours=9, minutes=50))
+
+
+def test_every_sync_order_converges():
+    """
+    Тест независимости слияния от порядка.
+    Проверяем:
+    1. При каждой из шести перестановок порядка синхронизации трех устройств
+       сервер приходит к одному и тому же состоянию
+    2. Ночь - одна запись с первым началом и первым пробуждением,
+       дневной сон - одна завершенная запись
+    3. После второго круга все устройства совпадают с сервером
+    4. merge_evidence не зависит от порядка правок
+    """
+    states = set()
+    for order in itertools.permutations("abc"):
+        server = _server(days=2)
+        clients = {name: SyncClient("anna", _wire(server)) for name in "abc"}
+        for client in clients.values():
+            client.sync()
+        _offline_edits(clients)
+        for name in order + order:
+            clients[name].sync()
+
+        fresh = SyncClient("anna", _wire(server))
+        fresh.sync()
+        state = tuple(_state(fresh.child))
+        states.add(state)
+        for client in clients.values():
+            assert tuple(_state(client.child)) == state
+
+    (state,) = states
+    assert list(state[-2:]) == [
+        (NIGHT, NIGHT + timedelta(hours=9, minutes=50), "мама\nпапа\nбабушка"),
+        (NIGHT + timedelta(hours=15), NIGHT + timedelta(hours=16, minutes=30), "дневной"),
+    ]
+
+    evidence = [
+        (NIGHT, 0, None, "мама"),
+        (NIGHT, 1, NIGHT + timedelta(hours=10), ""),
+        (NIGHT + timedelta(hours=2), 1, NIGHT + timedelta(hours=9), ""),
+        (NIGHT + timedelta(hours=12), 0, None, ""),
+        (NIGHT + timedelta(hours=15), 0, None, ""),
+    ]
+    # Начало в 8:00 после ночи отбрасывается: позже начат другой сон
+    expected = [
+        SleepRecord(NIGHT, NIGHT + timedelta(hours=9), "мама"),
+        SleepRecord(NIGHT + timedelta(hours=15)),
+    ]
+    for items in itertools.permutations(evidence):
+        assert merge_evidence(items) == expected
+
+
+def test_retry_and_storage(tmp_path):
+    """
+    Тест повторной отправки и хранилища.
+    Проверяем:
+    1. Ответ потерян - повтор не создает вторую запись
+    2. Записи сохраняются в хранилище, новый сервер отдает снимок
+    """
+    with SQLiteStorage(tmp_path / "sync.db") as storage:
+        server = SyncServer(storage, epoch="first")
+        server.add_child("anna", Child(name="Анна", birth_date=date(2023, 1, 1)))
+        wire = _wire(server)
+        lost = []
+
+        def flaky(request):
+            response = wire(request)
+            if not lost:
+                lost.append(request)
+                raise ConnectionError("связь оборвалась")
+            return response
+
+        client = SyncClient("anna", flaky)
+        with pytest.raises(ConnectionError):
+            client.sync()
+        client.sync()
+        client.start_sleep(NIGHT)
+        client.end_sleep(NIGHT + timedelta(hours=9))
+        lost.clear()
+        with pytest.raises(ConnectionError):
+            client.sync()
+        assert len(client.pending) == 2
+        client.sync()
+        assert client.pending == []
+        assert _state(client.child) == [(NIGHT, NIGHT + timedelta(hours=9), "")]
+        assert _state(storage.load_child("anna")) == _state(client.child)
+
+        restarted = SyncServer(storage, epoch="second")
+        client.transport = _wire(restarted)
+        assert client.sync().snapshot
+        assert _state(client.child) == [(NIGHT, NIGHT + timedelta(hours=9), "")]
+
+
+def test_log_limit_and_removed_keys():
+    """
+    Тест ограниченного журнала версий.
+    Проверяем:
+    1. Отставший клиент получает снимок, а не неполную дельту
+    2. Ключ, слившийся с другой записью, приходит как удаленный
+    """
+    server = _server(days=1, max_log=4)
+    late, active = SyncClient("anna", _wire(server)), SyncClient("anna", _wire(server))
+    late.sync()
+    active.sync()
+    for day in range(3):
+        start = NIGHT + timedelta(days=day)
+        active.start_sleep(start)
+        active.sync()
+        active.end_sleep(start + timedelta(hours=10))
+        active.sync()
+    assert late.sync().snapshot
+    assert _state(late.child) == _state(active.child)
+
+    late.start_sleep(NIGHT + timedelta(days=3, minutes=10))
+    active.start_sleep(NIGHT + timedelta(days=3))
+    active.sync()
+    delta = late.sync()
+    assert not delta.snapshot
+    assert delta.removed == [NIGHT + timedelta(days=3, minutes=10)]
+    assert late.child.get_active_sleep().start_time == NIGHT + timedelta(days=3)
+    assert isinstance(delta, SyncDelta)
+
+
+def test_back_to_back_naps():
+    """
+    Тест снов подряд на одном устройстве.
+    Проверяем:
+    1. Сон, начатый меньше чем через час после начала завершенного сна,
+       остается отдельной записью, а активный сон на устройстве не теряется
+    2. Сервер, сливающий только задетый промежуток, совпадает
+       с полным слиянием всех правок
+    3. Разные комментарии не теряются, даже если один содержит другой
+    """
+    server = _server(days=2)
+    phone = SyncClient("anna", _wire(server))
+    phone.sync()
+    nap = NIGHT + timedelta(hours=18)
+    phone.start_sleep(nap)
+    phone.end_sleep(nap + timedelta(minutes=20))
+    phone.sync()
+    phone.start_sleep(nap + timedelta(minutes=40))
+    phone.sync()
+    assert phone.child.get_active_sleep().start_time == nap + timedelta(minutes=40)
+    phone.end_sleep(nap + timedelta(hours=1, minutes=30))
+    phone.sync()
+
+    fresh = SyncClient("anna", _wire(server))
+    fresh.sync()
+    assert _state(fresh.child)[-2:] == [
+        (nap, nap + timedelta(minutes=20), ""),
+        (nap + timedelta(minutes=40), nap + timedelta(hours=1, minutes=30), ""),
+    ]
+    assert _state(phone.child) == _state(fresh.child)
+    assert fresh.child.sleep_records == merge_evidence(server._logs["anna"].evidence)
+
+    end = NIGHT + timedelta(hours=10)
+    merged = merge_evidence([(NIGHT, 1, end, "не спал"), (NIGHT, 1, end, "спал")])
+    assert merged == [SleepRecord(NIGHT, end, "не спал\nспал")]
@@ -0,0 +1,187 @@
+"""
+Модуль с тестами для асинхронного сервиса Telegram бота.
+
+Демонстрирует:
+1. Запуск асинхронного кода в обычных тестах через asyncio.run
+2. Проверку блокировок при одновременных запросах
+3. Объединение повторных запросов статистики
+4. Ограниченное число детей в памяти при многих чатах
+5. Время событий и дни в часовом поясе ребенка
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from sleep_tracker.core.exceptions import ChildNotFoundError
+from sleep_tracker.interfaces.telegram.service import SleepBotService, chat_child_id
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+
+CHAT_ID = -100123
+
+
+class FakeClock:
+    """
+    Управляемый источник времени для окна объединения запросов.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """
+    Фикстура с базой SQLite во временном каталоге.
+    """
+    with SQLiteStorage(tmp_path / "bot.db") as storage:
+        yield storage
+
+
+def test_concurrent_wake(storage):
+    """
+    Тест одновременного "проснулся" от двух родителей.
+    Проверяем:
+    1. Сон завершается ровно один раз
+    2. Второй запрос получает ValueError
+    3. В хранилище сохранена одна завершенная запись
+    """
+    async def scenario():
+        service = SleepBotService(storage)
+        await service.register(CHAT_ID, "Тест", date(2023, 1, 1))
+        await service.start_sleep(CHAT_ID, datetime(2024, 3, 15, 13, 0))
+        return await asyncio.gather(
+            service.end_sleep(CHAT_ID, datetime(2024, 3, 15, 14, 0)),
+            service.end_sleep(CHAT_ID, datetime(2024, 3, 15, 14, 1)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert len(errors) == 1 and isinstance(errors[0], ValueError)
+
+    records = storage.load_child(chat_child_id(CHAT_ID)).sleep_records
+    assert len(records) == 1
+    assert records[0].end_time == datetime(2024, 3, 15, 14, 0)
+
+
+def test_stats_coalescing(storage):
+    """
+    Тест объединения запросов статистики.
+    Проверяем:
+    1. Одновременные запросы считаются один раз
+    2. Повторный запрос в пределах окна берет готовый результат
+    3. После окна и после изменения записей статистика пересчитывается
+    """
+    clock = FakeClock()
+    day = date(2024, 3, 15)
+
+    async def scenario():
+        service = SleepBotService(storage, coalesce_window=1.0, clock=clock)
+        await service.register(CHAT_ID, "Тест", date(2023, 1, 1))
+        await service.start_sleep(CHAT_ID, datetime(2024, 3, 15, 13, 0))
+        await service.end_sleep(CHAT_ID, datetime(2024, 3, 15, 14, 30))
+
+        results = await asyncio.gather(*(service.stats(CHAT_ID, day) for _ in range(20)))
+        assert all(totals.sleep_minutes == 90 for totals in results)
+        assert service.stats_computations == 1
+
+        clock.now = 0.5
+        await service.stats(CHAT_ID, day)
+        assert service.stats_computations == 1
+
+        clock.now = 1.5
+        await service.stats(CHAT_ID, day)
+        assert service.stats_computations == 2
+
+        await service.start_sleep(CHAT_ID, datetime(2024, 3, 15, 16, 0))
+        await service.end_sleep(CHAT_ID, datetime(2024, 3, 15, 16, 45))
+        totals = await service.stats(CHAT_ID, day)
+        assert service.stats_computations == 3
+        assert totals.sleep_minutes == 135
+        assert totals.naps == 2
+
+    asyncio.run(scenario())
+
+
+def test_register_and_reload(storage):
+    """
+    Тест регистрации и загрузки ребенка из хранилища.
+    Проверяем:
+    1. Без регистрации запросы дают ChildNotFoundError
+    2. Новый экземпляр сервиса продолжает работу с сохраненным состоянием
+    3. Повторная регистрация не теряет историю сна
+    """
+    async def scenario():
+        service = SleepBotService(storage)
+        with pytest.raises(ChildNotFoundError):
+            await service.start_sleep(CHAT_ID, datetime(2024, 3, 15, 13, 0))
+        await service.register(CHAT_ID, "Тест", date(2023, 1, 1))
+        await service.start_sleep(CHAT_ID, datetime(2024, 3, 15, 13, 0))
+
+        restarted = SleepBotService(storage)
+        active = await restarted.active_sleep(CHAT_ID)
+        assert active is not None and active.start_time == datetime(2024, 3, 15, 13, 0)
+        await restarted.end_sleep(CHAT_ID, datetime(2024, 3, 15, 14, 0))
+
+        child = await restarted.register(CHAT_ID, "Новое имя", date(2023, 1, 2))
+        assert len(child.sleep_records) == 1
+        assert (await restarted.stats(CHAT_ID, date(2024, 3, 15))).sleep_minutes == 60
+
+    asyncio.run(scenario())
+    assert storage.load_child(chat_child_id(CHAT_ID)).name == "Новое имя"
+
+
+def test_many_chats_bounded(storage):
+    """
+    Тест памяти при многих чатах.
+    Проверяем:
+    1. В памяти не больше capacity детей, остальные вытесняются
+    2. Вытесненный ребенок загружается заново без потери событий
+    """
+    async def scenario():
+        service = SleepBotService(storage, capacity=4)
+        for chat_id in range(50):
+            await service.register(chat_id, f"Ребенок {chat_id}", date(2023, 1, 1))
+            await service.start_sleep(chat_id, datetime(2024, 3, 15, 13, 0))
+        assert len(service.registry) <= 4
+        record = await service.end_sleep(0, datetime(2024, 3, 15, 14, 0))
+        assert record.start_time == datetime(2024, 3, 15, 13, 0)
+
+    asyncio.run(scenario())
+    assert storage.load_child(chat_child_id(49)).get_active_sleep() is not None
+    assert storage.load_child(chat_child_id(0)).sleep_records[0].end_time == datetime(
+        2024, 3, 15, 14, 0
+    )
+
+
+def test_timezone_child(storage):
+    """
+    Тест ребенка с часовым поясом.
+    Проверяем:
+    1. Повторная регистрация сохраняет часовой пояс
+    2. Время события по умолчанию - текущее время в UTC, как у записей ребенка
+    3. Статистика по умолчанию берется за сегодняшний день ребенка
+    """
+    async def scenario():
+        service = SleepBotService(storage)
+        await service.register(CHAT_ID, "Тест", date(2023, 1, 1), "Asia/Tokyo")
+        child = await service.register(CHAT_ID, "Новое имя", date(2023, 1, 1))
+        assert child.timezone == "Asia/Tokyo"
+
+        before = datetime.now(timezone.utc).replace(tzinfo=None)
+        record = await service.start_sleep(CHAT_ID)
+        after = datetime.now(timezone.utc).replace(tzinfo=None)
+        assert before <= record.start_time <= after
+        await service.end_sleep(CHAT_ID, record.start_time + timedelta(minutes=30))
+
+        calendar = await service.calendar(CHAT_ID)
+        assert calendar.zone == "Asia/Tokyo"
+        assert await service.stats(CHAT_ID) == await service.stats(CHAT_ID, calendar.today())
+
+    asyncio.run(scenario())
+    assert storage.load_child(chat_child_id(CHAT_ID)).timezone == "Asia/Tokyo"
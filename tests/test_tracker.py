@@ -0,0 +1,145 @@
+"""
+Модуль с тестами для сервиса отслеживания сна и накопительной статистики.
+
+Демонстрирует:
+1. Сравнение инкрементального расчета с полным пересчетом
+2. Работу сервиса вместе с хранилищем
+3. Итоги ребенка с ленивой историей без загрузки всей истории
+"""
+
+from datetime import date, datetime, timedelta
+import random
+
+import pytest
+
+from sleep_tracker.core.models.child import Child
+from sleep_tracker.core.models.sleep_record import SleepRecord
+from sleep_tracker.services.storage.journal import JournalStorage
+from sleep_tracker.services.storage.sqlite import SQLiteStorage
+from sleep_tracker.services.tracker.accumulator import SleepAccumulator
+from sleep_tracker.services.tracker.service import SleepTracker
+
+
+@pytest.fixture
+def tracker():
+    """
+    Фикстура с сервисом, через который прошла случайная история сна.
+    """
+    rng = random.Random(11)
+    tracker = SleepTracker(Child(name="Тест", birth_date=date(2023, 1, 1)))
+    current = datetime(2024, 1, 1, 20, 0)
+    for _ in range(300):
+        tracker.start_sleep(current)
+        current += timedelta(minutes=rng.randint(20, 720), seconds=rng.randint(0, 59))
+        tracker.end_sleep(current)
+        current += timedelta(minutes=rng.randint(60, 400))
+    return tracker
+
+
+def _days(tracker):
+    first_day = tracker.child.sleep_records[0].start_time.date()
+    last_day = tracker.child.sleep_records[-1].end_time.date()
+    return [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 2)]
+
+
+def test_day_totals_match_sleep_stats(tracker):
+    """
+    Тест дневных итогов.
+    Проверяем:
+    1. Совпадение с get_sleep_stats за каждый день
+    2. Разделение на дневной и ночной сон и количество дневных снов
+    """
+    for day in _days(tracker):
+        sleep_minutes, awake_minutes, records = tracker.child.get_sleep_stats(day)
+        totals = tracker.day(day)
+        assert totals.sleep_minutes == sleep_minutes
+        assert totals.awake_minutes == awake_minutes
+        assert totals.daytime_minutes + totals.night_minutes == sleep_minutes
+        assert totals.naps == sum(record.is_daytime for record in records)
+
+
+def test_windows_match_sleep_stats(tracker):
+    """
+    Тест скользящих окон за 7 и 30 дней.
+    """
+    days = _days(tracker)
+    for last_day in days[::5]:
+        for length, totals in ((7, tracker.week(last_day)), (30, tracker.month(last_day))):
+            expected = sum(
+                tracker.child.get_sleep_stats(last_day - timedelta(days=offset))[0]
+                for offset in range(length)
+            )
+            assert totals.sleep_minutes == expected
+
+
+def test_rebuild(tracker):
+    """
+    Тест пересчета с нуля: результат совпадает с инкрементальным,
+    а активный сон не учитывается.
+    """
+    day = _days(tracker)[10]
+    before = tracker.month(day)
+    tracker.start_sleep(datetime(2025, 1, 1, 20, 0))
+    tracker.rebuild()
+    assert tracker.month(day) == before
+    assert SleepAccumulator.from_records(tracker.child.sleep_records).month(day) == before
+
+
+def test_tracker_with_storage(tmp_path):
+    """
+    Тест сохранения событий сервисом.
+    """
+    child = Child(name="Тест", birth_date=date(2023, 1, 1))
+    with JournalStorage(tmp_path) as storage:
+        storage.save_child("anna", child)
+        tracker = SleepTracker(child, "anna", storage)
+        tracker.start_sleep(datetime(2024, 3, 15, 13, 0), "Дневной")
+        tracker.end_sleep(datetime(2024, 3, 15, 14, 30), "Проснулся сам")
+        assert storage.load_child("anna") == child
+        assert tracker.day(date(2024, 3, 15)).naps == 1
+
+    with pytest.raises(ValueError):
+        SleepTracker(child, storage=storage)
+
+
+def test_lazy_history(tmp_path):
+    """
+    Тест сервиса для ребенка, загруженного через load_recent.
+    Проверяем:
+    1. Создание сервиса не загружает старую историю
+    2. Окна за неделю и месяц и старый день совпадают с полной загрузкой,
+       подгружается только история, которую задевает запрос
+    3. Новый сон учитывается один раз
+    """
+    records = []
+    night = datetime(2024, 1, 1, 21, 0)
+    for _ in range(200):
+        records.append(SleepRecord(night, night + timedelta(hours=9, minutes=30)))
+        nap = night + timedelta(hours=16)
+        records.append(SleepRecord(nap, nap + timedelta(hours=1, minutes=15)))
+        night += timedelta(days=1)
+    last_day = records[-1].end_time.date()
+
+    with SQLiteStorage(tmp_path / "lazy.db") as storage:
+        child = Child(name="Тест", birth_date=date(2023, 1, 1), sleep_records=records)
+        storage.save_child("anna", child)
+        lazy = storage.load_recent("anna", days=7)
+        tracker = SleepTracker(lazy, "anna", storage)
+        full = SleepTracker(storage.load_child("anna"))
+        assert lazy.loaded_records < 20
+
+        assert tracker.week(last_day) == full.week(last_day)
+        assert tracker.month(last_day) == full.month(last_day)
+        assert not lazy.history_loaded
+        assert lazy.loaded_records < 70
+        old_day = last_day - timedelta(days=100)
+        assert tracker.day(old_day) == full.day(old_day)
+        assert tracker.month(last_day) == full.month(last_day)
+
+        tracker.start_sleep(night)
+        full.start_sleep(night)
+        tracker.end_sleep(night + timedelta(hours=10))
+        full.end_sleep(night + timedelta(hours=10))
+        next_day = last_day + timedelta(days=1)
+        assert tracker.week(next_day) == full.week(next_day)
+        assert not lazy.history_loaded